@@ -6,23 +6,79 @@ import io
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 import json
+import hashlib
+import threading
 from PIL import Image
-from supabase import create_client, Client
 import matplotlib.pyplot as plt
-import plotly.graph_objects as go
+from f1_core import F1Repository
+from f1_core.connection import create_supabase_client
+from f1_core.throttle import RateLimiter, ThrottledClient
+from f1_core.snapshots import SnapshotCache
+from f1_core.drafts import DraftWriter
+from f1_core.lifecycle import LifecycleScheduler, rescore_and_save
+from f1_core.ingest import ADAPTERS, import_results
+from f1_core.memory import budget as cache_budget, cached, leak_monitor, rss_bytes
+from f1_core import shared_cache
+from f1_core.charts import bar_figure, frame_digest, lean_trend, trend_figure
+from f1_core.archive import all_time_standings, archive_season, list_archives, load_archive
+from f1_core.events import (
+    DEFAULT_SNAPSHOT_EVERY, baseline_snapshot, format_time, rebuild_state, standings_diff
+)
+from f1_core.models import (
+    USER_NAMES, TIME_DIFF_OPTIONS, CLASSIFIED_DRIVERS_OPTIONS, TEAMS_WITH_POINTS_OPTIONS,
+    YES_NO_OPTIONS, CATEGORY_LABELS, PREDICTION_FIELDS, EXTRA_ANSWER_PREFIX, build_submission, extra_answer_key, get_f1_drivers, parse_deadline, deadline_passed, local_moment, app_now,
+    hot_season, season_of, utc_timestamp
+)
+from f1_core.scoring import (
+    SCORING_RULESETS, ACTIVE_RULESET_VERSION, DB_VIEWS_RULESET_VERSION,
+    score_submission, format_point_details, rules_markdown, max_fixed_points
+)
+from f1_core.aggregation import (
+    count_predictions, answer_counts_from_submissions, compute_leaderboard,
+    leaderboard_from_race_points, field_counts_from_rows, build_user_history, season_simulation_table
+)
+from f1_core.crowd import contrarian_scores
 
 
 # Konfiguracja strony
 st.set_page_config(page_title="F1 Ankietka", page_icon="🏎️", layout="wide")
 
+# Migawki klasyfikacji: katalog, wiek [s], po którym są odświeżane w tle, i jak długo na końcu
+# przebiegu czekamy na odświeżenie, żeby podmienić wyświetloną klasyfikację
+SNAPSHOT_DIR = os.environ.get("F1_SNAPSHOT_DIR", ".snapshots")
+# Archiwum zakończonych sezonów (pliki Parquet, f1_core.archive)
+ARCHIVE_DIR = os.environ.get("F1_ARCHIVE_DIR", ".archive")
+LEADERBOARD_MAX_AGE = 30
+LEADERBOARD_REFRESH_WAIT = 10
+
+# Limit zapytań do Supabase na proces (wszystkie sesje): zapytania na sekundę i zapas na chwilowy szczyt
+SUPABASE_RATE_LIMIT = 20
+SUPABASE_BURST = 40
+pending_leaderboards = []
+
+# Harmonogram cyklu życia wyścigów (otwarcie, zamknięcie po terminie, punktacja po zapisaniu wyników):
+# "app" - wątek w tle w każdym procesie aplikacji, "worker" - osobny proces "f1_cli.py scheduler"
+LIFECYCLE_SCHEDULER = os.environ.get("F1_SCHEDULER", "app")
+LIFECYCLE_INTERVAL = 30
+# Jak długo lista aktywnych wyścigów jest brana z cache (harmonogram w procesie aplikacji czyści go wcześniej)
+ACTIVE_RACES_TTL = 60
+
+# Jeden klient Supabase (i pula połączeń HTTP) na proces, wspólny dla wszystkich sesji i przebiegów.
+# Identyczne odczyty z wielu sesji naraz idą do bazy raz, a wszystkie zapytania mają wspólny limit.
+@st.cache_resource(show_spinner=False)
+def get_supabase_client(url, key):
+    return ThrottledClient(create_supabase_client(url, key), RateLimiter(SUPABASE_RATE_LIMIT, SUPABASE_BURST))
+
+
 # Inicjalizacja klienta Supabase
 try:
     supabase_url = st.secrets["supabase"]["url"]
     supabase_key = st.secrets["supabase"]["key"]
-    supabase: Client = create_client(supabase_url, supabase_key)
+    supabase = get_supabase_client(supabase_url, supabase_key)
+    repo = F1Repository(supabase)
     supabase_connected = True
 except Exception as e:
     st.warning(f"Nie udało się połączyć z Supabase: {e}")
@@ -51,220 +107,414 @@ st.title("🏁 F1 Ankietka 🏎️")
 app_description = load_app_description()
 st.markdown(app_description)
 
-# Funkcja do pobierania aktywnych wyścigów z Supabase
+# Cache danych z bazy są wspólne dla wszystkich sesji i mieszczą się w jednym budżecie pamięci procesu
+# (f1_core.memory, F1_CACHE_BUDGET_MB) - po jego przekroczeniu usuwane są najdawniej używane wpisy.
+# Błędy zapytań nie trafiają do cache: funkcje fetch_* rzucają wyjątek, a wywołujący pokazuje komunikat.
+
+# Aktywne wyścigi z Supabase. Wyścigi otwiera i zamyka harmonogram (f1_core.lifecycle), który czyści
+# ten cache po każdej zmianie, więc przebieg skryptu tylko odczytuje listę.
+@cached(ttl=ACTIVE_RACES_TTL)
+def fetch_active_races():
+    return repo.get_active_races()
+
 def get_active_races():
     if not supabase_connected:
         return []
 
     try:
-        response = supabase.table('races').select('*').eq('is_active', True).execute()
-        return response.data
+        return fetch_active_races()
     except Exception as e:
         st.error(f"Błąd podczas pobierania wyścigów: {e}")
         return []
 
-@st.cache_data(ttl=60)
+@cached(ttl=60)
+def fetch_all_races():
+    return repo.get_all_races()
+
 def get_all_races():
     if not supabase_connected:
         return []
     try:
-        return supabase.table('races').select('*').execute().data
+        return fetch_all_races()
     except Exception as e:
         st.error(f"Błąd podczas pobierania wyścigów: {e}")
         return []
 
-def calculate_points(submission, race_result):
-    podium_points = sum(
-        1 for pos in ['podium_1', 'podium_2', 'podium_3']
-        if submission[pos] == race_result[pos]
+# Wersja wyników - zmienia się po dodaniu lub edycji wyników dowolnego wyścigu
+@cached(ttl=30)
+def get_results_version():
+    if not supabase_connected:
+        return None
+    return repo.get_results_version()
+
+# Historia typów jednego użytkownika (f1_core.repositories / f1_core.aggregation)
+@cached(ttl=300)
+def load_user_history(user_name, results_version):
+    user_subs, results_by_race, race_data_by_id = repo.fetch_user_history(user_name)
+    if not user_subs:
+        return None
+    return build_user_history(user_subs, results_by_race, race_data_by_id)
+
+# Historia użytkownika wybranego w formularzu liczona z wyprzedzeniem w osobnym wątku (nie w puli
+# zapytań - fetch_user_history sam z niej korzysta): po rozwinięciu profilu jest już w cache.
+# Błąd pomijamy - profil pobierze historię ponownie i wtedy go pokaże.
+def prefetch_user_history():
+    user_name = st.session_state.get("form_user_name")
+    if not (user_name and supabase_connected):
+        return
+
+    def warm(results_version):
+        try:
+            load_user_history(user_name, results_version)
+        except Exception:
+            pass
+
+    threading.Thread(target=warm, args=(get_results_version(),), name="f1-profile-prefetch", daemon=True).start()
+
+# Widok profilu użytkownika: dotychczasowe typy, trafienia w kategoriach i trend punktów
+def render_user_profile(user_name):
+    if not supabase_connected:
+        st.warning("Brak połączenia z bazą danych. Nie można wyświetlić profilu.")
+        return
+
+    try:
+        history = load_user_history(user_name, get_results_version())
+    except Exception as e:
+        st.error(f"Błąd podczas pobierania historii użytkownika: {e}")
+        return
+
+    if not history:
+        st.info(f"{user_name} nie ma jeszcze żadnych typów.")
+        return
+
+    scored = [h for h in history if h['scored']]
+    total_points = sum(h['points'] for h in scored)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Suma punktów", total_points)
+    col2.metric("Rozliczone wyścigi", len(scored))
+    col3.metric("Średnio na wyścig", round(total_points / len(scored), 1) if scored else 0)
+
+    if scored:
+        st.write("#### Punkty w kolejnych wyścigach")
+        trend_df = pd.DataFrame({
+            "Wyścig": [h['race_name'] for h in scored],
+            "Punkty": [h['points'] for h in scored],
+        })
+        trend_df["Narastająco"] = trend_df["Punkty"].cumsum()
+        st.line_chart(trend_df.set_index("Wyścig")[["Punkty", "Narastająco"]])
+
+        st.write("#### Skuteczność w kategoriach")
+        accuracy_rows = [
+            (label, sum(h['hits'][field] for h in scored), len(scored))
+            for field, label in CATEGORY_LABELS.items()
+        ]
+        accuracy_rows.append((
+            "Pytania dodatkowe",
+            sum(h['hits']['extra_answers'] for h in scored),
+            sum(h['hits']['extra_questions'] for h in scored)
+        ))
+        accuracy_df = pd.DataFrame([
+            {
+                "Kategoria": label,
+                "Trafienia": f"{hits}/{total}",
+                "Skuteczność (%)": round(100 * hits / total, 1) if total else 0.0
+            }
+            for label, hits, total in accuracy_rows
+        ])
+        st.dataframe(accuracy_df, hide_index=True)
+
+    st.write("#### Historia typów")
+    history_df = pd.DataFrame([
+        {
+            "Wyścig": h['race_name'],
+            "Data": h['race_date'],
+            "Podium": f"{h['submission']['podium_1']}, {h['submission']['podium_2']}, {h['submission']['podium_3']}",
+            "Kierowca dnia": h['submission']['driver_of_day'],
+            "Punkty": h['points'],
+        }
+        for h in reversed(history)
+    ])
+    st.dataframe(history_df, hide_index=True)
+
+# Statystyki tłumu (konsensus, entropia, kontrarianie) przechowywane w tabeli race_crowd_stats.
+# Przeliczane są tylko wyścigi, dla których brakuje statystyk lub zmieniły się wyniki.
+@cached(ttl=300)
+def get_crowd_stats(results_version):
+    return repo.load_crowd_stats(
+        on_store_error=lambda e: st.warning(f"Nie udało się zapisać statystyk tłumu: {e}")
+    )
+
+# Przeliczenie całej historii według wybranej wersji zasad i zapis sum punktów w tabeli scoring_totals
+# (aktywne zasady przelicza też harmonogram po każdej zmianie wyników - f1_core.lifecycle)
+def rescore_history(ruleset_version):
+    rescored = rescore_and_save(repo, ruleset_version, get_results_version())
+    load_scoring_totals.clear()
+    return rescored
+
+# Zapisane sumy punktów dla wszystkich przeliczonych wersji zasad
+@cached(ttl=300)
+def load_scoring_totals():
+    return repo.load_scoring_totals()
+
+# Symulacja Monte Carlo bieżącego sezonu - wynik zapamiętywany osobno dla każdej wersji wyników
+# (stare wersje wypadają z budżetu pamięci jako najdawniej używane)
+@cached()
+def run_season_simulation(results_version, season, n_races, n_sims):
+    results_by_race, _, scored_subs = repo.fetch_results_history(season=season)
+    if not scored_subs:
+        return None
+    return season_simulation_table(results_by_race, scored_subs, n_races, n_sims)
+
+# Dane klasyfikacji sezonu: punkty liczone w bazie (widok user_race_points), a gdy widoki są
+# niedostępne lub aktywne są inne zasady punktacji - w pandas na historii typów sezonu
+def load_leaderboard(season):
+    if ACTIVE_RULESET_VERSION == DB_VIEWS_RULESET_VERSION:
+        try:
+            return leaderboard_from_race_points(repo.get_user_race_points(season=season))
+        except Exception:
+            pass
+    results_by_race, race_data_by_id, scored_subs = repo.fetch_results_history(season=season)
+    return compute_leaderboard(results_by_race, race_data_by_id, scored_subs)
+
+# Wiersze widoku race_field_value_counts; pusta lista, gdy widok jest niedostępny
+def fetch_field_value_counts(race_id):
+    try:
+        return repo.get_field_value_counts(race_id)
+    except Exception:
+        return []
+
+# Rozkład typowań w polach wyścigu: z widoku race_field_value_counts, a w razie jego braku z pobranych typów
+def load_field_counts(value_counts, submissions):
+    if value_counts:
+        return {field: field_counts_from_rows(value_counts, field) for field in PREDICTION_FIELDS}
+    return {field: count_predictions(submissions, field) for field in PREDICTION_FIELDS}
+
+# Klasyfikacja bieżącego sezonu razem ze statystyką trafień wbrew większości - liczona w wątku
+# w tle (bez Streamlit); zapytania nie dotykają wyścigów wcześniejszych sezonów
+def compute_public_leaderboard():
+    season = hot_season(repo.get_all_races(), repo.get_scored_race_ids())
+    if season is None:
+        return None
+    leaderboard = load_leaderboard(season)
+    if leaderboard is None:
+        return None
+    season_race_ids = {r['id'] for r in repo.get_season_races(season)}
+    crowd_stats = [
+        row for race_id, row in repo.load_crowd_stats().items() if race_id in season_race_ids and row['contrarian']
+    ]
+    leaderboard["contrarian"] = contrarian_scores(crowd_stats) if crowd_stats else None
+    return leaderboard
+
+# Wersja danych klasyfikacji - migawka jest liczona od nowa tylko po zmianie wyników, sezonu lub zasad punktacji
+def leaderboard_version():
+    return f"{ACTIVE_RULESET_VERSION}:{hot_season(repo.get_all_races(), repo.get_scored_race_ids())}:{repo.get_results_version()}"
+
+# Wyścigi z wynikami dla danej wersji wyników
+@cached(ttl=300)
+def load_scored_race_ids(results_version):
+    return repo.get_scored_race_ids()
+
+# Bieżący sezon (najpóźniejszy sezon z wynikami, patrz models.hot_season)
+def get_hot_season():
+    if not supabase_connected:
+        return None
+    return hot_season(get_all_races(), load_scored_race_ids(get_results_version()))
+
+# Klasyfikacja wszech czasów: końcowe tabele zarchiwizowanych sezonów (Parquet) i klasyfikacje
+# sezonów jeszcze niezarchiwizowanych, liczone z bazy sezon po sezonie
+@cached(ttl=300)
+def load_all_time_standings(results_version, archived_seasons):
+    season_tables = {season: load_archive(ARCHIVE_DIR, season)["table"] for season in archived_seasons}
+    races = repo.get_all_races()
+    live_seasons = sorted({season_of(r) for r in races} - set(archived_seasons) - {None})
+    for season in live_seasons:
+        leaderboard = load_leaderboard(season)
+        season_tables[season] = leaderboard["table"] if leaderboard is not None else None
+    return all_time_standings(season_tables, current_season=hot_season(races, repo.get_scored_race_ids()))
+
+# Ostatnia znana klasyfikacja (pamięć procesu + pliki Arrow w SNAPSHOT_DIR), odświeżana w tle;
+# osobny katalog dla każdej bazy danych, wspólny dla wszystkich procesów aplikacji
+@st.cache_resource(show_spinner=False)
+def get_leaderboard_cache(database_url):
+    database_hash = hashlib.sha1(database_url.encode("utf-8")).hexdigest()[:12]
+    return SnapshotCache(
+        os.path.join(SNAPSHOT_DIR, f"leaderboard-{database_hash}"),
+        compute_public_leaderboard,
+        max_age=LEADERBOARD_MAX_AGE,
+        version_loader=leaderboard_version,
+        shared=shared_cache.tier,
     )
-    if podium_points == 3:
-        podium_points += 1
 
-    points = podium_points
-    for field in ['time_diff', 'driver_of_day', 'safety_car', 'red_flag',
-                  'classified_drivers', 'teams_with_points']:
-        if submission[field] == race_result[field]:
-            points += 1
+# Harmonogram cyklu życia wyścigów w tle procesu aplikacji (jeden na proces i bazę). Po otwarciu
+# lub zamknięciu wyścigów czyści cache list wyścigów, po odbudowie agregatów - cache wyników,
+# statystyk tłumu i sum punktów oraz odświeża migawkę klasyfikacji.
+@st.cache_resource(show_spinner=False)
+def get_lifecycle_scheduler(database_url):
+    leaderboard_cache = get_leaderboard_cache(database_url)
+
+    def races_changed(report):
+        fetch_active_races.clear()
+        fetch_all_races.clear()
+
+    def results_rebuilt(report):
+        get_results_version.clear()
+        get_crowd_stats.clear()
+        load_scoring_totals.clear()
+        leaderboard_cache.refresh()
+
+    return LifecycleScheduler(
+        repo,
+        interval=LIFECYCLE_INTERVAL,
+        on_races_changed=races_changed,
+        on_results_rebuilt=results_rebuilt,
+        shared=shared_cache.tier,
+        snapshot_every=DEFAULT_SNAPSHOT_EVERY,
+    ).start()
+
+# Po zapisaniu wyników: nowa klasyfikacja od razu, a agregaty przelicza harmonogram (w tle lub w procesie
+# "f1_cli.py scheduler", który zauważy nową wersję wyników w ciągu LIFECYCLE_INTERVAL sekund)
+def results_saved():
+    get_results_version.clear()
+    get_leaderboard_cache(supabase_url).refresh(force=True)
+    if LIFECYCLE_SCHEDULER == "app":
+        get_lifecycle_scheduler(supabase_url).wake()
+
+# Wykresy klasyfikacji (f1_core.charts) zapamiętane według skrótu danych: niezmieniona klasyfikacja
+# nie jest budowana od nowa w kolejnych przebiegach i sesjach. cache_resource trzyma gotowe obiekty
+# (bez kopiowania przez pickle), parametr _leaderboard nie wchodzi do klucza.
+@st.cache_resource(max_entries=8, show_spinner=False)
+def leaderboard_figures(content_hash, _leaderboard):
+    lean = lean_trend(_leaderboard["trend"])
+    sampled = []
+    if len(lean["trend"]) < lean["races"]:
+        sampled.append(f"{len(lean['trend'])} z {lean['races']} wyścigów")
+    if lean["rest_users"]:
+        sampled.append(f"osobno {len(lean['trend'].columns)} najlepszych, pozostali ({lean['rest_users']}) jako mediana i zakres")
+    return {
+        "bar": bar_figure(_leaderboard["table"]),
+        "trend": trend_figure(lean),
+        "sampled": "Wykres uproszczony: " + "; ".join(sampled) if sampled else None,
+    }
+
+# Tabela, wykresy i trafienia wbrew większości z migawki klasyfikacji
+def draw_leaderboard(snapshot):
+    leaderboard = snapshot["data"]
+    if leaderboard is None:
+        st.info("Brak danych do wyświetlenia. Wprowadź wyniki wyścigów i odpowiedzi użytkowników.")
+        return
+
+    # Wyświetl finałową tabelę
+    user_points = leaderboard["table"]
+    st.table(user_points)
+
+    figures = leaderboard_figures(frame_digest(user_points, leaderboard["trend"]), leaderboard)
+
+    # Wykres słupkowy z sumą punktów wszystkich typujących
+    st.subheader("Najlepsi typujący")
+    st.plotly_chart(figures["bar"], use_container_width=True)
+
+    # Wykres trendu - skumulowane punkty w chronologicznej kolejności wyścigów
+    st.subheader("Trend punktów w czasie")
+    st.plotly_chart(figures["trend"], use_container_width=True)
+    if figures["sampled"]:
+        st.caption(figures["sampled"])
 
-    for key, value in submission.get('extra_answers', {}).items():
-        if key in race_result.get('extra_answers', {}) and value == race_result['extra_answers'][key]:
-            points += 1
+    # Trafienia wbrew większości (statystyki tłumu zapisane per wyścig)
+    if leaderboard.get("contrarian") is not None:
+        st.subheader("Trafienia wbrew większości")
+        st.table(leaderboard["contrarian"])
 
-    return points
+    st.caption(f"Stan na {datetime.fromtimestamp(snapshot['created_at']).strftime('%d.%m.%Y %H:%M:%S')}")
 
-# Funkcja renderująca klasyfikację ogólną (tabela + wykresy)
+# Funkcja renderująca klasyfikację ogólną (tabela + wykresy). Od razu pokazuje ostatnią znaną
+# klasyfikację; jeśli w tle liczona jest nowsza, finish_leaderboard_refresh() podmienia ją na końcu przebiegu.
 def render_leaderboard():
     if not supabase_connected:
         st.warning("Brak połączenia z bazą danych. Nie można wyświetlić klasyfikacji.")
         return
 
+    cache = get_leaderboard_cache(supabase_url)
+    snapshot = cache.get()
+    if snapshot is None:
+        # Pierwsze uruchomienie bez zapisanej klasyfikacji - trzeba poczekać na obliczenia
+        with st.spinner("Ładowanie klasyfikacji..."):
+            snapshot = cache.wait()
+    if snapshot is None:
+        st.error(f"Błąd podczas pobierania klasyfikacji: {cache.last_error}")
+        return
+
+    if cache.last_error is not None:
+        st.warning(f"Nie udało się odświeżyć klasyfikacji, wyświetlany jest ostatni zapisany stan: {cache.last_error}")
+
+    placeholder = st.empty()
+    with placeholder.container():
+        draw_leaderboard(snapshot)
+    pending_leaderboards.append((cache, placeholder, snapshot))
+
+# Tytuł klasyfikacji z bieżącym sezonem
+def leaderboard_title():
+    season = get_hot_season()
+    return f"Aktualna klasyfikacja - sezon {season}" if season else "Aktualna klasyfikacja"
+
+# Klasyfikacja wszech czasów: zarchiwizowane sezony są czytane z plików Parquet, bez zapytań do bazy
+def render_all_time_leaderboard():
+    if not supabase_connected:
+        st.warning("Brak połączenia z bazą danych. Nie można wyświetlić klasyfikacji.")
+        return
+
+    archives = list_archives(ARCHIVE_DIR)
     try:
-        # Pobieranie wszystkich wyścigów z wprowadzonymi wynikami
-        results_response = supabase.table('results').select('race_id').execute()
-        race_ids_with_results = [r['race_id'] for r in results_response.data]
-
-        if not race_ids_with_results:
-            st.info("Brak wyścigów z wprowadzonymi wynikami.")
-            return
-
-        # Batch-fetch results, race metadata and submissions in 3 queries total
-        all_results_list = supabase.table('results').select('*').in_('race_id', race_ids_with_results).execute().data
-        all_race_data_list = supabase.table('races').select('*').in_('id', race_ids_with_results).execute().data
-        all_subs_list = supabase.table('submissions').select('*').in_('race_id', race_ids_with_results).execute().data
-
-        results_by_race = {r['race_id']: r for r in all_results_list}
-        race_data_by_id = {r['id']: r for r in all_race_data_list}
-
-        all_submissions = []
-        for submission in all_subs_list:
-            rid = submission['race_id']
-            if rid not in results_by_race or rid not in race_data_by_id:
-                continue
-            race_result = results_by_race[rid]
-            race_data = race_data_by_id[rid]
-            all_submissions.append({
-                "user_name": submission['user_name'],
-                "race_id": rid,
-                "race_name": race_data['race_name'],
-                "race_date": race_data['race_date'],
-                "points": calculate_points(submission, race_result)
-            })
-
-        if not all_submissions:
-            st.info("Brak danych do wyświetlenia. Wprowadź wyniki wyścigów i odpowiedzi użytkowników.")
-            return
-
-        # Stwórz DataFrame z wszystkimi typami
-        all_subs_df = pd.DataFrame(all_submissions)
-
-        # Grupuj po użytkowniku i sumuj punkty
-        user_points = all_subs_df.groupby('user_name')['points'].sum().reset_index()
-        user_points = user_points.sort_values('points', ascending=False)
-
-        # Dodaj ranking
-        user_points['pozycja'] = user_points['points'].rank(method='min', ascending=False).astype(int)
-        user_points = user_points[['pozycja', 'user_name', 'points']]
-        user_points.columns = ['Pozycja', 'Imię', 'Suma punktów']
-
-        # Dodaj liczbę wyścigów
-        races_count = all_subs_df.groupby('user_name').size().reset_index()
-        races_count.columns = ['Imię', 'Liczba wyścigów']
-
-        user_points = user_points.merge(races_count, on='Imię')
-        user_points['Średnio na wyścig'] = (user_points['Suma punktów'] / user_points['Liczba wyścigów']).round(1)
-
-        # Wyświetl finałową tabelę
-        final_table = user_points[['Pozycja', 'Imię', 'Suma punktów', 'Liczba wyścigów', 'Średnio na wyścig']]
-        st.table(final_table)
-
-        # Wykres słupkowy z sumą punktów wszystkich typujących
-        st.subheader("Najlepsi typujący")
-        f1_red = "#E10600"
-        bar_fig = go.Figure(
-            go.Bar(
-                x=user_points['Imię'],
-                y=user_points['Suma punktów'],
-                marker_color=f1_red,
-                text=user_points['Suma punktów'],
-                textposition='outside',
-                textfont=dict(size=18)
-            )
-        )
-        bar_fig.update_layout(
-            template="plotly_white",
-            yaxis_title="Suma punktów",
-            xaxis_title=None,
-            margin=dict(t=30, b=20, l=10, r=10),
-            showlegend=False,
-            font=dict(size=16)
-        )
-        bar_fig.update_xaxes(tickfont=dict(size=16))
-        bar_fig.update_yaxes(showgrid=True, gridcolor="#eeeeee", tickfont=dict(size=14), title_font=dict(size=16))
-        st.plotly_chart(bar_fig, use_container_width=True)
-
-        # Wykres trendu - skumulowane punkty w chronologicznej kolejności wyścigów
-        st.subheader("Trend punktów w czasie")
-        trend_df = all_subs_df.copy()
-        trend_df['race_date_parsed'] = pd.to_datetime(trend_df['race_date'], errors='coerce', utc=True)
-        trend_df = trend_df.sort_values(['race_date_parsed', 'race_id'])
-        trend_df['points_cum'] = trend_df.groupby('user_name')['points'].cumsum()
-
-        # race_id gwarantuje unikalność i poprawną kolejność, nawet przy zbieżnych/brakujących datach lub powtarzających się nazwach wyścigów
-        race_order = (
-            trend_df.drop_duplicates('race_id')
-            .sort_values(['race_date_parsed', 'race_id'])[['race_id', 'race_name']]
-        )
-        trend_pivot = trend_df.pivot_table(index='race_id', columns='user_name', values='points_cum', aggfunc='last')
-        trend_pivot = trend_pivot.reindex(race_order['race_id'])
-        trend_pivot.index = race_order['race_name']
-        # Utrzymaj skumulowaną wartość dla użytkowników, którzy pominęli dany wyścig
-        trend_pivot = trend_pivot.ffill()
-
-        race_labels = list(trend_pivot.index)
-        trend_fig = go.Figure()
-        for user in trend_pivot.columns:
-            trend_fig.add_trace(
-                go.Scatter(
-                    x=race_labels, y=trend_pivot[user],
-                    mode='lines+markers', name=user,
-                    line=dict(width=3), marker=dict(size=8)
-                )
-            )
-        trend_fig.update_layout(
-            template="plotly_white",
-            yaxis_title="Suma punktów (narastająco)",
-            xaxis_title=None,
-            margin=dict(t=30, b=20, l=10, r=10),
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0, font=dict(size=15)),
-            font=dict(size=16)
-        )
-        # Wymuś kolejność chronologiczną na osi X (kategorie tekstowe domyślnie sortowałyby się alfabetycznie)
-        trend_fig.update_xaxes(
-            categoryorder='array', categoryarray=race_labels, tickfont=dict(size=15),
-            showgrid=True, gridcolor="rgba(0,0,0,0.06)"
-        )
-        trend_fig.update_yaxes(
-            showgrid=True, gridcolor="rgba(0,0,0,0.06)", tickfont=dict(size=14), title_font=dict(size=16)
-        )
-        st.plotly_chart(trend_fig, use_container_width=True)
+        standings = load_all_time_standings(get_results_version(), tuple(archives))
     except Exception as e:
-        st.error(f"Błąd podczas pobierania klasyfikacji: {e}")
+        st.error(f"Błąd podczas pobierania klasyfikacji wszech czasów: {e}")
+        return
+
+    if standings is None:
+        st.info("Brak rozliczonych sezonów.")
+        return
+    st.dataframe(standings, hide_index=True)
+    if archives:
+        st.caption(f"Sezony z archiwum: {', '.join(map(str, archives))}")
+
+# Podmiana wyświetlonej klasyfikacji na świeżą, jeśli odświeżenie w tle zakończy się w ciągu
+# LEADERBOARD_REFRESH_WAIT sekund (reszta strony jest już wtedy wyświetlona)
+def finish_leaderboard_refresh():
+    for cache, placeholder, shown in pending_leaderboards:
+        fresh = cache.wait(LEADERBOARD_REFRESH_WAIT)
+        if fresh is None or fresh is shown or snapshot_data_equal(fresh["data"], shown["data"]):
+            continue
+        with placeholder.container():
+            draw_leaderboard(fresh)
+
+def snapshot_data_equal(left, right):
+    if left is None or right is None:
+        return left is right
+    if left.keys() != right.keys():
+        return False
+    return all(
+        (left[name] is None and right[name] is None)
+        or (left[name] is not None and right[name] is not None and left[name].equals(right[name]))
+        for name in left
+    )
 
 # Funkcja do zapisywania odpowiedzi do Supabase
-def save_submission(predictions, user_name, race_id):
+def save_submission(predictions, user_name, race_id, extra_answers):
     if not supabase_connected:
         st.error("Brak połączenia z bazą danych Supabase")
         return False
     
     try:
-        # Przygotuj dane do zapisania
-        extra_answers = {}
-        for key, value in predictions.items():
-            if key.startswith("Pytanie dodatkowe"):
-                extra_answers[key] = value
-        
-        # Zapisz główne dane odpowiedzi
-        submission_data = {
-            "user_name": user_name,
-            "podium_1": predictions["Podium 1. miejsce"],
-            "podium_2": predictions["Podium 2. miejsce"],
-            "podium_3": predictions["Podium 3. miejsce"],
-            "time_diff": predictions["Różnica czasowa"],
-            "driver_of_day": predictions["Kierowca dnia"],
-            "safety_car": predictions["Safety Car"] == "Tak",
-            "red_flag": predictions["Czerwona flaga"] == "Tak",
-            "classified_drivers": predictions["Liczba sklasyfikowanych kierowców"],
-            "teams_with_points": predictions["Liczba zespołów z punktami"],
-            "extra_answers": extra_answers,
-            "race_id": race_id
-        }
-        
+        # Przygotuj dane do zapisania (f1_core.models)
+        submission_data = build_submission(predictions, user_name, race_id, extra_answers)
+
         # Dodaj rekord do tabeli submissions
-        response = supabase.table('submissions').insert(submission_data).execute()
-        
+        response_data = repo.upsert_submission(
+            submission_data,
+            on_sync_error=lambda e: st.warning(f"Nie udało się zapisać odpowiedzi w submission_answers: {e}")
+        )
+
         # Sprawdź czy operacja się powiodła
-        if len(response.data) > 0:
+        if len(response_data) > 0:
             return True
         else:
             st.error("Nie udało się zapisać odpowiedzi")
@@ -274,18 +524,104 @@ def save_submission(predictions, user_name, race_id):
         st.error(f"Błąd podczas zapisywania odpowiedzi: {e}")
         return False
 
+# Szkice typów: jedna kolejka zapisu na proces i bazę, zapisywana do submission_drafts w tle
+@st.cache_resource(show_spinner=False)
+def get_draft_writer(database_url):
+    return DraftWriter(repo)
+
+# Pola formularza typowania zapisywane w szkicu (oprócz odpowiedzi na pytania dodatkowe)
+DRAFT_FIELDS = [
+    "podium_1", "podium_2", "podium_3", "time_diff", "dotd", "safety_car", "red_flag",
+    "classified_drivers", "teams_with_points",
+]
+
+# Klucz widżetu formularza typowania - osobny dla każdego wyścigu
+def prediction_key(race_id, field):
+    return f"prediction_{race_id}_{field}"
+
+# Dopuszczalne wartości pól formularza (szkic sprzed zmiany listy kierowców lub pytań może mieć inne)
+def prediction_options(drivers, custom_questions):
+    return {
+        "podium_1": drivers,
+        "podium_2": drivers,
+        "podium_3": drivers,
+        "time_diff": TIME_DIFF_OPTIONS,
+        "dotd": drivers,
+        "safety_car": YES_NO_OPTIONS,
+        "red_flag": YES_NO_OPTIONS,
+        "classified_drivers": CLASSIFIED_DRIVERS_OPTIONS,
+        "teams_with_points": TEAMS_WITH_POINTS_OPTIONS,
+        "extra_answers": {
+            extra_answer_key(question, i + 1): question["options"] for i, question in enumerate(custom_questions)
+        },
+    }
+
+# Wczytanie szkicu (z kolejki zapisu albo z bazy) do widżetów formularza - raz na parę (wyścig, użytkownik),
+# żeby nie nadpisywać późniejszych zmian. Brak tabeli submission_drafts (przed sql/007) nie blokuje formularza.
+def restore_draft(race_id, user_name, options):
+    if st.session_state.get("draft_restored") == (race_id, user_name):
+        return
+    st.session_state.draft_restored = (race_id, user_name)
+
+    draft = get_draft_writer(supabase_url).pending_draft(race_id, user_name)
+    if draft is None:
+        try:
+            row = repo.get_draft(race_id, user_name)
+        except Exception:
+            row = None
+        draft = row["predictions"] if row else None
+    if not draft:
+        return
+
+    extra_options = options.pop("extra_answers")
+    values = {field: draft.get(field) for field in options}
+    values.update({f"extra_{key}": (draft.get("extra_answers") or {}).get(key) for key in extra_options})
+    allowed = {**options, **{f"extra_{key}": choices for key, choices in extra_options.items()}}
+    for field, value in values.items():
+        if value in allowed[field]:
+            st.session_state[prediction_key(race_id, field)] = value
+    st.session_state.draft_saved = (race_id, user_name, json.dumps(draft, sort_keys=True, ensure_ascii=False))
+
+# Zmieniony stan formularza trafia do kolejki szkiców (bez zapytania do bazy w przebiegu)
+def save_draft(race_id, user_name, draft):
+    saved = (race_id, user_name, json.dumps(draft, sort_keys=True, ensure_ascii=False))
+    if st.session_state.get("draft_saved") != saved:
+        st.session_state.draft_saved = saved
+        get_draft_writer(supabase_url).save(race_id, user_name, draft)
+
+# Callback on_change pól formularza: stan wszystkich pól z session_state jako szkic wybranej osoby.
+# Bez wybranego imienia nie ma czyjego szkicu zapisać.
+def autosave_draft(race_id, extra_keys):
+    user_name = st.session_state.get("form_user_name")
+    if not (user_name and supabase_connected):
+        return
+    draft = {field: st.session_state.get(prediction_key(race_id, field)) for field in DRAFT_FIELDS}
+    draft["extra_answers"] = {
+        key: st.session_state.get(prediction_key(race_id, f"extra_{key}")) for key in extra_keys
+    }
+    save_draft(race_id, user_name, draft)
+
+# Po wysłaniu typów szkic nie jest już potrzebny
+def discard_draft(race_id, user_name):
+    get_draft_writer(supabase_url).discard(race_id, user_name)
+    try:
+        repo.delete_draft(race_id, user_name)
+    except Exception:
+        pass
+
 # Funkcja ładująca pytania
 def load_questions(race_id=None):
     # Jeśli mamy połączenie z Supabase i podane ID wyścigu
     if supabase_connected and race_id:
         try:
-            response = supabase.table('custom_questions').select('*').eq('race_id', race_id).execute()
+            race_questions = repo.get_race_questions(race_id)
             
-            if len(response.data) > 0:
+            if len(race_questions) > 0:
                 return [{
+                    "id": item["id"],
                     "question": item["question"],
                     "options": item["options"]
-                } for item in response.data]
+                } for item in race_questions]
         except Exception as e:
             st.warning(f"Nie udało się załadować pytań z Supabase: {e}")
     
@@ -389,33 +725,35 @@ def send_email_confirmation(predictions, user_name):
         st.error(f"Błąd podczas wysyłania emaila: {e}")
         return False
 
-# Funkcja do generowania listy kierowców F1
-def get_f1_drivers():
-    # Aktualna lista kierowców F1 2025 zgodnie z dostarczonym obrazem
-    teams_drivers = {
-        'Red Bull Racing': ['Max Verstappen', 'Isack Hadjar'],
-        'Ferrari': ['Charles Leclerc', 'Lewis Hamilton'],
-        'Mercedes': ['Andrea Kimi Antonelli', 'George Russell'],
-        'McLaren': ['Lando Norris', 'Oscar Piastri'],
-        'Aston Martin': ['Fernando Alonso', 'Lance Stroll'],
-        'Alpine': ['Jack Doohan', 'Pierre Gasly'],
-        'Williams': ['Alexander Albon', 'Carlos Sainz Jr.'],
-        'Racing Bulls': ['Arvid Lindblad', 'Liam Lawson'],
-        'Audi': ['Gabriel Bortoleto', 'Nico Hülkenberg'],
-        'Haas': ['Esteban Ocon', 'Oliver Bearman'],
-        'Cadillac': ['Valtteri Bottas', 'Sergio Perez']
-    }
-    
-    return [driver for team_drivers in teams_drivers.values() for driver in team_drivers]
+# Uruchomienie harmonogramu przy pierwszym przebiegu w procesie
+if supabase_connected and LIFECYCLE_SCHEDULER == "app":
+    get_lifecycle_scheduler(supabase_url)
 
 # Pobranie aktywnych wyścigów
 active_races = get_active_races()
 
-# Wybór wyścigu (jeśli są dostępne)
-selected_race = None
-race_id = None
+# Inicjalizacja stanu sesji dla logowania administratora
+if 'show_admin' not in st.session_state:
+    st.session_state.show_admin = False
+
+# Inicjalizacja stanu sesji dla pokazywania formularza logowania administratora
+if 'show_admin_login' not in st.session_state:
+    st.session_state.show_admin_login = False
 
-if active_races:
+# Funkcja do pokazywania/ukrywania formularza logowania
+def toggle_admin_login():
+    st.session_state.show_admin_login = not st.session_state.show_admin_login
+
+# Funkcja do wylogowania z panelu admina
+def logout_admin():
+    st.session_state.show_admin = False
+    st.session_state.show_admin_login = False
+    st.rerun()
+
+# Wybór wyścigu, termin typowania i formularz - fragment, więc zmiana wyścigu, zmiana pola (z autozapisem
+# szkicu) i wysłanie typów przeliczają tylko tę sekcję, a nie klasyfikację, profil czy panel administratora
+@st.fragment
+def render_prediction_section(active_races):
     if len(active_races) > 1:
         st.write("### Wybierz wyścig do typowania")
         race_options = [f"{race['race_name']} ({race['race_date']})" for race in active_races]
@@ -441,182 +779,175 @@ if active_races:
         deadline_str = selected_race['submission_deadline']
         try:
             # Konwersja stringa ISO do obiektu datetime
-            if 'Z' in deadline_str:
-                deadline = datetime.fromisoformat(deadline_str.replace('Z', '+00:00'))
-            else:
-                deadline = datetime.fromisoformat(deadline_str)
-                
-            now = datetime.now(deadline.tzinfo if deadline.tzinfo else None)
+            deadline = parse_deadline(deadline_str)
             
-            if now > deadline:
+            if deadline_passed(deadline):
                 st.error(f"Termin nadsyłania typów upłynął! Deadline był: {deadline.strftime('%Y-%m-%d %H:%M')}")
             else:
                 st.success(f"Możesz nadsyłać typy do: {deadline.strftime('%Y-%m-%d %H:%M')}")
         except Exception as e:
             st.warning(f"Nie udało się sprawdzić terminu: {e}")
 
-# Ładujemy dodatkowe pytania dla wybranego wyścigu (jeśli istnieje)
-custom_questions = load_questions(race_id)
-
-# Inicjalizacja stanu sesji dla logowania administratora
-if 'show_admin' not in st.session_state:
-    st.session_state.show_admin = False
-
-# Inicjalizacja stanu sesji dla pokazywania formularza logowania administratora
-if 'show_admin_login' not in st.session_state:
-    st.session_state.show_admin_login = False
-
-# Funkcja do pokazywania/ukrywania formularza logowania
-def toggle_admin_login():
-    st.session_state.show_admin_login = not st.session_state.show_admin_login
-
-# Funkcja do wylogowania z panelu admina
-def logout_admin():
-    st.session_state.show_admin = False
-    st.session_state.show_admin_login = False
-    st.rerun()
-
-# Formularz główny
-if not active_races:
-    st.info("Brak aktywnych wyścigów. Formularz typowania zostanie otwarty przed kolejnym wyścigiem.")
-    with st.expander("Aktualna klasyfikacja", expanded=True):
-        render_leaderboard()
-else:
-    with st.form("f1_prediction_form"):
-        # Dane osobowe
-        st.subheader("Twoje dane")
-
-        user_names = ["Agatka", "Iza", "Kinga", "Paweł", "Piotrek", "Seweryn"]
-
-        col1, col2 = st.columns(2)
-        with col1:
-            user_name = st.selectbox("Imię", user_names)
-
-        st.markdown("---")
-
-        # Lista kierowców
-        drivers = get_f1_drivers()
+    # Ładujemy dodatkowe pytania dla wybranego wyścigu
+    custom_questions = load_questions(race_id)
+
+    # Lista kierowców
+    drivers = get_f1_drivers()
+
+    # Dane osobowe
+    st.subheader("Twoje dane")
+
+    # Wybór imienia od razu przywraca szkic typów. Bez domyślnego imienia - inaczej każdy otwierający
+    # stronę dostałby w formularzu szkic pierwszej osoby z listy (i nadpisywałby go swoimi zmianami).
+    col1, col2 = st.columns(2)
+    with col1:
+        user_name = st.selectbox("Imię", USER_NAMES, index=None, placeholder="Wybierz swoje imię", key="form_user_name",
+                                 on_change=prefetch_user_history)
+
+    # Po wybraniu imienia formularz wraca do zapisanego szkicu typów
+    if user_name and supabase_connected:
+        restore_draft(race_id, user_name, prediction_options(drivers, custom_questions))
+
+    # Autozapis szkicu: każda zmiana pola odkłada stan formularza do kolejki szkiców (autosave_draft)
+    extra_keys = [extra_answer_key(question, i + 1) for i, question in enumerate(custom_questions)]
+    autosave = {"on_change": autosave_draft, "args": (race_id, extra_keys)}
+
+    st.markdown("---")
+
+    # Sekcja 1: Podium wyścigu
+    st.subheader("1. Podium wyścigu (1 punkt za każdego kierowcę, +1 za całe podium)")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        podium_1 = st.selectbox("Pierwsze miejsce", drivers, key=prediction_key(race_id, "podium_1"), **autosave)
+    with col2:
+        podium_2 = st.selectbox("Drugie miejsce", drivers, key=prediction_key(race_id, "podium_2"), **autosave)
+    with col3:
+        podium_3 = st.selectbox("Trzecie miejsce", drivers, key=prediction_key(race_id, "podium_3"), **autosave)
+
+    # Sekcja 2: Różnica czasowa
+    st.subheader("2. Różnica w sekundach między 1. a 2. miejscem (1 punkt)")
+    time_diff = st.radio(
+        "Wybierz przedział",
+        TIME_DIFF_OPTIONS,
+        key=prediction_key(race_id, "time_diff"),
+        **autosave
+    )
 
-        # Sekcja 1: Podium wyścigu
-        st.subheader("1. Podium wyścigu (1 punkt za każdego kierowcę, +1 za całe podium)")
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            podium_1 = st.selectbox("Pierwsze miejsce", drivers)
-        with col2:
-            podium_2 = st.selectbox("Drugie miejsce", drivers)
-        with col3:
-            podium_3 = st.selectbox("Trzecie miejsce", drivers)
-
-        # Sekcja 2: Różnica czasowa
-        st.subheader("2. Różnica w sekundach między 1. a 2. miejscem (1 punkt)")
-        time_diff = st.radio(
-            "Wybierz przedział",
-            ["Mniej niż 2 sekundy", "2.001-5 sekund", "5.001-10 sekund",
-             "10.001-20 sekund", "Więcej niż 20 sekund"]
-        )
+    # Sekcja 3: Driver of The Day
+    st.subheader("3. Kierowca dnia (1 punkt)")
+    dotd = st.selectbox("Driver of The Day", drivers, key=prediction_key(race_id, "dotd"), **autosave)
+
+    # Sekcja 4: Safety Car
+    st.subheader("4. Safety Car (1 punkt)")
+    safety_car = st.radio(
+        "Czy podczas wyścigu wyjedzie Safety Car?",
+        YES_NO_OPTIONS,
+        key=prediction_key(race_id, "safety_car"),
+        **autosave
+    )
 
-        # Sekcja 3: Driver of The Day
-        st.subheader("3. Kierowca dnia (1 punkt)")
-        dotd = st.selectbox("Driver of The Day", drivers)
+    # Sekcja 5: Czerwona flaga
+    st.subheader("5. Czerwona flaga (1 punkt)")
+    red_flag = st.radio(
+        "Czy podczas wyścigu będzie czerwona flaga?",
+        YES_NO_OPTIONS,
+        key=prediction_key(race_id, "red_flag"),
+        **autosave
+    )
 
-        # Sekcja 4: Safety Car
-        st.subheader("4. Safety Car (1 punkt)")
-        safety_car = st.radio(
-            "Czy podczas wyścigu wyjedzie Safety Car?",
-            ["Tak", "Nie"]
-        )
+    # Sekcja 6: Liczba sklasyfikowanych kierowców
+    st.subheader("6. Ilu kierowców zostanie sklasyfikowanych? (1 punkt)")
+    classified_drivers = st.radio(
+        "Wybierz przedział",
+        CLASSIFIED_DRIVERS_OPTIONS,
+        key=prediction_key(race_id, "classified_drivers"),
+        **autosave
+    )
 
-        # Sekcja 5: Czerwona flaga
-        st.subheader("5. Czerwona flaga (1 punkt)")
-        red_flag = st.radio(
-            "Czy podczas wyścigu będzie czerwona flaga?",
-            ["Tak", "Nie"]
-        )
+    # Sekcja 7: Liczba zespołów z punktami
+    st.subheader("7. Ile zespołów zdobędzie punkty? (1 punkt)")
+    teams_with_points = st.select_slider(
+        "Wybierz liczbę zespołów",
+        options=TEAMS_WITH_POINTS_OPTIONS,
+        key=prediction_key(race_id, "teams_with_points"),
+        **autosave
+    )
 
-        # Sekcja 6: Liczba sklasyfikowanych kierowców
-        st.subheader("6. Ilu kierowców zostanie sklasyfikowanych? (1 punkt)")
-        classified_drivers = st.radio(
-            "Wybierz przedział",
-            ["22", "21-20", "19-18", "17-16", "15-14", "Mniej niż 14"]
+    # Sekcja 8: Dodatkowe pytania (zmienne)
+    st.subheader("8. Dodatkowe pytania (1 punkt za każde)")
+
+    # Odpowiedzi zapisywane pod id pytania; w podsumowaniu i emailu - numer pytania
+    extra_answers = {}
+    extra_labels = {}
+    for i, question_data in enumerate(custom_questions):
+        question_key = extra_answer_key(question_data, i + 1)
+        extra_labels[question_key] = f"{EXTRA_ANSWER_PREFIX} {i+1}"
+        extra_answers[question_key] = st.radio(
+            question_data["question"],
+            options=question_data["options"],
+            key=prediction_key(race_id, f"extra_{question_key}"),
+            **autosave
         )
 
-        # Sekcja 7: Liczba zespołów z punktami
-        st.subheader("7. Ile zespołów zdobędzie punkty? (1 punkt)")
-        teams_with_points = st.select_slider(
-            "Wybierz liczbę zespołów",
-            options=[5, 6, 7, 8, 9, 10, 11]
-        )
+    submitted = st.button("Wyślij typy")
 
-        # Sekcja 8: Dodatkowe pytania (zmienne)
-        st.subheader("8. Dodatkowe pytania (1 punkt za każde)")
+    if submitted:
+        if not user_name:
+            st.error("Wypełnij imię!")
+        elif not race_id and supabase_connected:
+            st.error("Brak aktywnego wyścigu do typowania!")
+        else:
+            predictions = {
+                "Podium 1. miejsce": podium_1,
+                "Podium 2. miejsce": podium_2,
+                "Podium 3. miejsce": podium_3,
+                "Różnica czasowa": time_diff,
+                "Kierowca dnia": dotd,
+                "Safety Car": safety_car,
+                "Czerwona flaga": red_flag,
+                "Liczba sklasyfikowanych kierowców": classified_drivers,
+                "Liczba zespołów z punktami": teams_with_points,
+            }
+
+            predictions.update({extra_labels[key]: value for key, value in extra_answers.items()})
+
+            success = False
+
+            if supabase_connected and race_id:
+                success = save_submission(predictions, user_name, race_id, extra_answers)
+                if success:
+                    discard_draft(race_id, user_name)
+            else:
+                success = send_email_confirmation(predictions, user_name)
 
-        extra_answers = {}
-        for i, question_data in enumerate(custom_questions):
-            question_key = f"Pytanie dodatkowe {i+1}"
-            extra_answers[question_key] = st.radio(
-                question_data["question"],
-                options=question_data["options"]
-            )
+            if success:
+                st.success("Chill, koniec męczarni! Twoje typy zostały zapisane! Powodzenia! 🏆")
+                # Nowy typ zmienia historię użytkownika - odświeżamy cache profilu
+                load_user_history.clear()
 
-        submitted = st.form_submit_button("Wyślij typy")
+                st.subheader("Podsumowanie Twoich typów:")
+                df = pd.DataFrame(list(predictions.items()), columns=["Kategoria", "Twój typ"])
+                st.table(df)
 
-        if submitted:
-            if not user_name:
-                st.error("Wypełnij imię!")
-            elif not race_id and supabase_connected:
-                st.error("Brak aktywnego wyścigu do typowania!")
+                try:
+                    img = Image.open("fernando.png")
+                    st.image(img, caption="Powodzenia!", use_container_width=True)
+                except Exception as e:
+                    st.warning(f"Nie udało się wyświetlić obrazka: {e}")
             else:
-                predictions = {
-                    "Podium 1. miejsce": podium_1,
-                    "Podium 2. miejsce": podium_2,
-                    "Podium 3. miejsce": podium_3,
-                    "Różnica czasowa": time_diff,
-                    "Kierowca dnia": dotd,
-                    "Safety Car": safety_car,
-                    "Czerwona flaga": red_flag,
-                    "Liczba sklasyfikowanych kierowców": classified_drivers,
-                    "Liczba zespołów z punktami": teams_with_points,
-                }
-
-                predictions.update(extra_answers)
-
-                success = False
-
-                if supabase_connected and race_id:
-                    success = save_submission(predictions, user_name, race_id)
-                else:
-                    success = send_email_confirmation(predictions, user_name)
+                st.error("Wystąpił problem podczas zapisywania formularza. Spróbuj ponownie.")
 
-                if success:
-                    st.success("Chill, koniec męczarni! Twoje typy zostały zapisane! Powodzenia! 🏆")
-
-                    st.subheader("Podsumowanie Twoich typów:")
-                    df = pd.DataFrame(list(predictions.items()), columns=["Kategoria", "Twój typ"])
-                    st.table(df)
-
-                    try:
-                        img = Image.open("fernando.png")
-                        st.image(img, caption="Powodzenia!", use_container_width=True)
-                    except Exception as e:
-                        st.warning(f"Nie udało się wyświetlić obrazka: {e}")
-                else:
-                    st.error("Wystąpił problem podczas zapisywania formularza. Spróbuj ponownie.")
+# Formularz główny
+if not active_races:
+    st.info("Brak aktywnych wyścigów. Formularz typowania zostanie otwarty przed kolejnym wyścigiem.")
+    with st.expander(leaderboard_title(), expanded=True):
+        render_leaderboard()
+else:
+    render_prediction_section(active_races)
 
 # Dodanie instrukcji punktacji
 with st.expander("Zasady punktacji"):
-    st.markdown("""
-    ### Zasady przyznawania punktów:
-    1. **Podium** - 1 punkt za każdego prawidłowo wytypowanego kierowcę + 1 dodatkowy punkt za idealne podium (łącznie max. 4 punkty)
-    2. **Różnica czasowa** - 1 punkt za prawidłowy przedział
-    3. **Kierowca dnia** - 1 punkt za trafienie
-    4. **Safety Car** - 1 punkt za prawidłową odpowiedź
-    5. **Czerwona flaga** - 1 punkt za prawidłową odpowiedź
-    6. **Liczba sklasyfikowanych kierowców** - 1 punkt za prawidłowy przedział
-    7. **Liczba zespołów z punktami** - 1 punkt za trafienie
-    8. **Pytania dodatkowe** - po 1 punkcie za każdą prawidłową odpowiedź
-    
-    **Maksymalna liczba punktów do zdobycia: 11**
-    """)
+    st.markdown(rules_markdown(SCORING_RULESETS[ACTIVE_RULESET_VERSION]))
 
 # Zmienne do przechowywania ustawień aplikacji
 if 'app_settings' not in st.session_state:
@@ -632,7 +963,7 @@ def save_app_settings():
             json.dump(st.session_state.app_settings, file, ensure_ascii=False, indent=2)
         return True
     except Exception as e:
-        st.sidebar.error(f"Błąd podczas zapisywania ustawień: {e}")
+        st.error(f"Błąd podczas zapisywania ustawień: {e}")
         return False
 
 # Ukryty przycisk do pokazania formularza logowania
@@ -666,737 +997,1132 @@ if st.session_state.show_admin_login and not st.session_state.show_admin:
                 except Exception:
                     st.error("Brak konfiguracji hasła administratora w secrets.toml")
 
-# Panel administratora (gdy zalogowany)
-if st.session_state.show_admin:
-    with st.sidebar:
-        st.header("Panel Administratora")
-        
-        # Przycisk wylogowania na górze panelu
-        col1, col2 = st.columns([4, 1])
-        with col2:
-            if st.button("Wyloguj", key="logout_button"):
-                logout_admin()
-        
-        # Zakładki panelu administratora
-        admin_tabs = st.tabs(["Ustawienia", "Wyścigi", "Pytania", "Wyniki", "Statystyki"])
-        
-        # Zakładka z ustawieniami aplikacji
-        with admin_tabs[0]:
-            st.subheader("Ogólne ustawienia aplikacji")
-            
-            # Edycja opisu aplikacji
-            app_description_input = st.text_area(
-                "Opis aplikacji (tekst pod tytułem)",
-                value=app_description.replace("### ", ""),
-                help="Zmień główny opis aplikacji wyświetlany pod tytułem."
-            )
-            
-            # Aktualizacja opisu aplikacji w sesji
-            st.session_state.app_settings["app_description"] = f"### {app_description_input}"
-            
-            # Przyciski do zapisywania ustawień
-            if st.button("Zapisz ustawienia ogólne"):
-                # Zapisz do bazy danych jeśli połączenie z Supabase jest aktywne
-                if supabase_connected:
-                    try:
-                        # Sprawdź czy tabela app_settings istnieje i dodaj/zaktualizuj rekord
-                        settings_data = {"app_description": f"### {app_description_input}"}
-                        
-                        # Próba aktualizacji, jeśli nie istnieje, to dodanie nowego rekordu
-                        response = supabase.table('app_settings').upsert(settings_data).execute()
-                        
-                        if len(response.data) > 0:
-                            st.success("Ustawienia zostały zapisane w bazie danych!")
-                        else:
-                            # Fallback do zapisywania w pliku
-                            if save_app_settings():
-                                st.success("Ustawienia zostały zapisane w pliku!")
-                    except Exception as e:
-                        st.error(f"Błąd podczas zapisywania ustawień w bazie: {e}")
-                        # Próba zapisania do pliku jako fallback
-                        if save_app_settings():
-                            st.success("Ustawienia zostały zapisane w pliku!")
+# Sekcje panelu administratora - każda jest fragmentem, więc interakcja w zakładce przelicza
+# tylko tę zakładkę (st.rerun() po zmianie danych nadal odświeża całą aplikację)
+
+# Zakładka z ustawieniami aplikacji
+@st.fragment
+def render_admin_settings():
+    st.subheader("Ogólne ustawienia aplikacji")
+    
+    # Edycja opisu aplikacji
+    app_description_input = st.text_area(
+        "Opis aplikacji (tekst pod tytułem)",
+        value=app_description.replace("### ", ""),
+        help="Zmień główny opis aplikacji wyświetlany pod tytułem."
+    )
+    
+    # Aktualizacja opisu aplikacji w sesji
+    st.session_state.app_settings["app_description"] = f"### {app_description_input}"
+    
+    # Przyciski do zapisywania ustawień
+    if st.button("Zapisz ustawienia ogólne"):
+        # Zapisz do bazy danych jeśli połączenie z Supabase jest aktywne
+        if supabase_connected:
+            try:
+                # Sprawdź czy tabela app_settings istnieje i dodaj/zaktualizuj rekord
+                settings_data = {"app_description": f"### {app_description_input}"}
+                
+                # Próba aktualizacji, jeśli nie istnieje, to dodanie nowego rekordu
+                response_data = repo.save_app_settings(settings_data)
+                
+                if len(response_data) > 0:
+                    st.success("Ustawienia zostały zapisane w bazie danych!")
                 else:
-                    # Zapisz do pliku jeśli brak połączenia z Supabase
+                    # Fallback do zapisywania w pliku
                     if save_app_settings():
                         st.success("Ustawienia zostały zapisane w pliku!")
-                
-                st.rerun()  # Odświeżenie aplikacji, aby pokazać zmiany
+            except Exception as e:
+                st.error(f"Błąd podczas zapisywania ustawień w bazie: {e}")
+                # Próba zapisania do pliku jako fallback
+                if save_app_settings():
+                    st.success("Ustawienia zostały zapisane w pliku!")
+        else:
+            # Zapisz do pliku jeśli brak połączenia z Supabase
+            if save_app_settings():
+                st.success("Ustawienia zostały zapisane w pliku!")
         
-        # Zakładka zarządzania wyścigami
-        with admin_tabs[1]:
-            st.subheader("Zarządzanie wyścigami")
+        st.rerun()  # Odświeżenie aplikacji, aby pokazać zmiany
+
+
+# Zakładka zarządzania wyścigami
+@st.fragment
+def render_admin_races():
+    st.subheader("Zarządzanie wyścigami")
+    
+    if not supabase_connected:
+        st.error("Brak połączenia z bazą danych. Zarządzanie wyścigami wymaga połączenia z Supabase.")
+    else:
+        # Formularz dodawania nowego wyścigu
+        with st.form("add_race_form"):
+            st.write("#### Dodaj nowy wyścig")
+            race_name = st.text_input("Nazwa wyścigu (np. GP Hiszpanii)")
+            race_date = st.date_input("Data wyścigu")
+            submission_date = st.date_input("Data terminu nadsyłania typów")
+            submission_time = st.time_input("Czas terminu nadsyłania typów")
+            # Otwarcie w przyszłości - wyścig otworzy harmonogram; po terminie zamyka go automatycznie
+            opens_date = st.date_input("Data otwarcia typowania")
+            opens_time = st.time_input("Czas otwarcia typowania")
+
+            # Combine date and time into a datetime object
+            submission_deadline = datetime.combine(submission_date, submission_time)
+            opens_at = datetime.combine(opens_date, opens_time)
+                                
+            submit_race = st.form_submit_button("Dodaj wyścig")
             
-            if not supabase_connected:
-                st.error("Brak połączenia z bazą danych. Zarządzanie wyścigami wymaga połączenia z Supabase.")
-            else:
-                # Formularz dodawania nowego wyścigu
-                with st.form("add_race_form"):
-                    st.write("#### Dodaj nowy wyścig")
-                    race_name = st.text_input("Nazwa wyścigu (np. GP Hiszpanii)")
-                    race_date = st.date_input("Data wyścigu")
-                    submission_date = st.date_input("Data terminu nadsyłania typów")
-                    submission_time = st.time_input("Czas terminu nadsyłania typów")
-
-                    # Combine date and time into a datetime object
-                    submission_deadline = datetime.combine(submission_date, submission_time)
-                                        
-                    submit_race = st.form_submit_button("Dodaj wyścig")
-                    
-                    if submit_race:
-                        try:
-                            race_data = {
-                                "race_name": race_name,
-                                "race_date": race_date.isoformat(),
-                                "submission_deadline": submission_deadline.isoformat(),
-                                "is_active": True
-                            }
-                            
-                            response = supabase.table('races').insert(race_data).execute()
-                            
-                            if len(response.data) > 0:
-                                st.success(f"Dodano wyścig: {race_name}")
-                                st.rerun()
-                            else:
-                                st.error("Nie udało się dodać wyścigu")
-                        except Exception as e:
-                            st.error(f"Błąd: {e}")
-                
-                # Lista aktywnych wyścigów
-                st.subheader("Aktywne wyścigi")
-                active_races = get_active_races()
-                
-                if active_races:
-                    for race in active_races:
-                        col1, col2 = st.columns([3, 1])
-                        with col1:
-                            st.write(f"**{race['race_name']}** - {race['race_date']}")
-                            st.write(f"Termin typowania: {race['submission_deadline']}")
-                        with col2:
-                            if st.button("Deaktywuj", key=f"deactivate_{race['id']}"):
-                                supabase.table('races').update({"is_active": False}).eq("id", race['id']).execute()
-                                st.success(f"Deaktywowano wyścig: {race['race_name']}")
-                                st.rerun()
-                else:
-                    st.info("Brak aktywnych wyścigów.")
-                
-                # Lista wszystkich wyścigów (w tym nieaktywnych)
-                st.subheader("Wszystkie wyścigi")
+            if submit_race:
                 try:
-                    all_races_response = supabase.table('races').select('*').order('race_date', desc=True).execute()
-                    all_races = all_races_response.data
+                    race_data = {
+                        "race_name": race_name,
+                        "race_date": race_date.isoformat(),
+                        "submission_deadline": submission_deadline.isoformat(),
+                        "is_active": True
+                    }
+                    if local_moment(opens_at) > app_now():
+                        race_data.update({"is_active": False, "opens_at": opens_at.isoformat()})
                     
-                    if all_races:
-                        races_df = pd.DataFrame(all_races)
-                        races_df['status'] = races_df['is_active'].apply(lambda x: "Aktywny" if x else "Nieaktywny")
-                        races_df = races_df[['race_name', 'race_date', 'submission_deadline', 'status']]
-                        races_df.columns = ['Nazwa wyścigu', 'Data wyścigu', 'Termin typowania', 'Status']
-                        st.dataframe(races_df)
+                    response_data = repo.insert_race(race_data)
+                    
+                    if len(response_data) > 0:
+                        st.success(f"Dodano wyścig: {race_name}")
+                        fetch_active_races.clear()
+                        if LIFECYCLE_SCHEDULER == "app":
+                            get_lifecycle_scheduler(supabase_url).wake()
+                        st.rerun()
                     else:
-                        st.info("Brak wyścigów w bazie.")
+                        st.error("Nie udało się dodać wyścigu")
                 except Exception as e:
-                    st.error(f"Błąd podczas pobierania listy wyścigów: {e}")
-                    
-# Zakładka zarządzania pytaniami dodatkowymi
-        with admin_tabs[2]:
-            st.subheader("Zarządzanie pytaniami dodatkowymi")
+                    st.error(f"Błąd: {e}")
+        
+        # Lista aktywnych wyścigów
+        st.subheader("Aktywne wyścigi")
+        active_races = get_active_races()
+        
+        if active_races:
+            for race in active_races:
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    st.write(f"**{race['race_name']}** - {race['race_date']}")
+                    st.write(f"Termin typowania: {race['submission_deadline']}")
+                with col2:
+                    if st.button("Deaktywuj", key=f"deactivate_{race['id']}"):
+                        repo.deactivate_race(race['id'])
+                        fetch_active_races.clear()
+                        st.success(f"Deaktywowano wyścig: {race['race_name']}")
+                        st.rerun()
+        else:
+            st.info("Brak aktywnych wyścigów.")
+        
+        # Lista wszystkich wyścigów (w tym nieaktywnych)
+        st.subheader("Wszystkie wyścigi")
+        try:
+            all_races = repo.get_races_ordered()
             
-            if not supabase_connected:
-                st.error("Brak połączenia z bazą danych. Zarządzanie pytaniami wymaga połączenia z Supabase.")
+            if all_races:
+                races_df = pd.DataFrame(all_races)
+                races_df['status'] = races_df['is_active'].apply(lambda x: "Aktywny" if x else "Nieaktywny")
+                if 'opens_at' not in races_df:
+                    races_df['opens_at'] = None
+                races_df = races_df[['race_name', 'race_date', 'opens_at', 'submission_deadline', 'status']]
+                races_df.columns = ['Nazwa wyścigu', 'Data wyścigu', 'Zaplanowane otwarcie', 'Termin typowania', 'Status']
+                st.dataframe(races_df)
             else:
-                # Wybór wyścigu do edycji pytań
-                races = get_all_races()
+                st.info("Brak wyścigów w bazie.")
+        except Exception as e:
+            st.error(f"Błąd podczas pobierania listy wyścigów: {e}")
+
+
+# Zakładka zarządzania pytaniami dodatkowymi
+@st.fragment
+def render_admin_questions():
+    st.subheader("Zarządzanie pytaniami dodatkowymi")
+    
+    if not supabase_connected:
+        st.error("Brak połączenia z bazą danych. Zarządzanie pytaniami wymaga połączenia z Supabase.")
+    else:
+        # Wybór wyścigu do edycji pytań
+        races = get_all_races()
+        
+        if races:
+            race_options = [f"{race['race_name']} ({race['race_date']})" for race in races]
+            race_ids = [race['id'] for race in races]
+            
+            selected_race_index = st.selectbox(
+                "Wybierz wyścig do edycji pytań", 
+                range(len(races)), 
+                format_func=lambda x: race_options[x],
+                key="questions_race_select"
+            )
+            
+            selected_race_id = race_ids[selected_race_index]
+            
+            # Pobranie aktualnych pytań dla wybranego wyścigu
+            race_questions = repo.get_race_questions(selected_race_id)
+            
+            if not race_questions:
+                st.info(f"Brak pytań dla wyścigu {race_options[selected_race_index]}. Dodaj nowe pytania.")
                 
-                if races:
-                    race_options = [f"{race['race_name']} ({race['race_date']})" for race in races]
-                    race_ids = [race['id'] for race in races]
-                    
-                    selected_race_index = st.selectbox(
-                        "Wybierz wyścig do edycji pytań", 
-                        range(len(races)), 
-                        format_func=lambda x: race_options[x],
-                        key="questions_race_select"
-                    )
+                # Formularze do dodawania nowych pytań
+                with st.form("add_question_form"):
+                    st.write("#### Dodaj nowe pytanie")
+                    question_text = st.text_input("Treść pytania")
+                    options_text = st.text_area("Opcje odpowiedzi (każda w nowej linii)")
                     
-                    selected_race_id = race_ids[selected_race_index]
+                    submit_question = st.form_submit_button("Dodaj pytanie")
                     
-                    # Pobranie aktualnych pytań dla wybranego wyścigu
-                    questions_response = supabase.table('custom_questions').select('*').eq('race_id', selected_race_id).execute()
-                    race_questions = questions_response.data
-                    
-                    if not race_questions:
-                        st.info(f"Brak pytań dla wyścigu {race_options[selected_race_index]}. Dodaj nowe pytania.")
-                        
-                        # Formularze do dodawania nowych pytań
-                        with st.form("add_question_form"):
-                            st.write("#### Dodaj nowe pytanie")
-                            question_text = st.text_input("Treść pytania")
-                            options_text = st.text_area("Opcje odpowiedzi (każda w nowej linii)")
-                            
-                            submit_question = st.form_submit_button("Dodaj pytanie")
-                            
-                            if submit_question:
-                                if not question_text or not options_text:
-                                    st.error("Treść pytania i opcje odpowiedzi są wymagane.")
+                    if submit_question:
+                        if not question_text or not options_text:
+                            st.error("Treść pytania i opcje odpowiedzi są wymagane.")
+                        else:
+                            try:
+                                options = [opt.strip() for opt in options_text.split('\n') if opt.strip()]
+                                
+                                if len(options) < 2:
+                                    st.error("Dodaj co najmniej dwie opcje odpowiedzi.")
                                 else:
-                                    try:
-                                        options = [opt.strip() for opt in options_text.split('\n') if opt.strip()]
-                                        
-                                        if len(options) < 2:
-                                            st.error("Dodaj co najmniej dwie opcje odpowiedzi.")
-                                        else:
-                                            question_data = {
-                                                "question": question_text,
-                                                "options": options,
-                                                "race_id": selected_race_id
-                                            }
-                                            
-                                            response = supabase.table('custom_questions').insert(question_data).execute()
-                                            
-                                            if len(response.data) > 0:
-                                                st.success(f"Dodano pytanie dla wyścigu {race_options[selected_race_index]}")
-                                                st.rerun()
-                                            else:
-                                                st.error("Nie udało się dodać pytania")
-                                    except Exception as e:
-                                        st.error(f"Błąd: {e}")
-                    else:
-                        # Edycja istniejących pytań
-                        st.write(f"#### Edycja pytań dla wyścigu {race_options[selected_race_index]}")
-                        
-                        for i, question in enumerate(race_questions):
-                            with st.expander(f"Pytanie {i+1}: {question['question'][:50]}..."):
-                                with st.form(f"edit_question_{question['id']}"):
-                                    q_text = st.text_input("Treść pytania", value=question['question'], key=f"q_text_{question['id']}")
-                                    
-                                    options_str = "\n".join(question['options']) if isinstance(question['options'], list) else "\n".join(question['options'].keys())
-                                    q_options = st.text_area("Opcje odpowiedzi (każda w nowej linii)", value=options_str, key=f"q_options_{question['id']}")
-                                    
-                                    col1, col2 = st.columns([1, 1])
-                                    with col1:
-                                        update_btn = st.form_submit_button("Aktualizuj")
-                                    with col2:
-                                        delete_btn = st.form_submit_button("Usuń", type="primary")
+                                    question_data = {
+                                        "question": question_text,
+                                        "options": options,
+                                        "race_id": selected_race_id
+                                    }
                                     
-                                    if update_btn:
-                                        try:
-                                            options = [opt.strip() for opt in q_options.split('\n') if opt.strip()]
-                                            
-                                            if len(options) < 2:
-                                                st.error("Dodaj co najmniej dwie opcje odpowiedzi.")
-                                            else:
-                                                question_data = {
-                                                    "question": q_text,
-                                                    "options": options
-                                                }
-                                                
-                                                response = supabase.table('custom_questions').update(question_data).eq('id', question['id']).execute()
-                                                
-                                                if len(response.data) > 0:
-                                                    st.success("Pytanie zostało zaktualizowane")
-                                                    st.rerun()
-                                                else:
-                                                    st.error("Nie udało się zaktualizować pytania")
-                                        except Exception as e:
-                                            st.error(f"Błąd podczas aktualizacji: {e}")
+                                    response_data = repo.insert_question(question_data)
                                     
-                                    if delete_btn:
-                                        try:
-                                            response = supabase.table('custom_questions').delete().eq('id', question['id']).execute()
-                                            
-                                            if len(response.data) > 0:
-                                                st.success("Pytanie zostało usunięte")
-                                                st.rerun()
-                                            else:
-                                                st.error("Nie udało się usunąć pytania")
-                                        except Exception as e:
-                                            st.error(f"Błąd podczas usuwania: {e}")
-                        
-                        # Formularz dodawania nowego pytania dla istniejącego wyścigu
-                        with st.form("add_new_question_form"):
-                            st.write("#### Dodaj nowe pytanie")
-                            new_question_text = st.text_input("Treść pytania", key="new_q_text")
-                            new_options_text = st.text_area("Opcje odpowiedzi (każda w nowej linii)", key="new_q_options")
-                            
-                            submit_new_question = st.form_submit_button("Dodaj pytanie")
-                            
-                            if submit_new_question:
-                                if not new_question_text or not new_options_text:
-                                    st.error("Treść pytania i opcje odpowiedzi są wymagane.")
-                                else:
-                                    try:
-                                        options = [opt.strip() for opt in new_options_text.split('\n') if opt.strip()]
-                                        
-                                        if len(options) < 2:
-                                            st.error("Dodaj co najmniej dwie opcje odpowiedzi.")
-                                        else:
-                                            question_data = {
-                                                "question": new_question_text,
-                                                "options": options,
-                                                "race_id": selected_race_id
-                                            }
-                                            
-                                            response = supabase.table('custom_questions').insert(question_data).execute()
-                                            
-                                            if len(response.data) > 0:
-                                                st.success(f"Dodano nowe pytanie dla wyścigu {race_options[selected_race_index]}")
-                                                st.rerun()
-                                            else:
-                                                st.error("Nie udało się dodać pytania")
-                                    except Exception as e:
-                                        st.error(f"Błąd: {e}")
-                else:
-                    st.info("Brak wyścigów. Najpierw dodaj wyścig w zakładce 'Wyścigi'.")
-                    
-        # Zakładka zarządzania wynikami
-        with admin_tabs[3]:
-            st.subheader("Wprowadzanie wyników wyścigów")
-            
-            if not supabase_connected:
-                st.error("Brak połączenia z bazą danych. Wprowadzanie wyników wymaga połączenia z Supabase.")
+                                    if len(response_data) > 0:
+                                        st.success(f"Dodano pytanie dla wyścigu {race_options[selected_race_index]}")
+                                        st.rerun()
+                                    else:
+                                        st.error("Nie udało się dodać pytania")
+                            except Exception as e:
+                                st.error(f"Błąd: {e}")
             else:
-                # Wybór wyścigu do wprowadzenia wyników
-                races = get_all_races()
+                # Edycja istniejących pytań
+                st.write(f"#### Edycja pytań dla wyścigu {race_options[selected_race_index]}")
                 
-                if races:
-                    race_options = [f"{race['race_name']} ({race['race_date']})" for race in races]
-                    race_ids = [race['id'] for race in races]
-                    
-                    selected_race_index = st.selectbox(
-                        "Wybierz wyścig do wprowadzenia wyników", 
-                        range(len(races)), 
-                        format_func=lambda x: race_options[x],
-                        key="results_race_select"
-                    )
-                    
-                    selected_race_id = race_ids[selected_race_index]
-                    
-                    # Sprawdź czy już wprowadzono wyniki
-                    results_response = supabase.table('results').select('*').eq('race_id', selected_race_id).execute()
-                    existing_results = results_response.data
-                    
-                    # Lista kierowców
-                    drivers = get_f1_drivers()
-                    
-                    # Pobranie pytań dodatkowych dla tego wyścigu
-                    questions_response = supabase.table('custom_questions').select('*').eq('race_id', selected_race_id).execute()
-                    race_questions = questions_response.data
-                    
-                    if existing_results:
-                        st.info(f"Wyniki dla wyścigu {race_options[selected_race_index]} zostały już wprowadzone. Możesz je edytować poniżej.")
-                        
-                        with st.form("edit_results_form"):
-                            st.write("#### Edycja wyników wyścigu")
+                for i, question in enumerate(race_questions):
+                    with st.expander(f"Pytanie {i+1}: {question['question'][:50]}..."):
+                        with st.form(f"edit_question_{question['id']}"):
+                            q_text = st.text_input("Treść pytania", value=question['question'], key=f"q_text_{question['id']}")
                             
-                            result = existing_results[0]
+                            options_str = "\n".join(question['options']) if isinstance(question['options'], list) else "\n".join(question['options'].keys())
+                            q_options = st.text_area("Opcje odpowiedzi (każda w nowej linii)", value=options_str, key=f"q_options_{question['id']}")
                             
-                            # Podium
-                            st.subheader("Podium wyścigu")
-                            col1, col2, col3 = st.columns(3)
+                            col1, col2 = st.columns([1, 1])
                             with col1:
-                                podium_1 = st.selectbox("Pierwsze miejsce", drivers, index=drivers.index(result['podium_1']) if result['podium_1'] in drivers else 0)
+                                update_btn = st.form_submit_button("Aktualizuj")
                             with col2:
-                                #podium_2_options = [d for d in drivers if d != podium_1]
-                                podium_2 = st.selectbox("Drugie miejsce", drivers, index=drivers.index(result['podium_2']) if result['podium_2'] in drivers else 0)
-                            with col3:
-                                #podium_3_options = [d for d in drivers if d not in [podium_1, podium_2]]
-                                podium_3 = st.selectbox("Trzecie miejsce", drivers, index=drivers.index(result['podium_3']) if result['podium_3'] in drivers else 0)
-                            
-                            # Pozostałe wyniki
-                            time_diff = st.radio(
-                                "Różnica czasowa między 1. a 2. miejscem",
-                                ["Mniej niż 2 sekundy", "2.001-5 sekund", "5.001-10 sekund", 
-                                "10.001-20 sekund", "Więcej niż 20 sekund"],
-                                index=["Mniej niż 2 sekundy", "2.001-5 sekund", "5.001-10 sekund", 
-                                "10.001-20 sekund", "Więcej niż 20 sekund"].index(result['time_diff'])
-                            )
+                                delete_btn = st.form_submit_button("Usuń", type="primary")
                             
-                            dotd = st.selectbox("Kierowca dnia (DOTD)", drivers, index=drivers.index(result['driver_of_day']) if result['driver_of_day'] in drivers else 0)
-                            
-                            safety_car = st.radio(
-                                "Wyjazd Safety Car",
-                                ["Tak", "Nie"],
-                                index=0 if result['safety_car'] else 1
-                            )
-                            
-                            red_flag = st.radio(
-                                "Czerwona flaga",
-                                ["Tak", "Nie"],
-                                index=0 if result['red_flag'] else 1
-                            )
-                            
-                            classified_drivers = st.radio(
-                                "Liczba sklasyfikowanych kierowców",
-                                ["22", "21-20", "19-18", "17-16", "15-14", "Mniej niż 14"],
-                                index=["20", "19-18", "17-16", "15-14", "Mniej niż 14"].index(result['classified_drivers'])
-                            )
-                            
-                            teams_with_points = st.select_slider(
-                                "Liczba zespołów z punktami",
-                                options=[5, 6, 7, 8, 9, 10, 11],
-                                value=result['teams_with_points']
-                            )
-                            
-                            # Odpowiedzi na pytania dodatkowe
-                            extra_answers = {}
-                            if race_questions:
-                                st.subheader("Odpowiedzi na pytania dodatkowe")
-                                
-                                for i, question in enumerate(race_questions):
-                                    question_key = f"Pytanie dodatkowe {i+1}"
-                                    
-                                    # Pobierz poprzednią odpowiedź, jeśli istnieje
-                                    previous_answer = None
-                                    if 'extra_answers' in result and question_key in result['extra_answers']:
-                                        previous_answer = result['extra_answers'][question_key]
-                                    
-                                    options = question['options']
-                                    default_index = options.index(previous_answer) if previous_answer in options else 0
+                            if update_btn:
+                                try:
+                                    options = [opt.strip() for opt in q_options.split('\n') if opt.strip()]
                                     
-                                    extra_answers[question_key] = st.radio(
-                                        question['question'],
-                                        options=options,
-                                        index=default_index,
-                                        key=f"result_q_{question['id']}"
-                                    )
-                            
-                            update_results = st.form_submit_button("Zaktualizuj wyniki")
+                                    if len(options) < 2:
+                                        st.error("Dodaj co najmniej dwie opcje odpowiedzi.")
+                                    else:
+                                        question_data = {
+                                            "question": q_text,
+                                            "options": options
+                                        }
+                                        
+                                        response_data = repo.update_question(question['id'], question_data)
+                                        
+                                        if len(response_data) > 0:
+                                            st.success("Pytanie zostało zaktualizowane")
+                                            st.rerun()
+                                        else:
+                                            st.error("Nie udało się zaktualizować pytania")
+                                except Exception as e:
+                                    st.error(f"Błąd podczas aktualizacji: {e}")
                             
-                            if update_results:
+                            if delete_btn:
                                 try:
-                                    results_data = {
-                                        "podium_1": podium_1,
-                                        "podium_2": podium_2,
-                                        "podium_3": podium_3,
-                                        "time_diff": time_diff,
-                                        "driver_of_day": dotd,
-                                        "safety_car": safety_car == "Tak",
-                                        "red_flag": red_flag == "Tak",
-                                        "classified_drivers": classified_drivers,
-                                        "teams_with_points": teams_with_points,
-                                        "extra_answers": extra_answers,
-                                        "updated_at": datetime.now().isoformat()
+                                    response_data = repo.delete_question(question['id'])
+                                    
+                                    if len(response_data) > 0:
+                                        st.success("Pytanie zostało usunięte")
+                                        st.rerun()
+                                    else:
+                                        st.error("Nie udało się usunąć pytania")
+                                except Exception as e:
+                                    st.error(f"Błąd podczas usuwania: {e}")
+                
+                # Formularz dodawania nowego pytania dla istniejącego wyścigu
+                with st.form("add_new_question_form"):
+                    st.write("#### Dodaj nowe pytanie")
+                    new_question_text = st.text_input("Treść pytania", key="new_q_text")
+                    new_options_text = st.text_area("Opcje odpowiedzi (każda w nowej linii)", key="new_q_options")
+                    
+                    submit_new_question = st.form_submit_button("Dodaj pytanie")
+                    
+                    if submit_new_question:
+                        if not new_question_text or not new_options_text:
+                            st.error("Treść pytania i opcje odpowiedzi są wymagane.")
+                        else:
+                            try:
+                                options = [opt.strip() for opt in new_options_text.split('\n') if opt.strip()]
+                                
+                                if len(options) < 2:
+                                    st.error("Dodaj co najmniej dwie opcje odpowiedzi.")
+                                else:
+                                    question_data = {
+                                        "question": new_question_text,
+                                        "options": options,
+                                        "race_id": selected_race_id
                                     }
                                     
-                                    response = supabase.table('results').update(results_data).eq('race_id', selected_race_id).execute()
+                                    response_data = repo.insert_question(question_data)
                                     
-                                    if len(response.data) > 0:
-                                        st.success(f"Wyniki dla wyścigu {race_options[selected_race_index]} zostały zaktualizowane")
+                                    if len(response_data) > 0:
+                                        st.success(f"Dodano nowe pytanie dla wyścigu {race_options[selected_race_index]}")
                                         st.rerun()
                                     else:
-                                        st.error("Nie udało się zaktualizować wyników")
-                                except Exception as e:
-                                    st.error(f"Błąd podczas aktualizacji wyników: {e}")
-                    else:
-                        with st.form("add_results_form"):
-                            st.write("#### Wprowadzanie wyników wyścigu")
-                            
-                            # Podium
-                            st.subheader("Podium wyścigu")
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                podium_1 = st.selectbox("Pierwsze miejsce", drivers)
-                            with col2:
-                                #podium_2_options = [d for d in drivers if d != podium_1]
-                                podium_2 = st.selectbox("Drugie miejsce", drivers)
-                            with col3:
-                                #podium_3_options = [d for d in drivers if d not in [podium_1, podium_2]]
-                                podium_3 = st.selectbox("Trzecie miejsce", drivers)
+                                        st.error("Nie udało się dodać pytania")
+                            except Exception as e:
+                                st.error(f"Błąd: {e}")
+        else:
+            st.info("Brak wyścigów. Najpierw dodaj wyścig w zakładce 'Wyścigi'.")
+
+
+# Import wyników wielu wyścigów z pliku z klasyfikacją (f1_core.ingest) - pola results są wyliczane
+# z surowych danych, a agregaty przelicza harmonogram
+def render_results_import():
+    with st.expander("Import wyników z pliku"):
+        st.caption("Plik JSON lub CSV z klasyfikacją wyścigów (format opisany w f1_core/ingest.py). "
+                   "Wyścigi są dopasowywane po dacie i nazwie.")
+        uploaded = st.file_uploader("Plik z wynikami", type=list(ADAPTERS), key="results_import_file")
+        overwrite = st.checkbox("Zastąp istniejące wyniki", key="results_import_overwrite")
+        create_races = st.checkbox("Dodaj brakujące wyścigi", key="results_import_create")
+
+        if uploaded is not None and st.button("Importuj wyniki", key="results_import_button"):
+            try:
+                fmt = uploaded.name.rsplit(".", 1)[-1].lower()
+                feed_races = ADAPTERS[fmt](uploaded.getvalue().decode("utf-8"))
+                report = import_results(repo, feed_races, overwrite=overwrite, create_races=create_races)
+            except Exception as e:
+                st.error(f"Błąd podczas importu wyników: {e}")
+                return
+
+            if report['written']:
+                st.success(f"Zapisano wyniki {len(report['written'])} wyścigów: {', '.join(report['written'])}")
+                results_saved()
+                fetch_all_races.clear()
+            if report['skipped_existing']:
+                st.info(f"Pominięto wyścigi z wynikami: {', '.join(report['skipped_existing'])}")
+            if report['unmatched']:
+                st.warning(f"Nie znaleziono wyścigów: {', '.join(report['unmatched'])}")
+            for error in report['errors']:
+                st.error(f"{error['race']}: {error['error']}")
+            for warning in report['warnings']:
+                st.warning(warning)
+
+# Zakładka zarządzania wynikami
+@st.fragment
+def render_admin_results():
+    st.subheader("Wprowadzanie wyników wyścigów")
+    
+    if not supabase_connected:
+        st.error("Brak połączenia z bazą danych. Wprowadzanie wyników wymaga połączenia z Supabase.")
+    else:
+        render_results_import()
+
+        # Wybór wyścigu do wprowadzenia wyników
+        races = get_all_races()
+        
+        if races:
+            race_options = [f"{race['race_name']} ({race['race_date']})" for race in races]
+            race_ids = [race['id'] for race in races]
+            
+            selected_race_index = st.selectbox(
+                "Wybierz wyścig do wprowadzenia wyników", 
+                range(len(races)), 
+                format_func=lambda x: race_options[x],
+                key="results_race_select"
+            )
+            
+            selected_race_id = race_ids[selected_race_index]
+            
+            # Istniejące wyniki i pytania dodatkowe wyścigu (zapytania równoległe)
+            results_data = repo.fetch_parallel(
+                results=lambda: repo.get_race_results(selected_race_id),
+                questions=lambda: repo.get_race_questions(selected_race_id),
+            )
+            existing_results = results_data['results']
+            race_questions = results_data['questions']
+            
+            # Lista kierowców
+            drivers = get_f1_drivers()
+            
+            if existing_results:
+                st.info(f"Wyniki dla wyścigu {race_options[selected_race_index]} zostały już wprowadzone. Możesz je edytować poniżej.")
+                
+                with st.form("edit_results_form"):
+                    st.write("#### Edycja wyników wyścigu")
+                    
+                    result = existing_results[0]
+                    
+                    # Podium
+                    st.subheader("Podium wyścigu")
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        podium_1 = st.selectbox("Pierwsze miejsce", drivers, index=drivers.index(result['podium_1']) if result['podium_1'] in drivers else 0)
+                    with col2:
+                        #podium_2_options = [d for d in drivers if d != podium_1]
+                        podium_2 = st.selectbox("Drugie miejsce", drivers, index=drivers.index(result['podium_2']) if result['podium_2'] in drivers else 0)
+                    with col3:
+                        #podium_3_options = [d for d in drivers if d not in [podium_1, podium_2]]
+                        podium_3 = st.selectbox("Trzecie miejsce", drivers, index=drivers.index(result['podium_3']) if result['podium_3'] in drivers else 0)
+                    
+                    # Pozostałe wyniki
+                    time_diff = st.radio(
+                        "Różnica czasowa między 1. a 2. miejscem",
+                        TIME_DIFF_OPTIONS,
+                        index=TIME_DIFF_OPTIONS.index(result['time_diff'])
+                    )
+                    
+                    dotd = st.selectbox("Kierowca dnia (DOTD)", drivers, index=drivers.index(result['driver_of_day']) if result['driver_of_day'] in drivers else 0)
+                    
+                    safety_car = st.radio(
+                        "Wyjazd Safety Car",
+                        YES_NO_OPTIONS,
+                        index=0 if result['safety_car'] else 1
+                    )
+                    
+                    red_flag = st.radio(
+                        "Czerwona flaga",
+                        YES_NO_OPTIONS,
+                        index=0 if result['red_flag'] else 1
+                    )
+                    
+                    classified_drivers = st.radio(
+                        "Liczba sklasyfikowanych kierowców",
+                        CLASSIFIED_DRIVERS_OPTIONS,
+                        index=CLASSIFIED_DRIVERS_OPTIONS.index(result['classified_drivers']) if result['classified_drivers'] in CLASSIFIED_DRIVERS_OPTIONS else 0
+                    )
+                    
+                    teams_with_points = st.select_slider(
+                        "Liczba zespołów z punktami",
+                        options=TEAMS_WITH_POINTS_OPTIONS,
+                        value=result['teams_with_points']
+                    )
+                    
+                    # Odpowiedzi na pytania dodatkowe
+                    extra_answers = {}
+                    if race_questions:
+                        st.subheader("Odpowiedzi na pytania dodatkowe")
+                        
+                        for i, question in enumerate(race_questions):
+                            question_key = extra_answer_key(question, i + 1)
                             
-                            # Pozostałe wyniki
-                            time_diff = st.radio(
-                                "Różnica czasowa między 1. a 2. miejscem",
-                                ["Mniej niż 2 sekundy", "2.001-5 sekund", "5.001-10 sekund", 
-                                "10.001-20 sekund", "Więcej niż 20 sekund"]
-                            )
+                            # Pobierz poprzednią odpowiedź, jeśli istnieje
+                            previous_answer = (result.get('extra_answers') or {}).get(question_key)
                             
-                            dotd = st.selectbox("Kierowca dnia (DOTD)", drivers)
+                            options = question['options']
+                            default_index = options.index(previous_answer) if previous_answer in options else 0
                             
-                            safety_car = st.radio(
-                                "Wyjazd Safety Car",
-                                ["Tak", "Nie"]
+                            extra_answers[question_key] = st.radio(
+                                question['question'],
+                                options=options,
+                                index=default_index,
+                                key=f"result_q_{question['id']}"
                             )
+                    
+                    update_results = st.form_submit_button("Zaktualizuj wyniki")
+                    
+                    if update_results:
+                        try:
+                            results_data = {
+                                "podium_1": podium_1,
+                                "podium_2": podium_2,
+                                "podium_3": podium_3,
+                                "time_diff": time_diff,
+                                "driver_of_day": dotd,
+                                "safety_car": safety_car == "Tak",
+                                "red_flag": red_flag == "Tak",
+                                "classified_drivers": classified_drivers,
+                                "teams_with_points": teams_with_points,
+                                "extra_answers": extra_answers,
+                                "updated_at": utc_timestamp()
+                            }
                             
-                            red_flag = st.radio(
-                                "Czerwona flaga",
-                                ["Tak", "Nie"]
-                            )
+                            response_data = repo.update_results(selected_race_id, results_data)
                             
-                            classified_drivers = st.radio(
-                                "Liczba sklasyfikowanych kierowców",
-                                ["22", "21-20", "19-18", "17-16", "15-14", "Mniej niż 14"]
+                            if len(response_data) > 0:
+                                st.success(f"Wyniki dla wyścigu {race_options[selected_race_index]} zostały zaktualizowane")
+                                results_saved()
+                                st.rerun()
+                            else:
+                                st.error("Nie udało się zaktualizować wyników")
+                        except Exception as e:
+                            st.error(f"Błąd podczas aktualizacji wyników: {e}")
+            else:
+                with st.form("add_results_form"):
+                    st.write("#### Wprowadzanie wyników wyścigu")
+                    
+                    # Podium
+                    st.subheader("Podium wyścigu")
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        podium_1 = st.selectbox("Pierwsze miejsce", drivers)
+                    with col2:
+                        #podium_2_options = [d for d in drivers if d != podium_1]
+                        podium_2 = st.selectbox("Drugie miejsce", drivers)
+                    with col3:
+                        #podium_3_options = [d for d in drivers if d not in [podium_1, podium_2]]
+                        podium_3 = st.selectbox("Trzecie miejsce", drivers)
+                    
+                    # Pozostałe wyniki
+                    time_diff = st.radio(
+                        "Różnica czasowa między 1. a 2. miejscem",
+                        TIME_DIFF_OPTIONS
+                    )
+                    
+                    dotd = st.selectbox("Kierowca dnia (DOTD)", drivers)
+                    
+                    safety_car = st.radio(
+                        "Wyjazd Safety Car",
+                        YES_NO_OPTIONS
+                    )
+                    
+                    red_flag = st.radio(
+                        "Czerwona flaga",
+                        YES_NO_OPTIONS
+                    )
+                    
+                    classified_drivers = st.radio(
+                        "Liczba sklasyfikowanych kierowców",
+                        CLASSIFIED_DRIVERS_OPTIONS
+                    )
+                    
+                    teams_with_points = st.select_slider(
+                        "Liczba zespołów z punktami",
+                        options=TEAMS_WITH_POINTS_OPTIONS
+                    )
+                    
+                    # Odpowiedzi na pytania dodatkowe
+                    extra_answers = {}
+                    if race_questions:
+                        st.subheader("Odpowiedzi na pytania dodatkowe")
+                        
+                        for i, question in enumerate(race_questions):
+                            question_key = extra_answer_key(question, i + 1)
+                            extra_answers[question_key] = st.radio(
+                                question['question'],
+                                options=question['options'],
+                                key=f"result_q_{question['id']}"
                             )
+                    
+                    submit_results = st.form_submit_button("Zapisz wyniki")
+                    
+                    if submit_results:
+                        try:
+                            results_data = {
+                                "race_id": selected_race_id,
+                                "podium_1": podium_1,
+                                "podium_2": podium_2,
+                                "podium_3": podium_3,
+                                "time_diff": time_diff,
+                                "driver_of_day": dotd,
+                                "safety_car": safety_car == "Tak",
+                                "red_flag": red_flag == "Tak",
+                                "classified_drivers": classified_drivers,
+                                "teams_with_points": teams_with_points,
+                                "extra_answers": extra_answers
+                            }
                             
-                            teams_with_points = st.select_slider(
-                                "Liczba zespołów z punktami",
-                                options=[5, 6, 7, 8, 9, 10, 11]
-                            )
+                            response_data = repo.insert_results(results_data)
                             
-                            # Odpowiedzi na pytania dodatkowe
-                            extra_answers = {}
-                            if race_questions:
-                                st.subheader("Odpowiedzi na pytania dodatkowe")
+                            if len(response_data) > 0:
+                                st.success(f"Wyniki dla wyścigu {race_options[selected_race_index]} zostały zapisane")
                                 
-                                for i, question in enumerate(race_questions):
-                                    question_key = f"Pytanie dodatkowe {i+1}"
-                                    extra_answers[question_key] = st.radio(
-                                        question['question'],
-                                        options=question['options'],
-                                        key=f"result_q_{question['id']}"
-                                    )
-                            
-                            submit_results = st.form_submit_button("Zapisz wyniki")
-                            
-                            if submit_results:
-                                try:
-                                    results_data = {
-                                        "race_id": selected_race_id,
-                                        "podium_1": podium_1,
-                                        "podium_2": podium_2,
-                                        "podium_3": podium_3,
-                                        "time_diff": time_diff,
-                                        "driver_of_day": dotd,
-                                        "safety_car": safety_car == "Tak",
-                                        "red_flag": red_flag == "Tak",
-                                        "classified_drivers": classified_drivers,
-                                        "teams_with_points": teams_with_points,
-                                        "extra_answers": extra_answers
-                                    }
-                                    
-                                    response = supabase.table('results').insert(results_data).execute()
-                                    
-                                    if len(response.data) > 0:
-                                        st.success(f"Wyniki dla wyścigu {race_options[selected_race_index]} zostały zapisane")
-                                        
-                                        # Automatyczne obliczanie punktów
-                                        # if st.button("Oblicz punkty użytkowników na podstawie dodanych wyników"):
-                                        #     st.info("Funkcja w przygotowaniu...")
-                                            
-                                        st.rerun()
-                                    else:
-                                        st.error("Nie udało się zapisać wyników")
-                                except Exception as e:
-                                    st.error(f"Błąd podczas zapisywania wyników: {e}")
-                else:
-                    st.info("Brak wyścigów. Najpierw dodaj wyścig w zakładce 'Wyścigi'.")
+                                # Automatyczne obliczanie punktów
+                                # if st.button("Oblicz punkty użytkowników na podstawie dodanych wyników"):
+                                #     st.info("Funkcja w przygotowaniu...")
 
-        # Zakładka ze statystykami
-        with admin_tabs[4]:
-            st.subheader("Statystyki i odpowiedzi użytkowników")
+                                results_saved()
+                                st.rerun()
+                            else:
+                                st.error("Nie udało się zapisać wyników")
+                        except Exception as e:
+                            st.error(f"Błąd podczas zapisywania wyników: {e}")
+        else:
+            st.info("Brak wyścigów. Najpierw dodaj wyścig w zakładce 'Wyścigi'.")
+
+
+# Zakładka ze statystykami
+@st.fragment
+def render_admin_stats():
+    st.subheader("Statystyki i odpowiedzi użytkowników")
+    
+    if not supabase_connected:
+        st.error("Brak połączenia z bazą danych. Wyświetlanie statystyk wymaga połączenia z Supabase.")
+    else:
+        # Wybór wyścigu do analizy
+        races = get_all_races()
+        
+        if races:
+            race_options = [f"{race['race_name']} ({race['race_date']})" for race in races]
+            race_ids = [race['id'] for race in races]
             
-            if not supabase_connected:
-                st.error("Brak połączenia z bazą danych. Wyświetlanie statystyk wymaga połączenia z Supabase.")
-            else:
-                # Wybór wyścigu do analizy
-                races = get_all_races()
+            selected_race_index = st.selectbox(
+                "Wybierz wyścig do analizy", 
+                range(len(races)), 
+                format_func=lambda x: race_options[x],
+                key="stats_race_select"
+            )
+            
+            selected_race_id = race_ids[selected_race_index]
+            
+            # Odpowiedzi użytkowników, wyniki, pytania dodatkowe i rozkład typowań (zapytania równoległe)
+            stats_data = repo.fetch_parallel(
+                submissions=lambda: repo.get_race_submissions(selected_race_id),
+                results=lambda: repo.get_race_results(selected_race_id),
+                questions=lambda: repo.get_race_questions(selected_race_id),
+                value_counts=lambda: fetch_field_value_counts(selected_race_id),
+            )
+            submissions = stats_data['submissions']
+            
+            if submissions:
+                st.write(f"Liczba odpowiedzi: **{len(submissions)}**")
                 
-                if races:
-                    race_options = [f"{race['race_name']} ({race['race_date']})" for race in races]
-                    race_ids = [race['id'] for race in races]
+                race_results = stats_data['results']
+                
+                if race_results:
+                    result = race_results[0]
                     
-                    selected_race_index = st.selectbox(
-                        "Wybierz wyścig do analizy", 
-                        range(len(races)), 
-                        format_func=lambda x: race_options[x],
-                        key="stats_race_select"
-                    )
+                    # Obliczanie punktów użytkowników
+                    st.subheader("Tabela wyników")
+
+                    user_points = []
+
+                    for submission in submissions:
+                        points, details = score_submission(
+                            submission, result, SCORING_RULESETS[ACTIVE_RULESET_VERSION]
+                        )
+                        point_details = format_point_details(details)
+
+                        user_points.append({
+                            "user_name": submission['user_name'],
+                            "points": points,
+                            "point_details": point_details,
+                            "submission_date": submission['submission_date']
+                        })
                     
-                    selected_race_id = race_ids[selected_race_index]
+                    # Tabela z punktami
+                    points_df = pd.DataFrame(user_points)
+                    points_df = points_df.sort_values('points', ascending=False)
                     
-                    # Pobranie odpowiedzi użytkowników
-                    submissions_response = supabase.table('submissions').select('*').eq('race_id', selected_race_id).execute()
-                    submissions = submissions_response.data
+                    # Dodaj pozycję (miejsce)
+                    points_df['pozycja'] = points_df['points'].rank(method='min', ascending=False).astype(int)
+                    points_df = points_df[['pozycja', 'user_name', 'points', 'point_details', 'submission_date']]
+                    points_df.columns = ['Pozycja', 'Imię', 'Punkty', 'Szczegóły punktacji', 'Data wysłania']
                     
-                    if submissions:
-                        st.write(f"Liczba odpowiedzi: **{len(submissions)}**")
-                        
-                        # Pobranie wyników wyścigu
-                        results_response = supabase.table('results').select('*').eq('race_id', selected_race_id).execute()
-                        race_results = results_response.data
+                    st.dataframe(points_df)
+                    
+                    # Wykres z rozkładem punktów
+                    st.subheader("Rozkład punktów")
+                    
+                    points_counts = points_df['Punkty'].value_counts().sort_index()
+                    st.bar_chart(points_counts)
+                    
+                    # Statystyki typowań
+                    st.subheader("Statystyki typowań")
+                    
+                    field_counts = load_field_counts(stats_data['value_counts'], submissions)
+                    stats_tabs = st.tabs(["Podium", "Inne statystyki", "Pytania dodatkowe"])
+                    
+                    with stats_tabs[0]:
+                        # Podium statystyki
+                        col1, col2, col3 = st.columns(3)
                         
-                        if race_results:
-                            result = race_results[0]
+                        with col1:
+                            st.write("#### 1. miejsce")
+                            p1_counts = field_counts['podium_1']
                             
-                            # Obliczanie punktów użytkowników
-                            st.subheader("Tabela wyników")
-
-                            user_points = []
-
-                            for submission in submissions:
-                                points = calculate_points(submission, result)
-
-                                detail_labels = {
-                                    'podium_1': "1. miejsce", 'podium_2': "2. miejsce", 'podium_3': "3. miejsce",
-                                    'time_diff': "różnica czasowa", 'driver_of_day': "DOTD",
-                                    'safety_car': "Safety Car", 'red_flag': "czerwona flaga",
-                                    'classified_drivers': "liczba kierowców", 'teams_with_points': "zespoły z punktami"
-                                }
-                                point_details = [
-                                    f"1 pkt za {label}"
-                                    for field, label in detail_labels.items()
-                                    if submission[field] == result[field]
-                                ]
-                                podium_hits = sum(1 for pos in ['podium_1', 'podium_2', 'podium_3'] if submission[pos] == result[pos])
-                                if podium_hits == 3:
-                                    point_details.append("1 pkt bonus za pełne podium")
-                                for key, value in submission.get('extra_answers', {}).items():
-                                    if key in result.get('extra_answers', {}) and value == result['extra_answers'][key]:
-                                        point_details.append(f"1 pkt za {key}")
-
-                                user_points.append({
-                                    "user_name": submission['user_name'],
-                                    "points": points,
-                                    "point_details": ", ".join(point_details),
-                                    "submission_date": submission['submission_date']
-                                })
+                            p1_df = pd.DataFrame(list(p1_counts.items()), columns=['Kierowca', 'Liczba typowań'])
+                            p1_df = p1_df.sort_values('Liczba typowań', ascending=False)
                             
-                            # Tabela z punktami
-                            points_df = pd.DataFrame(user_points)
-                            points_df = points_df.sort_values('points', ascending=False)
+                            # Dodaj zaznaczenie dla faktycznego zwycięzcy
+                            p1_df['Faktyczny zwycięzca'] = p1_df['Kierowca'] == result['podium_1']
                             
-                            # Dodaj pozycję (miejsce)
-                            points_df['pozycja'] = points_df['points'].rank(method='min', ascending=False).astype(int)
-                            points_df = points_df[['pozycja', 'user_name', 'points', 'point_details', 'submission_date']]
-                            points_df.columns = ['Pozycja', 'Imię', 'Punkty', 'Szczegóły punktacji', 'Data wysłania']
+                            st.dataframe(p1_df)
+                        
+                        with col2:
+                            st.write("#### 2. miejsce")
+                            p2_counts = field_counts['podium_2']
                             
-                            st.dataframe(points_df)
+                            p2_df = pd.DataFrame(list(p2_counts.items()), columns=['Kierowca', 'Liczba typowań'])
+                            p2_df = p2_df.sort_values('Liczba typowań', ascending=False)
                             
-                            # Wykres z rozkładem punktów
-                            st.subheader("Rozkład punktów")
+                            # Dodaj zaznaczenie dla faktycznego zwycięzcy
+                            p2_df['Faktyczny wynik'] = p2_df['Kierowca'] == result['podium_2']
                             
-                            points_counts = points_df['Punkty'].value_counts().sort_index()
-                            st.bar_chart(points_counts)
+                            st.dataframe(p2_df)
+                        
+                        with col3:
+                            st.write("#### 3. miejsce")
+                            p3_counts = field_counts['podium_3']
                             
-                            # Statystyki typowań
-                            st.subheader("Statystyki typowań")
+                            p3_df = pd.DataFrame(list(p3_counts.items()), columns=['Kierowca', 'Liczba typowań'])
+                            p3_df = p3_df.sort_values('Liczba typowań', ascending=False)
                             
-                            stats_tabs = st.tabs(["Podium", "Inne statystyki"])
+                            # Dodaj zaznaczenie dla faktycznego zwycięzcy
+                            p3_df['Faktyczny wynik'] = p3_df['Kierowca'] == result['podium_3']
                             
-                            with stats_tabs[0]:
-                                # Podium statystyki
-                                col1, col2, col3 = st.columns(3)
-                                
-                                with col1:
-                                    st.write("#### 1. miejsce")
-                                    p1_counts = {}
-                                    for sub in submissions:
-                                        driver = sub['podium_1']
-                                        p1_counts[driver] = p1_counts.get(driver, 0) + 1
-                                    
-                                    p1_df = pd.DataFrame(list(p1_counts.items()), columns=['Kierowca', 'Liczba typowań'])
-                                    p1_df = p1_df.sort_values('Liczba typowań', ascending=False)
-                                    
-                                    # Dodaj zaznaczenie dla faktycznego zwycięzcy
-                                    p1_df['Faktyczny zwycięzca'] = p1_df['Kierowca'] == result['podium_1']
-                                    
-                                    st.dataframe(p1_df)
-                                
-                                with col2:
-                                    st.write("#### 2. miejsce")
-                                    p2_counts = {}
-                                    for sub in submissions:
-                                        driver = sub['podium_2']
-                                        p2_counts[driver] = p2_counts.get(driver, 0) + 1
-                                    
-                                    p2_df = pd.DataFrame(list(p2_counts.items()), columns=['Kierowca', 'Liczba typowań'])
-                                    p2_df = p2_df.sort_values('Liczba typowań', ascending=False)
-                                    
-                                    # Dodaj zaznaczenie dla faktycznego zwycięzcy
-                                    p2_df['Faktyczny wynik'] = p2_df['Kierowca'] == result['podium_2']
-                                    
-                                    st.dataframe(p2_df)
-                                
-                                with col3:
-                                    st.write("#### 3. miejsce")
-                                    p3_counts = {}
-                                    for sub in submissions:
-                                        driver = sub['podium_3']
-                                        p3_counts[driver] = p3_counts.get(driver, 0) + 1
-                                    
-                                    p3_df = pd.DataFrame(list(p3_counts.items()), columns=['Kierowca', 'Liczba typowań'])
-                                    p3_df = p3_df.sort_values('Liczba typowań', ascending=False)
-                                    
-                                    # Dodaj zaznaczenie dla faktycznego zwycięzcy
-                                    p3_df['Faktyczny wynik'] = p3_df['Kierowca'] == result['podium_3']
-                                    
-                                    st.dataframe(p3_df)
+                            st.dataframe(p3_df)
+                    
+                    with stats_tabs[1]:
+                        # Inne statystyki
+                        col1, col2 = st.columns(2)
+                        
+                        with col1:
+                            st.write("#### Różnica czasowa")
+                            time_counts = field_counts['time_diff']
                             
-                            with stats_tabs[1]:
-                                # Inne statystyki
-                                col1, col2 = st.columns(2)
-                                
-                                with col1:
-                                    st.write("#### Różnica czasowa")
-                                    time_counts = {}
-                                    for sub in submissions:
-                                        time = sub['time_diff']
-                                        time_counts[time] = time_counts.get(time, 0) + 1
-                                    
-                                    time_df = pd.DataFrame(list(time_counts.items()), columns=['Przedział', 'Liczba typowań'])
-                                    time_df = time_df.sort_values('Liczba typowań', ascending=False)
-                                    
-                                    # Dodaj zaznaczenie dla faktycznego wyniku
-                                    time_df['Faktyczny wynik'] = time_df['Przedział'] == result['time_diff']
-                                    
-                                    st.dataframe(time_df)
-                                
-                                with col2:
-                                    st.write("#### Safety Car")
-                                    sc_counts = {"Tak": 0, "Nie": 0}
-                                    for sub in submissions:
-                                        if sub['safety_car']:
-                                            sc_counts["Tak"] += 1
-                                        else:
-                                            sc_counts["Nie"] += 1
-                                    
-                                    sc_df = pd.DataFrame(list(sc_counts.items()), columns=['Opcja', 'Liczba typowań'])
-                                    
-                                    # Dodaj zaznaczenie dla faktycznego wyniku
-                                    sc_df['Faktyczny wynik'] = sc_df['Opcja'] == ("Tak" if result['safety_car'] else "Nie")
-                                    
-                                    st.dataframe(sc_df)
-                                    
-                                    # Pokaż wyniki w postaci wykresu kołowego
-                                    st.write("Rozkład typowań (Safety Car):")
-                                    fig, ax = plt.subplots()
-                                    ax.pie(sc_df['Liczba typowań'], labels=sc_df['Opcja'], autopct='%1.1f%%')
-                                    st.pyplot(fig)
+                            time_df = pd.DataFrame(list(time_counts.items()), columns=['Przedział', 'Liczba typowań'])
+                            time_df = time_df.sort_values('Liczba typowań', ascending=False)
                             
-                            # Możliwość eksportu danych
-                            st.subheader("Eksport danych")
+                            # Dodaj zaznaczenie dla faktycznego wyniku
+                            time_df['Faktyczny wynik'] = time_df['Przedział'] == result['time_diff']
                             
-                            col1, col2 = st.columns(2)
+                            st.dataframe(time_df)
+                        
+                        with col2:
+                            st.write("#### Safety Car")
+                            sc_counts = {"Tak": 0, "Nie": 0}
+                            for sub in submissions:
+                                if sub['safety_car']:
+                                    sc_counts["Tak"] += 1
+                                else:
+                                    sc_counts["Nie"] += 1
                             
-                            with col1:
-                                if st.button("Eksportuj tabelę wyników do CSV"):
-                                    csv = points_df.to_csv(index=False)
-                                    st.download_button(
-                                        label="Pobierz plik CSV z wynikami",
-                                        data=csv,
-                                        file_name=f"wyniki_{race_options[selected_race_index].replace(' ', '_')}.csv",
-                                        mime="text/csv"
-                                    )
+                            sc_df = pd.DataFrame(list(sc_counts.items()), columns=['Opcja', 'Liczba typowań'])
                             
-                            with col2:
-                                if st.button("Eksportuj wszystkie odpowiedzi do CSV"):
-                                    subs_df = pd.DataFrame(submissions)
-                                    # Uproszczenie danych JSON do eksportu
-                                    subs_df['extra_answers'] = subs_df['extra_answers'].apply(lambda x: str(x))
-                                    csv = subs_df.to_csv(index=False)
-                                    st.download_button(
-                                        label="Pobierz plik CSV z odpowiedziami",
-                                        data=csv,
-                                        file_name=f"odpowiedzi_{race_options[selected_race_index].replace(' ', '_')}.csv",
-                                        mime="text/csv"
-                                    )
-                        else:
-                            st.warning(f"Brak wprowadzonych wyników dla wyścigu {race_options[selected_race_index]}. Najpierw wprowadź wyniki w zakładce 'Wyniki'.")
-                    else:
-                        st.info(f"Brak odpowiedzi dla wyścigu {race_options[selected_race_index]}.")
+                            # Dodaj zaznaczenie dla faktycznego wyniku
+                            sc_df['Faktyczny wynik'] = sc_df['Opcja'] == ("Tak" if result['safety_car'] else "Nie")
+                            
+                            st.dataframe(sc_df)
+                            
+                            # Pokaż wyniki w postaci wykresu kołowego
+                            st.write("Rozkład typowań (Safety Car):")
+                            fig, ax = plt.subplots()
+                            ax.pie(sc_df['Liczba typowań'], labels=sc_df['Opcja'], autopct='%1.1f%%')
+                            st.pyplot(fig)
+                            # pyplot trzyma każdą figurę do zamknięcia - bez tego proces rośnie z każdym przebiegiem
+                            plt.close(fig)
+
+                    with stats_tabs[2]:
+                        # Rozkład odpowiedzi liczony w bazie (submission_answer_counts),
+                        # a gdy widok jest niedostępny - z extra_answers typów
+                        race_questions = stats_data['questions']
+                        question_ids = [q['id'] for q in race_questions]
+                        try:
+                            answer_counts = repo.get_answer_counts(question_ids) if question_ids else []
+                        except Exception:
+                            answer_counts = answer_counts_from_submissions(submissions, question_ids)
+
+                        if not race_questions:
+                            st.info("Brak pytań dodatkowych dla tego wyścigu.")
+
+                        correct_answers = result.get('extra_answers') or {}
+                        for question in race_questions:
+                            st.write(f"#### {question['question']}")
+                            question_df = pd.DataFrame(
+                                [(c['answer'], c['submissions']) for c in answer_counts if c['question_id'] == question['id']],
+                                columns=['Odpowiedź', 'Liczba typowań']
+                            ).sort_values('Liczba typowań', ascending=False)
+                            question_df['Faktyczny wynik'] = question_df['Odpowiedź'] == correct_answers.get(str(question['id']))
+                            hits = int(question_df.loc[question_df['Faktyczny wynik'], 'Liczba typowań'].sum())
+                            st.write(f"Trafienia: **{hits}/{int(question_df['Liczba typowań'].sum())}**")
+                            st.dataframe(question_df, hide_index=True)
+                    
+                    # Konsensus grupy i entropia typowań
+                    st.subheader("Mądrość tłumu")
+                    race_crowd_stats = get_crowd_stats(get_results_version()).get(selected_race_id)
+                    if race_crowd_stats and race_crowd_stats['entropy']:
+                        consensus = race_crowd_stats['consensus']
+                        st.write(
+                            f"Podium konsensusu: **{consensus.get('podium_1')}**, "
+                            f"**{consensus.get('podium_2')}**, **{consensus.get('podium_3')}**"
+                        )
+                        crowd_df = pd.DataFrame({
+                            'Pole': list(race_crowd_stats['entropy'].keys()),
+                            'Typ konsensusu': [consensus.get(f) for f in race_crowd_stats['entropy']],
+                            'Faktyczny wynik': [str(result.get(f)) for f in race_crowd_stats['entropy']],
+                            'Entropia (bity)': list(race_crowd_stats['entropy'].values())
+                        })
+                        st.dataframe(crowd_df)
+                        st.write("Trafienia wbrew większości w tym wyścigu:")
+                        st.dataframe(contrarian_scores([race_crowd_stats]))
+
+                    # Możliwość eksportu danych
+                    st.subheader("Eksport danych")
+                    
+                    col1, col2 = st.columns(2)
+                    
+                    with col1:
+                        if st.button("Eksportuj tabelę wyników do CSV"):
+                            csv = points_df.to_csv(index=False)
+                            st.download_button(
+                                label="Pobierz plik CSV z wynikami",
+                                data=csv,
+                                file_name=f"wyniki_{race_options[selected_race_index].replace(' ', '_')}.csv",
+                                mime="text/csv"
+                            )
+                    
+                    with col2:
+                        if st.button("Eksportuj wszystkie odpowiedzi do CSV"):
+                            subs_df = pd.DataFrame(submissions)
+                            # Uproszczenie danych JSON do eksportu
+                            subs_df['extra_answers'] = subs_df['extra_answers'].apply(lambda x: str(x))
+                            csv = subs_df.to_csv(index=False)
+                            st.download_button(
+                                label="Pobierz plik CSV z odpowiedziami",
+                                data=csv,
+                                file_name=f"odpowiedzi_{race_options[selected_race_index].replace(' ', '_')}.csv",
+                                mime="text/csv"
+                            )
+                else:
+                    st.warning(f"Brak wprowadzonych wyników dla wyścigu {race_options[selected_race_index]}. Najpierw wprowadź wyniki w zakładce 'Wyniki'.")
+            else:
+                st.info(f"Brak odpowiedzi dla wyścigu {race_options[selected_race_index]}.")
+        else:
+            st.info("Brak wyścigów. Najpierw dodaj wyścig w zakładce 'Wyścigi'.")
+
+
+# Zakładka z symulacją sezonu
+@st.fragment
+def render_admin_simulation():
+    st.subheader("Symulacja sezonu (Monte Carlo)")
+
+    if not supabase_connected:
+        st.error("Brak połączenia z bazą danych. Symulacja wymaga połączenia z Supabase.")
+    else:
+        st.write("Wyniki kolejnych wyścigów są losowane na podstawie rozkładów typowań z poprzednich wyścigów.")
+        sim_races = st.number_input("Liczba pozostałych wyścigów", min_value=1, max_value=30, value=5)
+        sim_count = st.select_slider("Liczba symulacji", options=[1_000, 10_000, 100_000], value=10_000)
+
+        if st.button("Uruchom symulację"):
+            try:
+                with st.spinner("Symulowanie sezonu..."):
+                    sim_df = run_season_simulation(get_results_version(), get_hot_season(), int(sim_races), int(sim_count))
+                if sim_df is None:
+                    st.info("Brak wyścigów z wprowadzonymi wynikami.")
                 else:
-                    st.info("Brak wyścigów. Najpierw dodaj wyścig w zakładce 'Wyścigi'.")
+                    st.write("Prawdopodobieństwo zajęcia poszczególnych miejsc na koniec sezonu:")
+                    st.dataframe(sim_df)
+            except Exception as e:
+                st.error(f"Błąd podczas symulacji: {e}")
+
+
+# Zakładka z wersjami zasad punktacji
+@st.fragment
+def render_admin_scoring():
+    st.subheader("Wersje zasad punktacji")
+
+    versions_df = pd.DataFrame([
+        {
+            "Wersja": version,
+            "Nazwa": ruleset["name"],
+            "Max. z pytań stałych": max_fixed_points(ruleset),
+            "Aktywna": version == ACTIVE_RULESET_VERSION
+        }
+        for version, ruleset in SCORING_RULESETS.items()
+    ])
+    st.dataframe(versions_df, hide_index=True)
+
+    if not supabase_connected:
+        st.error("Brak połączenia z bazą danych. Przeliczanie punktów wymaga połączenia z Supabase.")
+    else:
+        rescore_version = st.selectbox(
+            "Wersja zasad do przeliczenia",
+            list(SCORING_RULESETS),
+            format_func=lambda v: f"{v} - {SCORING_RULESETS[v]['name']}",
+            key="rescore_version_select"
+        )
+        with st.expander("Zasady wybranej wersji"):
+            st.markdown(rules_markdown(SCORING_RULESETS[rescore_version]))
+
+        if st.button("Przelicz całą historię"):
+            try:
+                rescored = rescore_history(rescore_version)
+                st.success(f"Przeliczono {rescored} typów według zasad w wersji {rescore_version}")
+            except Exception as e:
+                st.error(f"Błąd podczas przeliczania punktów: {e}")
+
+        st.subheader("Porównanie klasyfikacji")
+        try:
+            stored_totals = load_scoring_totals()
+        except Exception as e:
+            stored_totals = []
+            st.error(f"Błąd podczas pobierania zapisanych sum punktów: {e}")
+
+        if stored_totals:
+            totals_df = pd.DataFrame(stored_totals)
+            comparison_df = totals_df.pivot_table(
+                index='user_name', columns='ruleset_version', values='points', aggfunc='last'
+            )
+            for version in comparison_df.columns:
+                comparison_df[f"Pozycja (w. {version})"] = comparison_df[version].rank(method='min', ascending=False)
+            comparison_df = comparison_df.rename(columns={v: f"Punkty (w. {v})" for v in SCORING_RULESETS})
+            comparison_df.index.name = 'Imię'
+            st.dataframe(comparison_df)
+
+            current_version = get_results_version()
+            outdated = sorted(totals_df.loc[totals_df['results_version'] != current_version, 'ruleset_version'].unique())
+            if outdated:
+                st.warning(f"Wyniki zmieniły się od ostatniego przeliczenia wersji: {', '.join(map(str, outdated))}")
+        else:
+            st.info("Brak zapisanych przeliczeń. Wybierz wersję zasad i przelicz historię.")
+
+        render_season_archive()
+
+# Archiwum sezonów: zamrożenie zakończonego sezonu w plikach Parquet (f1_core.archive)
+def render_season_archive():
+    st.subheader("Archiwum sezonów")
+    archives = list_archives(ARCHIVE_DIR)
+    if archives:
+        st.dataframe(pd.DataFrame([
+            {
+                "Sezon": season,
+                "Wyścigi": manifest["races"],
+                "Typy": manifest["submissions"],
+                "Typujący": manifest["users"],
+                "Wersja zasad": manifest["ruleset_version"],
+                "Rozmiar (kB)": round(manifest["bytes"] / 1024, 1),
+                "Zarchiwizowano": datetime.fromtimestamp(manifest["created_at"]).strftime('%d.%m.%Y %H:%M'),
+            }
+            for season, manifest in archives.items()
+        ]), hide_index=True)
+
+    races = get_all_races()
+    current = get_hot_season()
+    finished = sorted({season_of(r) for r in races} - {None, current} - set(archives), reverse=True)
+    if not finished:
+        st.info("Brak zakończonych sezonów do zarchiwizowania.")
+        return
+    season = st.selectbox("Zakończony sezon", finished, key="archive_season_select")
+    if st.button("Zarchiwizuj sezon"):
+        try:
+            manifest = archive_season(repo, season, ARCHIVE_DIR)
+            load_all_time_standings.clear()
+            st.success(f"Zarchiwizowano sezon {season}: {manifest['races']} wyścigów, {manifest['submissions']} typów")
+        except Exception as e:
+            st.error(f"Błąd podczas archiwizacji sezonu: {e}")
+
+# Klasyfikacja bieżącego sezonu odtworzona z dziennika zmian na chwilę at (czas UTC w formacie ISO)
+@cached(ttl=60)
+def replay_standings(at):
+    races = {r['id']: r for r in repo.get_all_races()}
+    state = rebuild_state(repo, at=at)
+    leaderboard = state.leaderboard(races, season=hot_season(races.values(), state.results))
+    return {
+        "table": leaderboard["table"] if leaderboard is not None else None,
+        "snapshot_at": state.snapshot_at,
+        "events": state.events_applied,
+        "rescored": state.rescored,
+    }
+
+# Wybór chwili w zakładce historii (czas lokalny, do końca wybranej minuty) jako czas UTC w formacie ISO
+def history_moment(label, default, key):
+    col1, col2 = st.columns(2)
+    day = col1.date_input(label, value=default.date(), key=f"{key}_date")
+    moment = col2.time_input("Godzina", value=default.time().replace(second=0, microsecond=0), key=f"{key}_time")
+    return format_time(datetime.combine(day, moment) + timedelta(seconds=59))
+
+# Zakładka historii: klasyfikacja z dowolnej chwili odtworzona z dziennika zmian (f1_core.events),
+# zmiana punktów i pozycji między dwiema chwilami oraz zdarzenia z tego okresu
+@st.fragment
+def render_admin_history():
+    st.subheader("Dziennik zmian")
+    if not supabase_connected:
+        st.error("Brak połączenia z bazą danych. Historia zmian wymaga połączenia z Supabase.")
+        return
+
+    try:
+        snapshots = repo.list_event_snapshots()
+    except Exception as e:
+        st.error(f"Błąd podczas pobierania migawek (czy wykonano sql/010_change_events.sql?): {e}")
+        return
+    if snapshots:
+        st.caption(f"Migawki: {len(snapshots)}, najnowsza z {snapshots[0]['occurred_at']}")
+    else:
+        st.info("Brak migawek. Jeśli typy lub wyniki były zapisane przed włączeniem dziennika, utwórz migawkę bazową.")
+    if st.button("Migawka bazowa z bieżących tabel"):
+        try:
+            snapshot = baseline_snapshot(repo)
+            replay_standings.clear()
+            st.success(f"Zapisano migawkę: {snapshot['submissions']} typów, {snapshot['results']} wyników")
+        except Exception as e:
+            st.error(f"Błąd podczas zapisywania migawki: {e}")
+
+    now = app_now()
+    at = history_moment("Klasyfikacja na dzień", now, "history_at")
+    since = history_moment("W porównaniu z dniem", now - timedelta(days=7), "history_since")
+    try:
+        after = replay_standings(at)
+        before = replay_standings(since)
+        events = repo.fetch_events(after=min(since, at), until=max(since, at))
+    except Exception as e:
+        st.error(f"Błąd podczas odtwarzania klasyfikacji: {e}")
+        return
+
+    st.caption(
+        f"Odtworzono z migawki {after['snapshot_at'] or '(brak - od początku dziennika)'} "
+        f"i {after['events']} zdarzeń; przeliczono {after['rescored']} typów"
+    )
+    if after["table"] is None and before["table"] is None:
+        st.info("Brak rozliczonych typów w wybranym okresie.")
+    else:
+        st.dataframe(standings_diff(before["table"], after["table"]), hide_index=True)
+
+    if events:
+        st.write(f"Zmiany w wybranym okresie: {len(events)}")
+        st.dataframe(pd.DataFrame([
+            {
+                "Czas": event['occurred_at'],
+                "Dane": "Typ" if event['entity'] == 'submission' else "Wyniki",
+                "Zmiana": "Usunięcie" if event['action'] == 'delete' else "Zapis",
+                "Wyścig": event['race_id'],
+                "Użytkownik": event.get('user_name') or "",
+            }
+            for event in reversed(events)
+        ]), hide_index=True)
+
+# Zakładka pamięci procesu: budżet cache (f1_core.memory) i raporty wycieków z tracemalloc
+@st.fragment
+def render_admin_memory():
+    st.subheader("Pamięć procesu")
+    stats = cache_budget.stats()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("RSS procesu", f"{rss_bytes() / 2**20:.1f} MB")
+    col2.metric("Cache", f"{stats['used_bytes'] / 2**20:.1f} / {stats['max_bytes'] / 2**20:.0f} MB")
+    requests_total = stats['hits'] + stats['misses']
+    col3.metric("Trafienia cache", f"{100 * stats['hits'] / requests_total:.0f}%" if requests_total else "-")
+    st.caption(f"Wpisy: {stats['entries']}, usunięte po przekroczeniu budżetu: {stats['evictions']}")
+    if stats['by_cache']:
+        st.dataframe(pd.DataFrame([
+            {"Cache": name, "Wpisy": row['entries'], "Rozmiar (kB)": round(row['bytes'] / 1024, 1)}
+            for name, row in stats['by_cache'].items()
+        ]), hide_index=True)
+    if st.button("Wyczyść cache danych"):
+        cache_budget.clear()
+        st.rerun()
+
+    st.subheader("Wspólny cache replik")
+    tier = shared_cache.tier
+    if tier is None:
+        st.info("Wyłączony - każda replika liczy dane sama. Ustaw F1_SHARED_CACHE (sqlite:///ścieżka albo redis://...).")
+    else:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Trafienia", tier.stats["hits"])
+        col2.metric("Braki", tier.stats["misses"])
+        col3.metric("Policzone tutaj", tier.stats["computed"])
+        col4.metric("Oczekiwania na inną replikę", tier.stats["waited"])
+        if tier.last_error is not None:
+            st.warning(f"Ostatni błąd wspólnego cache: {tier.last_error}")
+
+    st.subheader("Wykrywanie wycieków")
+    st.write(
+        "Śledzenie alokacji (tracemalloc) spowalnia aplikację, dlatego jest domyślnie wyłączone. "
+        f"Włączone zapisuje raport co {leak_monitor.interval:.0f} s: wzrost pamięci od momentu włączenia według miejsc w kodzie."
+    )
+    col1, col2 = st.columns(2)
+    if leak_monitor.running:
+        if col1.button("Zatrzymaj śledzenie"):
+            leak_monitor.stop()
+            st.rerun()
+        if col2.button("Raport teraz"):
+            leak_monitor.report()
+    elif col1.button("Włącz śledzenie"):
+        leak_monitor.start()
+        st.rerun()
+
+    reports = list(leak_monitor.reports)
+    if not reports:
+        st.info("Brak raportów.")
+        return
+    history_df = pd.DataFrame([
+        {
+            "Czas": datetime.fromtimestamp(report['at']),
+            "RSS (MB)": report['rss_bytes'] / 2**20,
+            "Śledzone (MB)": (report['traced_bytes'] or 0) / 2**20,
+            "Cache (MB)": report['cache']['used_bytes'] / 2**20,
+        }
+        for report in reports
+    ])
+    st.line_chart(history_df.set_index("Czas"))
+    latest = reports[-1]
+    if latest['top_growth']:
+        st.write("Największy wzrost od włączenia śledzenia:")
+        st.dataframe(pd.DataFrame([
+            {
+                "Miejsce": row['location'],
+                "Wzrost (kB)": round(row['size_diff'] / 1024, 1),
+                "Nowe obiekty": row['count_diff'],
+                "Razem (kB)": round(row['size'] / 1024, 1),
+            }
+            for row in latest['top_growth']
+        ]), hide_index=True)
+
+
+# Panel administratora (gdy zalogowany)
+if st.session_state.show_admin:
+    with st.sidebar:
+        st.header("Panel Administratora")
+        
+        # Przycisk wylogowania na górze panelu
+        col1, col2 = st.columns([4, 1])
+        with col2:
+            if st.button("Wyloguj", key="logout_button"):
+                logout_admin()
+        
+        # Zakładki panelu administratora
+        admin_tabs = st.tabs(["Ustawienia", "Wyścigi", "Pytania", "Wyniki", "Statystyki", "Symulacja", "Punktacja", "Historia", "Pamięć"])
+        
+        with admin_tabs[0]:
+            render_admin_settings()
+        with admin_tabs[1]:
+            render_admin_races()
+        with admin_tabs[2]:
+            render_admin_questions()
+        with admin_tabs[3]:
+            render_admin_results()
+        with admin_tabs[4]:
+            render_admin_stats()
+        with admin_tabs[5]:
+            render_admin_simulation()
+        with admin_tabs[6]:
+            render_admin_scoring()
+        with admin_tabs[7]:
+            render_admin_history()
+        with admin_tabs[8]:
+            render_admin_memory()
 
 if active_races:
-    with st.expander("Aktualna klasyfikacja"):
+    with st.expander(leaderboard_title()):
         render_leaderboard()
+
+with st.expander("Klasyfikacja wszech czasów"):
+    render_all_time_leaderboard()
+
+# Profil typującego - domyślnie użytkownik wybrany w formularzu (jego historię wczytuje z wyprzedzeniem
+# prefetch_user_history). Fragment: wybór typującego przelicza tylko profil. Zwinięta sekcja niczego
+# nie liczy (on_change="rerun" i .open wymagają streamlit>=1.55).
+@st.fragment
+def render_profile_section():
+    form_user = st.session_state.get("form_user_name")
+    profile_user = st.selectbox(
+        "Wybierz typującego",
+        USER_NAMES,
+        index=USER_NAMES.index(form_user) if form_user in USER_NAMES else 0,
+        key="profile_user_select"
+    )
+    render_user_profile(profile_user)
+
+with st.expander("Profil typującego", key="profile_expander", on_change="rerun") as profile_expander:
+    if profile_expander.open:
+        render_profile_section()
 st.markdown("🏎️ F1 Ankietka by Piotr Antoniszyn © 2025")
+
+finish_leaderboard_refresh()
@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Porównanie klasyfikacji liczonej w bazie (widoki z sql/006) z obliczeniami w pandas na pełnej
+# historii typów: czas, liczba zapytań, liczba i rozmiar pobranych wierszy oraz zgodność wyników.
+# Bez --dump/--supabase dane są syntetyczne, a widoki liczy SQLite (f1_core/sqlite_views.py) raz na
+# wersję danych - jak Postgres po stronie serwera; ten koszt jest raportowany osobno (view_compute_ms).
+#
+#   uv run python benchmarks/aggregation_bench.py --users 100 --races 100 --latency 0.02
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from dataset import build_tables  # noqa: E402
+from f1_core import F1Repository  # noqa: E402
+from f1_core.aggregation import compute_leaderboard, leaderboard_from_race_points, leaderboards_match  # noqa: E402
+from f1_core.local_db import LocalStore, LocalSupabaseClient  # noqa: E402
+from f1_core.sqlite_views import view_rows  # noqa: E402
+
+
+# Licznik zapytań, wierszy i bajtów (JSON) odpowiedzi dla dowolnego klienta Supabase
+class Meter:
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.bytes = 0
+
+
+class MeteredQuery:
+    def __init__(self, query, meter):
+        self._query = query
+        self._meter = meter
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if name == 'execute':
+            def execute():
+                response = attr()
+                self._meter.calls += 1
+                self._meter.rows += len(response.data)
+                self._meter.bytes += len(json.dumps(response.data, default=str))
+                return response
+            return execute
+
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return MeteredQuery(result, self._meter) if hasattr(result, 'execute') else result
+        return chained
+
+
+class MeteredClient:
+    def __init__(self, client, meter):
+        self._client = client
+        self._meter = meter
+
+    def table(self, name):
+        return MeteredQuery(self._client.table(name), self._meter)
+
+
+def pandas_path(repo):
+    results_by_race, race_data_by_id, scored_subs = repo.fetch_results_history()
+    return compute_leaderboard(results_by_race, race_data_by_id, scored_subs)
+
+
+def database_path(repo):
+    return leaderboard_from_race_points(repo.get_user_race_points())
+
+
+def measure(client, path, repeat):
+    timings, meter = [], None
+    leaderboard = None
+    for _ in range(repeat):
+        meter = Meter()
+        repo = F1Repository(MeteredClient(client, meter))
+        started = time.perf_counter()
+        leaderboard = path(repo)
+        timings.append(time.perf_counter() - started)
+    return leaderboard, {
+        "time_ms_median": round(statistics.median(timings) * 1000, 1),
+        "queries": meter.calls,
+        "rows_fetched": meter.rows,
+        "payload_kib": round(meter.bytes / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Klasyfikacja: agregacja w bazie vs pandas")
+    parser.add_argument("--users", type=int, default=30)
+    parser.add_argument("--races", type=int, default=40)
+    parser.add_argument("--questions", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.0, help="opóźnienie każdego zapytania do lokalnej bazy [s]")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--dump", help="lokalny zrzut bazy (JSON) zamiast danych syntetycznych")
+    parser.add_argument("--supabase", action="store_true", help="pomiar na Supabase (secrets.toml / zmienne środowiskowe)")
+    parser.add_argument("--secrets", default=os.path.join(REPO_ROOT, ".streamlit", "secrets.toml"))
+    parser.add_argument("--json", action="store_true", help="raport w formacie JSON")
+    args = parser.parse_args()
+
+    store = None
+    if args.supabase:
+        from f1_cli import connect
+        args.dump = None
+        client = connect(args)[0].client
+    elif args.dump:
+        store = LocalStore.from_dump(args.dump, latency=args.latency)
+    else:
+        tables = build_tables(n_users=args.users, n_races=args.races, n_questions=args.questions, active_race=False)
+        store = LocalStore(tables, latency=args.latency)
+    if store is not None:
+        client = LocalSupabaseClient(store)
+
+    pandas_leaderboard, pandas_stats = measure(client, pandas_path, args.repeat)
+    db_leaderboard, db_stats = measure(client, database_path, args.repeat)
+    if store is not None:
+        started = time.perf_counter()
+        view_rows(store.tables, 'user_race_points')
+        db_stats["view_compute_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    report = {
+        "pandas": pandas_stats,
+        "database": db_stats,
+        "results_match": leaderboards_match(pandas_leaderboard, db_leaderboard),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for path_name in ("pandas", "database"):
+            print(f"{path_name}:")
+            for key, value in report[path_name].items():
+                print(f"{key:>18}: {value}")
+        print(f"results_match: {report['results_match']}")
+    sys.exit(0 if report["results_match"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Klasyfikacja po kilku sezonach: płaska klasyfikacja całej historii (stan sprzed archiwum) vs
+# klasyfikacja bieżącego sezonu i klasyfikacja wszech czasów z archiwum Parquet zakończonych sezonów.
+# Liczone są zapytania, pobrane wiersze typów i czas; wynik wszech czasów z archiwum jest porównywany
+# z wynikiem liczonym w całości z bazy.
+#
+#   uv run python benchmarks/archive_bench.py --seasons 5 --users 30 --latency 0.02
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from dataset import build_tables  # noqa: E402
+from f1_core import F1Repository  # noqa: E402
+from f1_core.aggregation import compute_leaderboard  # noqa: E402
+from f1_core.archive import all_time_standings, archive_season, list_archives, load_archive  # noqa: E402
+from f1_core.local_db import LocalStore, LocalSupabaseClient  # noqa: E402
+from f1_core.models import hot_season, season_of  # noqa: E402
+
+
+def measure(client, work):
+    calls_before = client.calls
+    started = time.perf_counter()
+    value, rows = work()
+    return value, {
+        "db_queries": client.calls - calls_before,
+        "submission_rows": rows,
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Klasyfikacja: cała historia vs bieżący sezon i archiwum")
+    parser.add_argument("--seasons", type=int, default=5)
+    parser.add_argument("--users", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.02, help="opóźnienie każdego zapytania do lokalnej bazy [s]")
+    parser.add_argument("--json", action="store_true", help="raport w formacie JSON")
+    args = parser.parse_args()
+
+    # Wyścigi w build_tables są co 14 dni od 1 marca 2025; ostatni sezon jest w połowie
+    n_races = int(((args.seasons - 1) * 365 + 180) / 14)
+    client = LocalSupabaseClient(LocalStore(build_tables(n_users=args.users, n_races=n_races), latency=args.latency))
+    repo = F1Repository(client)
+    races = repo.get_all_races()
+    current = hot_season(races, repo.get_scored_race_ids())
+    seasons = sorted({season_of(r) for r in races})
+    report = {"seasons": seasons, "races": len(races)}
+
+    def flat():
+        history = repo.fetch_results_history()
+        return compute_leaderboard(*history), len(history[2])
+
+    def hot():
+        history = repo.fetch_results_history(season=current)
+        return compute_leaderboard(*history), len(history[2])
+
+    _, report["flat_leaderboard"] = measure(client, flat)
+    _, report["hot_season_leaderboard"] = measure(client, hot)
+
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        for season in seasons:
+            if season != current:
+                archive_season(repo, season, directory)
+        archives = list_archives(directory)
+        report["archive"] = {
+            "seasons": len(archives),
+            "kb": round(sum(m["bytes"] for m in archives.values()) / 1024, 1),
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+        def all_time_archived():
+            tables = {season: load_archive(directory, season)["table"] for season in archives}
+            leaderboard, rows = hot()
+            tables[current] = leaderboard["table"]
+            return all_time_standings(tables, current_season=current), rows
+
+        def all_time_database():
+            tables, rows = {}, 0
+            for season in seasons:
+                history = repo.fetch_results_history(season=season)
+                tables[season] = compute_leaderboard(*history)["table"]
+                rows += len(history[2])
+            return all_time_standings(tables, current_season=current), rows
+
+        archived, report["all_time_archived"] = measure(client, all_time_archived)
+        database, report["all_time_database"] = measure(client, all_time_database)
+        report["all_time_match"] = archived.equals(database)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in report.items():
+            print(f"{key:>24}: {value}")
+    sys.exit(0 if report["all_time_match"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+# Fala odświeżeń: N sesji jednocześnie wykonuje odczyty przebiegu skryptu (aktywne wyścigi, pytania
+# wyścigu, wersja wyników), jak po zapisaniu wyników przez administratora. Porównanie liczby zapytań
+# do bazy, najwyższej liczby zapytań w ciągu sekundy i czasu bez i z ThrottledClient.
+#
+#   uv run python benchmarks/coalescing_bench.py --sessions 50 --latency 0.05
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from dataset import build_tables  # noqa: E402
+from f1_core import F1Repository  # noqa: E402
+from f1_core.local_db import LocalStore, LocalSupabaseClient  # noqa: E402
+from f1_core.throttle import RateLimiter, ThrottledClient  # noqa: E402
+
+
+# Klient lokalnej bazy zapisujący czas każdego zapytania
+class TimedClient(LocalSupabaseClient):
+    def __init__(self, store):
+        super().__init__(store)
+        self.started = []
+
+    def table(self, table_name):
+        query = super().table(table_name)
+        execute = query.execute
+
+        def timed_execute():
+            self.started.append(time.monotonic())
+            return execute()
+        query.execute = timed_execute
+        return query
+
+
+def rerun_reads(repo):
+    active = repo.get_active_races()
+    race_id = active[0]['id'] if active else 1
+    repo.fetch_parallel(
+        questions=lambda: repo.get_race_questions(race_id),
+        version=lambda: repo.get_results_version(),
+    )
+
+
+def herd(client, sessions):
+    barrier = threading.Barrier(sessions)
+
+    def session():
+        barrier.wait()
+        rerun_reads(F1Repository(client))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def peak_per_second(timestamps):
+    ordered = sorted(timestamps)
+    peak, start = 0, 0
+    for end, stamp in enumerate(ordered):
+        while stamp - ordered[start] >= 1.0:
+            start += 1
+        peak = max(peak, end - start + 1)
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fala identycznych zapytań: bez i z łączeniem zapytań i limitem")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="opóźnienie każdego zapytania do lokalnej bazy [s]")
+    parser.add_argument("--rate", type=float, default=20.0, help="limit zapytań na sekundę")
+    parser.add_argument("--burst", type=int, default=40)
+    parser.add_argument("--json", action="store_true", help="raport w formacie JSON")
+    args = parser.parse_args()
+
+    store = LocalStore(build_tables(n_users=30, n_races=10), latency=args.latency)
+    report = {}
+    for name in ("direct", "throttled"):
+        base = TimedClient(store)
+        client = base if name == "direct" else ThrottledClient(base, RateLimiter(args.rate, args.burst))
+        wall = herd(client, args.sessions)
+        report[name] = {
+            "db_queries": base.calls,
+            "peak_queries_per_s": peak_per_second(base.started),
+            "wall_ms": round(wall * 1000, 1),
+        }
+        if name == "throttled":
+            report[name]["coalesced"] = client.single_flight.coalesced
+            report[name]["limiter_wait_s"] = round(client.limiter.waited, 2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, stats in report.items():
+            print(f"{name}:")
+            for key, value in stats.items():
+                print(f"{key:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Opóźnienie ładowania danych widoków (klasyfikacja, zakładki Wyniki i Statystyki): nowy klient
+# Supabase w każdym przebiegu skryptu vs jeden klient na proces oraz zapytania kolejno vs równolegle.
+# Bez --supabase mierzona jest tylko równoległość - na lokalnej bazie z opóźnieniem --latency.
+#
+#   uv run python benchmarks/connection_bench.py --supabase --repeat 20
+#   uv run python benchmarks/connection_bench.py --latency 0.05
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from dataset import build_tables  # noqa: E402
+from f1_core import F1Repository  # noqa: E402
+from f1_core.connection import create_supabase_client, http2_available  # noqa: E402
+from f1_core.local_db import LocalStore, LocalSupabaseClient  # noqa: E402
+
+
+def _stats(timings):
+    ordered = sorted(timings)
+    return {
+        "first_ms": round(timings[0] * 1000, 1),
+        "p50_ms": round(statistics.median(ordered) * 1000, 1),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 1),
+    }
+
+
+def leaderboard_view(repo):
+    return repo.fetch_results_history()
+
+
+# Zapytania zakładki Wyniki dla ostatniego wyścigu
+def results_tab_view(repo):
+    race_id = max(race['id'] for race in repo.get_all_races())
+    return repo.fetch_parallel(
+        results=lambda: repo.get_race_results(race_id),
+        questions=lambda: repo.get_race_questions(race_id),
+    )
+
+
+# Zapytania zakładki Statystyki dla ostatniego wyścigu
+def stats_tab_view(repo):
+    race_id = max(race['id'] for race in repo.get_all_races())
+    return repo.fetch_parallel(
+        submissions=lambda: repo.get_race_submissions(race_id),
+        results=lambda: repo.get_race_results(race_id),
+        questions=lambda: repo.get_race_questions(race_id),
+        value_counts=lambda: repo.get_field_value_counts(race_id),
+    )
+
+
+VIEWS = {"leaderboard": leaderboard_view, "results_tab": results_tab_view, "stats_tab": stats_tab_view}
+
+
+# make_repo() jest wywoływane przed każdym pomiarem (nowy klient) albo raz (klient współdzielony)
+def measure(make_repo, view, repeat, reuse):
+    repo = make_repo() if reuse else None
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        view(repo if reuse else make_repo())
+        timings.append(time.perf_counter() - started)
+    return _stats(timings)
+
+
+def measure_views(variants, repeat):
+    return {
+        f"{view_name}/{variant}": measure(make_repo, view, repeat, reuse)
+        for view_name, view in VIEWS.items()
+        for variant, (make_repo, reuse) in variants.items()
+    }
+
+
+def supabase_credentials(secrets_path):
+    url, key = os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_KEY")
+    if url and key:
+        return url, key
+    import tomllib
+    with open(secrets_path, "rb") as file:
+        secrets = tomllib.load(file)
+    return secrets["supabase"]["url"], secrets["supabase"]["key"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Połączenie z bazą: ponowne użycie klienta i równoległe zapytania")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--users", type=int, default=30)
+    parser.add_argument("--races", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="opóźnienie każdego zapytania do lokalnej bazy [s]")
+    parser.add_argument("--supabase", action="store_true", help="pomiar na Supabase (secrets.toml / zmienne środowiskowe)")
+    parser.add_argument("--secrets", default=os.path.join(REPO_ROOT, ".streamlit", "secrets.toml"))
+    parser.add_argument("--json", action="store_true", help="raport w formacie JSON")
+    args = parser.parse_args()
+
+    report = {}
+    if args.supabase:
+        from supabase import create_client
+        url, key = supabase_credentials(args.secrets)
+        report["http2"] = http2_available()
+        # Stan sprzed zmiany: nowy klient w każdym przebiegu i zapytania wysyłane kolejno
+        report.update(measure_views({
+            "new_client_serial": (lambda: F1Repository(create_client(url, key), max_workers=1), False),
+            "shared_client_serial": (lambda: F1Repository(create_supabase_client(url, key), max_workers=1), True),
+            "shared_client_parallel": (lambda: F1Repository(create_supabase_client(url, key)), True),
+        }, args.repeat))
+    else:
+        store = LocalStore(build_tables(n_users=args.users, n_races=args.races, active_race=False), latency=args.latency)
+        report.update(measure_views({
+            "serial": (lambda: F1Repository(LocalSupabaseClient(store), max_workers=1), True),
+            "parallel": (lambda: F1Repository(LocalSupabaseClient(store)), True),
+        }, args.repeat))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, value in report.items():
+            if isinstance(value, dict):
+                print(f"{name}:")
+                for key, item in value.items():
+                    print(f"{key:>12}: {item}")
+            else:
+                print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import random
+from datetime import datetime, timedelta
+
+from f1_core.models import TEAMS_DRIVERS, app_now, submission_answer_rows
+
+# Syntetyczne dane w formacie tabel Supabase dla testów obciążeniowych i benchmarków.
+
+DRIVERS = [
+    'Max Verstappen', 'Isack Hadjar', 'Charles Leclerc', 'Lewis Hamilton',
+    'Andrea Kimi Antonelli', 'George Russell', 'Lando Norris', 'Oscar Piastri',
+    'Fernando Alonso', 'Lance Stroll', 'Pierre Gasly', 'Carlos Sainz Jr.'
+]
+TIME_DIFFS = ["Mniej niż 2 sekundy", "2.001-5 sekund", "5.001-10 sekund", "10.001-20 sekund", "Więcej niż 20 sekund"]
+CLASSIFIED = ["22", "21-20", "19-18", "17-16", "15-14", "Mniej niż 14"]
+TEAMS = [5, 6, 7, 8, 9, 10, 11]
+APP_USERS = ["Agatka", "Iza", "Kinga", "Paweł", "Piotrek", "Seweryn"]
+
+
+def _prediction(rnd, question_ids):
+    return {
+        "podium_1": rnd.choice(DRIVERS),
+        "podium_2": rnd.choice(DRIVERS),
+        "podium_3": rnd.choice(DRIVERS),
+        "time_diff": rnd.choice(TIME_DIFFS),
+        "driver_of_day": rnd.choice(DRIVERS),
+        "safety_car": rnd.random() < 0.5,
+        "red_flag": rnd.random() < 0.2,
+        "classified_drivers": rnd.choice(CLASSIFIED),
+        "teams_with_points": rnd.choice(TEAMS),
+        "extra_answers": {str(qid): rnd.choice(["Tak", "Nie"]) for qid in question_ids},
+    }
+
+
+# Tabele races/results/submissions/custom_questions dla n_users x n_races rozliczonych wyścigów.
+# Ostatni wyścig (opcjonalnie) jest aktywny z terminem typowania za deadline_minutes minut.
+def build_tables(n_users=6, n_races=10, n_questions=2, active_race=True, deadline_minutes=10, seed=0):
+    rnd = random.Random(seed)
+    users = (APP_USERS + [f"Gracz {i}" for i in range(max(0, n_users - len(APP_USERS)))])[:n_users]
+    start = datetime(2025, 3, 1)
+    tables = {"races": [], "results": [], "submissions": [], "custom_questions": [], "app_settings": [],
+              "submission_answers": []}
+    next_id = 1
+
+    for race_no in range(n_races + (1 if active_race else 0)):
+        race_id = race_no + 1
+        is_active = active_race and race_no == n_races
+        race_date = start + timedelta(days=14 * race_no)
+        deadline = app_now().replace(tzinfo=None) + timedelta(minutes=deadline_minutes) if is_active else race_date - timedelta(days=1)
+        tables["races"].append({
+            "id": race_id,
+            "race_name": f"GP {race_no + 1}",
+            "race_date": race_date.date().isoformat(),
+            "submission_deadline": deadline.isoformat(timespec="seconds"),
+            "is_active": is_active,
+        })
+
+        question_ids = []
+        for q in range(n_questions):
+            tables["custom_questions"].append({
+                "id": next_id, "race_id": race_id, "question": f"Pytanie {q + 1} do GP {race_no + 1}?",
+                "options": ["Tak", "Nie"],
+            })
+            question_ids.append(next_id)
+            next_id += 1
+
+        if is_active:
+            continue
+
+        result = _prediction(rnd, question_ids)
+        result.update({"id": race_id, "race_id": race_id, "updated_at": None})
+        tables["results"].append(result)
+
+        for user in users:
+            submission = _prediction(rnd, question_ids)
+            submission.update({
+                "id": next_id, "race_id": race_id, "user_name": user,
+                "submission_date": (race_date - timedelta(days=2)).isoformat(),
+            })
+            tables["submissions"].append(submission)
+            tables["submission_answers"].extend(submission_answer_rows(submission))
+            next_id += 1
+
+    return tables
+
+
+# Surowa klasyfikacja wyścigów (format f1_core.ingest) dla wyścigów z build_tables
+def build_feed(races, seed=0):
+    rnd = random.Random(seed)
+    grid = [(driver, team) for team, drivers in TEAMS_DRIVERS.items() for driver in drivers]
+    points = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+    feed = []
+    for race in races:
+        order = rnd.sample(grid, len(grid))
+        retired = rnd.randint(0, 6)
+        winner_time = rnd.uniform(5200, 6200)
+        classification, gap = [], 0.0
+        for position, (driver, team) in enumerate(order, start=1):
+            finished = position <= len(order) - retired
+            gap += rnd.uniform(0.1, 12.0) if position > 1 else 0.0
+            classification.append({
+                "position": position,
+                "driver": driver,
+                "team": team,
+                "status": "Finished" if finished else "DNF",
+                "time": f"{winner_time // 3600:.0f}:{winner_time % 3600 // 60:02.0f}:{winner_time % 60:06.3f}" if position == 1
+                        else (f"+{gap:.3f}" if finished else ""),
+                "points": points[position - 1] if finished and position <= len(points) else 0,
+            })
+        race_control = []
+        if rnd.random() < 0.5:
+            race_control.append({"lap": rnd.randint(1, 50), "category": "SafetyCar", "status": "DEPLOYED", "mode": "SAFETY CAR"})
+        if rnd.random() < 0.3:
+            race_control.append({"lap": rnd.randint(1, 50), "category": "SafetyCar", "status": "DEPLOYED", "mode": "VIRTUAL SAFETY CAR"})
+        if rnd.random() < 0.15:
+            race_control.append({"lap": rnd.randint(1, 50), "category": "Flag", "flag": "RED", "message": "RED FLAG"})
+        feed.append({
+            "race_name": race["race_name"],
+            "race_date": race["race_date"],
+            "classification": classification,
+            "race_control": race_control,
+            "driver_of_the_day": rnd.choice(grid)[0],
+        })
+    return feed
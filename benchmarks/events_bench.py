@@ -0,0 +1,110 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+
+# Dziennik zmian (f1_core.events) przy serii zmian typów i wyników: liczba zdarzeń zapisanych przez
+# wyzwalacz (tu - LocalStore) względem liczby zmian, czas odtworzenia klasyfikacji z najbliższej migawki vs z samej
+# migawki bazowej vs pełne przeliczenie z tabel. Klasyfikacja odtworzona z dziennika jest porównywana
+# z klasyfikacją liczoną z bieżących tabel.
+#
+#   uv run python benchmarks/events_bench.py --changes 3000 --snapshot-every 500 --latency 0.005
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from dataset import DRIVERS, build_tables  # noqa: E402
+from f1_core import F1Repository  # noqa: E402
+from f1_core.aggregation import compute_leaderboard, leaderboards_match  # noqa: E402
+from f1_core.events import (  # noqa: E402
+    SETTLE, LeaderboardState, baseline_snapshot, event_order, maybe_snapshot, rebuild_state, utc_now,
+)
+from f1_core.local_db import LocalStore, LocalSupabaseClient  # noqa: E402
+
+
+def timed(work):
+    started = time.perf_counter()
+    value = work()
+    return value, round((time.perf_counter() - started) * 1000, 1)
+
+
+# Zmiany jak w sezonie: głównie ponownie wysłane typy, co jakiś czas poprawka wyników wyścigu
+def apply_changes(repo, client, n_changes, snapshot_every, rnd):
+    submissions = client.table('submissions').select('*').execute().data
+    results = client.table('results').select('*').execute().data
+    snapshots = 0
+    for i in range(n_changes):
+        if rnd.random() < 0.1:
+            result = rnd.choice(results)
+            repo.update_results(result['race_id'], {"podium_1": rnd.choice(DRIVERS), "updated_at": utc_now().isoformat()})
+        else:
+            submission = dict(rnd.choice(submissions))
+            submission.pop('id')
+            submission['podium_1'] = rnd.choice(DRIVERS)
+            repo.upsert_submission(submission)
+        if snapshot_every and (i + 1) % snapshot_every == 0:
+            # Zdarzenia są zapisywane razem ze zmianą, więc migawka może objąć je wszystkie
+            if maybe_snapshot(repo, every=1, now=utc_now() + timedelta(seconds=SETTLE)):
+                snapshots += 1
+    return snapshots
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dziennik zmian: zapis zdarzeń i odtwarzanie z migawek")
+    parser.add_argument("--users", type=int, default=30)
+    parser.add_argument("--races", type=int, default=40)
+    parser.add_argument("--changes", type=int, default=3000)
+    parser.add_argument("--snapshot-every", type=int, default=500, help="migawka po tylu zmianach")
+    parser.add_argument("--latency", type=float, default=0.005, help="opóźnienie każdego zapytania do lokalnej bazy [s]")
+    parser.add_argument("--json", action="store_true", help="raport w formacie JSON")
+    args = parser.parse_args()
+
+    store = LocalStore(build_tables(n_users=args.users, n_races=args.races), latency=args.latency)
+    client = LocalSupabaseClient(store)
+    repo = F1Repository(client)
+    baseline_snapshot(repo)
+    baseline = repo.get_event_snapshot()
+
+    snapshots = apply_changes(repo, client, args.changes, args.snapshot_every, random.Random(0))
+    report = {
+        "changes": args.changes,
+        "events_written": len(store.tables.get('change_events', [])),
+        "snapshots": snapshots + 1,
+    }
+
+    races = {r['id']: r for r in repo.get_all_races()}
+
+    def from_baseline():
+        state = LeaderboardState.from_snapshot(baseline)
+        for event in sorted(repo.fetch_events(after=baseline['occurred_at']), key=event_order):
+            state.apply(event)
+        return state
+
+    def full():
+        return compute_leaderboard(*repo.fetch_results_history())
+
+    latest, report["replay_latest_snapshot_ms"] = timed(lambda: rebuild_state(repo))
+    report["replay_latest_snapshot_events"] = latest.events_applied
+    report["replay_latest_snapshot_rescored"] = latest.rescored
+    replayed, report["replay_baseline_ms"] = timed(from_baseline)
+    report["replay_baseline_events"] = replayed.events_applied
+    expected, report["full_rescore_ms"] = timed(full)
+    report["full_rescore_submissions"] = len(repo.fetch_results_history()[2])
+    report["match"] = (
+        leaderboards_match(latest.leaderboard(races), expected)
+        and leaderboards_match(replayed.leaderboard(races), expected)
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in report.items():
+            print(f"{key:>34}: {value}")
+    sys.exit(0 if report["match"] else 1)
+
+
+if __name__ == "__main__":
+    main()
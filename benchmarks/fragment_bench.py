@@ -0,0 +1,170 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+# Koszt pojedynczej interakcji: pełny przebieg skryptu (stan sprzed podziału na fragmenty) vs
+# przebieg tylko fragmentu, w którym jest zmieniony widżet. Liczone są zapytania do bazy,
+# czas CPU procesu i czas przebiegu. AppTest zawsze uruchamia cały skrypt, więc przebiegi
+# fragmentów są zlecane bezpośrednio (FragmentRunner poniżej), jak robi to serwer Streamlit.
+#
+#   uv run python benchmarks/fragment_bench.py --latency 0.02
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "F1-quiz-app_v2.py")
+sys.path.insert(0, REPO_ROOT)
+# Harmonogram wyścigów (zapytania w tle, poza przebiegami skryptu) nie wlicza się do pomiarów
+os.environ.setdefault("F1_SCHEDULER", "worker")
+
+import smtplib  # noqa: E402
+
+import supabase  # noqa: E402
+import streamlit.testing.v1.app_test as app_test_module  # noqa: E402
+from streamlit.runtime.fragment import MemoryFragmentStorage  # noqa: E402
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData  # noqa: E402
+from streamlit.testing.v1.element_tree import parse_tree_from_messages  # noqa: E402
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner, require_widgets_deltas  # noqa: E402
+
+from dataset import APP_USERS, build_tables  # noqa: E402
+from f1_core.local_db import LocalStore, LocalSupabaseClient  # noqa: E402
+from loadtest import LocalSMTP  # noqa: E402
+
+
+# Runner AppTest ze wspólnym magazynem fragmentów i możliwością przebiegu wybranych fragmentów
+class FragmentRunner(LocalScriptRunner):
+    storage = MemoryFragmentStorage()
+    fragment_queue = []
+    # Identyfikator widżetu -> identyfikator fragmentu, w którym został utworzony
+    widget_fragments = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._fragment_storage = FragmentRunner.storage
+
+    def run(self, widget_state=None, query_params=None, timeout=3, page_hash=""):
+        queue = list(FragmentRunner.fragment_queue)
+        self.request_rerun(RerunData(
+            widget_states=widget_state,
+            page_script_hash=page_hash,
+            fragment_id_queue=queue,
+            is_fragment_scoped_rerun=bool(queue),
+        ))
+        if not self._script_thread:
+            self.start()
+        require_widgets_deltas(self, timeout)
+
+        messages = self.forward_msgs()
+        for msg in messages:
+            if msg.WhichOneof("type") != "delta" or not msg.delta.fragment_id:
+                continue
+            if msg.delta.WhichOneof("type") != "new_element":
+                continue
+            element = msg.delta.new_element
+            proto = getattr(element, element.WhichOneof("type"))
+            widget_id = getattr(proto, "id", "")
+            if widget_id:
+                FragmentRunner.widget_fragments[widget_id] = msg.delta.fragment_id
+        return parse_tree_from_messages(messages)
+
+
+def new_app(client, timeout):
+    at = app_test_module.AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.secrets["supabase"] = {"url": f"local://fragment-bench-{id(client)}", "key": "local"}
+    at.secrets["email"] = {"sender": "bench@example.com", "password": "local"}
+    at.secrets["admin"] = {"password": "local"}
+    at.session_state["show_admin"] = True
+    return at
+
+
+# Jedna interakcja: ustawienie widżetu i przebieg (pełny albo tylko fragment widżetu)
+def measure(at, client, interact, scope):
+    at.run()
+    widget = interact(at)
+    FragmentRunner.fragment_queue = [FragmentRunner.widget_fragments[widget.id]] if scope == "fragment" else []
+    calls_before = client.calls
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+    try:
+        at.run()
+    finally:
+        FragmentRunner.fragment_queue = []
+    return {
+        "db_calls": client.calls - calls_before,
+        "cpu_ms": round((time.process_time() - cpu_before) * 1000, 1),
+        "wall_ms": round((time.perf_counter() - started) * 1000, 1),
+        "exception": bool(at.exception),
+    }
+
+
+# Profil jest liczony tylko w rozwiniętej sekcji; AppTest nie pamięta stanu sekcji między przebiegami,
+# a zwinięta sekcja zeruje wybór typującego - kolejni typujący (spoza cache) są brani z PROFILE_USERS
+PROFILE_USERS = itertools.cycle(APP_USERS[1:])
+
+
+def open_profile(at):
+    at.session_state["profile_expander"] = True
+
+
+def change_profile(at):
+    open_profile(at)
+    at.run()
+    open_profile(at)
+    widget = at.selectbox(key="profile_user_select")
+    widget.select(next(PROFILE_USERS))
+    return widget
+
+
+def change_stats_race(at):
+    widget = at.selectbox(key="stats_race_select")
+    widget.select(1 - widget.value if len(widget.options) > 1 else widget.value)
+    return widget
+
+
+def submit_form(at):
+    at.selectbox(key="form_user_name").select(APP_USERS[0])
+    widget = next(b for b in at.button if b.label == "Wyślij typy")
+    widget.click()
+    return widget
+
+
+INTERACTIONS = {
+    "profile_select": change_profile,
+    "admin_stats_race": change_stats_race,
+    "form_submit": submit_form,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Koszt interakcji: pełny przebieg vs fragment")
+    parser.add_argument("--users", type=int, default=30)
+    parser.add_argument("--races", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="opóźnienie każdego zapytania do lokalnej bazy [s]")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--json", action="store_true", help="raport w formacie JSON")
+    args = parser.parse_args()
+
+    app_test_module.LocalScriptRunner = FragmentRunner
+    smtplib.SMTP = LocalSMTP
+    store = LocalStore(build_tables(n_users=args.users, n_races=args.races), latency=args.latency)
+    client = LocalSupabaseClient(store)
+    supabase.create_client = lambda *a, **k: client
+
+    at = new_app(client, args.timeout)
+    at.run()  # rozgrzewka: import modułów i cache
+    report = {}
+    for name, interact in INTERACTIONS.items():
+        report[name] = {scope: measure(at, client, interact, scope) for scope in ("full", "fragment")}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, scopes in report.items():
+            print(f"{name}:")
+            for scope, stats in scopes.items():
+                print(f"  {scope:>8}: " + ", ".join(f"{key} {value}" for key, value in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
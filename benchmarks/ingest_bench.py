@@ -0,0 +1,93 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Uzupełnienie wyników sezonu z pliku: odczyt pliku (JSON i CSV), wyliczenie pól results z surowej
+# klasyfikacji, zapis jednym upsertem i odbudowa agregatów (jak harmonogram po zmianie wyników).
+# Liczone są zapytania do bazy i czas każdego etapu.
+#
+#   uv run python benchmarks/ingest_bench.py --races 24 --latency 0.05
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from dataset import build_feed, build_tables  # noqa: E402
+from f1_core import F1Repository  # noqa: E402
+from f1_core.ingest import import_results, read_feed  # noqa: E402
+from f1_core.lifecycle import rebuild_aggregates  # noqa: E402
+from f1_core.local_db import LocalStore, LocalSupabaseClient  # noqa: E402
+
+CSV_COLUMNS = ["race_date", "race_name", "position", "driver", "team", "status", "time", "points",
+               "safety_car", "red_flag", "driver_of_the_day"]
+
+
+def write_csv(path, feed):
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for race in feed:
+            safety_car = any(m["category"] == "SafetyCar" and m["mode"] == "SAFETY CAR" for m in race["race_control"])
+            red_flag = any(m["category"] == "Flag" for m in race["race_control"])
+            for n, entry in enumerate(race["classification"]):
+                race_fields = {"safety_car": safety_car, "red_flag": red_flag,
+                               "driver_of_the_day": race["driver_of_the_day"]} if n == 0 else {}
+                writer.writerow({"race_date": race["race_date"], "race_name": race["race_name"], **entry, **race_fields})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import wyników sezonu z pliku")
+    parser.add_argument("--races", type=int, default=24)
+    parser.add_argument("--users", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.05, help="opóźnienie każdego zapytania do lokalnej bazy [s]")
+    parser.add_argument("--json", action="store_true", help="raport w formacie JSON")
+    args = parser.parse_args()
+
+    tables = build_tables(n_users=args.users, n_races=args.races, active_race=False)
+    feed = build_feed(tables["races"])
+    report = {}
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {"json": os.path.join(directory, "season.json"), "csv": os.path.join(directory, "season.csv")}
+        with open(paths["json"], "w", encoding="utf-8") as file:
+            json.dump({"races": feed}, file, ensure_ascii=False)
+        write_csv(paths["csv"], feed)
+
+        for fmt, path in paths.items():
+            # Sezon bez wyników - jak przed ręcznym wypełnianiem zakładki Wyniki
+            store = LocalStore({**tables, "results": []}, latency=args.latency)
+            client = LocalSupabaseClient(store)
+            repo = F1Repository(client)
+
+            started = time.perf_counter()
+            feed_races = read_feed(path)
+            read_s = time.perf_counter() - started
+            imported = import_results(repo, feed_races)
+            import_s = time.perf_counter() - started - read_s
+            rebuilt = rebuild_aggregates(repo, repo.get_results_version())
+            total_s = time.perf_counter() - started
+
+            report[fmt] = {
+                "races_written": len(imported["written"]),
+                "errors": len(imported["errors"]),
+                "warnings": len(imported["warnings"]),
+                "rescored_submissions": rebuilt["rescored_submissions"],
+                "db_queries": client.calls,
+                "read_ms": round(read_s * 1000, 1),
+                "import_ms": round(import_s * 1000, 1),
+                "total_ms": round(total_s * 1000, 1),
+            }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for fmt, stats in report.items():
+            print(f"{fmt}:")
+            for key, value in stats.items():
+                print(f"{key:>22}: {value}")
+
+
+if __name__ == "__main__":
+    main()
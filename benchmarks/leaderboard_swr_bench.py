@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Czas do wyświetlenia klasyfikacji przy różnym opóźnieniu bazy: obliczenie przy każdym wejściu
+# (stan sprzed migawek) vs odczyt ostatniej migawki (stale-while-revalidate, odświeżanie w tle)
+# z pamięci procesu i z dysku (pliki Arrow przez mmap - nowy proces aplikacji), oraz rozmiar migawki.
+#
+#   uv run python benchmarks/leaderboard_swr_bench.py --latencies 0 0.05 0.2 0.5
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from dataset import build_tables  # noqa: E402
+from f1_core import F1Repository  # noqa: E402
+from f1_core.aggregation import compute_leaderboard  # noqa: E402
+from f1_core.local_db import LocalStore, LocalSupabaseClient  # noqa: E402
+from f1_core.snapshots import SnapshotCache, read_snapshot  # noqa: E402
+
+
+def median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 2)
+
+
+# Rozmiar bieżącej migawki: manifest i pliki ramek, które wskazuje
+def snapshot_kib(directory):
+    manifest_path = os.path.join(directory, "manifest.json")
+    with open(manifest_path, encoding="utf-8") as file:
+        frames = [path for path in json.load(file)["frames"].values() if path]
+    sizes = [os.path.getsize(manifest_path)] + [os.path.getsize(os.path.join(directory, path)) for path in frames]
+    return round(sum(sizes) / 1024, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Klasyfikacja: obliczenie przy wejściu vs migawka odświeżana w tle")
+    parser.add_argument("--latencies", type=float, nargs="+", default=[0.0, 0.05, 0.2, 0.5])
+    parser.add_argument("--users", type=int, default=30)
+    parser.add_argument("--races", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="raport w formacie JSON")
+    args = parser.parse_args()
+
+    tables = build_tables(n_users=args.users, n_races=args.races, active_race=False)
+    report = {}
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        for latency in args.latencies:
+            repo = F1Repository(LocalSupabaseClient(LocalStore(tables, latency=latency)))
+
+            def load():
+                return compute_leaderboard(*repo.fetch_results_history())
+
+            # max_age=0: każdy odczyt zleca odświeżenie w tle, ale nie czeka na nie
+            directory = os.path.join(snapshot_dir, f"leaderboard-{latency}")
+            cache = SnapshotCache(directory, load, max_age=0)
+            cache.get()
+            cache.wait()
+            report[f"latency_{latency}s"] = {
+                "blocking_ms": median_ms(load, args.repeat),
+                "snapshot_ms": median_ms(cache.get, args.repeat),
+                "disk_read_ms": median_ms(lambda: read_snapshot(directory), args.repeat),
+                "snapshot_kib": snapshot_kib(directory),
+            }
+            cache.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, value in report.items():
+            print(f"{name}: blocking {value['blocking_ms']} ms, snapshot {value['snapshot_ms']} ms, "
+                  f"disk {value['disk_read_ms']} ms ({value['snapshot_kib']} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import resource
+import smtplib
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Test obciążeniowy "przed terminem typowania": N równoległych sesji wysyła formularz
+# i renderuje klasyfikację. Supabase i SMTP są zastąpione lokalnymi odpowiednikami.
+# AppTest podmienia globalny stan Streamlit (Runtime, st.secrets), więc każda sesja
+# działa w osobnym procesie, a wszystkie startują w tej samej chwili.
+#
+#   uv run python benchmarks/loadtest.py --sessions 16 --users 30 --races 20 --latency 0.02
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "F1-quiz-app_v2.py")
+sys.path.insert(0, REPO_ROOT)
+# Harmonogram wyścigów (zapytania w tle, poza przebiegami skryptu) nie wlicza się do pomiarów
+os.environ.setdefault("F1_SCHEDULER", "worker")
+
+import supabase  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from dataset import APP_USERS, build_tables  # noqa: E402
+from f1_core.local_db import LocalStore, LocalSupabaseClient  # noqa: E402
+
+# Klient lokalnej bazy bieżącego procesu (jedna sesja na proces)
+_session_client = None
+
+
+def _local_create_client(url, key, *args, **kwargs):
+    return _session_client
+
+
+class LocalSMTP:
+    sent = []
+
+    def __init__(self, host, port, *args, **kwargs):
+        pass
+
+    def starttls(self, *args, **kwargs):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def send_message(self, msg, *args, **kwargs):
+        LocalSMTP.sent.append(msg['Subject'])
+
+    def quit(self):
+        pass
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run_session(session_no, client, args, user_offset=0):
+    at = AppTest.from_file(APP_PATH, default_timeout=args.timeout)
+    at.secrets["supabase"] = {"url": f"local://session-{session_no}", "key": "local"}
+    at.secrets["email"] = {"sender": "loadtest@example.com", "password": "local"}
+    at.secrets["admin"] = {"password": "local"}
+
+    reruns = []
+
+    def timed_run():
+        calls_before = client.calls
+        started = time.perf_counter()
+        at.run()
+        reruns.append({
+            "latency": time.perf_counter() - started,
+            "db_calls": client.calls - calls_before,
+            "exception": bool(at.exception),
+        })
+
+    # Pierwsze wejście na stronę
+    timed_run()
+
+    # Wysłanie formularza (jeśli jest aktywny wyścig)
+    submit_buttons = [b for b in at.button if b.label == "Wyślij typy"]
+    if submit_buttons:
+        at.selectbox(key="form_user_name").select(APP_USERS[(session_no + user_offset) % len(APP_USERS)])
+        submit_buttons[0].click()
+        timed_run()
+
+    # Kolejne odświeżenia z rozwiniętą klasyfikacją
+    for _ in range(args.leaderboard_reruns):
+        timed_run()
+
+    return at, reruns
+
+
+# Jedna sesja w osobnym procesie: rozgrzewka, oczekiwanie na wspólny start i pomiar
+def run_worker(session_no, args, start_at):
+    global _session_client
+    store = LocalStore(build_tables(n_users=args.users, n_races=args.races), latency=args.latency)
+    supabase.create_client = _local_create_client
+    smtplib.SMTP = LocalSMTP
+
+    # Rozgrzewka: import modułów i pierwsze wypełnienie cache nie wliczają się do pomiarów
+    # Klient jest zasobem procesu (st.cache_resource), więc rozgrzewka i pomiar używają tego samego.
+    # Rozgrzewka wysyła typy za innego użytkownika - ponowne wysłanie zastąpiłoby typ zamiast dodać nowy.
+    _session_client = LocalSupabaseClient(store)
+    run_session(session_no, _session_client, args, user_offset=1)
+
+    submissions_before = len(store.tables["submissions"])
+    emails_before = len(LocalSMTP.sent)
+    time.sleep(max(0.0, start_at - time.time()))
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    _, reruns = run_session(session_no, _session_client, args)
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        "reruns": reruns,
+        # ru_maxrss jest w KiB (Linux); przyrost szczytowego RSS w trakcie sesji
+        "memory_kib": rss_after - rss_before,
+        "submissions_saved": len(store.tables["submissions"]) - submissions_before,
+        "emails_sent": len(LocalSMTP.sent) - emails_before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test obciążeniowy aplikacji F1 Ankietka")
+    parser.add_argument("--sessions", type=int, default=8, help="liczba równoległych sesji (procesów)")
+    parser.add_argument("--users", type=int, default=6, help="liczba typujących w historii")
+    parser.add_argument("--races", type=int, default=10, help="liczba rozliczonych wyścigów w historii")
+    parser.add_argument("--latency", type=float, default=0.0, help="opóźnienie każdego zapytania do bazy [s]")
+    parser.add_argument("--leaderboard-reruns", type=int, default=2, help="dodatkowe odświeżenia na sesję")
+    parser.add_argument("--warmup", type=float, default=None, help="czas na rozgrzewkę procesów przed startem [s]")
+    parser.add_argument("--timeout", type=float, default=120, help="limit czasu jednego przebiegu skryptu [s]")
+    parser.add_argument("--json", action="store_true", help="raport w formacie JSON")
+    args = parser.parse_args()
+
+    warmup = args.warmup if args.warmup is not None else 10 + args.sessions
+    start_at = time.time() + warmup
+    with ProcessPoolExecutor(max_workers=args.sessions) as pool:
+        futures = [pool.submit(run_worker, n, args, start_at) for n in range(args.sessions)]
+        sessions = [f.result() for f in futures]
+    wall_time = time.time() - start_at
+
+    reruns = [rerun for session in sessions for rerun in session["reruns"]]
+    latencies = [r["latency"] for r in reruns]
+    db_calls = [r["db_calls"] for r in reruns]
+    report = {
+        "sessions": args.sessions,
+        "reruns": len(reruns),
+        "failed_reruns": sum(r["exception"] for r in reruns),
+        "wall_time_s": round(wall_time, 3),
+        "reruns_per_s": round(len(reruns) / wall_time, 2),
+        "latency_p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "latency_p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+        "latency_p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "db_calls_per_rerun_mean": round(statistics.mean(db_calls), 2),
+        "db_calls_per_rerun_max": max(db_calls),
+        "memory_per_session_kib": round(statistics.mean(s["memory_kib"] for s in sessions), 1),
+        "submissions_saved": sum(s["submissions_saved"] for s in sessions),
+        "emails_sent": sum(s["emails_sent"] for s in sessions),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in report.items():
+            print(f"{key:>26}: {value}")
+
+
+if __name__ == "__main__":
+    main()
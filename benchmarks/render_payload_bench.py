@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import sys
+import time
+import zlib
+
+# Dane klasyfikacji wysyłane do przeglądarki w jednym przebiegu: tabela (Arrow) i dwa wykresy Plotly
+# (JSON, jak w st.plotly_chart). Wcześniejsze wykresy (linia i etykiety dla każdego użytkownika
+# i wyścigu, budowane w każdym przebiegu) vs odchudzone wykresy z f1_core.charts zapamiętane według
+# skrótu danych. Rozmiar po kompresji odpowiada server.enableWebsocketCompression (permessage-deflate).
+#
+#   uv run python benchmarks/render_payload_bench.py --users 100 --races 100
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import plotly.graph_objects as go  # noqa: E402
+import plotly.io  # noqa: E402
+import plotly.tools  # noqa: E402
+import pyarrow as pa  # noqa: E402
+
+from dataset import build_tables  # noqa: E402
+from f1_core import F1Repository  # noqa: E402
+from f1_core.aggregation import compute_leaderboard  # noqa: E402
+from f1_core.charts import bar_figure, frame_digest, lean_trend, trend_figure  # noqa: E402
+from f1_core.local_db import LocalStore, LocalSupabaseClient  # noqa: E402
+
+
+# Wykresy w postaci sprzed odchudzenia (jak dawniej w draw_leaderboard)
+def full_figures(leaderboard):
+    table, trend = leaderboard["table"], leaderboard["trend"]
+    bar = go.Figure(go.Bar(x=table['Imię'], y=table['Suma punktów'], marker_color="#E10600",
+                           text=table['Suma punktów'], textposition='outside', textfont=dict(size=18)))
+    bar.update_layout(template="plotly_white", yaxis_title="Suma punktów", xaxis_title=None,
+                      margin=dict(t=30, b=20, l=10, r=10), showlegend=False, font=dict(size=16))
+    bar.update_xaxes(tickfont=dict(size=16))
+    bar.update_yaxes(showgrid=True, gridcolor="#eeeeee", tickfont=dict(size=14), title_font=dict(size=16))
+    race_labels = list(trend.index)
+    line = go.Figure()
+    for user in trend.columns:
+        line.add_trace(go.Scatter(x=race_labels, y=trend[user], mode='lines+markers', name=user,
+                                  line=dict(width=3), marker=dict(size=8)))
+    line.update_layout(template="plotly_white", yaxis_title="Suma punktów (narastająco)", xaxis_title=None,
+                       margin=dict(t=30, b=20, l=10, r=10), font=dict(size=16),
+                       legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0, font=dict(size=15)))
+    line.update_xaxes(categoryorder='array', categoryarray=race_labels, tickfont=dict(size=15),
+                      showgrid=True, gridcolor="rgba(0,0,0,0.06)")
+    line.update_yaxes(showgrid=True, gridcolor="rgba(0,0,0,0.06)", tickfont=dict(size=14), title_font=dict(size=16))
+    return {"bar": bar, "trend": line}
+
+
+def lean_figures(leaderboard):
+    return {"bar": bar_figure(leaderboard["table"]), "trend": trend_figure(lean_trend(leaderboard["trend"]))}
+
+
+# Specyfikacje wykresów dokładnie tak, jak tworzy je st.plotly_chart
+def specs(figures):
+    return [
+        plotly.io.to_json(plotly.tools.return_figure_from_figure_or_data(fig, validate_figure=True), validate=False)
+        for fig in figures.values()
+    ]
+
+
+def deflated(data):
+    compressor = zlib.compressobj(wbits=-15)
+    return len(compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH))
+
+
+def table_bytes(table):
+    sink = pa.BufferOutputStream()
+    arrow_table = pa.Table.from_pandas(table)
+    with pa.ipc.new_stream(sink, arrow_table.schema) as writer:
+        writer.write_table(arrow_table)
+    return sink.getvalue().to_pybytes()
+
+
+# Jeden przebieg: zbudowanie wykresów (z cache albo od nowa) i serializacja jak w st.plotly_chart
+def rerun(leaderboard, build, cache=None):
+    started = time.perf_counter()
+    if cache is None:
+        figures = build(leaderboard)
+    else:
+        key = frame_digest(leaderboard["table"], leaderboard["trend"])
+        figures = cache.get(key)
+        if figures is None:
+            figures = cache[key] = build(leaderboard)
+    payload = [spec.encode('utf-8') for spec in specs(figures)] + [table_bytes(leaderboard["table"])]
+    return payload, (time.perf_counter() - started) * 1000
+
+
+def measure(leaderboard, build, reruns, cache=None):
+    timings = []
+    for _ in range(reruns):
+        payload, ms = rerun(leaderboard, build, cache)
+        timings.append(ms)
+    return {
+        "chart_kb": round(sum(map(len, payload[:-1])) / 1024, 1),
+        "table_kb": round(len(payload[-1]) / 1024, 1),
+        "total_kb": round(sum(map(len, payload)) / 1024, 1),
+        "deflated_kb": round(sum(map(deflated, payload)) / 1024, 1),
+        "first_rerun_ms": round(timings[0], 1),
+        "next_rerun_ms": round(sorted(timings[1:])[len(timings[1:]) // 2], 1) if reruns > 1 else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rozmiar danych klasyfikacji wysyłanych w jednym przebiegu")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--races", type=int, default=100)
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="raport w formacie JSON")
+    args = parser.parse_args()
+
+    repo = F1Repository(LocalSupabaseClient(LocalStore(build_tables(n_users=args.users, n_races=args.races))))
+    leaderboard = compute_leaderboard(*repo.fetch_results_history())
+    report = {
+        "users": args.users,
+        "races": len(leaderboard["trend"]),
+        "full": measure(leaderboard, full_figures, args.reruns),
+        "lean": measure(leaderboard, lean_figures, args.reruns, cache={}),
+    }
+    report["deflated_reduction"] = round(report["full"]["deflated_kb"] / report["lean"]["deflated_kb"], 1)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['users']} użytkowników x {report['races']} wyścigów")
+        for mode in ("full", "lean"):
+            print(f"  {mode:>5}: " + ", ".join(f"{key} {value}" for key, value in report[mode].items()))
+        print(f"  przesyłane po kompresji: {report['deflated_reduction']}x mniej")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,553 @@
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+# Losowe sprawdzanie zgodności wszystkich ścieżek punktacji z punktacją wzorcową. Punktacja wzorcowa
+# nie korzysta z kodu punktacji: wartości punktów odczytuje z tekstu zasad pokazywanego użytkownikom
+# (rules_markdown) i przyznaje je tak, jak opisuje ten tekst. Każda partia to losowe wyścigi
+# z pytaniami dodatkowymi, typy i wyniki z przypadkami brzegowymi: brak extra_answers (klucz, None,
+# pusty słownik), True/False vs "Tak"/"Nie", liczba vs tekst w teams_with_points i classified_drivers.
+# Wartość w innym typie niż kolumna bazy nie jest prawidłową odpowiedzią.
+# Sprawdzane ścieżki (w nawiasie wersja zasad):
+#   - score_submission, score_frame, rescore_totals dla każdej wersji zasad
+#   - score_breakdown (suma trafień, zasady 1), compute_leaderboard (aktywne zasady)
+#   - LeaderboardState (dziennik zmian) po zdarzeniach w losowej kolejności, z błędnym wynikiem
+#     poprawionym później
+#   - score_choice_arrays (punktacja symulacji sezonu, bez pytań dodatkowych)
+#   - widoki submission_points i user_race_points + leaderboard_from_race_points w SQLite
+#     (f1_core/sqlite_views.py) i, z --postgres, w Postgres (sql/006 na prawdziwych typach kolumn;
+#     wiersze odrzucone przez Postgres są pomijane, punktowane są wiersze odczytane z bazy)
+# Przy niezgodności przykład jest upraszczany i wypisywany, a skrypt kończy się kodem 1. Szybka wersja
+# z ustalonymi ziarnami działa w pytest (tests/test_scoring_equivalence.py).
+#
+#   uv run python benchmarks/scoring_fuzz.py --cases 100000 --workers 4
+#   uv run python benchmarks/scoring_fuzz.py --cases 20000 --postgres postgresql://localhost/f1_test
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from f1_core.aggregation import compute_leaderboard, leaderboard_from_race_points, rescore_totals  # noqa: E402
+from f1_core.events import LeaderboardState, format_time, utc_now  # noqa: E402
+from f1_core.models import PODIUM_FIELDS, PREDICTION_FIELDS  # noqa: E402
+from f1_core.scoring import (  # noqa: E402
+    ACTIVE_RULESET_VERSION, DB_VIEWS_RULESET_VERSION, SCORING_RULESETS, rules_markdown, score_breakdown,
+    score_choice_arrays, score_frame, score_submission,
+)
+from f1_core.sqlite_views import view_rows  # noqa: E402
+
+VIEWS_SQL_PATH = os.path.join(REPO_ROOT, "sql", "006_aggregate_views.sql")
+
+# Mała pula wartości, żeby trafienia (także częściowe na podium) były częste
+DRIVERS = ["Max Verstappen", "Lando Norris", "Oscar Piastri", "Charles Leclerc"]
+TEXT_VALUES = {
+    'time_diff': ["Mniej niż 2 sekundy", "2.001-5 sekund"],
+    'driver_of_day': DRIVERS[:3],
+    'classified_drivers': ["22", "21-20"],
+}
+USERS = ["Agatka", "Iza", "Kinga", "Paweł"]
+EXTRA_VALUES = ["A", "B"]
+
+# Ta sama odpowiedź w typie kolumny bazy i w innym typie ("Tak" zamiast True, "7" zamiast 7,
+# 22 zamiast "22")
+BOOLEAN_FORMS = {True: [True, "Tak"], False: [False, "Nie"]}
+INTEGER_FORMS = {n: [n, str(n)] for n in (5, 6, 7)}
+TEXT_FORMS = {"22": ["22", 22]}
+KINDS = {
+    **{field: 'text' for field in PREDICTION_FIELDS},
+    'safety_car': 'boolean', 'red_flag': 'boolean', 'teams_with_points': 'integer',
+}
+FORMS = {'boolean': BOOLEAN_FORMS, 'integer': INTEGER_FORMS, 'text': TEXT_FORMS}
+# (pole, zapis) -> wartość w typie kolumny
+NATIVE = {
+    (field, form): value
+    for field, kind in KINDS.items() for value, forms in FORMS[kind].items() for form in forms
+}
+
+# Kategorie z tekstu zasad -> pola typu
+RULE_LABELS = {
+    "Różnica czasowa": 'time_diff',
+    "Kierowca dnia": 'driver_of_day',
+    "Safety Car": 'safety_car',
+    "Czerwona flaga": 'red_flag',
+    "Liczba sklasyfikowanych kierowców": 'classified_drivers',
+    "Liczba zespołów z punktami": 'teams_with_points',
+}
+
+
+def _rule_points(pattern, text, required=True):
+    match = re.search(pattern, text)
+    if match is None:
+        if required:
+            raise ValueError(f"Brak w zasadach: {pattern}")
+        return 0
+    return int(match.group(1))
+
+
+# Punkty odczytane z tekstu zasad (rules_markdown)
+def rules_from_text(text):
+    return {
+        "podium": _rule_points(r"\*\*Podium\*\* - (\d+) punkt\w* za każdego prawidłowo wytypowanego kierowcę", text),
+        "partial": _rule_points(r"(\d+) punkt\w* za kierowcę z podium na innej pozycji", text, required=False),
+        "bonus": _rule_points(r"\+ (\d+) punkt\w* dodatkowo za idealne podium", text, required=False),
+        "fields": {
+            field: _rule_points(rf"\*\*{re.escape(label)}\*\* - (\d+) punkt", text)
+            for label, field in RULE_LABELS.items()
+        },
+        "extra": _rule_points(r"\*\*Pytania dodatkowe\*\* - po (\d+) punk", text),
+    }
+
+
+RULES = {version: rules_from_text(rules_markdown(ruleset)) for version, ruleset in SCORING_RULESETS.items()}
+
+
+# Trafienie tylko przy tej samej wartości w tym samym typie
+def same_answer(predicted, actual):
+    return type(predicted) is type(actual) and predicted == actual
+
+
+# Punktacja wzorcowa według tekstu zasad; z extra=False bez pytań dodatkowych
+def reference_points(submission, result, rules, extra=True):
+    predicted = [submission[pos] for pos in PODIUM_FIELDS]
+    actual = [result[pos] for pos in PODIUM_FIELDS]
+    points = 0
+    for driver, actual_driver in zip(predicted, actual):
+        if same_answer(driver, actual_driver):
+            points += rules["podium"]
+        elif any(same_answer(driver, other) for other in actual):
+            points += rules["partial"]
+    if all(same_answer(driver, actual_driver) for driver, actual_driver in zip(predicted, actual)):
+        points += rules["bonus"]
+    for field, field_points in rules["fields"].items():
+        if same_answer(submission[field], result[field]):
+            points += field_points
+    if extra:
+        correct = result.get('extra_answers') or {}
+        for key, answer in (submission.get('extra_answers') or {}).items():
+            if key in correct and same_answer(answer, correct[key]):
+                points += rules["extra"]
+    return points
+
+
+def reference_totals(results, submissions, rules):
+    totals = {}
+    for submission in submissions:
+        user = submission['user_name']
+        totals[user] = totals.get(user, 0) + reference_points(submission, results[submission['race_id']], rules)
+    return totals
+
+
+def random_value(field, rnd):
+    kind = KINDS[field]
+    if kind == 'boolean':
+        return rnd.choice(BOOLEAN_FORMS[rnd.random() < 0.5])
+    if kind == 'integer':
+        return rnd.choice(INTEGER_FORMS[rnd.choice(list(INTEGER_FORMS))])
+    value = rnd.choice(DRIVERS if field in PODIUM_FIELDS else TEXT_VALUES[field])
+    return rnd.choice(TEXT_FORMS.get(value, [value]))
+
+
+# Wiersz z polami typu i odpowiedziami na pytania wyścigu (czasem bez klucza extra_answers)
+def random_row(questions, rnd):
+    row = {field: random_value(field, rnd) for field in PREDICTION_FIELDS}
+    shape = rnd.random()
+    if shape < 0.1:
+        return row
+    if shape < 0.2:
+        row['extra_answers'] = None
+    elif shape < 0.3:
+        row['extra_answers'] = {}
+    else:
+        row['extra_answers'] = {key: rnd.choice(EXTRA_VALUES) for key in questions if rnd.random() < 0.8}
+    return row
+
+
+# Losowe wyścigi, wyniki i typy (id typu = numer przypadku)
+def random_batch(seed, n_cases):
+    rnd = random.Random(seed)
+    results, submissions = {}, []
+    race_id = 0
+    while len(submissions) < n_cases:
+        race_id += 1
+        questions = [str(key) for key in rnd.sample(range(1, 6), rnd.randint(0, 3))]
+        results[race_id] = {'race_id': race_id, **random_row(questions, rnd)}
+        for user in rnd.sample(USERS, rnd.randint(1, len(USERS))):
+            if len(submissions) == n_cases:
+                break
+            # Część typów odpowiada też na pytania spoza wyniku (pytanie usunięte)
+            asked = questions + (["9"] if rnd.random() < 0.1 else [])
+            submissions.append({
+                'id': seed * n_cases + len(submissions), 'race_id': race_id, 'user_name': user,
+                **random_row(asked, rnd),
+            })
+    return results, submissions
+
+
+def race_rows(results):
+    first = date(2025, 1, 1)
+    return [
+        {'id': race_id, 'race_name': f"GP {race_id}", 'race_date': (first + timedelta(days=race_id)).isoformat()}
+        for race_id in results
+    ]
+
+
+# Suma punktów użytkowników z tabeli klasyfikacji
+def leaderboard_totals(leaderboard):
+    if leaderboard is None:
+        return {}
+    table = leaderboard["table"]
+    return {user: int(points) for user, points in zip(table['Imię'], table['Suma punktów'])}
+
+
+def breakdown_points(submission, result):
+    hits = score_breakdown(submission, result)
+    return (
+        sum(bool(hits[field]) for field in PREDICTION_FIELDS)
+        + all(hits[pos] for pos in PODIUM_FIELDS)
+        + hits['extra_answers']
+    )
+
+
+def frame_points(results, submissions, version):
+    subs_df = pd.DataFrame(submissions)
+    results_df = pd.DataFrame(list(results.values()))
+    points = score_frame(subs_df, results_df, SCORING_RULESETS[version])
+    return dict(zip(subs_df['id'], points.tolist()))
+
+
+# Punkty symulacji: typy i wyniki jako indeksy wariantów (podium ze wspólną listą kierowców, jak
+# w season_simulation_table); ta sama wartość w innym typie to inny wariant
+def choice_points(results, submissions, version):
+    variants = {}
+
+    def index(field, value):
+        group = variants.setdefault('podium' if field in PODIUM_FIELDS else field, {})
+        return group.setdefault((type(value).__name__, value), len(group))
+
+    picks = np.array([[index(field, s[field]) for field in PREDICTION_FIELDS] for s in submissions])
+    outcomes = np.array([
+        [index(field, results[s['race_id']][field]) for field in PREDICTION_FIELDS] for s in submissions
+    ])
+    points = score_choice_arrays(picks, outcomes, SCORING_RULESETS[version])
+    return {s['id']: int(p) for s, p in zip(submissions, points)}
+
+
+def sqlite_tables(results, submissions):
+    return {'races': race_rows(results), 'results': list(results.values()), 'submissions': submissions}
+
+
+def view_points(results, submissions):
+    rows = view_rows(sqlite_tables(results, submissions), 'submission_points')
+    return {row['submission_id']: row['points'] for row in rows}
+
+
+# Zdarzenia dziennika w losowej kolejności; część wyników najpierw z błędnym podium, poprawiona później
+def replay_points(results, submissions, version, rnd):
+    events = [('submission', row) for row in submissions]
+    corrections = []
+    for result in results.values():
+        if rnd.random() < 0.3:
+            wrong = {**result, 'podium_1': rnd.choice(DRIVERS), 'safety_car': rnd.choice([True, "Nie"])}
+            events.append(('result', wrong))
+            corrections.append(('result', result))
+        else:
+            events.append(('result', result))
+    rnd.shuffle(events)
+    state = LeaderboardState.from_rows([], [], version)
+    now = format_time(utc_now())
+    for entity, row in events + corrections:
+        state.apply({'entity': entity, 'action': 'upsert', 'payload': row, 'occurred_at': now})
+    return state.points
+
+
+# Tabele z typami kolumn jak w Supabase (tylko kolumny używane przez widoki z sql/006)
+def _postgres_schema():
+    column_types = {'boolean': "boolean", 'integer': "integer", 'text': "text"}
+    fields = ", ".join(f"{field} {column_types[KINDS[field]]}" for field in PREDICTION_FIELDS)
+    return f"""
+        create table races (id integer primary key, race_name text, race_date date);
+        create table results (race_id integer primary key, {fields}, extra_answers jsonb);
+        create table submissions (id bigint primary key, race_id integer, user_name text, {fields}, extra_answers jsonb);
+    """
+
+
+# Widoki z sql/006 w Postgres (wymaga pakietu psycopg): zwraca wiersze zapisane w bazie, punkty
+# z submission_points i wiersze user_race_points. Wszystko dzieje się w tymczasowym schemacie
+# wycofywanej transakcji; wiersze, których Postgres nie przyjmie ("Tak" w kolumnie boolean), są pomijane
+def postgres_views(url, results, submissions):
+    try:
+        import psycopg
+        from psycopg.rows import dict_row
+        from psycopg.types.json import Jsonb
+    except ImportError as e:
+        raise RuntimeError("Sprawdzanie widoków w Postgres wymaga pakietu psycopg (uv add psycopg)") from e
+
+    columns = {
+        'races': ['id', 'race_name', 'race_date'],
+        'results': ['race_id'] + PREDICTION_FIELDS + ['extra_answers'],
+        'submissions': ['id', 'race_id', 'user_name'] + PREDICTION_FIELDS + ['extra_answers'],
+    }
+    tables = sqlite_tables(results, submissions)
+    with psycopg.connect(url, row_factory=dict_row) as conn:
+        try:
+            schema = f"scoring_fuzz_{os.getpid()}"
+            conn.execute(f"create schema {schema}")
+            conn.execute(f"set local search_path to {schema}")
+            conn.execute(_postgres_schema())
+            with open(VIEWS_SQL_PATH, encoding="utf-8") as file:
+                conn.execute(file.read())
+            for table, names in columns.items():
+                sql = f"insert into {table} ({', '.join(names)}) values ({', '.join('%s' for _ in names)})"
+                for row in tables[table]:
+                    values = [row.get(name) for name in names]
+                    if names[-1] == 'extra_answers' and values[-1] is not None:
+                        values[-1] = Jsonb(values[-1])
+                    try:
+                        with conn.transaction():
+                            conn.execute(sql, values)
+                    except psycopg.DataError:
+                        pass
+            stored_results = {row['race_id']: row for row in conn.execute("select * from results")}
+            stored_submissions = conn.execute("select * from submissions order by id").fetchall()
+            points = {row['submission_id']: row['points'] for row in conn.execute("select * from submission_points")}
+            race_points = conn.execute("select * from user_race_points").fetchall()
+        finally:
+            conn.rollback()
+    return stored_results, stored_submissions, points, race_points
+
+
+# Wynik ścieżki albo opis wyjątku (wyjątek też jest niezgodnością)
+def attempt(work):
+    try:
+        return work()
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+# Punkty jednego typu w każdej ścieżce liczącej pojedyncze typy - nazwa ścieżki -> (punkty, oczekiwane)
+def pair_points(submission, result):
+    sid, race = submission['id'], {result['race_id']: result}
+    points = {}
+    for version, ruleset in SCORING_RULESETS.items():
+        expected = reference_points(submission, result, RULES[version])
+        points[f"score_submission[{version}]"] = (
+            attempt(lambda: score_submission(submission, result, ruleset)[0]), expected
+        )
+        points[f"score_frame[{version}]"] = (attempt(lambda: frame_points(race, [submission], version).get(sid)), expected)
+        points[f"LeaderboardState[{version}]"] = (
+            attempt(lambda: LeaderboardState.from_rows([submission], [result], version).points.get(sid)), expected
+        )
+        points[f"score_choice_arrays[{version}]"] = (
+            attempt(lambda: choice_points(race, [submission], version).get(sid)),
+            reference_points(submission, result, RULES[version], extra=False),
+        )
+    points["score_breakdown[1]"] = (
+        attempt(lambda: breakdown_points(submission, result)), reference_points(submission, result, RULES[1])
+    )
+    points[f"sqlite submission_points[{DB_VIEWS_RULESET_VERSION}]"] = (
+        attempt(lambda: view_points(race, [submission]).get(sid)),
+        reference_points(submission, result, RULES[DB_VIEWS_RULESET_VERSION]),
+    )
+    return points
+
+
+def pair_mismatches(submission, result):
+    return sorted(name for name, (value, expected) in pair_points(submission, result).items() if value != expected)
+
+
+# Najprostsze wersje wiersza: bez pytań dodatkowych, po jednym pytaniu mniej, pole w typie kolumny
+def simpler_rows(row):
+    answers = row.get('extra_answers')
+    if 'extra_answers' in row:
+        yield {key: value for key, value in row.items() if key != 'extra_answers'}
+    if isinstance(answers, dict):
+        for key in answers:
+            yield {**row, 'extra_answers': {k: v for k, v in answers.items() if k != key}}
+    for field in PREDICTION_FIELDS:
+        native = NATIVE.get((field, row[field]))
+        if native is not None and not same_answer(native, row[field]):
+            yield {**row, field: native}
+
+
+# Upraszczanie niezgodnego przykładu, dopóki ta sama ścieżka nadal się nie zgadza
+def shrink(submission, result, mismatches):
+    changed = True
+    while changed:
+        changed = False
+        for which in ('submission', 'result'):
+            row = submission if which == 'submission' else result
+            for candidate in simpler_rows(row):
+                sub, res = (candidate, result) if which == 'submission' else (submission, candidate)
+                if set(mismatches) & set(pair_mismatches(sub, res)):
+                    submission, result, changed = sub, res, True
+                    break
+            if changed:
+                break
+    return submission, result
+
+
+# Przykład dla ścieżki check (albo dla wszystkich niezgodnych, gdy sam typ nie odtwarza błędu partii)
+def counterexample(check, submission, result):
+    mismatches = pair_mismatches(submission, result)
+    submission, result = shrink(submission, result, [check] if check in mismatches else mismatches)
+    return {
+        "mismatches": pair_mismatches(submission, result),
+        "submission": submission,
+        "result": result,
+        "points": {name: {"got": value, "expected": expected}
+                   for name, (value, expected) in pair_points(submission, result).items()},
+    }
+
+
+# Pierwsza niezgodność ścieżki liczącej pojedyncze typy (points: id typu -> punkty albo opis wyjątku).
+# Przykłady z Postgres nie są upraszczane - wiersze odczytane z bazy nie przechodzą przez pozostałe ścieżki
+def submission_mismatch(name, seed, points, expected, submissions, results, shrinkable=True):
+    failing = [s for s in submissions if isinstance(points, str) or points.get(s['id']) != expected[s['id']]]
+    if not failing:
+        return None
+    if not shrinkable:
+        submission = failing[0]
+        return {
+            "check": name, "seed": seed, "submission": submission, "result": results[submission['race_id']],
+            "got": points if isinstance(points, str) else points.get(submission['id']),
+            "expected": expected[submission['id']],
+        }
+    # Wyjątek w całej partii: przykładem jest pierwszy typ, na którym ścieżka zawodzi także sama
+    for submission in failing[:50] if isinstance(points, str) else failing[:1]:
+        result = results[submission['race_id']]
+        if name in pair_mismatches(submission, result) or not isinstance(points, str):
+            return {"check": name, "seed": seed, **counterexample(name, submission, result)}
+    return {"check": name, "seed": seed, "error": points}
+
+
+def totals_mismatch(name, seed, totals, expected):
+    if totals != expected:
+        return {"check": name, "seed": seed, "totals": totals, "expected": expected}
+    return None
+
+
+# Widoki Postgres: punkty i klasyfikacja porównane z punktacją wzorcową wierszy odczytanych z bazy
+def postgres_mismatch(url, seed, results, submissions):
+    rules = RULES[DB_VIEWS_RULESET_VERSION]
+    stored_results, stored_submissions, points, race_points = postgres_views(url, results, submissions)
+    scored = [s for s in stored_submissions if s['race_id'] in stored_results]
+    expected = {s['id']: reference_points(s, stored_results[s['race_id']], rules) for s in scored}
+    failure = submission_mismatch(f"postgres submission_points[{DB_VIEWS_RULESET_VERSION}]", seed, points,
+                                  expected, scored, stored_results, shrinkable=False)
+    if failure is not None:
+        return failure
+    return totals_mismatch(f"postgres leaderboard_from_race_points[{DB_VIEWS_RULESET_VERSION}]", seed,
+                           attempt(lambda: leaderboard_totals(leaderboard_from_race_points(race_points))),
+                           reference_totals(stored_results, scored, rules))
+
+
+# Jedna partia: wszystkie ścieżki na całej partii; zwraca liczbę przypadków i pierwszą niezgodność.
+# Z postgres_url partia sprawdza też widoki w Postgres
+def run_batch(seed, n_cases, postgres_url=None):
+    rnd = random.Random(-seed)
+    results, submissions = random_batch(seed, n_cases)
+    races = {race['id']: race for race in race_rows(results)}
+
+    def expected_points(version, extra=True):
+        return {s['id']: reference_points(s, results[s['race_id']], RULES[version], extra) for s in submissions}
+
+    checks = []
+    for version, ruleset in SCORING_RULESETS.items():
+        expected = expected_points(version)
+        checks.append((f"score_submission[{version}]", expected, lambda ruleset=ruleset: {
+            s['id']: score_submission(s, results[s['race_id']], ruleset)[0] for s in submissions
+        }))
+        checks.append((f"score_frame[{version}]", expected,
+                       lambda version=version: frame_points(results, submissions, version)))
+        checks.append((f"LeaderboardState[{version}]", expected,
+                       lambda version=version: replay_points(results, submissions, version, rnd)))
+        checks.append((f"score_choice_arrays[{version}]", expected_points(version, extra=False),
+                       lambda version=version: choice_points(results, submissions, version)))
+    checks.append(("score_breakdown[1]", expected_points(1), lambda: {
+        s['id']: breakdown_points(s, results[s['race_id']]) for s in submissions
+    }))
+    checks.append((f"sqlite submission_points[{DB_VIEWS_RULESET_VERSION}]", expected_points(DB_VIEWS_RULESET_VERSION),
+                   lambda: view_points(results, submissions)))
+    for name, expected, work in checks:
+        failure = submission_mismatch(name, seed, attempt(work), expected, submissions, results)
+        if failure is not None:
+            return n_cases, failure
+
+    totals = []
+    for version in SCORING_RULESETS:
+        totals.append((f"rescore_totals[{version}]", reference_totals(results, submissions, RULES[version]),
+                       lambda version=version: rescore_totals(results, submissions, version)
+                       .set_index('user_name')['points'].astype(int).to_dict()))
+    totals.append((f"compute_leaderboard[{ACTIVE_RULESET_VERSION}]",
+                   reference_totals(results, submissions, RULES[ACTIVE_RULESET_VERSION]),
+                   lambda: leaderboard_totals(compute_leaderboard(results, races, submissions))))
+    totals.append((f"sqlite leaderboard_from_race_points[{DB_VIEWS_RULESET_VERSION}]",
+                   reference_totals(results, submissions, RULES[DB_VIEWS_RULESET_VERSION]),
+                   lambda: leaderboard_totals(leaderboard_from_race_points(
+                       view_rows(sqlite_tables(results, submissions), 'user_race_points')
+                   ))))
+    for name, expected, work in totals:
+        failure = totals_mismatch(name, seed, attempt(work), expected)
+        if failure is not None:
+            return n_cases, failure
+
+    if postgres_url:
+        return n_cases, postgres_mismatch(postgres_url, seed, results, submissions)
+    return n_cases, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zgodność wszystkich ścieżek punktacji z punktacją wzorcową")
+    parser.add_argument("--cases", type=int, default=100_000, help="liczba sprawdzanych typów")
+    parser.add_argument("--batch", type=int, default=2000, help="typów w jednej partii")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--postgres", default=os.environ.get("F1_TEST_DATABASE_URL"),
+                        help="adres bazy Postgres do sprawdzenia widoków z sql/006 (domyślnie F1_TEST_DATABASE_URL)")
+    parser.add_argument("--json", action="store_true", help="raport w formacie JSON")
+    args = parser.parse_args()
+
+    sizes = [min(args.batch, args.cases - start) for start in range(0, args.cases, args.batch)]
+    seeds = [args.seed * len(sizes) + i for i in range(len(sizes))]
+    started = time.perf_counter()
+    checked, failure = 0, None
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for n_cases, found in pool.map(run_batch, seeds, sizes, [args.postgres] * len(sizes)):
+            checked += n_cases
+            if found is not None:
+                failure = found
+                break
+    seconds = time.perf_counter() - started
+
+    report = {
+        "cases": checked,
+        "rulesets": sorted(SCORING_RULESETS),
+        "postgres": bool(args.postgres),
+        "seconds": round(seconds, 1),
+        "cases_per_second": round(checked / seconds),
+        "ok": failure is None,
+        "counterexample": failure,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False, default=str))
+    else:
+        print(f"{checked} typów, zasady {report['rulesets']}, Postgres: {'tak' if args.postgres else 'nie'}: "
+              f"{report['seconds']} s ({report['cases_per_second']} typów/s)")
+        if failure is None:
+            print("wszystkie ścieżki punktacji zgodne z punktacją wzorcową")
+        else:
+            print("NIEZGODNOŚĆ:")
+            print(json.dumps(failure, indent=2, ensure_ascii=False, default=str))
+    sys.exit(0 if failure is None else 1)
+
+
+if __name__ == "__main__":
+    main()
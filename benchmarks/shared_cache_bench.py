@@ -0,0 +1,112 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Kilka replik aplikacji (osobne procesy, jak za load balancerem) po kolejnych zmianach wyników:
+# każda odświeża migawkę klasyfikacji i czyta historie wszystkich użytkowników. Bez wspólnego
+# cache każda replika liczy klasyfikację i pyta bazę sama (praca rośnie z liczbą replik), ze
+# wspólnym cache (f1_core.shared_cache) klasyfikację każdej wersji wyników liczy jedna replika.
+# Repliki mają osobne katalogi migawek (jak na osobnych hostach) i identyczne lokalne bazy.
+#
+#   uv run python benchmarks/shared_cache_bench.py --replicas 4 --versions 3
+#   uv run python benchmarks/shared_cache_bench.py --shared redis://localhost:6379/0
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from dataset import APP_USERS, build_tables  # noqa: E402
+from f1_core import F1Repository, shared_cache  # noqa: E402
+from f1_core.aggregation import build_user_history, compute_leaderboard  # noqa: E402
+from f1_core.local_db import LocalStore, LocalSupabaseClient  # noqa: E402
+from f1_core.memory import cached  # noqa: E402
+from f1_core.snapshots import SnapshotCache  # noqa: E402
+
+repo = None
+
+
+@cached(ttl=300)
+def user_history(user_name, results_version):
+    user_subs, results_by_race, race_data_by_id = repo.fetch_user_history(user_name)
+    return build_user_history(user_subs, results_by_race, race_data_by_id) if user_subs else None
+
+
+def replica(index, args, url, directory, barrier, queue):
+    global repo
+    tier = shared_cache.configure(url)
+    client = LocalSupabaseClient(LocalStore(build_tables(n_users=args.users, n_races=args.races),
+                                            latency=args.latency))
+    repo = F1Repository(client)
+    computed = 0
+
+    def load_leaderboard():
+        nonlocal computed
+        computed += 1
+        return compute_leaderboard(*repo.fetch_results_history())
+
+    cache = SnapshotCache(os.path.join(directory, f"replica-{index}", "leaderboard"), load_leaderboard,
+                          max_age=0, version_loader=repo.get_results_version, shared=tier)
+    elapsed = 0.0
+    for version in range(args.versions):
+        barrier.wait()
+        started = time.perf_counter()
+        cache.refresh().join()
+        results_version = cache.wait()["version"]
+        for user in APP_USERS[:args.users]:
+            user_history(user, results_version)
+        elapsed += time.perf_counter() - started
+        barrier.wait()
+        # Ta sama zmiana wyników we wszystkich replikach (wspólna baza)
+        client.table('results').update({"updated_at": f"2026-01-{version + 1:02d}T12:00:00"}).eq('race_id', 1).execute()
+
+    queue.put({"leaderboard_computed": computed, "db_queries": client.calls, "elapsed_s": elapsed})
+
+
+def run_fleet(args, url):
+    barrier = multiprocessing.Barrier(args.replicas)
+    queue = multiprocessing.Queue()
+    with tempfile.TemporaryDirectory() as directory:
+        processes = [
+            multiprocessing.Process(target=replica, args=(i, args, url, directory, barrier, queue))
+            for i in range(args.replicas)
+        ]
+        for process in processes:
+            process.start()
+        reports = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+    return {
+        "leaderboard_computed": sum(r["leaderboard_computed"] for r in reports),
+        "db_queries": sum(r["db_queries"] for r in reports),
+        "max_elapsed_s": round(max(r["elapsed_s"] for r in reports), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Praca floty replik: własny cache vs wspólny cache")
+    parser.add_argument("--replicas", type=int, default=4)
+    parser.add_argument("--versions", type=int, default=3, help="liczba kolejnych wersji wyników")
+    parser.add_argument("--users", type=int, default=30)
+    parser.add_argument("--races", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.01, help="opóźnienie każdego zapytania do lokalnej bazy [s]")
+    parser.add_argument("--shared", help="adres wspólnego cache (domyślnie plik SQLite w katalogu tymczasowym)")
+    parser.add_argument("--json", action="store_true", help="raport w formacie JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.shared or f"sqlite:///{os.path.join(directory, 'shared-cache.db')}"
+        report = {"local": run_fleet(args, None), "shared": run_fleet(args, url)}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{args.replicas} repliki, {args.versions} wersje wyników")
+        for mode, stats in report.items():
+            print(f"  {mode:>7}: " + ", ".join(f"{key} {value}" for key, value in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
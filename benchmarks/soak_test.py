@@ -0,0 +1,183 @@
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Test długiego działania: tysiące przebiegów skryptu w jednym procesie (jak serwer działający
+# tygodniami) z interakcjami z kolejnych zakładek i nowymi sesjami co --session-reruns przebiegów.
+# Co --window przebiegów, po gc, zapisywana jest liczba obiektów śledzonych przez gc i RSS procesu
+# (z --tracemalloc także pamięć zaalokowana przez Pythona - dokładniej, ale kilka razy wolniej).
+# Pamięć po rozgrzewce powinna być płaska: jeśli mediana ostatniej ćwiartki pomiarów przekracza
+# medianę pierwszej o więcej niż --max-growth-mb albo liczba obiektów rośnie o więcej niż
+# --max-object-growth procent, test kończy się kodem 1 (z --tracemalloc wypisuje też miejsca
+# alokacji, w których pamięć urosła najbardziej).
+#
+#   uv run python benchmarks/soak_test.py --reruns 2000
+#   uv run python benchmarks/soak_test.py --reruns 500 --tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "F1-quiz-app_v2.py")
+sys.path.insert(0, REPO_ROOT)
+# Harmonogram wyścigów (wątek w tle) nie wlicza się do pomiarów; migawki klasyfikacji w katalogu tymczasowym
+os.environ.setdefault("F1_SCHEDULER", "worker")
+os.environ.setdefault("F1_SNAPSHOT_DIR", tempfile.mkdtemp(prefix="f1-soak-"))
+
+import smtplib  # noqa: E402
+
+import supabase  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from dataset import APP_USERS, build_tables  # noqa: E402
+from f1_core.local_db import LocalStore, LocalSupabaseClient  # noqa: E402
+from f1_core.memory import budget, rss_bytes  # noqa: E402
+from loadtest import LocalSMTP  # noqa: E402
+
+
+def new_session(client, timeout):
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.secrets["supabase"] = {"url": f"local://soak-{id(client)}", "key": "local"}
+    at.secrets["email"] = {"sender": "soak@example.com", "password": "local"}
+    at.secrets["admin"] = {"password": "local"}
+    at.session_state["show_admin"] = True
+    return at
+
+
+# Interakcje wykonywane po kolei (n - numer przebiegu): każda ustawia widżet przed kolejnym przebiegiem
+def change_profile(at, n):
+    # Profil jest liczony tylko w rozwiniętej sekcji; AppTest nie pamięta stanu sekcji między przebiegami
+    at.session_state["profile_expander"] = True
+    at.run()
+    at.session_state["profile_expander"] = True
+    at.selectbox(key="profile_user_select").select(APP_USERS[n % len(APP_USERS)])
+
+
+def change_stats_race(at, n):
+    widget = at.selectbox(key="stats_race_select")
+    if widget.options:
+        widget.select(n % len(widget.options))
+
+
+def edit_form(at, n):
+    at.selectbox(key="form_user_name").select(APP_USERS[n % len(APP_USERS)])
+
+
+def submit_form(at, n):
+    at.selectbox(key="form_user_name").select(APP_USERS[n % len(APP_USERS)])
+    next(b for b in at.button if b.label == "Wyślij typy").click()
+
+
+INTERACTIONS = [change_profile, change_stats_race, edit_form, submit_form]
+
+
+def measure(reruns):
+    gc.collect()
+    sample = {"reruns": reruns, "objects": len(gc.get_objects()), "rss_mb": round(rss_bytes() / 2**20, 1)}
+    if tracemalloc.is_tracing():
+        sample["traced_mb"] = round(tracemalloc.get_traced_memory()[0] / 2**20, 2)
+    return sample
+
+
+# Wzrost od pierwszej do ostatniej ćwiartki pomiarów (mediany - pojedyncze skoki nie decydują)
+def growth(samples, key):
+    quarter = max(len(samples) // 4, 1)
+    first = statistics.median(s[key] for s in samples[:quarter])
+    last = statistics.median(s[key] for s in samples[-quarter:])
+    return first, last
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test długiego działania: pamięć po tysiącach przebiegów")
+    parser.add_argument("--reruns", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200, help="przebiegi przed pierwszym pomiarem")
+    parser.add_argument("--window", type=int, default=100, help="przebiegi między pomiarami")
+    parser.add_argument("--session-reruns", type=int, default=50, help="przebiegi jednej sesji")
+    parser.add_argument("--users", type=int, default=30)
+    parser.add_argument("--races", type=int, default=20)
+    parser.add_argument("--max-growth-mb", type=float, default=16.0,
+                        help="dopuszczalny wzrost RSS (z --tracemalloc: pamięci Pythona) [MB]")
+    parser.add_argument("--max-object-growth", type=float, default=2.0, help="dopuszczalny wzrost liczby obiektów [%%]")
+    parser.add_argument("--tracemalloc", action="store_true", help="pomiar pamięci zaalokowanej przez Pythona")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--json", action="store_true", help="raport w formacie JSON")
+    args = parser.parse_args()
+
+    smtplib.SMTP = LocalSMTP
+    client = LocalSupabaseClient(LocalStore(build_tables(n_users=args.users, n_races=args.races)))
+    supabase.create_client = lambda *a, **k: client
+
+    if args.tracemalloc:
+        tracemalloc.start(1)
+    baseline = None
+    samples = []
+    exceptions = 0
+    started = time.perf_counter()
+    at = None
+    for n in range(args.reruns):
+        if n % args.session_reruns == 0:
+            at = new_session(client, args.timeout)
+            at.run()
+        try:
+            INTERACTIONS[n % len(INTERACTIONS)](at, n)
+        except (KeyError, StopIteration):
+            pass
+        at.run()
+        exceptions += bool(at.exception)
+
+        done = n + 1
+        if done == args.warmup and args.tracemalloc:
+            gc.collect()
+            baseline = tracemalloc.take_snapshot()
+        if done >= args.warmup and (done - args.warmup) % args.window == 0:
+            samples.append(measure(done))
+
+    if len(samples) < 4:
+        parser.error("za mało pomiarów - zwiększ --reruns albo zmniejsz --window")
+    memory_key = "traced_mb" if args.tracemalloc else "rss_mb"
+    first_mb, last_mb = growth(samples, memory_key)
+    first_objects, last_objects = growth(samples, "objects")
+    memory_growth = round(last_mb - first_mb, 2)
+    object_growth = round(100 * (last_objects - first_objects) / first_objects, 2)
+    top_growth = []
+    if args.tracemalloc:
+        gc.collect()
+        top_growth = [
+            {"location": str(stat.traceback[0]), "size_diff_kb": round(stat.size_diff / 1024, 1)}
+            for stat in tracemalloc.take_snapshot().compare_to(baseline, "lineno")[:10]
+        ]
+    report = {
+        "reruns": args.reruns,
+        "elapsed_s": round(time.perf_counter() - started, 1),
+        "exceptions": exceptions,
+        "memory": memory_key,
+        "memory_growth_mb": memory_growth,
+        "object_growth_pct": object_growth,
+        "cache": {key: value for key, value in budget.stats().items() if key != "by_cache"},
+        "samples": samples,
+        "top_growth": top_growth,
+        "passed": memory_growth <= args.max_growth_mb and object_growth <= args.max_object_growth and not exceptions,
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for sample in samples:
+            print(f"{sample['reruns']:>6} przebiegów: " + ", ".join(
+                f"{key} {value}" for key, value in sample.items() if key != "reruns"
+            ))
+        print(f"wzrost po rozgrzewce: {memory_key} {memory_growth} MB (limit {args.max_growth_mb} MB), "
+              f"obiekty {object_growth}% (limit {args.max_object_growth}%), wyjątki: {exceptions}, "
+              f"czas: {report['elapsed_s']} s")
+        if not report["passed"] and top_growth:
+            print("największy wzrost od rozgrzewki:")
+            for row in top_growth:
+                print(f"  {row['size_diff_kb']:>10} kB  {row['location']}")
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,497 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tomllib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from f1_core import F1Repository, shared_cache
+from f1_core.archive import archive_season, list_archives
+from f1_core.crowd import compute_crowd_stats
+from f1_core.events import DEFAULT_SNAPSHOT_EVERY, baseline_snapshot, maybe_snapshot, rebuild_state, standings_diff
+from f1_core.integrity import (
+    duplicate_ids_to_delete, find_duplicate_results, find_duplicate_submissions, find_orphan_extra_answers,
+)
+from f1_core.ingest import ADAPTERS, import_results, read_feed
+from f1_core.lifecycle import DEFAULT_INTERVAL, LifecycleScheduler, rebuild_aggregates
+from f1_core.local_db import LocalStore, LocalSupabaseClient
+from f1_core.migrations import rekey_extra_answers
+from f1_core.models import hot_season, season_of, utc_timestamp
+from f1_core.scoring import SCORING_RULESETS, score_frame
+
+# Operacje wsadowe bez interfejsu WWW: przeliczenie punktów, odbudowa zapisanych agregatów
+# i kontrole spójności. Wyścigi przetwarzane są równolegle w osobnych procesach.
+#
+#   uv run python f1_cli.py all                        # Supabase (.streamlit/secrets.toml)
+#   uv run python f1_cli.py check --dump baza.json     # lokalny zrzut bazy
+#   uv run python f1_cli.py dump --out baza.json       # zrzut Supabase do pliku
+#   uv run python f1_cli.py migrate-extra-keys         # klucze extra_answers -> id pytań
+#   uv run python f1_cli.py sync-answers               # uzupełnienie submission_answers
+#   uv run python f1_cli.py scheduler                  # harmonogram wyścigów (F1_SCHEDULER=worker)
+#   uv run python f1_cli.py import-results --feed sezon.json --create-races
+#   uv run python f1_cli.py archive-seasons            # zakończone sezony do plików Parquet
+#   uv run python f1_cli.py events-snapshot --baseline # migawka dziennika zmian z bieżących tabel
+#   uv run python f1_cli.py replay --at 2026-05-01T12:00 --since 2026-04-30T12:00
+
+SECRETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".streamlit", "secrets.toml")
+DUMP_TABLES = {
+    'races': 'id',
+    'custom_questions': 'id',
+    'submissions': 'id',
+    'results': 'id',
+    'race_crowd_stats': 'race_id',
+    'scoring_totals': 'ruleset_version',
+    'submission_answers': 'submission_id',
+    'change_events': 'id',
+    'event_snapshots': 'id',
+}
+
+
+# Połączenie z lokalnym zrzutem (--dump) albo z Supabase (zmienne środowiskowe lub secrets.toml).
+# Zmiany typów i wyników trafiają do dziennika zmian (wyzwalacz z sql/010, w zrzucie - LocalStore).
+def connect(args):
+    if args.dump:
+        store = LocalStore.from_dump(args.dump)
+        return F1Repository(LocalSupabaseClient(store)), store
+
+    url, key = os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_KEY")
+    if not (url and key):
+        with open(args.secrets, "rb") as file:
+            secrets = tomllib.load(file)
+        url, key = secrets["supabase"]["url"], secrets["supabase"]["key"]
+
+    from f1_core.connection import create_supabase_client
+    return F1Repository(create_supabase_client(url, key)), None
+
+
+# Przetworzenie paczki wyścigów (uruchamiane w procesie roboczym). Punkty liczone są
+# jedną operacją wektorową na paczkę, kontrole spójności - wyścig po wyścigu.
+def process_races(task):
+    races = task['races']
+    subs = [sub for race in races for sub in race['submissions']]
+    results = [race['result'] for race in races if race['result']]
+    report = {
+        "races": len(races),
+        "submissions": len(subs),
+        "points": {},
+        "crowd": [],
+        "duplicates": [],
+        "orphans": [],
+    }
+    for race in races:
+        report['duplicates'] += find_duplicate_submissions(race['submissions'])
+        report['orphans'] += find_orphan_extra_answers(
+            race['questions'], [race['result']] if race['result'] else [], race['submissions']
+        )
+
+    if results and subs:
+        subs_df = pd.DataFrame(subs)
+        results_df = pd.DataFrame(results)
+        scored = subs_df['race_id'].isin(results_df['race_id'])
+        for version in task['ruleset_versions']:
+            subs_df['points'] = score_frame(subs_df, results_df, SCORING_RULESETS[version])
+            per_race = subs_df[scored].groupby(['user_name', 'race_id'])['points'].sum()
+            report['points'][version] = [
+                (user_name, race_id, int(points)) for (user_name, race_id), points in per_race.items()
+            ]
+    # Także wyścigi z wynikami bez typów (pusty rekord statystyk)
+    if task['rebuild_crowd']:
+        report['crowd'] = list(compute_crowd_stats(subs, results).values())
+    return report
+
+
+# Paczki zadań dla procesów roboczych - wszystkie dane jednego wyścigu trafiają do tej samej paczki
+def build_tasks(races, results, submissions, questions, ruleset_versions, rebuild_crowd, chunks):
+    results_by_race = {r['race_id']: r for r in results}
+    subs_by_race, questions_by_race = {}, {}
+    for sub in submissions:
+        subs_by_race.setdefault(sub['race_id'], []).append(sub)
+    for question in sorted(questions, key=lambda q: q['id']):
+        questions_by_race.setdefault(question['race_id'], []).append(question)
+
+    race_ids = sorted({r['id'] for r in races} | set(subs_by_race) | set(results_by_race))
+    race_tasks = [
+        {
+            "race_id": race_id,
+            "result": results_by_race.get(race_id),
+            "submissions": subs_by_race.get(race_id, []),
+            "questions": questions_by_race.get(race_id, []),
+        }
+        for race_id in race_ids
+    ]
+    return [
+        {"races": race_tasks[i::chunks], "ruleset_versions": ruleset_versions, "rebuild_crowd": rebuild_crowd}
+        for i in range(min(chunks, len(race_tasks)))
+    ]
+
+
+def run_tasks(tasks, workers):
+    if workers == 1:
+        return [process_races(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(process_races, tasks))
+
+
+# Sumy punktów użytkowników w formacie tabeli scoring_totals
+def totals_rows(reports, version, results_version):
+    totals = {}
+    for report in reports:
+        for user_name, _, points in report['points'].get(version, []):
+            entry = totals.setdefault(user_name, {"points": 0, "races": 0})
+            entry["points"] += points
+            entry["races"] += 1
+    computed_at = utc_timestamp()
+    return [
+        {
+            "user_name": user_name,
+            "points": int(entry["points"]),
+            "races": entry["races"],
+            "ruleset_version": version,
+            "results_version": results_version,
+            "computed_at": computed_at,
+        }
+        for user_name, entry in sorted(totals.items())
+    ]
+
+
+def run_maintenance(args):
+    repo, store = connect(args)
+    stats = {"command": args.command}
+    started = time.perf_counter()
+
+    tables = {name: repo.fetch_all(name) for name in ('races', 'results', 'submissions', 'custom_questions')}
+    stats["rows_loaded"] = sum(len(rows) for rows in tables.values())
+    stats["load_s"] = round(time.perf_counter() - started, 3)
+
+    do_rescore = args.command in ('rescore', 'all')
+    do_rebuild = args.command in ('rebuild', 'all')
+    do_check = args.command in ('check', 'all')
+    versions = args.ruleset or list(SCORING_RULESETS)
+
+    workers = args.workers or os.cpu_count() or 1
+    tasks = build_tasks(
+        tables['races'], tables['results'], tables['submissions'], tables['custom_questions'],
+        versions if do_rescore else [], do_rebuild, chunks=workers * args.chunks_per_worker
+    )
+    process_started = time.perf_counter()
+    reports = run_tasks(tasks, workers)
+    process_s = time.perf_counter() - process_started
+    stats["workers"] = workers
+    stats["races"] = sum(r['races'] for r in reports)
+    stats["submissions"] = sum(r['submissions'] for r in reports)
+    stats["process_s"] = round(process_s, 3)
+    stats["races_per_s"] = round(stats["races"] / process_s, 1) if process_s else None
+    stats["submissions_per_s"] = round(stats["submissions"] / process_s, 1) if process_s else None
+
+    write_started = time.perf_counter()
+    changed = False
+    if do_rescore:
+        results_version = repo.get_results_version()
+        for version in versions:
+            rows = totals_rows(reports, version, results_version)
+            stats[f"totals_v{version}"] = {row['user_name']: row['points'] for row in rows}
+            if rows and not args.dry_run:
+                repo.save_scoring_totals(rows)
+                changed = True
+
+    if do_rebuild:
+        crowd_rows = [row for r in reports for row in r['crowd']]
+        stats["crowd_stats_rebuilt"] = len(crowd_rows)
+        if crowd_rows and not args.dry_run:
+            repo.save_crowd_stats(crowd_rows)
+            changed = True
+
+    issues = 0
+    if do_check:
+        duplicates = [d for r in reports for d in r['duplicates']]
+        orphans = [o for r in reports for o in r['orphans']]
+        duplicate_results = find_duplicate_results(tables['results'])
+        fixed = args.fix_duplicates and not args.dry_run
+        issues = len(orphans) + (0 if fixed else len(duplicates) + len(duplicate_results))
+        stats["duplicate_submissions"] = [
+            {"race_id": race_id, "user_name": user_name, "ids": ids} for race_id, user_name, ids in duplicates
+        ]
+        stats["duplicate_results"] = [{"race_id": race_id, "ids": ids} for race_id, ids in duplicate_results]
+        stats["orphan_extra_answers"] = orphans
+        if args.fix_duplicates and duplicates:
+            # Usuwane są starsze typy; przed usunięciem ich kopie trafiają do duplicate_backups
+            to_delete = duplicate_ids_to_delete(duplicates)
+            stats["submissions_to_delete"] = to_delete
+            if not args.dry_run:
+                by_id = {row['id']: row for row in tables['submissions']}
+                stats["backed_up_submissions"] = len(repo.backup_rows('submissions', [by_id[i] for i in to_delete]))
+                stats["deleted_submissions"] = len(repo.delete_submissions(to_delete))
+                changed = True
+        if args.fix_duplicates and duplicate_results:
+            to_delete = duplicate_ids_to_delete(duplicate_results)
+            stats["results_to_delete"] = to_delete
+            if not args.dry_run:
+                by_id = {row['id']: row for row in tables['results']}
+                kept = [ids[-1] for _, ids in duplicate_results]
+                stats["backed_up_results"] = len(repo.backup_rows('results', [by_id[i] for i in to_delete]))
+                stats["deleted_results"] = len(repo.delete_duplicate_results(to_delete, kept))
+                # Usunięte wyniki zmieniają punkty - agregaty dla nowej wersji wyników (jak po imporcie)
+                stats["rebuilt"] = rebuild_aggregates(repo, repo.get_results_version())
+                changed = True
+
+    if store is not None and changed:
+        store.dump(args.dump)
+    stats["write_s"] = round(time.perf_counter() - write_started, 3)
+    stats["total_s"] = round(time.perf_counter() - started, 3)
+    return stats, issues
+
+
+# Przepisanie kluczy extra_answers z "Pytanie dodatkowe N" na id pytań (results i submissions)
+def run_migrate_extra_keys(args):
+    repo, store = connect(args)
+    started = time.perf_counter()
+    questions_by_race = {}
+    for question in repo.fetch_all('custom_questions'):
+        questions_by_race.setdefault(question['race_id'], []).append(question)
+
+    stats = {"command": args.command}
+    for table_name in ('results', 'submissions'):
+        rows = repo.fetch_all(table_name)
+        changed = rekey_extra_answers(rows, questions_by_race)
+        stats[f"{table_name}_rows"] = len(rows)
+        stats[f"{table_name}_migrated"] = len(changed)
+        if changed and not args.dry_run:
+            repo.upsert_rows(table_name, changed)
+
+    if store is not None and not args.dry_run:
+        store.dump(args.dump)
+    stats["total_s"] = round(time.perf_counter() - started, 3)
+    return stats, 0
+
+
+# Uzupełnienie tabeli submission_answers na podstawie extra_answers wszystkich typów
+def run_sync_answers(args):
+    repo, store = connect(args)
+    started = time.perf_counter()
+    question_ids = {q['id'] for q in repo.fetch_all('custom_questions')}
+    submissions = repo.fetch_all('submissions')
+    # Tylko odpowiedzi na istniejące pytania (klucz obcy question_id)
+    for submission in submissions:
+        submission['extra_answers'] = {
+            key: value for key, value in (submission.get('extra_answers') or {}).items()
+            if key.isdigit() and int(key) in question_ids
+        }
+
+    stats = {"command": args.command, "submissions": len(submissions)}
+    if not args.dry_run:
+        stats["answers_synced"] = repo.sync_submission_answers(
+            submissions, on_sync_error=lambda e: print(f"Błąd zapisu submission_answers: {e}", file=sys.stderr)
+        )
+        if store is not None:
+            store.dump(args.dump)
+    stats["total_s"] = round(time.perf_counter() - started, 3)
+    return stats, 0
+
+
+# Zrzut tabel Supabase do pliku JSON, który można później podać w --dump
+def run_dump(args):
+    repo, _ = connect(args)
+    started = time.perf_counter()
+    tables = {}
+    for name, order_by in DUMP_TABLES.items():
+        try:
+            tables[name] = repo.fetch_all(name, order_by=order_by)
+        except Exception as e:
+            print(f"Pominięto tabelę {name}: {e}", file=sys.stderr)
+    LocalStore(tables).dump(args.out)
+    return {
+        "command": "dump",
+        "rows": {name: len(rows) for name, rows in tables.items()},
+        "total_s": round(time.perf_counter() - started, 3),
+    }, 0
+
+
+# Import oficjalnych wyników z pliku (JSON/CSV, f1_core.ingest) i przeliczenie agregatów dla nowej
+# wersji wyników - zmienione wyścigi w race_crowd_stats i sumy punktów aktywnych zasad
+def run_import_results(args):
+    if not args.feed:
+        raise SystemExit("import-results wymaga --feed PLIK")
+    repo, store = connect(args)
+    started = time.perf_counter()
+    feed_races = read_feed(args.feed, args.format)
+    stats = {"command": args.command, "read_s": round(time.perf_counter() - started, 3)}
+    stats.update(import_results(
+        repo, feed_races, overwrite=args.overwrite, create_races=args.create_races, dry_run=args.dry_run
+    ))
+    stats["import_s"] = round(time.perf_counter() - started, 3)
+
+    if stats["written"] and not args.dry_run:
+        stats["rebuilt"] = rebuild_aggregates(repo, repo.get_results_version())
+        if store is not None:
+            store.dump(args.dump)
+    stats["total_s"] = round(time.perf_counter() - started, 3)
+    return stats, len(stats["errors"]) + len(stats["unmatched"])
+
+
+# Archiwizacja zakończonych sezonów (f1_core.archive): wybrany sezon (--season) albo wszystkie
+# zakończone, których nie ma jeszcze w archiwum
+def run_archive_seasons(args):
+    repo, _ = connect(args)
+    started = time.perf_counter()
+    archived = list_archives(args.archive_dir)
+    if args.season is not None:
+        seasons = [args.season]
+    else:
+        races = repo.get_all_races()
+        seasons = sorted({season_of(r) for r in races} - {None, hot_season(races, repo.get_scored_race_ids())} - set(archived))
+
+    stats = {"command": args.command, "archived": {}, "errors": {}}
+    for season in seasons:
+        try:
+            stats["archived"][season] = archive_season(repo, season, args.archive_dir, overwrite=args.overwrite)
+        except (ValueError, OSError) as e:
+            stats["errors"][season] = str(e)
+    stats["total_s"] = round(time.perf_counter() - started, 3)
+    return stats, len(stats["errors"])
+
+
+# Migawka dziennika zmian: --baseline z bieżących tabel (przy włączaniu dziennika na istniejących
+# danych), bez niego - ze stanu odtworzonego z dziennika, jeśli od poprzedniej migawki przybyło zdarzeń
+def run_events_snapshot(args):
+    repo, store = connect(args)
+    started = time.perf_counter()
+    if args.baseline:
+        snapshot = baseline_snapshot(repo)
+    else:
+        snapshot = maybe_snapshot(repo, every=args.snapshot_every)
+    if store is not None and snapshot:
+        store.dump(args.dump)
+    stats = {"command": args.command, "snapshot": snapshot or "brak nowych zdarzeń",
+             "total_s": round(time.perf_counter() - started, 3)}
+    return stats, 0
+
+
+# Klasyfikacja odtworzona z dziennika zmian na chwilę --at (domyślnie teraz); z --since także zmiana
+# punktów i pozycji od tamtej chwili
+def run_replay(args):
+    repo, _ = connect(args)
+    started = time.perf_counter()
+    at = parse_time(args.at)
+    races = {r['id']: r for r in repo.get_all_races()}
+    state = rebuild_state(repo, at=at)
+    leaderboard = state.leaderboard(races, season=args.season)
+    stats = {
+        "command": args.command,
+        "at": at or "teraz",
+        "snapshot_at": state.snapshot_at,
+        "events_replayed": state.events_applied,
+        "rescored_submissions": state.rescored,
+        "replay_s": round(time.perf_counter() - started, 3),
+    }
+    table = leaderboard["table"] if leaderboard is not None else None
+    if args.since:
+        before = rebuild_state(repo, at=parse_time(args.since)).leaderboard(races, season=args.season)
+        table = standings_diff(before["table"] if before is not None else None, table)
+    stats["standings"] = [] if table is None else table.to_dict('records')
+    stats["total_s"] = round(time.perf_counter() - started, 3)
+    return stats, 0
+
+
+# Czas z linii poleceń (ISO; bez strefy - czas lokalny)
+def parse_time(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+# Harmonogram cyklu życia wyścigów jako osobny proces: otwarcie i zamknięcie wyścigów według terminów
+# oraz odbudowa agregatów po zmianie wyników. Aplikacja uruchomiona z F1_SCHEDULER=worker go nie uruchamia.
+def run_scheduler(args):
+    repo, store = connect(args)
+    scheduler = LifecycleScheduler(repo, interval=args.interval, shared=shared_cache.tier,
+                                   snapshot_every=args.snapshot_every)
+    while True:
+        try:
+            report = scheduler.tick()
+        except Exception as e:
+            if args.once:
+                raise
+            print(f"Błąd harmonogramu: {e}", file=sys.stderr)
+            time.sleep(scheduler.interval)
+            continue
+
+        changed = bool(report['opened'] or report['closed'] or report['rebuilt'] or report.get('snapshot'))
+        if store is not None and changed:
+            store.dump(args.dump)
+        if args.once:
+            return report, 0
+        if changed:
+            report['at'] = datetime.now().isoformat(timespec='seconds')
+            print_report(report, args.json)
+        time.sleep(scheduler.next_wait())
+
+
+def print_report(stats, as_json):
+    if as_json:
+        print(json.dumps(stats, indent=2, ensure_ascii=False, default=str))
+        return
+    for key, value in stats.items():
+        if isinstance(value, (list, dict)):
+            print(f"{key:>22}: {len(value)}")
+            for item in (value.items() if isinstance(value, dict) else value):
+                print(f"{'':>24}{item}")
+        else:
+            print(f"{key:>22}: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Operacje wsadowe F1 Ankietka")
+    parser.add_argument("command", choices=["rescore", "rebuild", "check", "all", "dump", "migrate-extra-keys", "sync-answers",
+                                            "scheduler", "import-results", "archive-seasons", "events-snapshot", "replay"],
+                        help="rescore - sumy punktów (scoring_totals), rebuild - statystyki tłumu "
+                             "(race_crowd_stats), check - kontrole spójności, all - wszystko, dump - zrzut bazy, "
+                             "migrate-extra-keys - klucze odpowiedzi dodatkowych na id pytań, "
+                             "sync-answers - uzupełnienie submission_answers, "
+                             "scheduler - otwieranie/zamykanie wyścigów i punktacja po zapisaniu wyników, "
+                             "import-results - wyniki wyścigów z pliku, "
+                             "archive-seasons - zakończone sezony do archiwum Parquet, "
+                             "events-snapshot - migawka dziennika zmian, "
+                             "replay - klasyfikacja z dziennika zmian na wybraną chwilę")
+    parser.add_argument("--dump", help="lokalny zrzut bazy (JSON) zamiast Supabase; zmiany są zapisywane do tego pliku")
+    parser.add_argument("--secrets", default=SECRETS_PATH, help="plik secrets.toml z danymi Supabase")
+    parser.add_argument("--out", default="f1_dump.json", help="plik wynikowy polecenia dump")
+    parser.add_argument("--ruleset", type=int, action="append", choices=list(SCORING_RULESETS),
+                        help="wersja zasad do przeliczenia (domyślnie wszystkie)")
+    parser.add_argument("--workers", type=int, default=None, help="liczba procesów (domyślnie liczba rdzeni)")
+    parser.add_argument("--chunks-per-worker", type=int, default=4, help="liczba paczek wyścigów na proces")
+    parser.add_argument("--fix-duplicates", action="store_true",
+                        help="check: usuń zdublowane typy i wyniki, zostawiając najnowsze (kopia w duplicate_backups; "
+                             "z --dry-run tylko raport)")
+    parser.add_argument("--dry-run", action="store_true", help="nie zapisuj niczego w bazie")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="scheduler: odstęp między przebiegami [s]")
+    parser.add_argument("--once", action="store_true", help="scheduler: jeden przebieg i koniec (np. z crona)")
+    parser.add_argument("--feed", help="import-results: plik z klasyfikacją wyścigów")
+    parser.add_argument("--format", choices=list(ADAPTERS), help="import-results: format pliku (domyślnie z rozszerzenia)")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="import-results: zastąp istniejące wyniki; archive-seasons: zastąp archiwum sezonu")
+    parser.add_argument("--create-races", action="store_true", help="import-results: dodaj brakujące wyścigi")
+    parser.add_argument("--season", type=int, help="archive-seasons: sezon do archiwizacji (domyślnie wszystkie zakończone); "
+                             "replay: klasyfikacja tylko tego sezonu")
+    parser.add_argument("--archive-dir", default=os.environ.get("F1_ARCHIVE_DIR", ".archive"),
+                        help="archive-seasons: katalog archiwum sezonów")
+    parser.add_argument("--baseline", action="store_true", help="events-snapshot: migawka z bieżących tabel")
+    parser.add_argument("--snapshot-every", type=int, default=DEFAULT_SNAPSHOT_EVERY,
+                        help="events-snapshot, scheduler: migawka po tylu nowych zdarzeniach")
+    parser.add_argument("--at", help="replay: chwila (ISO, np. 2026-05-01T12:00; domyślnie teraz)")
+    parser.add_argument("--since", help="replay: pokaż zmianę klasyfikacji od tej chwili")
+    parser.add_argument("--json", action="store_true", help="raport w formacie JSON")
+    args = parser.parse_args()
+
+    commands = {"dump": run_dump, "migrate-extra-keys": run_migrate_extra_keys, "sync-answers": run_sync_answers,
+                "scheduler": run_scheduler, "import-results": run_import_results,
+                "archive-seasons": run_archive_seasons, "events-snapshot": run_events_snapshot, "replay": run_replay}
+    stats, issues = commands.get(args.command, run_maintenance)(args)
+    print_report(stats, args.json)
+    # Niezerowy kod wyjścia, gdy kontrole znalazły problemy (do użycia w cronie/CI)
+    sys.exit(1 if issues else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+# Logika aplikacji F1 Ankietka niezależna od Streamlit: modele, punktacja,
+# agregacje i dostęp do danych. Używana przez interfejs i skrypty wsadowe.
+
+from f1_core.repositories import F1Repository
+from f1_core.scoring import ACTIVE_RULESET_VERSION, SCORING_RULESETS, calculate_points
+
+__all__ = ["F1Repository", "ACTIVE_RULESET_VERSION", "SCORING_RULESETS", "calculate_points"]
@@ -0,0 +1,204 @@
+import pandas as pd
+
+from f1_core.models import PODIUM_FIELDS, PREDICTION_FIELDS
+from f1_core.scoring import (
+    ACTIVE_RULESET_VERSION, SCORING_RULESETS, calculate_points, score_breakdown, score_frame
+)
+from f1_core.simulation import counts_to_probs, simulate_positions
+
+# Agregacje na danych z bazy: klasyfikacja, trend punktów, historia użytkownika,
+# przeliczenia historii i dane wejściowe symulacji.
+
+
+# Funkcja zliczająca typowania dla jednego pola (rozkład typowań)
+def count_predictions(submissions, field):
+    counts = {}
+    for sub in submissions:
+        counts[sub[field]] = counts.get(sub[field], 0) + 1
+    return counts
+
+
+# Rozkład odpowiedzi na pytania dodatkowe policzony z extra_answers (gdy widok
+# submission_answer_counts jest niedostępny); wiersze jak w widoku
+def answer_counts_from_submissions(submissions, question_ids):
+    wanted = {str(qid) for qid in question_ids}
+    counts = {}
+    for sub in submissions:
+        for key, value in (sub.get('extra_answers') or {}).items():
+            if key in wanted:
+                counts[(int(key), str(value))] = counts.get((int(key), str(value)), 0) + 1
+    return [
+        {"question_id": question_id, "answer": answer, "submissions": n}
+        for (question_id, answer), n in counts.items()
+    ]
+
+
+# Punkty każdego typu z historii wraz z nazwą i datą wyścigu
+def score_history(results_by_race, race_data_by_id, scored_subs):
+    all_submissions = []
+    for submission in scored_subs:
+        rid = submission['race_id']
+        race_data = race_data_by_id[rid]
+        all_submissions.append({
+            "user_name": submission['user_name'],
+            "race_id": rid,
+            "race_name": race_data['race_name'],
+            "race_date": race_data['race_date'],
+            "points": calculate_points(submission, results_by_race[rid])
+        })
+    return pd.DataFrame(all_submissions)
+
+
+# Tabela klasyfikacji generalnej
+def leaderboard_table(all_subs_df):
+    # Grupuj po użytkowniku i sumuj punkty
+    user_points = all_subs_df.groupby('user_name')['points'].sum().reset_index()
+    user_points = user_points.sort_values('points', ascending=False)
+
+    # Dodaj ranking
+    user_points['pozycja'] = user_points['points'].rank(method='min', ascending=False).astype(int)
+    user_points = user_points[['pozycja', 'user_name', 'points']]
+    user_points.columns = ['Pozycja', 'Imię', 'Suma punktów']
+
+    # Dodaj liczbę wyścigów
+    races_count = all_subs_df.groupby('user_name').size().reset_index()
+    races_count.columns = ['Imię', 'Liczba wyścigów']
+
+    user_points = user_points.merge(races_count, on='Imię')
+    user_points['Średnio na wyścig'] = (user_points['Suma punktów'] / user_points['Liczba wyścigów']).round(1)
+
+    return user_points[['Pozycja', 'Imię', 'Suma punktów', 'Liczba wyścigów', 'Średnio na wyścig']]
+
+
+# Macierz skumulowanych punktów: wyścigi (chronologicznie) x użytkownicy
+def trend_matrix(all_subs_df):
+    trend_df = all_subs_df.copy()
+    trend_df['race_date_parsed'] = pd.to_datetime(trend_df['race_date'], errors='coerce', utc=True)
+    trend_df = trend_df.sort_values(['race_date_parsed', 'race_id'])
+    trend_df['points_cum'] = trend_df.groupby('user_name')['points'].cumsum()
+
+    # race_id gwarantuje unikalność i poprawną kolejność, nawet przy zbieżnych/brakujących datach lub powtarzających się nazwach wyścigów
+    race_order = (
+        trend_df.drop_duplicates('race_id')
+        .sort_values(['race_date_parsed', 'race_id'])[['race_id', 'race_name']]
+    )
+    trend_pivot = trend_df.pivot_table(index='race_id', columns='user_name', values='points_cum', aggfunc='last')
+    trend_pivot = trend_pivot.reindex(race_order['race_id'])
+    trend_pivot.index = race_order['race_name']
+    # Utrzymaj skumulowaną wartość dla użytkowników, którzy pominęli dany wyścig
+    return trend_pivot.ffill()
+
+
+# Dane klasyfikacji generalnej (tabela i macierz trendu) albo None, gdy brak rozliczonych typów
+def compute_leaderboard(results_by_race, race_data_by_id, scored_subs):
+    all_subs_df = score_history(results_by_race, race_data_by_id, scored_subs)
+    if all_subs_df.empty:
+        return None
+    return {
+        "table": leaderboard_table(all_subs_df),
+        "trend": trend_matrix(all_subs_df),
+    }
+
+
+# Dane klasyfikacji z punktów użytkowników w wyścigach policzonych w bazie (widok user_race_points)
+def leaderboard_from_race_points(race_points):
+    if not race_points:
+        return None
+    race_points_df = pd.DataFrame(race_points)
+    return {
+        "table": leaderboard_table(race_points_df),
+        "trend": trend_matrix(race_points_df),
+    }
+
+
+# Rozkład typowań w polu z widoku race_field_value_counts (jak count_predictions)
+def field_counts_from_rows(value_counts, field):
+    return {row['value']: row['submissions'] for row in value_counts if row['field'] == field}
+
+
+# Czy dwie wersje danych klasyfikacji są zgodne (weryfikacja obliczeń w bazie z obliczeniami w pandas)
+def leaderboards_match(left, right):
+    if left is None or right is None:
+        return left is right
+    columns = ['Pozycja', 'Imię', 'Suma punktów']
+    left_table = left["table"][columns].sort_values(columns[:2]).reset_index(drop=True)
+    right_table = right["table"][columns].sort_values(columns[:2]).reset_index(drop=True)
+    return left_table.equals(right_table) and left["trend"].equals(right["trend"])
+
+
+# Historia typów jednego użytkownika z punktami i trafieniami w rozliczonych wyścigach
+def build_user_history(user_subs, results_by_race, race_data_by_id):
+    history = []
+    for submission in user_subs:
+        rid = submission['race_id']
+        race_data = race_data_by_id.get(rid, {})
+        row = {
+            "race_id": rid,
+            "race_name": race_data.get('race_name', str(rid)),
+            "race_date": race_data.get('race_date'),
+            "scored": rid in results_by_race,
+            "points": None,
+            "submission": submission,
+        }
+        if rid in results_by_race:
+            row["points"] = calculate_points(submission, results_by_race[rid])
+            row["hits"] = score_breakdown(submission, results_by_race[rid])
+        history.append(row)
+
+    history.sort(key=lambda h: (str(h['race_date']), h['race_id']))
+    return history
+
+
+# Sumy punktów użytkowników po przeliczeniu całej historii według wybranej wersji zasad
+def rescore_totals(results_by_race, scored_subs, ruleset_version):
+    subs_df = pd.DataFrame(scored_subs)
+    results_df = pd.DataFrame(list(results_by_race.values()))
+    subs_df['points'] = score_frame(subs_df, results_df, SCORING_RULESETS[ruleset_version])
+    totals = subs_df.groupby('user_name').agg(points=('points', 'sum'), races=('race_id', 'nunique')).reset_index()
+    totals['ruleset_version'] = ruleset_version
+    return totals
+
+
+# Symulacja Monte Carlo sezonu na podstawie rozkładów typowań z historii
+def season_simulation_table(results_by_race, scored_subs, n_races, n_sims, workers=None):
+    subs_df = pd.DataFrame(scored_subs)
+    subs_df['points'] = [calculate_points(s, results_by_race[s['race_id']]) for s in scored_subs]
+    users = sorted(subs_df['user_name'].unique())
+    base_points = subs_df.groupby('user_name')['points'].sum().reindex(users).to_numpy()
+
+    # Rozkłady typowań każdego użytkownika i całej grupy dla kolejnych pól; pola podium mają wspólną
+    # listę kierowców, żeby typ kierowcy z podium na innej pozycji dało się porównać z wynikiem
+    podium_drivers = sorted(set().union(*(subs_df[pos].astype(str) for pos in PODIUM_FIELDS)))
+    choice_probs, outcome_probs = [], []
+    for field in PREDICTION_FIELDS:
+        field_counts = pd.crosstab(subs_df['user_name'], subs_df[field].astype(str)).reindex(users, fill_value=0)
+        if field in PODIUM_FIELDS:
+            field_counts = field_counts.reindex(columns=podium_drivers, fill_value=0)
+        choice_probs.append(counts_to_probs(field_counts.to_numpy()))
+        outcome_probs.append(counts_to_probs(field_counts.to_numpy().sum(axis=0)))
+
+    # Pytania dodatkowe - średnia liczba pytań na wyścig i skuteczność każdego użytkownika
+    extra_counts = [len(r.get('extra_answers') or {}) for r in results_by_race.values()]
+    extra_count = int(round(sum(extra_counts) / len(extra_counts)))
+    extra_hits = {user: [0, 0] for user in users}
+    for sub in scored_subs:
+        result_extra = results_by_race[sub['race_id']].get('extra_answers') or {}
+        for key, value in (sub.get('extra_answers') or {}).items():
+            if key in result_extra:
+                extra_hits[sub['user_name']][0] += value == result_extra[key]
+                extra_hits[sub['user_name']][1] += 1
+    extra_hit_rates = [(hits + 1) / (total + 2) for hits, total in extra_hits.values()]
+
+    position_probs = simulate_positions(
+        base_points, choice_probs, outcome_probs, n_races, n_sims,
+        ruleset=SCORING_RULESETS[ACTIVE_RULESET_VERSION], extra_count=extra_count,
+        extra_hit_rates=extra_hit_rates, workers=workers
+    )
+
+    sim_df = pd.DataFrame(
+        (position_probs * 100).round(1),
+        columns=[f"{i + 1}. miejsce (%)" for i in range(len(users))]
+    )
+    sim_df.insert(0, 'Obecne punkty', base_points)
+    sim_df.insert(0, 'Imię', users)
+    return sim_df.sort_values('1. miejsce (%)', ascending=False).reset_index(drop=True)
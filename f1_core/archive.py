@@ -0,0 +1,158 @@
+import functools
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from f1_core.aggregation import leaderboard_table, score_history, trend_matrix
+from f1_core.models import hot_season, season_of
+from f1_core.scoring import ACTIVE_RULESET_VERSION
+
+# Archiwum zakończonych sezonów: każdy sezon (rok kalendarzowy race_date) zamrożony w osobnym
+# katalogu z plikami Parquet (kompresja zstd), które po zapisaniu już się nie zmieniają.
+# Klasyfikacja bieżącego sezonu jest liczona z bazy tylko dla jego wyścigów, a klasyfikacja
+# wszech czasów łączy końcowe tabele z archiwum z sezonami, których jeszcze nie zarchiwizowano.
+# Dane sezonu zostają w bazie - archiwum tylko zdejmuje z zapytań pracę nad starymi sezonami.
+#
+# Układ katalogu archiwum:
+#   season-<rok>/manifest.json    - wersja formatu, sezon, liczby wyścigów i typów, wersja zasad
+#   season-<rok>/points.parquet   - punkty każdego typu (user_name, race_id, race_name, race_date, points)
+#   season-<rok>/standings.parquet - końcowa klasyfikacja sezonu (jak tabela klasyfikacji)
+#   season-<rok>/trend.parquet    - skumulowane punkty po kolejnych wyścigach
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+COMPRESSION = "zstd"
+
+
+def season_path(directory, season):
+    return os.path.join(directory, f"season-{season}")
+
+
+def _write_frame(frame, path, preserve_index=False):
+    table = pa.Table.from_pandas(frame, preserve_index=preserve_index)
+    pq.write_table(table, path, compression=COMPRESSION)
+    return os.path.getsize(path)
+
+
+# Zamrożenie sezonu w archiwum. Sezon musi być zakończony: wcześniejszy niż bieżący i bez aktywnych
+# wyścigów. Istniejące archiwum sezonu jest zastępowane tylko z overwrite=True. Zwraca manifest.
+def archive_season(repo, season, directory, overwrite=False):
+    races = repo.get_all_races()
+    current = hot_season(races, repo.get_scored_race_ids())
+    if current is not None and season >= current:
+        raise ValueError(f"Sezon {season} nie jest zakończony (bieżący sezon: {current})")
+    season_races = [r for r in races if season_of(r) == season]
+    if not season_races:
+        raise ValueError(f"Brak wyścigów w sezonie {season}")
+    active = [r['race_name'] for r in season_races if r.get('is_active')]
+    if active:
+        raise ValueError(f"Sezon {season} ma aktywne wyścigi: {', '.join(active)}")
+
+    target = season_path(directory, season)
+    if os.path.exists(target) and not overwrite:
+        raise FileExistsError(f"Sezon {season} jest już zarchiwizowany ({target})")
+
+    results_by_race, race_data_by_id, scored_subs = repo.fetch_results_history(season=season)
+    points = score_history(results_by_race, race_data_by_id, scored_subs)
+    if points.empty:
+        raise ValueError(f"Sezon {season} nie ma rozliczonych typów")
+
+    # Zapis do katalogu tymczasowego i podmiana - czytelnik widzi całe archiwum sezonu albo nic
+    os.makedirs(directory, exist_ok=True)
+    staging = os.path.join(directory, f".season-{season}.{os.getpid()}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    sizes = {
+        "points": _write_frame(points, os.path.join(staging, "points.parquet")),
+        "standings": _write_frame(leaderboard_table(points), os.path.join(staging, "standings.parquet")),
+        "trend": _write_frame(trend_matrix(points), os.path.join(staging, "trend.parquet"), preserve_index=True),
+    }
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "season": season,
+        "races": len(results_by_race),
+        "submissions": len(points),
+        "users": int(points['user_name'].nunique()),
+        "ruleset_version": ACTIVE_RULESET_VERSION,
+        "created_at": time.time(),
+        "bytes": sum(sizes.values()),
+    }
+    with open(os.path.join(staging, MANIFEST), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False)
+
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    os.rename(staging, target)
+    return manifest
+
+
+# Manifesty zarchiwizowanych sezonów: {sezon: manifest}
+def list_archives(directory):
+    archives = {}
+    if not os.path.isdir(directory):
+        return archives
+    for entry in os.listdir(directory):
+        if not entry.startswith("season-"):
+            continue
+        try:
+            with open(os.path.join(directory, entry, MANIFEST), encoding="utf-8") as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            continue
+        if manifest.get("format_version") == FORMAT_VERSION:
+            archives[manifest["season"]] = manifest
+    return dict(sorted(archives.items()))
+
+
+# Klasyfikacja zarchiwizowanego sezonu {"table": ..., "trend": ...}. Archiwum się nie zmienia,
+# więc odczyt jest zapamiętywany (created_at odróżnia archiwum zapisane ponownie z overwrite=True).
+def load_archive(directory, season):
+    manifest = list_archives(directory).get(season)
+    if manifest is None:
+        return None
+    return _read_archive(season_path(directory, season), manifest["created_at"])
+
+
+@functools.lru_cache(maxsize=32)
+def _read_archive(path, created_at):
+    return {
+        "table": pq.read_table(os.path.join(path, "standings.parquet")).to_pandas(),
+        "trend": pq.read_table(os.path.join(path, "trend.parquet")).to_pandas(),
+    }
+
+
+# Klasyfikacja wszech czasów z tabel sezonów {sezon: tabela klasyfikacji}: suma punktów, liczba sezonów,
+# tytuły (pierwsze miejsca) i najlepsze miejsce w zakończonych sezonach (bez current_season) oraz punkty
+# w każdym sezonie
+def all_time_standings(season_tables, current_season=None):
+    frames = [table.assign(Sezon=season) for season, table in season_tables.items() if table is not None]
+    if not frames:
+        return None
+    combined = pd.concat(frames, ignore_index=True)
+    standings = combined.groupby('Imię').agg(
+        points=('Suma punktów', 'sum'),
+        seasons=('Sezon', 'nunique'),
+        races=('Liczba wyścigów', 'sum'),
+    ).reset_index()
+    finished = combined[combined['Sezon'] != current_season].groupby('Imię')['Pozycja']
+    standings['titles'] = standings['Imię'].map(finished.apply(lambda positions: int((positions == 1).sum())))
+    standings['titles'] = standings['titles'].fillna(0).astype(int)
+    standings['best'] = standings['Imię'].map(finished.min()).astype('Int64')
+    standings['Pozycja'] = standings['points'].rank(method='min', ascending=False).astype(int)
+    standings['Średnio na wyścig'] = (standings['points'] / standings['races']).round(1)
+    standings = standings.rename(columns={
+        'points': 'Suma punktów', 'seasons': 'Sezony', 'titles': 'Tytuły',
+        'best': 'Najlepsze miejsce', 'races': 'Liczba wyścigów',
+    })
+
+    per_season = combined.pivot_table(index='Imię', columns='Sezon', values='Suma punktów', aggfunc='sum')
+    per_season.columns = [f"Punkty {season}" for season in per_season.columns]
+    standings = standings.merge(per_season.reset_index(), on='Imię')
+    columns = ['Pozycja', 'Imię', 'Suma punktów', 'Sezony', 'Tytuły', 'Najlepsze miejsce',
+               'Liczba wyścigów', 'Średnio na wyścig'] + list(per_season.columns)
+    return standings.sort_values(['Pozycja', 'Imię'])[columns].reset_index(drop=True)
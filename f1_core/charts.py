@@ -0,0 +1,142 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io
+
+# Wykresy klasyfikacji (Plotly) budowane bez Streamlit. Wykres trendu rośnie jak użytkownicy x wyścigi
+# i jest wysyłany do przeglądarki przy każdym przebiegu, dlatego przy dużej historii dane są odchudzane:
+#   - wyścigi: najwyżej TREND_MAX_RACES punktów na linię (równomiernie, zawsze z pierwszym i ostatnim
+#     wyścigiem) - punkty są skumulowane, więc pominięte wyścigi nie zmieniają wartości na osi
+#   - użytkownicy: osobne linie dla TREND_TOP_USERS najlepszych, pozostali jako mediana i zakres min-max
+#   - wartości jako liczby całkowite, bez znaczników i etykiet przy każdym punkcie
+# Mała historia wygląda tak jak wcześniej. Zbudowane wykresy są zapamiętywane według skrótu danych
+# (frame_digest), więc niezmieniona klasyfikacja nie jest budowana ani sprawdzana od nowa.
+
+F1_RED = "#E10600"
+TREND_MAX_RACES = 30
+TREND_TOP_USERS = 12
+# Do tylu użytkowników słupki mają etykiety z sumą punktów, a linie trendu - znaczniki
+BAR_LABEL_LIMIT = 30
+MARKER_LIMIT = 20
+REST_LABEL = "Pozostali"
+
+
+# Skrót zawartości ramki (wartości, indeks i kolumny) - klucz cache zbudowanych wykresów
+def frame_digest(*frames):
+    digest = hashlib.sha1()
+    for frame in frames:
+        digest.update(pd.util.hash_pandas_object(frame, index=True).values.tobytes())
+        digest.update(repr(list(frame.columns)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+# Indeksy równomiernie rozłożonych wierszy (najwyżej limit, zawsze pierwszy i ostatni)
+def sample_positions(length, limit):
+    if length <= limit:
+        return list(range(length))
+    return sorted(set(np.linspace(0, length - 1, limit).round().astype(int).tolist()))
+
+
+# Dane wykresu trendu: {"trend": linie użytkowników, "rest": mediana/min/max pozostałych albo None,
+# "races": liczba wszystkich wyścigów}
+def lean_trend(trend, max_races=TREND_MAX_RACES, top_users=TREND_TOP_USERS):
+    sampled = trend.iloc[sample_positions(len(trend), max_races)]
+    if len(trend.columns) <= top_users:
+        return {"trend": sampled, "rest": None, "races": len(trend), "rest_users": 0}
+    final = trend.ffill().iloc[-1].fillna(0)
+    top = final.sort_values(ascending=False, kind='stable').index[:top_users]
+    rest = sampled.drop(columns=top)
+    return {
+        "trend": sampled[top],
+        "rest": pd.DataFrame({
+            "median": rest.median(axis=1),
+            "min": rest.min(axis=1),
+            "max": rest.max(axis=1),
+        }),
+        "races": len(trend),
+        "rest_users": len(rest.columns),
+    }
+
+
+def _ints(values):
+    return [None if pd.isna(value) else int(round(value)) for value in values]
+
+
+def bar_figure(table):
+    labeled = len(table) <= BAR_LABEL_LIMIT
+    fig = go.Figure(
+        go.Bar(
+            x=table['Imię'].tolist(),
+            y=_ints(table['Suma punktów']),
+            marker_color=F1_RED,
+            text=_ints(table['Suma punktów']) if labeled else None,
+            textposition='outside' if labeled else None,
+            textfont=dict(size=18) if labeled else None,
+        )
+    )
+    fig.update_layout(
+        template="plotly_white",
+        yaxis_title="Suma punktów",
+        xaxis_title=None,
+        margin=dict(t=30, b=20, l=10, r=10),
+        showlegend=False,
+        font=dict(size=16)
+    )
+    fig.update_xaxes(tickfont=dict(size=16))
+    fig.update_yaxes(showgrid=True, gridcolor="#eeeeee", tickfont=dict(size=14), title_font=dict(size=16))
+    return fig
+
+
+# Wykres trendu z gotowego wyniku lean_trend (liczonego raz także na potrzeby podpisu wykresu)
+def trend_figure(lean):
+    lines = lean["trend"]
+    race_labels = list(lines.index)
+    markers = len(race_labels) <= MARKER_LIMIT
+    fig = go.Figure()
+    rest = lean["rest"]
+    if rest is not None:
+        # Zakres pozostałych jako pasek (górna krawędź wypełniona do dolnej) i ich mediana
+        fig.add_trace(go.Scatter(
+            x=race_labels, y=_ints(rest["min"]), mode='lines', line=dict(width=0),
+            hoverinfo='skip', showlegend=False,
+        ))
+        fig.add_trace(go.Scatter(
+            x=race_labels, y=_ints(rest["max"]), mode='lines', line=dict(width=0),
+            fill='tonexty', fillcolor="rgba(0,0,0,0.08)", hoverinfo='skip',
+            name=f"{REST_LABEL} ({lean['rest_users']}): min-max",
+        ))
+        fig.add_trace(go.Scatter(
+            x=race_labels, y=_ints(rest["median"]), mode='lines',
+            line=dict(width=2, dash='dot', color="rgba(0,0,0,0.45)"),
+            name=f"{REST_LABEL}: mediana",
+        ))
+    for user in lines.columns:
+        fig.add_trace(go.Scatter(
+            x=race_labels, y=_ints(lines[user]),
+            mode='lines+markers' if markers else 'lines', name=user,
+            line=dict(width=3), marker=dict(size=8) if markers else None,
+        ))
+    fig.update_layout(
+        template="plotly_white",
+        yaxis_title="Suma punktów (narastająco)",
+        xaxis_title=None,
+        margin=dict(t=30, b=20, l=10, r=10),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0, font=dict(size=15)),
+        font=dict(size=16)
+    )
+    # Wymuś kolejność chronologiczną na osi X (kategorie tekstowe domyślnie sortowałyby się alfabetycznie)
+    fig.update_xaxes(
+        categoryorder='array', categoryarray=race_labels, tickfont=dict(size=15),
+        showgrid=True, gridcolor="rgba(0,0,0,0.06)"
+    )
+    fig.update_yaxes(
+        showgrid=True, gridcolor="rgba(0,0,0,0.06)", tickfont=dict(size=14), title_font=dict(size=16)
+    )
+    return fig
+
+
+# Rozmiar wykresu wysyłanego do przeglądarki (JSON, jak w st.plotly_chart)
+def figure_bytes(fig):
+    return len(plotly.io.to_json(fig, validate=False).encode('utf-8'))
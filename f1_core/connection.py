@@ -0,0 +1,71 @@
+import importlib.util
+import time
+
+import httpx
+import supabase
+from postgrest.utils import SyncClient
+
+# Klient Supabase z jednym, współdzielonym połączeniem HTTP: keep-alive, HTTP/2 (pakiet h2 z zależności
+# httpx[http2] - wiele zapytań równolegle w jednym połączeniu), limity czasu i ponawianie zapytań
+# odczytu z wykładniczym opóźnieniem. Nieudane nawiązanie połączenia ponawia tylko transport httpx.
+
+TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 0.2
+# Kody odpowiedzi, po których ponawiamy zapytanie (chwilowa niedostępność serwera)
+RETRY_STATUSES = {502, 503, 504}
+# Ponawiane są tylko zapytania bez skutków ubocznych
+RETRY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def http2_available():
+    return importlib.util.find_spec("h2") is not None
+
+
+class RetryTransport(httpx.HTTPTransport):
+    def __init__(self, attempts=RETRY_ATTEMPTS, backoff=RETRY_BACKOFF, **kwargs):
+        # retries= w HTTPTransport ponawia tylko nieudane nawiązanie połączenia (bezpieczne dla każdej metody)
+        super().__init__(retries=attempts - 1, **kwargs)
+        self.attempts = attempts
+        self.backoff = backoff
+
+    def handle_request(self, request):
+        if request.method not in RETRY_METHODS:
+            return super().handle_request(request)
+
+        for attempt in range(self.attempts):
+            last = attempt == self.attempts - 1
+            try:
+                response = super().handle_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                # Nawiązanie połączenia ponowił już HTTPTransport (retries=) - bez drugiej warstwy prób
+                raise
+            except (httpx.TimeoutException, httpx.NetworkError):
+                if last:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or last:
+                    return response
+                response.close()
+            time.sleep(self.backoff * 2 ** attempt)
+
+
+# Sesja HTTP klienta PostgREST z pulą połączeń, HTTP/2 i ponawianiem zapytań
+def tuned_session(base_url, headers, timeout=TIMEOUT, limits=LIMITS,
+                  attempts=RETRY_ATTEMPTS, backoff=RETRY_BACKOFF):
+    http2 = http2_available()
+    transport = RetryTransport(attempts=attempts, backoff=backoff, http2=http2, limits=limits)
+    return SyncClient(base_url=base_url, headers=headers, timeout=timeout, http2=http2, transport=transport)
+
+
+# Klient Supabase ze strojoną sesją PostgREST. Inne klienty (np. lokalna baza z f1_core.local_db
+# podstawiona w testach obciążeniowych) są zwracane bez zmian.
+def create_supabase_client(url, key, **session_options):
+    client = supabase.create_client(url, key)
+    if isinstance(client, supabase.Client):
+        postgrest = client.postgrest
+        default_session = postgrest.session
+        postgrest.session = tuned_session(default_session.base_url, default_session.headers, **session_options)
+        default_session.close()
+    return client
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+from f1_core.models import PREDICTION_FIELDS
+
+# Statystyki "mądrości tłumu" dla wyścigów: typ konsensusu, entropia typowań
+# i trafienia wbrew większości.
+
+CROWD_FIELDS = PREDICTION_FIELDS
+
+
+# Zamiana listy rekordów na format długi (race_id, [user_name], field, value)
+def _to_long(rows, id_columns):
+    df = pd.DataFrame(rows)
+    df = df[id_columns + [f for f in CROWD_FIELDS if f in df.columns]]
+    long_df = df.melt(id_vars=id_columns, var_name='field', value_name='value')
+    # Porównujemy wartości jako tekst, żeby bool/int/str z JSON-a zachowywały się tak samo
+    long_df['value'] = long_df['value'].astype(str)
+    return long_df
+
+
+# Pusty rekord statystyk - wyścig z wynikami, ale bez typów. Zapisany rekord oznacza, że statystyki
+# są aktualne dla tej wersji wyników i nie trzeba ich przeliczać przy każdym odczycie.
+def empty_crowd_stats(race_id, results_updated_at):
+    return {"race_id": race_id, "results_updated_at": results_updated_at,
+            "consensus": {}, "entropy": {}, "contrarian": {}}
+
+
+# Obliczenie statystyk dla wielu wyścigów naraz (jedno grupowanie dla całej historii).
+# Zwraca słownik race_id -> rekord gotowy do zapisania w tabeli race_crowd_stats - także dla
+# wyścigów z wynikami bez typów (pusty rekord).
+def compute_crowd_stats(submissions, results):
+    if not results:
+        return {}
+    empty = {r['race_id']: empty_crowd_stats(r['race_id'], r.get('updated_at')) for r in results}
+    if not submissions:
+        return empty
+
+    subs_long = _to_long(submissions, ['race_id', 'user_name'])
+    results_long = _to_long(results, ['race_id']).rename(columns={'value': 'result'})
+
+    counts = subs_long.groupby(['race_id', 'field', 'value']).size().rename('count').reset_index()
+    counts['total'] = counts.groupby(['race_id', 'field'])['count'].transform('sum')
+    counts['max_count'] = counts.groupby(['race_id', 'field'])['count'].transform('max')
+    share = counts['count'] / counts['total']
+    counts['entropy'] = -share * np.log2(share)
+
+    entropy = counts.groupby(['race_id', 'field'])['entropy'].sum().round(3)
+    # Przy remisie typem konsensusu zostaje pierwsza wartość alfabetycznie
+    consensus = (
+        counts.sort_values(['race_id', 'field', 'count', 'value'], ascending=[True, True, False, True])
+        .drop_duplicates(['race_id', 'field'])
+        .set_index(['race_id', 'field'])['value']
+    )
+
+    # Typ "wbrew większości" to każdy typ mniej popularny niż najczęstszy
+    scored = subs_long.merge(counts[['race_id', 'field', 'value', 'count', 'max_count']],
+                             on=['race_id', 'field', 'value'])
+    scored = scored.merge(results_long, on=['race_id', 'field'], how='left')
+    scored['against'] = scored['count'] < scored['max_count']
+    scored['against_right'] = scored['against'] & (scored['value'] == scored['result'])
+    contrarian = scored.groupby(['race_id', 'user_name'])[['against', 'against_right']].sum()
+
+    updated_at = {r['race_id']: r.get('updated_at') for r in results}
+    stats = dict(empty)
+    for race_id in entropy.index.get_level_values('race_id').unique().tolist():
+        race_consensus = consensus.loc[race_id].to_dict()
+        race_contrarian = contrarian.loc[race_id] if race_id in contrarian.index else contrarian.iloc[0:0]
+        stats[race_id] = {
+            "race_id": race_id,
+            "results_updated_at": updated_at.get(race_id),
+            "consensus": race_consensus,
+            "entropy": entropy.loc[race_id].to_dict(),
+            "contrarian": {
+                user: [int(row['against']), int(row['against_right'])]
+                for user, row in race_contrarian.iterrows()
+            },
+        }
+    return stats
+
+
+# Zsumowanie wyniku "kontrarianina" każdego użytkownika z zapisanych statystyk wyścigów
+def contrarian_scores(stats_rows):
+    totals = {}
+    for row in stats_rows:
+        for user, (against, against_right) in (row.get('contrarian') or {}).items():
+            user_total = totals.setdefault(user, [0, 0])
+            user_total[0] += against
+            user_total[1] += against_right
+
+    scores_df = pd.DataFrame(
+        [(user, against, right) for user, (against, right) in totals.items()],
+        columns=['Imię', 'Typy wbrew większości', 'Trafione wbrew większości']
+    )
+    against = scores_df['Typy wbrew większości']
+    scores_df['Skuteczność (%)'] = (
+        (scores_df['Trafione wbrew większości'] / against.where(against > 0)) * 100
+    ).fillna(0).round(1)
+    return scores_df.sort_values(['Trafione wbrew większości', 'Skuteczność (%)'], ascending=False).reset_index(drop=True)
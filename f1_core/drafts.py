@@ -0,0 +1,112 @@
+import atexit
+import threading
+import time
+from datetime import datetime, timezone
+
+# Szkice typów (tabela submission_drafts, sql/007): stan formularza typowania dla pary
+# (wyścig, użytkownik), żeby zerwana sesja (np. telefon tuż przed startem) nie traciła typów.
+# Każda zmiana pola formularza trafia do kolejki w pamięci procesu, gdzie nowsza wersja szkicu
+# zastępuje starszą; wątek w tle co flush_interval sekund zapisuje jednym upsertem wszystkie
+# szkice, które nie zmieniały się od debounce sekund. Szkic z kolejki jest widoczny od razu
+# (pending_draft), zanim trafi do bazy. Porzucenie szkicu (discard) zmienia jego generację:
+# zapis starszej generacji, który był już w drodze, jest potem usuwany, a po błędzie nie wraca do kolejki.
+
+DEFAULT_FLUSH_INTERVAL = 2.0
+DEFAULT_DEBOUNCE = 1.0
+
+
+class DraftWriter:
+    def __init__(self, repo, flush_interval=DEFAULT_FLUSH_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+        self.repo = repo
+        self.flush_interval = flush_interval
+        self.debounce = debounce
+        self.lock = threading.Lock()
+        # (race_id, user_name) -> (predictions, updated_at, czas ostatniej zmiany, generacja)
+        self.pending = {}
+        # (race_id, user_name) -> liczba porzuceń szkicu
+        self.generations = {}
+        self.thread = None
+        self.last_error = None
+        self.updates = 0
+        self.rows_written = 0
+        self.batches = 0
+        atexit.register(self.flush, True)
+
+    def save(self, race_id, user_name, predictions):
+        key = (race_id, user_name)
+        with self.lock:
+            self.pending[key] = (
+                predictions, datetime.now(timezone.utc).isoformat(), time.monotonic(), self.generations.get(key, 0)
+            )
+            self.updates += 1
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="f1-draft-writer", daemon=True)
+                self.thread.start()
+
+    # Szkic czekający w kolejce na zapis (None, jeśli go nie ma)
+    def pending_draft(self, race_id, user_name):
+        with self.lock:
+            entry = self.pending.get((race_id, user_name))
+        return entry[0] if entry else None
+
+    # Porzucenie szkicu (np. po wysłaniu typów): niezapisany wypada z kolejki, a zapisywany właśnie
+    # w tle zostanie usunięty po zapisie (szkic w bazie usuwa wywołujący)
+    def discard(self, race_id, user_name):
+        key = (race_id, user_name)
+        with self.lock:
+            self.pending.pop(key, None)
+            self.generations[key] = self.generations.get(key, 0) + 1
+
+    def _stale(self, key, entry):
+        return entry[3] != self.generations.get(key, 0)
+
+    # Zapis gotowych szkiców jednym upsertem; force=True zapisuje wszystkie, bez czekania na debounce.
+    # Przy błędzie szkice wracają do kolejki (chyba że w międzyczasie pojawiła się nowsza wersja
+    # albo szkic porzucono). Szkice porzucone w trakcie zapisu są po nim usuwane z bazy.
+    def flush(self, force=False):
+        now = time.monotonic()
+        with self.lock:
+            batch = {
+                key: entry for key, entry in self.pending.items()
+                if force or now - entry[2] >= self.debounce
+            }
+            for key in batch:
+                del self.pending[key]
+        if not batch:
+            return 0
+
+        rows = [
+            {"race_id": race_id, "user_name": user_name, "predictions": predictions, "updated_at": updated_at}
+            for (race_id, user_name), (predictions, updated_at, _, _) in batch.items()
+        ]
+        try:
+            saved = self.repo.upsert_rows('submission_drafts', rows, on_conflict='race_id,user_name')
+        except Exception as e:
+            with self.lock:
+                for key, entry in batch.items():
+                    if not self._stale(key, entry):
+                        self.pending.setdefault(key, entry)
+                self.last_error = e
+            return 0
+
+        with self.lock:
+            self.rows_written += saved
+            self.batches += 1
+            self.last_error = None
+            stale = [key for key, entry in batch.items() if self._stale(key, entry)]
+        for race_id, user_name in stale:
+            try:
+                self.repo.delete_draft(race_id, user_name)
+            except Exception as e:
+                with self.lock:
+                    self.last_error = e
+        return saved
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+            with self.lock:
+                if not self.pending:
+                    self.thread = None
+                    return
@@ -0,0 +1,246 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from f1_core.aggregation import leaderboard_table, trend_matrix
+from f1_core.models import APP_TIMEZONE, parse_deadline, season_of
+from f1_core.scoring import ACTIVE_RULESET_VERSION, calculate_points
+
+# Dziennik zmian typów i wyników (sql/010): każda zmiana wiersza w submissions i results dopisuje
+# zdarzenie z pełnym wierszem po zmianie. W Postgresie robi to wyzwalacz w tej samej transakcji co zmiana
+# (także dla migracji i skryptów wsadowych), w lokalnej bazie - LocalStore w tym samym zapytaniu.
+# Co pewien czas zapisywana jest migawka stanu (typy, wyniki i punkty każdego typu), więc klasyfikację
+# z dowolnej chwili odtwarza najbliższa wcześniejsza migawka i zdarzenia po niej - punkty są liczone
+# od nowa tylko dla typów, których dotyczy zdarzenie, a nie dla całej historii.
+#
+# Kolejność zdarzeń wyznacza occurred_at (czas zmiany), a nie kolejność zatwierdzenia transakcji. Dłuższa
+# transakcja może zatwierdzić wcześniejsze zdarzenie z opóźnieniem, dlatego migawka obejmuje zdarzenia
+# najwyżej do now - SETTLE.
+
+# Ile sekund po zmianie zdarzenie musi już być w bazie (z zapasem na długie transakcje)
+SETTLE = 60
+# Migawka po co najmniej tylu zdarzeniach od poprzedniej
+DEFAULT_SNAPSHOT_EVERY = 500
+
+ENTITIES = ('submission', 'result')
+ACTIONS = ('upsert', 'delete')
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+# Czas w formacie zapisywanym w change_events (stała liczba cyfr, więc napisy porównują się jak czasy)
+def format_time(moment):
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=APP_TIMEZONE)
+    return moment.astimezone(timezone.utc).isoformat(timespec='microseconds')
+
+
+# Klucz kolejności zdarzeń - Postgres zwraca timestamptz bez końcowych zer części ułamkowej
+def event_order(event):
+    return parse_deadline(str(event['occurred_at'])), event.get('id') or 0
+
+
+# Zdarzenia dla zapisanych wierszy (payload jak w JSON, np. daty jako napisy) - jak wyzwalacz z sql/010
+def build_events(entity, action, rows, occurred_at=None):
+    if entity not in ENTITIES or action not in ACTIONS:
+        raise ValueError(f"Nieznane zdarzenie: {entity}/{action}")
+    occurred_at = occurred_at or format_time(utc_now())
+    return [
+        {
+            "occurred_at": occurred_at,
+            "entity": entity,
+            "action": action,
+            "race_id": row.get('race_id'),
+            "user_name": row.get('user_name'),
+            "payload": json.loads(json.dumps(row, default=str)),
+        }
+        for row in rows
+    ]
+
+
+class LeaderboardState:
+    # Stan odtwarzany ze zdarzeń: typy (id -> wiersz), wyniki (race_id -> wiersz) i punkty typów
+    # w rozliczonych wyścigach (id typu -> punkty) według zasad ruleset_version
+    def __init__(self, ruleset_version=ACTIVE_RULESET_VERSION):
+        self.ruleset_version = ruleset_version
+        self.submissions = {}
+        self.results = {}
+        self.points = {}
+        self.by_race = {}
+        # Czas migawki, od której zaczęło się odtwarzanie, i ostatniego zastosowanego zdarzenia
+        self.snapshot_at = None
+        self.occurred_at = None
+        self.events_applied = 0
+        self.rescored = 0
+
+    @classmethod
+    def from_rows(cls, submissions, results, ruleset_version=ACTIVE_RULESET_VERSION):
+        state = cls(ruleset_version)
+        for row in results:
+            state.results[row['race_id']] = row
+        for row in submissions:
+            state._put_submission(row)
+        return state
+
+    # Stan z zapisanej migawki; punkty innej wersji zasad są liczone od nowa
+    @classmethod
+    def from_snapshot(cls, snapshot, ruleset_version=ACTIVE_RULESET_VERSION):
+        data = snapshot['state']
+        if isinstance(data, str):
+            data = json.loads(data)
+        points = None
+        if snapshot.get('ruleset_version') == ruleset_version:
+            points = {int(sid): value for sid, value in data['points'].items()}
+        state = cls(ruleset_version)
+        for row in data['results']:
+            state.results[row['race_id']] = row
+        for row in data['submissions']:
+            state._put_submission(row, points)
+        state.snapshot_at = state.occurred_at = snapshot['occurred_at']
+        return state
+
+    def to_snapshot(self, occurred_at):
+        return {
+            "occurred_at": occurred_at,
+            "ruleset_version": self.ruleset_version,
+            "state": json.loads(json.dumps({
+                "submissions": list(self.submissions.values()),
+                "results": list(self.results.values()),
+                "points": {str(sid): value for sid, value in self.points.items()},
+            }, default=str)),
+            "created_at": format_time(utc_now()),
+        }
+
+    # Punkty z migawki (known) albo policzone dla wyścigu z wynikami
+    def _put_submission(self, row, known=None):
+        sid = row['id']
+        self._drop_submission(sid)
+        self.submissions[sid] = row
+        self.by_race.setdefault(row['race_id'], set()).add(sid)
+        result = self.results.get(row['race_id'])
+        if result is None:
+            return
+        if known is not None and sid in known:
+            self.points[sid] = known[sid]
+        else:
+            self.points[sid] = calculate_points(row, result, self.ruleset_version)
+            self.rescored += 1
+
+    def _drop_submission(self, sid):
+        previous = self.submissions.pop(sid, None)
+        if previous is not None:
+            self.by_race.get(previous['race_id'], set()).discard(sid)
+            self.points.pop(sid, None)
+
+    def _rescore_race(self, race_id):
+        result = self.results.get(race_id)
+        for sid in self.by_race.get(race_id, ()):
+            if result is None:
+                self.points.pop(sid, None)
+            else:
+                self.points[sid] = calculate_points(self.submissions[sid], result, self.ruleset_version)
+                self.rescored += 1
+
+    def apply(self, event):
+        row = event['payload']
+        if isinstance(row, str):
+            row = json.loads(row)
+        if event['entity'] == 'submission':
+            if event['action'] == 'delete':
+                self._drop_submission(row['id'])
+            else:
+                # Ponowne wysłanie typu zmienia wiersz (race_id, user_name) w miejscu, ale typ zapisany
+                # przed wprowadzeniem unikalnego indeksu mógł mieć inne id - zostaje jeden typ na parę
+                for sid in list(self.by_race.get(row['race_id'], ())):
+                    if sid != row['id'] and self.submissions[sid]['user_name'] == row['user_name']:
+                        self._drop_submission(sid)
+                self._put_submission({**self.submissions.get(row['id'], {}), **row})
+        else:
+            race_id = row['race_id']
+            if event['action'] == 'delete':
+                self.results.pop(race_id, None)
+            else:
+                self.results[race_id] = {**self.results.get(race_id, {}), **row}
+            self._rescore_race(race_id)
+        self.occurred_at = event['occurred_at']
+        self.events_applied += 1
+
+    # Punkty każdego rozliczonego typu z nazwą i datą wyścigu (jak aggregation.score_history);
+    # z season - tylko wyścigi tego sezonu
+    def points_frame(self, race_data_by_id, season=None):
+        rows = []
+        for sid in sorted(self.points):
+            submission = self.submissions[sid]
+            race = race_data_by_id.get(submission['race_id'])
+            if race is None or (season is not None and season_of(race) != season):
+                continue
+            rows.append({
+                "user_name": submission['user_name'],
+                "race_id": submission['race_id'],
+                "race_name": race['race_name'],
+                "race_date": race['race_date'],
+                "points": self.points[sid],
+            })
+        return pd.DataFrame(rows)
+
+    # Dane klasyfikacji (jak aggregation.compute_leaderboard) albo None, gdy brak rozliczonych typów
+    def leaderboard(self, race_data_by_id, season=None):
+        points = self.points_frame(race_data_by_id, season)
+        if points.empty:
+            return None
+        return {"table": leaderboard_table(points), "trend": trend_matrix(points)}
+
+
+# Stan w chwili at (domyślnie teraz): najbliższa migawka nie późniejsza niż at i zdarzenia po niej.
+# Bez migawki odtwarzanie zaczyna się od pustego stanu (dziennik od początku istnienia danych).
+def rebuild_state(repo, at=None, ruleset_version=ACTIVE_RULESET_VERSION):
+    until = format_time(at) if isinstance(at, datetime) else at
+    snapshot = repo.get_event_snapshot(until=until)
+    state = LeaderboardState(ruleset_version) if snapshot is None else LeaderboardState.from_snapshot(snapshot, ruleset_version)
+    for event in sorted(repo.fetch_events(after=state.snapshot_at, until=until), key=event_order):
+        state.apply(event)
+    return state
+
+
+# Migawka bazowa z bieżących tabel - przy włączaniu dziennika na istniejących danych. Czas migawki
+# jest brany przed odczytem, więc zmiana w trakcie odczytu zostanie najwyżej zastosowana ponownie.
+def baseline_snapshot(repo, ruleset_version=ACTIVE_RULESET_VERSION):
+    occurred_at = format_time(utc_now())
+    data = repo.fetch_parallel(
+        submissions=lambda: repo.fetch_all('submissions'),
+        results=lambda: repo.fetch_all('results'),
+    )
+    state = LeaderboardState.from_rows(data['submissions'], data['results'], ruleset_version)
+    repo.save_event_snapshot(state.to_snapshot(occurred_at))
+    return {"occurred_at": occurred_at, "submissions": len(state.submissions), "results": len(state.results)}
+
+
+# Nowa migawka, gdy od poprzedniej przybyło co najmniej every zdarzeń. Obejmuje zdarzenia do now - SETTLE,
+# żeby zdarzenia z niezatwierdzonych jeszcze transakcji nie trafiły przed migawkę. Zwraca raport albo None.
+def maybe_snapshot(repo, every=DEFAULT_SNAPSHOT_EVERY, now=None):
+    cutoff = format_time((now or utc_now()) - timedelta(seconds=SETTLE))
+    state = rebuild_state(repo, at=cutoff)
+    if state.events_applied < every:
+        return None
+    repo.save_event_snapshot(state.to_snapshot(cutoff))
+    return {"occurred_at": cutoff, "events": state.events_applied}
+
+
+# Zmiana klasyfikacji między dwiema tabelami: punkty i pozycja przed i po dla każdego użytkownika
+def standings_diff(before, after):
+    columns = ['Imię', 'Pozycja', 'Suma punktów']
+    empty = pd.DataFrame(columns=columns)
+    before = (before if before is not None else empty)[columns]
+    after = (after if after is not None else empty)[columns]
+    diff = before.merge(after, on='Imię', how='outer', suffixes=(' przed', ' po'))
+    for column in ('Suma punktów przed', 'Suma punktów po'):
+        diff[column] = pd.to_numeric(diff[column]).fillna(0).astype(int)
+    diff['Zmiana punktów'] = diff['Suma punktów po'] - diff['Suma punktów przed']
+    diff['Zmiana pozycji'] = (pd.to_numeric(diff['Pozycja przed']) - pd.to_numeric(diff['Pozycja po'])).astype('Int64')
+    for column in ('Pozycja przed', 'Pozycja po'):
+        diff[column] = pd.to_numeric(diff[column]).astype('Int64')
+    return diff.sort_values(['Pozycja po', 'Imię'], na_position='last').reset_index(drop=True)
+
@@ -0,0 +1,39 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Równoległe wykonywanie niezależnych zapytań do bazy. Zapytania czekają głównie na sieć, więc
+# wystarczają wątki; czas widoku to czas najwolniejszego zapytania, a nie suma wszystkich.
+# Pula wątków jest wspólna dla procesu (wszystkie sesje Streamlit), tworzona przy pierwszym użyciu.
+# Zapytania nie powinny same wywoływać run() - zagnieżdżone zadania mogłyby czekać na wolny wątek puli.
+
+DEFAULT_MAX_WORKERS = 8
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(max_workers):
+    with _pools_lock:
+        if max_workers not in _pools:
+            _pools[max_workers] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="f1-query")
+        return _pools[max_workers]
+
+
+class QueryExecutor:
+    # max_workers - ile zapytań może być wykonywanych jednocześnie (1 = kolejno, w bieżącym wątku)
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        self.max_workers = max_workers
+
+    # Wykonanie zapytań podanych jako funkcje bez argumentów: run(results=lambda: ..., races=lambda: ...).
+    # Zwraca słownik wyników pod tymi samymi nazwami; jeśli któreś zapytanie zgłosi wyjątek,
+    # po zakończeniu wszystkich zgłaszany jest pierwszy z nich (w kolejności argumentów).
+    def run(self, **queries):
+        if self.max_workers <= 1 or len(queries) <= 1:
+            return {name: query() for name, query in queries.items()}
+
+        futures = {name: _pool(self.max_workers).submit(query) for name, query in queries.items()}
+        errors = [future.exception() for future in futures.values()]
+        for error in errors:
+            if error is not None:
+                raise error
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,341 @@
+import csv
+import io
+import json
+import math
+import os
+import unicodedata
+
+from f1_core.models import CLASSIFIED_DRIVERS_OPTIONS, TEAMS_DRIVERS, TIME_DIFF_OPTIONS, get_f1_drivers, utc_timestamp
+
+# Import oficjalnych wyników wyścigów z pliku zamiast ręcznego wypełniania zakładki Wyniki.
+# Adapter (ADAPTERS) zamienia plik na listę wyścigów z surową klasyfikacją, jak w danych
+# z systemu pomiaru czasu:
+#   {"race_name": ..., "race_date": "2025-03-16",
+#    "classification": [{"position": 1, "driver": ..., "team": ..., "status": ..., "time": ..., "gap": ..., "points": ...}],
+#    "race_control": [{"category": "SafetyCar", "status": "DEPLOYED", "mode": "SAFETY CAR"}, {"category": "Flag", "flag": "RED"}],
+#    "driver_of_the_day": ..., "extra_answers": {id lub treść pytania: odpowiedź}}
+# derive_results liczy z niej wszystkie punktowane pola tabeli results (podium, przedział różnicy
+# czasu, liczba sklasyfikowanych, zespoły z punktami, Safety Car, czerwona flaga), a import_results
+# zapisuje wyniki wielu wyścigów jednym upsertem.
+
+# Statusy kierowców, którzy nie zostali sklasyfikowani
+NOT_CLASSIFIED_STATUSES = {
+    "dnf", "dns", "dsq", "dq", "nc", "ret", "retired", "disqualified", "excluded", "withdrawn",
+    "did not start", "did not finish", "not classified",
+}
+# Dolne granice przedziałów liczby sklasyfikowanych kierowców (kolejność jak CLASSIFIED_DRIVERS_OPTIONS)
+CLASSIFIED_LOWER_BOUNDS = [22, 20, 18, 16, 14]
+# Górne granice przedziałów różnicy czasu [s] (kolejność jak TIME_DIFF_OPTIONS)
+TIME_DIFF_UPPER_BOUNDS = [2, 5, 10, 20]
+# Pozycje punktowane, gdy plik nie podaje punktów
+POINTS_POSITIONS = 10
+# Pola, których plik może nie podawać - import zostawia wtedy wartość zapisaną w bazie (nowy wynik: False)
+OPTIONAL_FEED_FIELDS = ('safety_car', 'red_flag')
+
+
+def _lower_keys(row):
+    return {str(key).strip().lower(): value for key, value in row.items()}
+
+
+def _parse_bool(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    text = str(value).strip().casefold()
+    if text in ("", "none", "null"):
+        return None
+    return text in ("tak", "true", "1", "yes", "y", "t")
+
+
+def _parse_number(value):
+    if value is None or str(value).strip() == "":
+        return None
+    return float(str(value).strip())
+
+
+# Czas w sekundach z "1:42:06.304", "+0.895", "+1:02.3", "12.5s"; okrążenia straty ("+1 Lap") - nieskończoność
+def parse_duration(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().lstrip("+").rstrip("s").strip()
+    if not text:
+        return None
+    if "lap" in text.casefold():
+        return math.inf
+    seconds = 0.0
+    for part in text.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def time_diff_bucket(seconds):
+    for limit, option in zip(TIME_DIFF_UPPER_BOUNDS, TIME_DIFF_OPTIONS):
+        if seconds <= limit:
+            return option
+    return TIME_DIFF_OPTIONS[-1]
+
+
+def classified_drivers_bucket(count):
+    for lower, option in zip(CLASSIFIED_LOWER_BOUNDS, CLASSIFIED_DRIVERS_OPTIONS):
+        if count >= lower:
+            return option
+    return CLASSIFIED_DRIVERS_OPTIONS[-1]
+
+
+def _fold(name):
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return " ".join(ascii_name.replace(".", " ").casefold().split())
+
+
+# Nazwa kierowcy z listy aplikacji dla nazwy z pliku ("Nico Hulkenberg" -> "Nico Hülkenberg",
+# "Carlos Sainz" -> "Carlos Sainz Jr."). Zwraca None, gdy nie da się jej jednoznacznie dopasować.
+def match_driver(name, drivers):
+    folded = _fold(name)
+    by_folded = {_fold(driver): driver for driver in drivers}
+    if folded in by_folded:
+        return by_folded[folded]
+    candidates = [
+        driver for key, driver in by_folded.items()
+        if key.startswith(folded + " ") or folded.startswith(key + " ")
+    ]
+    if not candidates:
+        surname = folded.split(" ")[-1]
+        candidates = [driver for key, driver in by_folded.items() if surname in key.split(" ")]
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def _is_classified(entry):
+    if entry.get('classified') is not None:
+        return bool(_parse_bool(entry['classified']))
+    status = str(entry.get('status') or "").strip().casefold()
+    return entry.get('position') is not None and status not in NOT_CLASSIFIED_STATUSES
+
+
+# Różnica czasu między 1. a 2. miejscem: gap drugiego kierowcy albo różnica czasów wyścigu
+def _winner_gap(winner, second):
+    gap = parse_duration(second.get('gap'))
+    if gap is not None:
+        return gap
+    second_time = second.get('time')
+    if isinstance(second_time, str) and second_time.strip().startswith("+"):
+        return parse_duration(second_time)
+    winner_time, second_time = parse_duration(winner.get('time')), parse_duration(second_time)
+    if winner_time is None or second_time is None:
+        return None
+    return second_time - winner_time
+
+
+def _race_control_flags(messages):
+    safety_car = red_flag = False
+    for message in messages:
+        message = _lower_keys(message)
+        category = str(message.get('category') or "").casefold()
+        text = " ".join(str(message.get(key) or "") for key in ('status', 'mode', 'message')).upper()
+        if category == "safetycar" and "DEPLOYED" in text and "VIRTUAL" not in text:
+            safety_car = True
+        if category == "flag" and (str(message.get('flag') or "").upper() == "RED" or "RED FLAG" in text):
+            red_flag = True
+    return safety_car, red_flag
+
+
+# Pola tabeli results z surowej klasyfikacji wyścigu: (wiersz bez race_id, ostrzeżenia). Safety Car
+# i czerwona flaga są w wierszu tylko, jeśli plik je podaje (komunikaty race_control albo jawne pola).
+# ValueError, gdy brakuje danych do punktowanego pola (np. podium albo kierowcy dnia).
+def derive_results(race, drivers=None):
+    drivers = drivers or get_f1_drivers()
+    warnings = []
+
+    def driver_name(name):
+        matched = match_driver(name, drivers)
+        if matched is None:
+            warnings.append(f"Nieznany kierowca: {name}")
+            return name
+        return matched
+
+    entries = [_lower_keys(entry) for entry in race.get('classification') or []]
+    for entry in entries:
+        position = str(entry.get('position') or "").strip()
+        entry['position'] = int(position) if position.isdigit() else None
+    classified = sorted((e for e in entries if e['position'] is not None and _is_classified(e)), key=lambda e: e['position'])
+    if len(classified) < 3:
+        raise ValueError("klasyfikacja ma mniej niż 3 sklasyfikowanych kierowców")
+
+    gap = _winner_gap(classified[0], classified[1])
+    if gap is None:
+        raise ValueError("brak różnicy czasu między 1. a 2. miejscem")
+
+    # Zespół z pliku, a gdy go brak - z listy kierowców aplikacji
+    driver_teams = {driver: team for team, team_drivers in TEAMS_DRIVERS.items() for driver in team_drivers}
+    if any(_parse_number(e.get('points')) is not None for e in entries):
+        scorers = [e for e in entries if (_parse_number(e.get('points')) or 0) > 0]
+    else:
+        scorers = classified[:POINTS_POSITIONS]
+    teams = {e.get('team') or driver_teams.get(match_driver(e['driver'], drivers)) for e in scorers}
+    if None in teams:
+        raise ValueError("nie można ustalić zespołu kierowcy z punktami")
+    teams_with_points = len(teams)
+
+    dotd = race.get('driver_of_the_day')
+    if not dotd:
+        raise ValueError("brak kierowcy dnia (driver_of_the_day)")
+
+    row = {
+        "podium_1": driver_name(classified[0]['driver']),
+        "podium_2": driver_name(classified[1]['driver']),
+        "podium_3": driver_name(classified[2]['driver']),
+        "time_diff": time_diff_bucket(gap),
+        "driver_of_day": driver_name(dotd),
+        "classified_drivers": classified_drivers_bucket(len(classified)),
+        "teams_with_points": teams_with_points,
+    }
+    race_control = race.get('race_control') or []
+    if race_control:
+        row['safety_car'], row['red_flag'] = _race_control_flags(race_control)
+    for field in OPTIONAL_FEED_FIELDS:
+        if _parse_bool(race.get(field)) is not None:
+            row[field] = _parse_bool(race[field])
+    return row, warnings
+
+
+# Adaptery: treść pliku -> lista wyścigów w formacie opisanym na początku modułu
+
+# JSON: {"races": [...]} albo lista wyścigów
+def parse_json_feed(text):
+    data = json.loads(text)
+    return data['races'] if isinstance(data, dict) else data
+
+
+# CSV: wiersz na kierowcę (race_date, race_name, position, driver, team, status, time, gap, points);
+# pola wyścigu (safety_car, red_flag, driver_of_the_day, kolumny "extra:<id lub treść pytania>")
+# są brane z pierwszego wiersza wyścigu, w którym są wypełnione
+def parse_csv_feed(text):
+    races = {}
+    for row in csv.DictReader(io.StringIO(text)):
+        row = {key.strip(): (value or "").strip() for key, value in _lower_keys(row).items()}
+        race = races.setdefault((row.get('race_date'), row.get('race_name')), {
+            "race_date": row.get('race_date'), "race_name": row.get('race_name'),
+            "classification": [], "extra_answers": {},
+        })
+        race['classification'].append({
+            key: row.get(key) for key in ('position', 'driver', 'team', 'status', 'time', 'gap', 'points', 'classified')
+            if row.get(key)
+        })
+        for key in ('safety_car', 'red_flag', 'driver_of_the_day'):
+            if row.get(key) and race.get(key) is None:
+                race[key] = row[key]
+        for key, value in row.items():
+            if key.startswith("extra:") and value:
+                race['extra_answers'].setdefault(key[len("extra:"):].strip(), value)
+    return list(races.values())
+
+
+ADAPTERS = {
+    "json": parse_json_feed,
+    "csv": parse_csv_feed,
+}
+
+
+def read_feed(path, fmt=None):
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in ADAPTERS:
+        raise ValueError(f"Nieobsługiwany format pliku z wynikami: {fmt} (dostępne: {', '.join(ADAPTERS)})")
+    with open(path, encoding="utf-8") as file:
+        return ADAPTERS[fmt](file.read())
+
+
+def _race_key(race):
+    return str(race.get('race_date') or "")[:10], " ".join(str(race.get('race_name') or "").casefold().split())
+
+
+# Wyścig z bazy dla wyścigu z pliku: po dacie (a przy kilku w tym dniu - po nazwie), potem po nazwie
+def _match_race(feed_race, races):
+    date, name = _race_key(feed_race)
+    same_date = [race for race in races if _race_key(race)[0] == date]
+    if len(same_date) == 1:
+        return same_date[0]
+    same_name = [race for race in (same_date or races) if _race_key(race)[1] == name]
+    return same_name[0] if len(same_name) == 1 else None
+
+
+# Odpowiedzi na pytania dodatkowe z pliku (klucz: id albo treść pytania) -> extra_answers (klucz: id pytania)
+def _extra_answers(feed_answers, race_questions, warnings):
+    by_text = {" ".join(q['question'].casefold().split()): q for q in race_questions}
+    by_id = {str(q['id']): q for q in race_questions}
+    answers = {}
+    for key, value in (feed_answers or {}).items():
+        question = by_id.get(str(key)) or by_text.get(" ".join(str(key).casefold().split()))
+        if question is None:
+            warnings.append(f"Nieznane pytanie dodatkowe: {key}")
+            continue
+        if question.get('options') and value not in question['options']:
+            warnings.append(f"Odpowiedź spoza opcji pytania {question['id']}: {value}")
+        answers[str(question['id'])] = value
+    return answers
+
+
+# Import wyników wyścigów z pliku (lista z adaptera). Wyniki są zapisywane jednym upsertem po race_id;
+# istniejące wyniki zostają, chyba że overwrite=True - wtedy plik zastępuje tylko podane w nim pola,
+# a odpowiedzi na pytania dodatkowe z pliku są dopisywane do wpisanych ręcznie. create_races=True dodaje brakujące wyścigi
+# (nieaktywne). Zwraca raport; przeliczenie agregatów zostaje po stronie wywołującego.
+def import_results(repo, feed_races, overwrite=False, create_races=False, dry_run=False):
+    data = repo.fetch_parallel(
+        races=repo.get_all_races,
+        results=lambda: repo.fetch_all('results'),
+        questions=lambda: repo.fetch_all('custom_questions'),
+    )
+    races = data['races']
+    existing = {row['race_id']: row for row in data['results']}
+    questions_by_race = {}
+    for question in data['questions']:
+        questions_by_race.setdefault(question['race_id'], []).append(question)
+
+    report = {"races_in_feed": len(feed_races), "created_races": [], "written": [], "skipped_existing": [],
+              "unmatched": [], "errors": [], "warnings": []}
+
+    matched = [(feed_race, _match_race(feed_race, races)) for feed_race in feed_races]
+    missing = [feed_race for feed_race, race in matched if race is None]
+    if missing and create_races:
+        new_races = [
+            {
+                "race_name": feed_race.get('race_name'),
+                "race_date": str(feed_race.get('race_date'))[:10],
+                "submission_deadline": f"{str(feed_race.get('race_date'))[:10]}T00:00:00",
+                "is_active": False,
+            }
+            for feed_race in missing
+        ]
+        created = new_races if dry_run else repo.insert_races(new_races)
+        report['created_races'] = [race['race_name'] for race in created]
+        matched = [(feed_race, race or _match_race(feed_race, created)) for feed_race, race in matched]
+
+    rows = []
+    updated_at = utc_timestamp()
+    for feed_race, race in matched:
+        label = f"{feed_race.get('race_name')} ({feed_race.get('race_date')})"
+        if race is None:
+            report['unmatched'].append(label)
+            continue
+        if race.get('id') in existing and not overwrite:
+            report['skipped_existing'].append(label)
+            continue
+        try:
+            row, warnings = derive_results(feed_race)
+        except (ValueError, TypeError, KeyError) as e:
+            report['errors'].append({"race": label, "error": str(e)})
+            continue
+        current = existing.get(race.get('id')) or {}
+        for field in OPTIONAL_FEED_FIELDS:
+            row.setdefault(field, bool(current.get(field)))
+        row['extra_answers'] = {
+            **(current.get('extra_answers') or {}),
+            **_extra_answers(feed_race.get('extra_answers'), questions_by_race.get(race.get('id'), []), warnings),
+        }
+        row.update({"race_id": race.get('id'), "updated_at": updated_at})
+        report['warnings'] += [f"{label}: {warning}" for warning in warnings]
+        report['written'].append(label)
+        rows.append(row)
+
+    if rows and not dry_run:
+        repo.upsert_results(rows)
+    return report
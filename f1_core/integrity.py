@@ -0,0 +1,53 @@
+from f1_core.models import extra_answer_key
+
+# Kontrole spójności danych: zdublowane typy i wyniki oraz odpowiedzi na pytania dodatkowe,
+# które nie mają już odpowiednika w tabeli custom_questions.
+
+
+# Typy tego samego użytkownika dla tego samego wyścigu: [(race_id, user_name, [id, ...]), ...]
+def find_duplicate_submissions(submissions):
+    by_key = {}
+    for sub in submissions:
+        by_key.setdefault((sub['race_id'], sub['user_name']), []).append(sub.get('id'))
+    return [
+        (race_id, user_name, sorted(ids, key=lambda i: (i is None, i)))
+        for (race_id, user_name), ids in sorted(by_key.items(), key=lambda item: str(item[0]))
+        if len(ids) > 1
+    ]
+
+
+# Wyniki zapisane kilka razy dla tego samego wyścigu: [(race_id, [id, ...]), ...]
+def find_duplicate_results(results):
+    by_race = {}
+    for result in results:
+        by_race.setdefault(result['race_id'], []).append(result.get('id'))
+    return [
+        (race_id, sorted(ids, key=lambda i: (i is None, i)))
+        for race_id, ids in sorted(by_race.items(), key=lambda item: str(item[0]))
+        if len(ids) > 1
+    ]
+
+
+# Klucze odpowiedzi dodatkowych, które nie są id żadnego pytania wyścigu
+# (pytanie usunięte albo klucz pozycyjny sprzed migracji "f1_cli.py migrate-extra-keys")
+def find_orphan_extra_answers(race_questions, results, submissions):
+    question_keys = {extra_answer_key(q, n) for n, q in enumerate(race_questions, start=1)}
+    orphans = []
+    sources = [('results', r) for r in results] + [('submissions', s) for s in submissions]
+    for table, row in sources:
+        for key in (row.get('extra_answers') or {}):
+            if key not in question_keys:
+                orphans.append({
+                    "table": table,
+                    "id": row.get('id'),
+                    "race_id": row.get('race_id'),
+                    "user_name": row.get('user_name'),
+                    "key": key,
+                })
+    return orphans
+
+
+# Identyfikatory wierszy do usunięcia - zostaje najnowszy (największe id) wiersz każdej grupy
+# (typ pary (wyścig, użytkownik) albo wynik wyścigu)
+def duplicate_ids_to_delete(duplicates):
+    return [i for *_, ids in duplicates for i in ids[:-1] if i is not None]
@@ -0,0 +1,196 @@
+import threading
+import time
+
+from f1_core.aggregation import rescore_totals
+from f1_core.events import maybe_snapshot
+from f1_core.models import app_now, deadline_passed, local_moment, utc_timestamp
+from f1_core.scoring import ACTIVE_RULESET_VERSION
+
+# Harmonogram cyklu życia wyścigu - w tle albo w osobnym procesie ("f1_cli.py scheduler"),
+# tak żeby przebiegi skryptu niczego nie przeliczały:
+#   otwarcie   - nieaktywny wyścig z opens_at (sql/008), którego czas otwarcia minął, a termin
+#                typowania nie: is_active=True, opens_at=null (zaplanowane otwarcie jest jednorazowe,
+#                więc wyścig zamknięty ręcznie przyciskiem "Deaktywuj" nie otwiera się ponownie)
+#   zamknięcie - aktywny wyścig po submission_deadline: is_active=False
+#                (terminy bez strefy to czas APP_TIMEZONE, niezależnie od strefy serwera)
+#   punktacja  - po zmianie wersji wyników: statystyki tłumu (race_crowd_stats) i sumy punktów
+#                aktywnych zasad (scoring_totals); przy kilku replikach ze wspólnym cache
+#                (f1_core.shared_cache) odbudowę danej wersji wyników wykonuje tylko jedna z nich
+#   migawka    - co SNAPSHOT_CHECK_INTERVAL sekund: migawka dziennika zmian, jeśli przybyło dość zdarzeń
+
+DEFAULT_INTERVAL = 30.0
+MIN_WAIT = 0.5
+SNAPSHOT_CHECK_INTERVAL = 600
+
+
+def _passed(value, now=None):
+    return bool(value) and deadline_passed(value, now)
+
+
+# Zmiany wyścigów wynikające z terminów: [(race, {"is_active": ...}), ...]
+def plan_transitions(races, now=None):
+    changes = []
+    for race in races:
+        deadline = race.get('submission_deadline')
+        if race.get('is_active'):
+            if _passed(deadline, now):
+                changes.append((race, {"is_active": False}))
+        elif race.get('opens_at') and _passed(race['opens_at'], now) and not _passed(deadline, now):
+            changes.append((race, {"is_active": True, "opens_at": None}))
+    return changes
+
+
+# Sekundy do najbliższego zaplanowanego otwarcia lub zamknięcia (None, jeśli nic nie jest zaplanowane)
+def seconds_to_next_transition(races):
+    waits = []
+    for race in races:
+        value = race.get('submission_deadline') if race.get('is_active') else race.get('opens_at')
+        if value:
+            waits.append((local_moment(value) - app_now()).total_seconds())
+    future = [wait for wait in waits if wait > 0]
+    return min(future) if future else None
+
+
+# Przeliczenie całej historii według wybranej wersji zasad (jedna operacja wektorowa)
+# i zapis sum punktów użytkowników w tabeli scoring_totals. Zwraca liczbę przeliczonych typów.
+def rescore_and_save(repo, ruleset_version, results_version):
+    results_by_race, _, scored_subs = repo.fetch_results_history()
+    if not scored_subs:
+        return 0
+
+    totals = rescore_totals(results_by_race, scored_subs, ruleset_version)
+    totals['results_version'] = results_version
+    totals['computed_at'] = utc_timestamp()
+    repo.save_scoring_totals(totals.to_dict('records'))
+    return len(scored_subs)
+
+
+# Odbudowa agregatów po zmianie wyników. Statystyki tłumu są liczone tylko dla wyścigów ze zmienionymi
+# wynikami, sumy punktów - tylko jeśli nie zapisał ich już inny proces dla tej samej wersji wyników.
+def rebuild_aggregates(repo, results_version, ruleset_version=ACTIVE_RULESET_VERSION):
+    crowd_stats = repo.load_crowd_stats()
+    stored_versions = {
+        row.get('results_version') for row in repo.load_scoring_totals()
+        if row.get('ruleset_version') == ruleset_version
+    }
+    up_to_date = stored_versions == {results_version}
+    return {
+        "crowd_stats": len(crowd_stats),
+        "rescored_submissions": 0 if up_to_date else rescore_and_save(repo, ruleset_version, results_version),
+    }
+
+
+class LifecycleScheduler:
+    # on_races_changed(report) - po otwarciu lub zamknięciu wyścigów (np. czyszczenie cache aktywnych wyścigów);
+    # on_results_rebuilt(report) - po odbudowie agregatów dla nowej wersji wyników;
+    # shared - wspólny cache replik (SharedCache) z dzierżawą odbudowy;
+    # snapshot_every - migawka dziennika zmian (f1_core.events) po tylu nowych zdarzeniach (None - bez migawek)
+    def __init__(self, repo, interval=DEFAULT_INTERVAL, on_races_changed=None, on_results_rebuilt=None,
+                 shared=None, snapshot_every=None):
+        self.repo = repo
+        self.shared = shared
+        self.snapshot_every = snapshot_every
+        self.interval = interval
+        self.on_races_changed = on_races_changed
+        self.on_results_rebuilt = on_results_rebuilt
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+        # Wersja wyników, dla której agregaty są już odbudowane
+        self.results_version = None
+        self.next_transition = None
+        self.next_snapshot_check = 0.0
+        self.last_error = None
+        self.last_report = None
+
+    # Jeden przebieg: otwarcie/zamknięcie wyścigów, odbudowa agregatów po zmianie wyników
+    # i (z snapshot_every) migawka dziennika zmian
+    def tick(self, now=None):
+        started = time.perf_counter()
+        report = {"opened": [], "closed": [], "rebuilt": None}
+
+        races = self.repo.get_all_races()
+        for race, change in plan_transitions(races, now):
+            self.repo.update_race(race['id'], change)
+            race.update(change)
+            report["opened" if change["is_active"] else "closed"].append(race['id'])
+        self.next_transition = seconds_to_next_transition(races)
+        if (report["opened"] or report["closed"]) and self.on_races_changed:
+            self.on_races_changed(report)
+
+        results_version = self.repo.get_results_version()
+        if results_version != self.results_version:
+            # Odbudowę trzyma inna replika - kolejny przebieg sprawdzi wersję ponownie
+            # (agregaty będą już aktualne, więc odbudowa niczego nie przeliczy)
+            lease = f"lease:lifecycle:rebuild:{results_version}"
+            leased = self._acquire(lease)
+            if leased is False:
+                report["deferred"] = True
+            else:
+                try:
+                    report["rebuilt"] = rebuild_aggregates(self.repo, results_version)
+                finally:
+                    if leased:
+                        self.shared.release(lease)
+                self.results_version = results_version
+                if self.on_results_rebuilt:
+                    self.on_results_rebuilt(report)
+
+        if self.snapshot_every and time.monotonic() >= self.next_snapshot_check:
+            report["snapshot"] = self._snapshot()
+
+        report["tick_s"] = round(time.perf_counter() - started, 3)
+        self.last_report = report
+        return report
+
+    # Migawka dziennika zmian; jej błąd (np. brak tabel z sql/010) nie przerywa przebiegu
+    def _snapshot(self):
+        self.next_snapshot_check = time.monotonic() + SNAPSHOT_CHECK_INTERVAL
+        lease = "lease:lifecycle:events-snapshot"
+        leased = self._acquire(lease)
+        if leased is False:
+            return None
+        try:
+            return maybe_snapshot(self.repo, every=self.snapshot_every)
+        except Exception as e:
+            return {"error": str(e)}
+        finally:
+            if leased:
+                self.shared.release(lease)
+
+    # Dzierżawa we wspólnym cache: True/False, None bez wspólnego cache (albo gdy jest niedostępny)
+    def _acquire(self, lease):
+        if self.shared is None:
+            return None
+        try:
+            return self.shared.acquire(lease, max(self.interval, MIN_WAIT) * 4)
+        except Exception as e:
+            self.shared.last_error = e
+            return None
+
+    # Czas do kolejnego przebiegu: interval, krócej gdy wcześniej wypada otwarcie lub zamknięcie wyścigu
+    def next_wait(self):
+        if self.next_transition is None:
+            return self.interval
+        return max(min(self.interval, self.next_transition), MIN_WAIT)
+
+    # Natychmiastowy przebieg (np. po zapisaniu wyników albo dodaniu wyścigu)
+    def wake(self):
+        self.wakeup.set()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="f1-lifecycle", daemon=True)
+                self.thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                self.tick()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+            self.wakeup.wait(self.next_wait())
+            self.wakeup.clear()
@@ -0,0 +1,258 @@
+import copy
+import itertools
+import json
+import threading
+import time
+
+from f1_core.events import build_events
+from f1_core.sqlite_views import VIEW_SQL, view_rows
+
+# Lokalny zamiennik klienta Supabase (tylko podzbiór API PostgREST używany przez aplikację).
+# Dane trzymane są w pamięci; służy do testów obciążeniowych, benchmarków i pracy na zrzucie bazy.
+
+# Klucze używane przez upsert, gdy nie podano on_conflict (odpowiadają kluczom głównym z sql/)
+PRIMARY_KEYS = {
+    'race_crowd_stats': ['race_id'],
+    'scoring_totals': ['ruleset_version', 'user_name'],
+    'submission_answers': ['submission_id', 'question_id'],
+    'submission_drafts': ['race_id', 'user_name'],
+}
+
+# Tabele z dziennikiem zmian (wyzwalacz z sql/010) -> rodzaj zdarzenia
+CHANGE_LOG_ENTITIES = {'submissions': 'submission', 'results': 'result'}
+
+
+# Liczba typów z daną odpowiedzią na pytanie (widok submission_answer_counts z sql/)
+def _submission_answer_counts(tables):
+    counts = {}
+    for row in tables.get('submission_answers', []):
+        key = (row['question_id'], row['answer'])
+        counts[key] = counts.get(key, 0) + 1
+    return [
+        {"question_id": question_id, "answer": answer, "submissions": n}
+        for (question_id, answer), n in counts.items()
+    ]
+
+
+# Widoki tylko do odczytu: nazwa -> funkcja wyliczająca wiersze z tabel
+VIEWS = {
+    'submission_answer_counts': _submission_answer_counts,
+    # Widoki agregujące z sql/006 liczone w SQLite
+    **{name: (lambda tables, name=name: view_rows(tables, name)) for name in VIEW_SQL},
+}
+
+
+class LocalResponse:
+    def __init__(self, data):
+        self.data = data
+        self.count = len(data)
+
+
+class LocalStore:
+    # max_rows - limit wierszy jednej odpowiedzi jak max-rows w PostgREST (None - bez limitu)
+    def __init__(self, tables=None, latency=0.0, max_rows=None):
+        self.tables = {name: [dict(row) for row in rows] for name, rows in (tables or {}).items()}
+        self.latency = latency
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+        # Numer wersji danych (zmienia się przy każdym zapisie) i wyliczone dla niej widoki
+        self.version = 0
+        self.view_cache = {}
+        start = max((row.get('id', 0) for rows in self.tables.values() for row in rows
+                     if isinstance(row.get('id'), int)), default=0) + 1
+        self._ids = itertools.count(start)
+
+    # Wczytanie zrzutu bazy w formacie {"nazwa_tabeli": [wiersze, ...]}
+    @classmethod
+    def from_dump(cls, path, latency=0.0):
+        with open(path, "r", encoding="utf-8") as file:
+            return cls(json.load(file), latency=latency)
+
+    def dump(self, path):
+        with self.lock, open(path, "w", encoding="utf-8") as file:
+            json.dump(self.tables, file, ensure_ascii=False, default=str)
+
+    def next_id(self):
+        return next(self._ids)
+
+
+class LocalQuery:
+    def __init__(self, client, table_name):
+        self.client = client
+        self.table_name = table_name
+        self.operation = 'select'
+        self.columns = None
+        self.payload = None
+        self.filters = []
+        self.order_by = []
+        self.limit_count = None
+        self.offset = 0
+        self.on_conflict = None
+
+    def select(self, columns='*', **kwargs):
+        self.operation = 'select'
+        if columns.strip() != '*':
+            self.columns = [c.strip() for c in columns.split(',')]
+        return self
+
+    def insert(self, payload, **kwargs):
+        self.operation = 'insert'
+        self.payload = payload
+        return self
+
+    def upsert(self, payload, on_conflict=None, **kwargs):
+        self.operation = 'upsert'
+        self.payload = payload
+        self.on_conflict = on_conflict
+        return self
+
+    def update(self, payload, **kwargs):
+        self.operation = 'update'
+        self.payload = payload
+        return self
+
+    def delete(self, **kwargs):
+        self.operation = 'delete'
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(lambda row: row.get(column) != value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) >= value)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) < value)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) <= value)
+        return self
+
+    # Kilka kolumn po przecinku jak w PostgREST ("user_name,race_id")
+    def order(self, column, desc=False, **kwargs):
+        self.order_by.extend((name.strip(), desc) for name in column.split(','))
+        return self
+
+    def limit(self, count, **kwargs):
+        self.limit_count = count
+        return self
+
+    # Zakres wierszy jak w PostgREST (oba końce włącznie)
+    def range(self, start, end, **kwargs):
+        self.offset = start
+        self.limit_count = end - start + 1
+        return self
+
+    def _matches(self, row):
+        return all(condition(row) for condition in self.filters)
+
+    def _conflict_keys(self):
+        if self.on_conflict:
+            return [c.strip() for c in self.on_conflict.split(',')]
+        return PRIMARY_KEYS.get(self.table_name, ['id'])
+
+    def execute(self):
+        store = self.client.store
+        if store.latency:
+            time.sleep(store.latency)
+
+        with store.lock:
+            self.client.calls += 1
+            rows = store.tables.setdefault(self.table_name, []) if self.table_name not in VIEWS else []
+
+            if self.operation == 'select':
+                if self.table_name in VIEWS:
+                    cached = store.view_cache.get(self.table_name)
+                    if cached is None or cached[0] != store.version:
+                        cached = (store.version, VIEWS[self.table_name](store.tables))
+                        store.view_cache[self.table_name] = cached
+                    rows = cached[1]
+                selected = [row for row in rows if self._matches(row)]
+                for column, desc in reversed(self.order_by):
+                    selected.sort(key=lambda row: (row.get(column) is None, str(row.get(column))), reverse=desc)
+                if self.limit_count is not None:
+                    selected = selected[self.offset:self.offset + self.limit_count]
+                if store.max_rows is not None:
+                    selected = selected[:store.max_rows]
+                if self.columns:
+                    selected = [{c: row.get(c) for c in self.columns} for row in selected]
+                return LocalResponse(copy.deepcopy(selected))
+
+            store.version += 1
+            if self.operation in ('insert', 'upsert'):
+                items = self.payload if isinstance(self.payload, list) else [self.payload]
+                keys = self._conflict_keys()
+                saved = []
+                for item in items:
+                    item = copy.deepcopy(item)
+                    existing = None
+                    if self.operation == 'upsert' and all(k in item for k in keys):
+                        existing = next((row for row in rows if all(row.get(k) == item[k] for k in keys)), None)
+                    if existing is not None:
+                        existing.update(item)
+                        saved.append(copy.deepcopy(existing))
+                    else:
+                        item.setdefault('id', store.next_id())
+                        rows.append(item)
+                        saved.append(copy.deepcopy(item))
+                self._log_changes(store, 'upsert', saved)
+                return LocalResponse(saved)
+
+            if self.operation == 'update':
+                updated = []
+                for row in rows:
+                    if self._matches(row):
+                        row.update(copy.deepcopy(self.payload))
+                        updated.append(copy.deepcopy(row))
+                self._log_changes(store, 'upsert', updated)
+                return LocalResponse(updated)
+
+            if self.operation == 'delete':
+                deleted = [row for row in rows if self._matches(row)]
+                store.tables[self.table_name] = [row for row in rows if not self._matches(row)]
+                self._log_changes(store, 'delete', deleted)
+                return LocalResponse(copy.deepcopy(deleted))
+
+        raise ValueError(f"Nieobsługiwana operacja: {self.operation}")
+
+    # Zdarzenia dziennika zmian w tym samym zapytaniu co zmiana (jak wyzwalacz z sql/010)
+    def _log_changes(self, store, action, rows):
+        entity = CHANGE_LOG_ENTITIES.get(self.table_name)
+        if entity is None or not rows:
+            return
+        events = build_events(entity, action, rows)
+        for event in events:
+            event['id'] = store.next_id()
+        store.tables.setdefault('change_events', []).extend(events)
+
+
+class LocalSupabaseClient:
+    def __init__(self, store):
+        self.store = store
+        # Licznik zapytań wysłanych przez tego klienta
+        self.calls = 0
+
+    def table(self, table_name):
+        return LocalQuery(self, table_name)
+
+    def from_(self, table_name):
+        return self.table(table_name)
+
+    def rpc(self, fn, params=None):
+        raise NotImplementedError(f"Funkcja RPC {fn} nie jest dostępna w lokalnej bazie")
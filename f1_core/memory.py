@@ -0,0 +1,245 @@
+import functools
+import gc
+import os
+import pickle
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict, deque
+
+from f1_core import shared_cache
+
+# Pamięć długo działającego procesu aplikacji (serwer Streamlit działa tygodniami):
+#   MemoryBudget - wspólny dla wszystkich cache procesu limit bajtów; wpisy są trzymane jako pickle
+#                  (rozmiar = długość bajtów, każdy odczyt zwraca nową kopię, jak st.cache_data),
+#                  a po przekroczeniu limitu usuwane są najdawniej używane (LRU) z dowolnego cache
+#   cached       - dekorator cache funkcji z TTL korzystający z budżetu (zamiast st.cache_data);
+#                  z F1_SHARED_CACHE brakujące wpisy są brane ze wspólnego cache replik (f1_core.shared_cache)
+#   LeakMonitor  - okresowe migawki tracemalloc: wzrost zaalokowanej pamięci od punktu odniesienia
+#                  według miejsc alokacji, RSS procesu i zajętość budżetu cache
+
+DEFAULT_BUDGET_BYTES = 64 * 1024 * 1024
+DEFAULT_REPORT_INTERVAL = 300.0
+
+
+class MemoryBudget:
+    def __init__(self, max_bytes=DEFAULT_BUDGET_BYTES):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # (nazwa cache, argumenty, ...) -> (pickle wartości, termin ważności albo None); kolejność = LRU
+        self.entries = OrderedDict()
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Zapisana wartość (bajty) albo None, gdy jej nie ma lub wygasła
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    # Wartość większa niż cały budżet nie jest zapisywana
+    def put(self, key, payload, ttl=None):
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            if len(payload) > self.max_bytes:
+                return
+            self.entries[key] = (payload, time.monotonic() + ttl if ttl is not None else None)
+            self.used_bytes += len(payload)
+            self._evict()
+
+    # Usunięcie wpisów jednego cache (name) albo wszystkich
+    def clear(self, name=None):
+        with self.lock:
+            for key in [key for key in self.entries if name is None or key[0] == name]:
+                self._remove(key)
+
+    def resize(self, max_bytes):
+        with self.lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _remove(self, key):
+        payload, _ = self.entries.pop(key)
+        self.used_bytes -= len(payload)
+
+    def _evict(self):
+        while self.used_bytes > self.max_bytes and self.entries:
+            key = next(iter(self.entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            by_cache = {}
+            for key, (payload, _) in self.entries.items():
+                entries, size = by_cache.get(key[0], (0, 0))
+                by_cache[key[0]] = (entries + 1, size + len(payload))
+            return {
+                "max_bytes": self.max_bytes,
+                "used_bytes": self.used_bytes,
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "by_cache": {name: {"entries": n, "bytes": size} for name, (n, size) in sorted(by_cache.items())},
+            }
+
+
+# Budżet wspólny dla procesu (wszystkie sesje i wszystkie funkcje z @cached)
+budget = MemoryBudget(int(float(os.environ.get("F1_CACHE_BUDGET_MB", DEFAULT_BUDGET_BYTES / 2**20)) * 2**20))
+
+
+# Generacja cache we wspólnym cache replik (None bez wspólnego cache albo gdy jest niedostępny)
+def _shared_generation(tier, name):
+    if tier is None:
+        return None
+    try:
+        return tier.generation(name)
+    except Exception as e:
+        tier.last_error = e
+        return None
+
+
+# Cache wyniku funkcji w budżecie pamięci; klucz to nazwa funkcji i argumenty (repr),
+# wartość musi dać się zapisać przez pickle. Funkcja dostaje metodę clear().
+# Ze wspólnym cache (shared=True i F1_SHARED_CACHE) klucz zawiera też generację cache: clear()
+# w dowolnej replice podbija generację, więc wpisy wszystkich replik przestają być aktualne,
+# a brakującą wartość liczy jedna replika i zapisuje dla pozostałych.
+def cached(ttl=None, memory_budget=None, shared=True):
+    def decorator(func):
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            target = memory_budget or budget
+            tier = shared_cache.tier if shared else None
+            generation = _shared_generation(tier, name)
+            arguments = repr((args, sorted(kwargs.items())))
+            key = (name, arguments, generation)
+            payload = target.get(key)
+            if payload is not None:
+                return pickle.loads(payload)
+            if generation is None:
+                value = func(*args, **kwargs)
+            else:
+                value = tier.get_or_compute(
+                    shared_cache.make_key(f"cache:{name}", arguments), lambda: func(*args, **kwargs),
+                    version=generation, ttl=ttl
+                )
+            target.put(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ttl)
+            return value
+
+        def clear():
+            (memory_budget or budget).clear(name)
+            tier = shared_cache.tier if shared else None
+            if tier is not None:
+                try:
+                    tier.bump(name)
+                except Exception as e:
+                    tier.last_error = e
+
+        wrapper.clear = clear
+        return wrapper
+    return decorator
+
+
+# Pamięć rezydentna procesu w bajtach (Linux: /proc, gdzie indziej: szczytowa z getrusage)
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class LeakMonitor:
+    # interval - co ile sekund raport w tle; top - ile miejsc alokacji z największym wzrostem;
+    # history - ile ostatnich raportów jest trzymanych
+    def __init__(self, interval=DEFAULT_REPORT_INTERVAL, top=15, history=96, frames=1):
+        self.interval = interval
+        self.top = top
+        self.frames = frames
+        self.lock = threading.Lock()
+        self.reports = deque(maxlen=history)
+        self.baseline = None
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    # Włączenie tracemalloc i punktu odniesienia; raporty co interval sekund w wątku w tle
+    def start(self):
+        with self.lock:
+            if self.running:
+                return self
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+            self.baseline = self._snapshot()
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name="f1-leak-monitor", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        with self.lock:
+            self.thread = None
+            self.baseline = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _snapshot(self):
+        gc.collect()
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ])
+
+    # Raport: pamięć śledzona przez tracemalloc, RSS, budżet cache i miejsca alokacji,
+    # w których pamięć urosła najbardziej od punktu odniesienia
+    def report(self):
+        report = {
+            "at": time.time(),
+            "rss_bytes": rss_bytes(),
+            "cache": budget.stats(),
+            "traced_bytes": None,
+            "traced_peak_bytes": None,
+            "top_growth": [],
+        }
+        baseline = self.baseline
+        if tracemalloc.is_tracing() and baseline is not None:
+            snapshot = self._snapshot()
+            report["traced_bytes"], report["traced_peak_bytes"] = tracemalloc.get_traced_memory()
+            report["top_growth"] = [
+                {"location": str(stat.traceback[0]), "size_diff": stat.size_diff,
+                 "count_diff": stat.count_diff, "size": stat.size}
+                for stat in snapshot.compare_to(baseline, "lineno")[:self.top]
+                if stat.size_diff > 0
+            ]
+        self.reports.append(report)
+        return report
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.report()
+
+
+# Monitor procesu; włączany zmienną F1_TRACEMALLOC=1 albo z panelu administratora
+leak_monitor = LeakMonitor(float(os.environ.get("F1_LEAK_REPORT_INTERVAL", DEFAULT_REPORT_INTERVAL)))
+if os.environ.get("F1_TRACEMALLOC") == "1":
+    leak_monitor.start()
@@ -0,0 +1,35 @@
+from f1_core.models import EXTRA_ANSWER_PREFIX
+
+# Migracje danych wykonywane po stronie aplikacji (odpowiedniki plików z sql/ dla lokalnych zrzutów).
+
+
+# Numer pytania z klucza "Pytanie dodatkowe N" (None, gdy klucz ma inny format)
+def extra_answer_number(key):
+    if not isinstance(key, str) or not key.startswith(EXTRA_ANSWER_PREFIX):
+        return None
+    try:
+        return int(key[len(EXTRA_ANSWER_PREFIX):].strip())
+    except ValueError:
+        return None
+
+
+# Mapa "Pytanie dodatkowe N" -> id N-tego pytania wyścigu w kolejności id (tak numerował je formularz)
+def positional_key_map(race_questions):
+    ordered = sorted(race_questions, key=lambda q: q['id'])
+    return {f"{EXTRA_ANSWER_PREFIX} {n}": str(q['id']) for n, q in enumerate(ordered, start=1)}
+
+
+# Przepisanie kluczy extra_answers wierszy results/submissions z pozycyjnych na id pytań.
+# Zwraca tylko zmienione wiersze; klucze bez odpowiadającego pytania zostają bez zmian
+# (wykrywa je kontrola spójności w f1_cli.py check).
+def rekey_extra_answers(rows, questions_by_race):
+    changed = []
+    for row in rows:
+        answers = row.get('extra_answers') or {}
+        if not any(extra_answer_number(key) is not None for key in answers):
+            continue
+        key_map = positional_key_map(questions_by_race.get(row['race_id'], []))
+        rekeyed = {key_map.get(key, key): value for key, value in answers.items()}
+        if rekeyed != answers:
+            changed.append({**row, "extra_answers": rekeyed})
+    return changed
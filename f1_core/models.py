@@ -0,0 +1,151 @@
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+# Stałe i struktury danych aplikacji: uczestnicy, kierowcy, warianty odpowiedzi i pola typów.
+
+# Strefa czasowa terminów wyścigów: submission_deadline i opens_at są zapisywane z panelu administratora
+# jako czas lokalny bez strefy
+APP_TIMEZONE = ZoneInfo("Europe/Warsaw")
+
+USER_NAMES = ["Agatka", "Iza", "Kinga", "Paweł", "Piotrek", "Seweryn"]
+
+# Aktualna lista kierowców F1 2025 zgodnie z dostarczonym obrazem
+TEAMS_DRIVERS = {
+    'Red Bull Racing': ['Max Verstappen', 'Isack Hadjar'],
+    'Ferrari': ['Charles Leclerc', 'Lewis Hamilton'],
+    'Mercedes': ['Andrea Kimi Antonelli', 'George Russell'],
+    'McLaren': ['Lando Norris', 'Oscar Piastri'],
+    'Aston Martin': ['Fernando Alonso', 'Lance Stroll'],
+    'Alpine': ['Jack Doohan', 'Pierre Gasly'],
+    'Williams': ['Alexander Albon', 'Carlos Sainz Jr.'],
+    'Racing Bulls': ['Arvid Lindblad', 'Liam Lawson'],
+    'Audi': ['Gabriel Bortoleto', 'Nico Hülkenberg'],
+    'Haas': ['Esteban Ocon', 'Oliver Bearman'],
+    'Cadillac': ['Valtteri Bottas', 'Sergio Perez']
+}
+
+TIME_DIFF_OPTIONS = ["Mniej niż 2 sekundy", "2.001-5 sekund", "5.001-10 sekund",
+                     "10.001-20 sekund", "Więcej niż 20 sekund"]
+CLASSIFIED_DRIVERS_OPTIONS = ["22", "21-20", "19-18", "17-16", "15-14", "Mniej niż 14"]
+TEAMS_WITH_POINTS_OPTIONS = [5, 6, 7, 8, 9, 10, 11]
+YES_NO_OPTIONS = ["Tak", "Nie"]
+
+PODIUM_FIELDS = ['podium_1', 'podium_2', 'podium_3']
+OTHER_FIELDS = ['time_diff', 'driver_of_day', 'safety_car', 'red_flag',
+                'classified_drivers', 'teams_with_points']
+PREDICTION_FIELDS = PODIUM_FIELDS + OTHER_FIELDS
+
+# Nazwy kategorii w formularzu (klucze słownika predictions) -> kolumny tabeli submissions
+PREDICTION_LABELS = {
+    "Podium 1. miejsce": 'podium_1',
+    "Podium 2. miejsce": 'podium_2',
+    "Podium 3. miejsce": 'podium_3',
+    "Różnica czasowa": 'time_diff',
+    "Kierowca dnia": 'driver_of_day',
+    "Safety Car": 'safety_car',
+    "Czerwona flaga": 'red_flag',
+    "Liczba sklasyfikowanych kierowców": 'classified_drivers',
+    "Liczba zespołów z punktami": 'teams_with_points',
+}
+
+# Nazwy kategorii w statystykach i profilu typującego
+CATEGORY_LABELS = {
+    'podium_1': "1. miejsce", 'podium_2': "2. miejsce", 'podium_3': "3. miejsce",
+    'time_diff': "Różnica czasowa", 'driver_of_day': "Kierowca dnia",
+    'safety_car': "Safety Car", 'red_flag': "Czerwona flaga",
+    'classified_drivers': "Liczba kierowców", 'teams_with_points': "Zespoły z punktami"
+}
+
+EXTRA_ANSWER_PREFIX = "Pytanie dodatkowe"
+
+
+def get_f1_drivers():
+    return [driver for team_drivers in TEAMS_DRIVERS.values() for driver in team_drivers]
+
+
+# Klucz odpowiedzi na pytanie dodatkowe w extra_answers: id pytania z custom_questions.
+# Pytania spoza bazy (secrets, questions.json) nie mają id - wtedy klucz pozycyjny.
+def extra_answer_key(question, position):
+    if question.get('id') is not None:
+        return str(question['id'])
+    return f"{EXTRA_ANSWER_PREFIX} {position}"
+
+
+# Wiersze tabeli submission_answers dla zapisanego typu (tylko klucze będące id pytań)
+def submission_answer_rows(submission):
+    return [
+        {"submission_id": submission['id'], "question_id": int(key), "answer": str(value)}
+        for key, value in (submission.get('extra_answers') or {}).items()
+        if str(key).isdigit()
+    ]
+
+
+# Rekord tabeli submissions utworzony z odpowiedzi formularza
+# (extra_answers: klucz z extra_answer_key -> odpowiedź)
+def build_submission(predictions, user_name, race_id, extra_answers):
+    submission = {
+        field: predictions[label] for label, field in PREDICTION_LABELS.items()
+    }
+    submission['safety_car'] = predictions["Safety Car"] == "Tak"
+    submission['red_flag'] = predictions["Czerwona flaga"] == "Tak"
+    submission.update({
+        "user_name": user_name,
+        "extra_answers": extra_answers,
+        "race_id": race_id
+    })
+    return submission
+
+
+# Konwersja terminu typowania (ISO, opcjonalnie z "Z") do obiektu datetime
+def parse_deadline(deadline_str):
+    if 'Z' in deadline_str:
+        return datetime.fromisoformat(deadline_str.replace('Z', '+00:00'))
+    return datetime.fromisoformat(deadline_str)
+
+
+# Chwila z kolumny timestamp/timestamptz (napis ISO albo datetime); czas bez strefy to UTC, jak w sesji
+# Postgresa. Porównanie chwil nie zależy od zapisu (strefa, końcowe zera części ułamkowej).
+def parse_timestamp(value):
+    if value is None or value == '':
+        return None
+    moment = value if isinstance(value, datetime) else parse_deadline(str(value))
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+# Czas zapisu (np. results.updated_at) - zawsze ze strefą, żeby porównywał się z timestamptz
+def utc_timestamp():
+    return datetime.now(timezone.utc).isoformat()
+
+
+# Termin (napis ISO albo datetime) ze strefą; czas bez strefy to czas lokalny APP_TIMEZONE
+def local_moment(value):
+    moment = value if isinstance(value, datetime) else parse_deadline(str(value))
+    return moment if moment.tzinfo else moment.replace(tzinfo=APP_TIMEZONE)
+
+
+# Bieżąca chwila w strefie APP_TIMEZONE (niezależnie od strefy serwera)
+def app_now():
+    return datetime.now(APP_TIMEZONE)
+
+
+# Czy termin typowania już minął (porównanie chwil ze strefą)
+def deadline_passed(deadline, now=None):
+    return local_moment(now or app_now()) > local_moment(deadline)
+
+
+# Sezon wyścigu - rok kalendarzowy race_date (None, gdy wyścig nie ma daty)
+def season_of(race):
+    race_date = race.get('race_date')
+    return int(str(race_date)[:4]) if race_date else None
+
+
+# Bieżący ("gorący") sezon - najpóźniejszy sezon z wynikami (scored_race_ids - id wyścigów z wynikami),
+# więc pierwszy dodany wyścig następnego sezonu go nie zmienia; bez żadnych wyników - najpóźniejszy
+# sezon, w którym są wyścigi
+def hot_season(races, scored_race_ids):
+    races = list(races)
+    scored = [season_of(race) for race in races if race.get('id') in scored_race_ids]
+    seasons = [season for season in scored if season is not None]
+    if not seasons:
+        seasons = [season for season in map(season_of, races) if season is not None]
+    return max(seasons) if seasons else None
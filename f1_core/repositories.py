@@ -0,0 +1,327 @@
+import hashlib
+import json
+
+from f1_core.crowd import compute_crowd_stats
+from f1_core.executor import DEFAULT_MAX_WORKERS, QueryExecutor
+from f1_core.models import parse_timestamp, submission_answer_rows, utc_timestamp
+
+# Dostęp do danych (Supabase lub lokalna baza z f1_core.local_db) bez zależności od Streamlit.
+# Metody zwracają dane lub zgłaszają wyjątek - obsługa błędów należy do wywołującego.
+
+
+# Zapytanie ograniczone do wyścigów jednego sezonu (rok kalendarzowy race_date)
+def season_filter(query, season):
+    return query.gte('race_date', f"{season}-01-01").lt('race_date', f"{season + 1}-01-01")
+
+
+class F1Repository:
+    # max_workers - ile niezależnych zapytań może być wysłanych jednocześnie (1 = kolejno)
+    def __init__(self, client, max_workers=DEFAULT_MAX_WORKERS):
+        self.client = client
+        self.executor = QueryExecutor(max_workers)
+
+    def table(self, name):
+        return self.client.table(name)
+
+    # Niezależne zapytania wykonywane równolegle: fetch_parallel(results=lambda: ..., races=lambda: ...)
+    # zwraca {"results": ..., "races": ...}
+    def fetch_parallel(self, **queries):
+        return self.executor.run(**queries)
+
+    # Wszystkie wiersze tabeli pobierane stronami (PostgREST domyślnie zwraca najwyżej 1000 wierszy);
+    # where(query) zawęża zapytanie, np. lambda q: q.in_('race_id', race_ids); order_by musi jednoznacznie
+    # porządkować wiersze (widoki bez id: kilka kolumn po przecinku, jak w PostgREST)
+    def fetch_all(self, table_name, order_by='id', page_size=1000, where=None, columns='*'):
+        rows = []
+        while True:
+            query = self.table(table_name).select(columns)
+            if where is not None:
+                query = where(query)
+            page = query.order(order_by).range(len(rows), len(rows) + page_size - 1).execute().data
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+
+    # Zbiorczy zapis pełnych wierszy (np. po migracji danych) paczkami po batch_size
+    def upsert_rows(self, table_name, rows, on_conflict='id', batch_size=500):
+        saved = 0
+        for start in range(0, len(rows), batch_size):
+            saved += len(self.table(table_name).upsert(rows[start:start + batch_size], on_conflict=on_conflict).execute().data)
+        return saved
+
+    # Wyścigi
+
+    def get_active_races(self):
+        return self.table('races').select('*').eq('is_active', True).execute().data
+
+    def get_all_races(self):
+        return self.table('races').select('*').execute().data
+
+    def get_races_ordered(self):
+        return self.table('races').select('*').order('race_date', desc=True).execute().data
+
+    def insert_race(self, race_data):
+        return self.table('races').insert(race_data).execute().data
+
+    def deactivate_race(self, race_id):
+        return self.table('races').update({"is_active": False}).eq("id", race_id).execute().data
+
+    def insert_races(self, races_data):
+        return self.table('races').insert(races_data).execute().data
+
+    def update_race(self, race_id, race_data):
+        return self.table('races').update(race_data).eq("id", race_id).execute().data
+
+    # Pytania dodatkowe
+
+    def get_race_questions(self, race_id):
+        return self.table('custom_questions').select('*').eq('race_id', race_id).execute().data
+
+    def insert_question(self, question_data):
+        return self.table('custom_questions').insert(question_data).execute().data
+
+    def update_question(self, question_id, question_data):
+        return self.table('custom_questions').update(question_data).eq('id', question_id).execute().data
+
+    def delete_question(self, question_id):
+        self._delete_answers('question_id', [question_id])
+        return self.table('custom_questions').delete().eq('id', question_id).execute().data
+
+    # Typy i wyniki
+
+    # Zapis typu razem z jego wierszami w submission_answers. Jeden typ na parę (wyścig, użytkownik):
+    # ponowne wysłanie zastępuje poprzedni typ (unikalny indeks z sql/011). Błąd synchronizacji
+    # (np. brak tabeli przed migracją sql/005) nie blokuje zapisu typu - trafia do on_sync_error.
+    def upsert_submission(self, submission_data, on_sync_error=None):
+        saved = self.table('submissions').upsert(submission_data, on_conflict='race_id,user_name').execute().data
+        self.sync_submission_answers(saved, on_sync_error)
+        return saved
+
+    # Kopie wierszy przed usunięciem zdublowanych typów i wyników (tabela duplicate_backups, sql/007).
+    # Błąd zapisu kopii przerywa usuwanie.
+    def backup_rows(self, table_name, rows):
+        backups = [{'table_name': table_name, 'row_id': row['id'], 'row': row} for row in rows]
+        return self.table('duplicate_backups').insert(backups).execute().data
+
+    def delete_submissions(self, submission_ids):
+        self._delete_answers('submission_id', submission_ids)
+        return self.table('submissions').delete().in_('id', submission_ids).execute().data
+
+    # Znormalizowane odpowiedzi dodatkowe: wiersz (submission_id, question_id, answer) na odpowiedź
+    def sync_submission_answers(self, submissions, on_sync_error=None):
+        rows = [row for submission in submissions for row in submission_answer_rows(submission)]
+        if not rows:
+            return 0
+        try:
+            return self.upsert_rows('submission_answers', rows, on_conflict='submission_id,question_id')
+        except Exception as e:
+            if on_sync_error:
+                on_sync_error(e)
+            return 0
+
+    # Szkice typów (sql/007) - zapisywane partiami przez f1_core.drafts.DraftWriter
+
+    def get_draft(self, race_id, user_name):
+        rows = self.table('submission_drafts').select('*').eq('race_id', race_id).eq('user_name', user_name).execute().data
+        return rows[0] if rows else None
+
+    def delete_draft(self, race_id, user_name):
+        return self.table('submission_drafts').delete().eq('race_id', race_id).eq('user_name', user_name).execute().data
+
+    # W Postgresie usuwa je też "on delete cascade"; jawne usunięcie obsługuje lokalną bazę
+    def _delete_answers(self, column, ids):
+        try:
+            self.table('submission_answers').delete().in_(column, ids).execute()
+        except Exception:
+            pass
+
+    # Rozkład odpowiedzi na pytania dodatkowe liczony w bazie (widok submission_answer_counts)
+    def get_answer_counts(self, question_ids):
+        return self.table('submission_answer_counts').select('*').in_('question_id', question_ids).execute().data
+
+    def get_race_submissions(self, race_id):
+        return self.table('submissions').select('*').eq('race_id', race_id).execute().data
+
+    def get_race_results(self, race_id):
+        return self.table('results').select('*').eq('race_id', race_id).execute().data
+
+    def insert_results(self, results_data):
+        return self.table('results').insert(results_data).execute().data
+
+    def update_results(self, race_id, results_data):
+        return self.table('results').update(results_data).eq('race_id', race_id).execute().data
+
+    # Wyniki wielu wyścigów naraz (import z pliku) - jeden wiersz na wyścig (unikalny race_id, sql/011)
+    def upsert_results(self, results_rows):
+        return self.upsert_rows('results', results_rows, on_conflict='race_id')
+
+    # Usunięcie zdublowanych wierszy wyników (f1_cli.py check --fix-duplicates). Dziennik zmian trzyma
+    # jeden wynik na wyścig, a usunięcie duplikatu zdejmuje z niego wynik wyścigu - wiersze, które zostały
+    # (kept_ids), dostają nowe updated_at, więc dziennik dostaje ich zdarzenie, a wersja wyników się zmienia.
+    def delete_duplicate_results(self, result_ids, kept_ids):
+        deleted = self.table('results').delete().in_('id', result_ids).execute().data
+        self.table('results').update({'updated_at': utc_timestamp()}).in_('id', kept_ids).execute()
+        return deleted
+
+    # Dziennik zmian (sql/010) - zdarzenia zapisuje wyzwalacz na submissions i results
+
+    # Zdarzenia z przedziału (after, until] w kolejności occurred_at, pobierane stronami
+    def fetch_events(self, after=None, until=None, page_size=1000):
+        events = []
+        while True:
+            query = self.table('change_events').select('*')
+            if after is not None:
+                query = query.gt('occurred_at', after)
+            if until is not None:
+                query = query.lte('occurred_at', until)
+            page = query.order('occurred_at').order('id').range(len(events), len(events) + page_size - 1).execute().data
+            events.extend(page)
+            if len(page) < page_size:
+                return events
+
+    def save_event_snapshot(self, snapshot):
+        return self.table('event_snapshots').insert(snapshot).execute().data
+
+    # Najpóźniejsza migawka nie późniejsza niż until (None, jeśli jej nie ma)
+    def get_event_snapshot(self, until=None):
+        query = self.table('event_snapshots').select('*')
+        if until is not None:
+            query = query.lte('occurred_at', until)
+        rows = query.order('occurred_at', desc=True).limit(1).execute().data
+        return rows[0] if rows else None
+
+    # Lista migawek bez ich zawartości
+    def list_event_snapshots(self):
+        return self.table('event_snapshots').select('id, occurred_at, ruleset_version, created_at').order('occurred_at', desc=True).execute().data
+
+    # Wersja wyników - zmienia się po dodaniu lub edycji wyników dowolnego wyścigu
+    def get_results_version(self):
+        rows = self.table('results').select('race_id, updated_at').execute().data
+        fingerprint = json.dumps(sorted((r['race_id'], r.get('updated_at') or '') for r in rows), default=str)
+        return hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+
+    # Wyścigi jednego sezonu (roku kalendarzowego race_date)
+    # Id wyścigów, które mają wyniki (wybór bieżącego sezonu, models.hot_season)
+    def get_scored_race_ids(self):
+        return {row['race_id'] for row in self.fetch_all('results', columns='race_id')}
+
+    def get_season_races(self, season):
+        return season_filter(self.table('races').select('*'), season).execute().data
+
+    # Wyniki, dane wyścigów i typy dla wszystkich wyścigów z wprowadzonymi wynikami;
+    # z season - tylko dla wyścigów tego sezonu (zapytania nie dotykają wcześniejszych sezonów)
+    def fetch_results_history(self, season=None):
+        if season is None:
+            # Wyniki, wyścigi i typy w jednej turze równoległych zapytań (każde stronami); typy wyścigów
+            # bez wyników (zwykle tylko bieżącego) są odrzucane poniżej
+            data = self.fetch_parallel(
+                results=lambda: self.fetch_all('results'),
+                races=lambda: self.fetch_all('races'),
+                submissions=lambda: self.fetch_all('submissions'),
+            )
+        else:
+            races = self.get_season_races(season)
+            race_ids = [r['id'] for r in races]
+            if not race_ids:
+                return {}, {}, []
+            data = self.fetch_parallel(
+                results=lambda: self.fetch_all('results', where=lambda q: q.in_('race_id', race_ids)),
+                submissions=lambda: self.fetch_all('submissions', where=lambda q: q.in_('race_id', race_ids)),
+            )
+            data['races'] = races
+        all_results_list, all_race_data_list, all_subs_list = data['results'], data['races'], data['submissions']
+
+        if not all_results_list:
+            return {}, {}, []
+
+        results_by_race = {r['race_id']: r for r in all_results_list}
+        race_data_by_id = {r['id']: r for r in all_race_data_list}
+        scored_subs = [
+            s for s in all_subs_list
+            if s['race_id'] in results_by_race and s['race_id'] in race_data_by_id
+        ]
+        return results_by_race, race_data_by_id, scored_subs
+
+    # Typy jednego użytkownika wraz z wynikami i danymi jego wyścigów - zapytanie po indeksie
+    # (user_name, race_id), więc koszt rośnie z historią użytkownika, a nie z liczbą wszystkich typów
+    def fetch_user_history(self, user_name):
+        user_subs = self.table('submissions').select('*').eq('user_name', user_name).order('race_id').execute().data
+        race_ids = sorted({s['race_id'] for s in user_subs})
+        if not race_ids:
+            return [], {}, {}
+
+        data = self.fetch_parallel(
+            results=lambda: self.table('results').select('*').in_('race_id', race_ids).execute().data,
+            races=lambda: self.table('races').select('*').in_('id', race_ids).execute().data,
+        )
+        results_by_race = {r['race_id']: r for r in data['results']}
+        race_data_by_id = {r['id']: r for r in data['races']}
+        return user_subs, results_by_race, race_data_by_id
+
+    # Statystyki tłumu z tabeli race_crowd_stats; przeliczane są tylko wyścigi, dla których
+    # brakuje statystyk lub zmieniły się wyniki (porównanie chwil, nie napisów - timestamptz wraca
+    # z bazy w innym zapisie niż results.updated_at). on_store_error dostaje wyjątek nieudanego zapisu.
+    def load_crowd_stats(self, on_store_error=None):
+        results_rows = self.fetch_all('results', order_by='race_id')
+        if not results_rows:
+            return {}
+
+        try:
+            stored_rows = self.fetch_all('race_crowd_stats', order_by='race_id')
+            stats_table_available = True
+        except Exception:
+            stored_rows = []
+            stats_table_available = False
+
+        stored = {r['race_id']: r for r in stored_rows}
+        stale_results = [
+            r for r in results_rows
+            if r['race_id'] not in stored
+            or parse_timestamp(stored[r['race_id']].get('results_updated_at')) != parse_timestamp(r.get('updated_at'))
+        ]
+
+        if stale_results:
+            stale_race_ids = [r['race_id'] for r in stale_results]
+            stale_subs = self.fetch_all('submissions', where=lambda q: q.in_('race_id', stale_race_ids))
+            fresh = compute_crowd_stats(stale_subs, stale_results)
+            if fresh and stats_table_available:
+                try:
+                    self.save_crowd_stats(list(fresh.values()))
+                except Exception as e:
+                    if on_store_error:
+                        on_store_error(e)
+            stored.update(fresh)
+
+        result_race_ids = {r['race_id'] for r in results_rows}
+        return {rid: row for rid, row in stored.items() if rid in result_race_ids}
+
+    def save_crowd_stats(self, rows):
+        return self.table('race_crowd_stats').upsert(rows).execute().data
+
+    # Agregaty liczone w bazie (widoki z sql/006) - kilkaset wierszy zamiast wszystkich typów
+
+    # Widoki też podlegają limitowi 1000 wierszy PostgREST (np. 30 użytkowników x 40 wyścigów), więc są
+    # czytane stronami
+    def get_user_race_points(self, season=None):
+        where = None if season is None else (lambda query: season_filter(query, season))
+        return self.fetch_all('user_race_points', order_by='user_name,race_id', where=where)
+
+    def get_user_points_totals(self):
+        return self.fetch_all('user_points_totals', order_by='user_name')
+
+    def get_field_value_counts(self, race_id):
+        return self.fetch_all('race_field_value_counts', order_by='field,value',
+                              where=lambda query: query.eq('race_id', race_id))
+
+    # Sumy punktów po przeliczeniu historii (tabela scoring_totals)
+
+    def save_scoring_totals(self, rows):
+        return self.table('scoring_totals').upsert(rows).execute().data
+
+    def load_scoring_totals(self):
+        return self.table('scoring_totals').select('*').execute().data
+
+    # Ustawienia aplikacji
+
+    def save_app_settings(self, settings_data):
+        return self.table('app_settings').upsert(settings_data).execute().data
@@ -0,0 +1,227 @@
+import numpy as np
+import pandas as pd
+
+from f1_core.models import OTHER_FIELDS, PODIUM_FIELDS, PREDICTION_FIELDS
+
+# Deklaratywne, wersjonowane zasady punktacji.
+# Nowa wersja zasad to nowy wpis w SCORING_RULESETS - istniejących wersji nie zmieniamy,
+# bo zapisane sumy punktów (tabela scoring_totals) są przypisane do numeru wersji.
+
+FIELD_LABELS = {
+    'podium_1': "1. miejsce", 'podium_2': "2. miejsce", 'podium_3': "3. miejsce",
+    'time_diff': "różnica czasowa", 'driver_of_day': "DOTD",
+    'safety_car': "Safety Car", 'red_flag': "czerwona flaga",
+    'classified_drivers': "liczba kierowców", 'teams_with_points': "zespoły z punktami"
+}
+
+SCORING_RULESETS = {
+    1: {
+        "name": "Zasady podstawowe",
+        "field_points": {field: 1 for field in PODIUM_FIELDS + OTHER_FIELDS},
+        # Punkty za kierowcę z podium wytypowanego na innej pozycji podium
+        "podium_partial_points": 0,
+        "podium_bonus": 1,
+        "extra_points": 1,
+        # Wagi wybranych pytań dodatkowych (id pytania jako tekst -> punkty)
+        "extra_weights": {},
+    },
+    2: {
+        "name": "Podium z częściowym zaliczeniem",
+        "field_points": {**{field: 2 for field in PODIUM_FIELDS}, **{field: 1 for field in OTHER_FIELDS}},
+        "podium_partial_points": 1,
+        "podium_bonus": 1,
+        "extra_points": 1,
+        "extra_weights": {},
+    },
+}
+
+ACTIVE_RULESET_VERSION = 1
+
+# Wersja zasad zaimplementowana w widokach SQL (sql/006_aggregate_views.sql, f1_core/sqlite_views.py)
+DB_VIEWS_RULESET_VERSION = 1
+
+
+def _extra_points(ruleset, key):
+    return ruleset["extra_weights"].get(key, ruleset["extra_points"])
+
+
+# Punktacja jednego typu według zasad; zwraca sumę i listę (opis, punkty)
+def score_submission(submission, race_result, ruleset):
+    details = []
+    podium_hits = 0
+    result_podium = [race_result[pos] for pos in PODIUM_FIELDS]
+    for pos in PODIUM_FIELDS:
+        if submission[pos] == race_result[pos]:
+            podium_hits += 1
+            details.append((FIELD_LABELS[pos], ruleset["field_points"][pos]))
+        elif ruleset["podium_partial_points"] and submission[pos] in result_podium:
+            details.append((f"{FIELD_LABELS[pos]} (kierowca z podium)", ruleset["podium_partial_points"]))
+
+    for field in OTHER_FIELDS:
+        if submission[field] == race_result[field]:
+            details.append((FIELD_LABELS[field], ruleset["field_points"][field]))
+
+    if podium_hits == 3 and ruleset["podium_bonus"]:
+        details.append(("bonus za pełne podium", ruleset["podium_bonus"]))
+
+    result_extra = race_result.get('extra_answers') or {}
+    for key, value in (submission.get('extra_answers') or {}).items():
+        if key in result_extra and value == result_extra[key]:
+            details.append((key, _extra_points(ruleset, key)))
+
+    return sum(points for _, points in details), details
+
+
+# Punkty za typ według wybranej (domyślnie aktywnej) wersji zasad punktacji
+def calculate_points(submission, race_result, ruleset_version=ACTIVE_RULESET_VERSION):
+    points, _ = score_submission(submission, race_result, SCORING_RULESETS[ruleset_version])
+    return points
+
+
+# Szczegóły trafień jednego typu: pole -> czy trafione oraz liczba trafionych pytań dodatkowych
+def score_breakdown(submission, race_result):
+    hits = {field: submission[field] == race_result[field] for field in PREDICTION_FIELDS}
+    result_extra = race_result.get('extra_answers') or {}
+    answered = [(key, value) for key, value in (submission.get('extra_answers') or {}).items() if key in result_extra]
+    hits['extra_answers'] = sum(1 for key, value in answered if value == result_extra[key])
+    hits['extra_questions'] = len(answered)
+    return hits
+
+
+# Opis szczegółów punktacji w formacie tabeli statystyk ("1 pkt za DOTD, ...")
+def format_point_details(details):
+    return ", ".join(
+        f"{points} pkt {label}" if label.startswith("bonus") else f"{points} pkt za {label}"
+        for label, points in details
+    )
+
+
+# Punktacja wielu typów naraz (jedna operacja na kolumnach dla całej historii).
+# subs_df i results_df to ramki z wierszami tabel submissions i results.
+# Zwraca serię punktów o indeksie zgodnym z subs_df.
+def score_frame(subs_df, results_df, ruleset):
+    if subs_df.empty:
+        return pd.Series(dtype=float, index=subs_df.index)
+
+    fields = PREDICTION_FIELDS
+    subs_df = _with_extra_answers(subs_df)
+    results_df = _with_extra_answers(results_df)
+    result_columns = results_df[['race_id'] + fields + ['extra_answers']].rename(
+        columns={c: f"{c}_result" for c in fields + ['extra_answers']}
+    )
+    merged = subs_df[['race_id'] + fields + ['extra_answers']].reset_index().merge(
+        result_columns, on='race_id', how='inner'
+    ).set_index('index')
+
+    points = np.zeros(len(merged))
+    exact = {}
+    for field in fields:
+        exact[field] = (merged[field] == merged[f"{field}_result"]).to_numpy()
+        points += exact[field] * ruleset["field_points"][field]
+
+    if ruleset["podium_partial_points"]:
+        for pos in PODIUM_FIELDS:
+            on_podium = np.zeros(len(merged), dtype=bool)
+            for other in PODIUM_FIELDS:
+                on_podium |= (merged[pos] == merged[f"{other}_result"]).to_numpy()
+            points += (on_podium & ~exact[pos]) * ruleset["podium_partial_points"]
+
+    podium_complete = exact['podium_1'] & exact['podium_2'] & exact['podium_3']
+    points += podium_complete * ruleset["podium_bonus"]
+
+    # Pytania dodatkowe: odpowiedzi typów w formacie długim (wiersz = typ x pytanie) złączone
+    # z tabelą poprawnych odpowiedzi po (race_id, id pytania) - jedna para kolumn do porównania
+    sub_extra = [
+        (idx, race_id, key, value)
+        for idx, race_id, answers in zip(merged.index, merged['race_id'], merged['extra_answers'])
+        for key, value in _answers(answers).items()
+    ]
+    correct_answers = [
+        (race_id, key, value)
+        for race_id, answers in zip(results_df['race_id'], results_df['extra_answers'])
+        for key, value in _answers(answers).items()
+    ]
+    if sub_extra and correct_answers:
+        extra_df = pd.DataFrame(sub_extra, columns=['idx', 'race_id', 'key', 'answer']).merge(
+            pd.DataFrame(correct_answers, columns=['race_id', 'key', 'correct']), on=['race_id', 'key']
+        )
+        extra_df = extra_df[(extra_df['answer'] == extra_df['correct']).to_numpy()]
+        weights = extra_df['key'].map(ruleset["extra_weights"]).fillna(ruleset["extra_points"])
+        extra_points = weights.groupby(extra_df['idx'].to_numpy()).sum()
+        points += extra_points.reindex(merged.index, fill_value=0).to_numpy()
+
+    return pd.Series(points, index=merged.index).reindex(subs_df.index, fill_value=0)
+
+
+# Punkty typów zapisanych jako indeksy wariantów (tablice NumPy, ostatnia oś - pola w kolejności
+# PREDICTION_FIELDS) według zasad, jak w score_submission bez pytań dodatkowych. Pola podium muszą
+# używać wspólnej listy kierowców. picks i outcomes muszą się rozgłaszać (np. [symulacja, użytkownik,
+# pole] i [symulacja, 1, pole]).
+def score_choice_arrays(picks, outcomes, ruleset):
+    points = 0
+    exact = picks == outcomes
+    for field_idx, field in enumerate(PREDICTION_FIELDS):
+        points = points + exact[..., field_idx] * ruleset["field_points"][field]
+    n_podium = len(PODIUM_FIELDS)
+    if ruleset["podium_partial_points"]:
+        on_podium = (picks[..., :n_podium, None] == outcomes[..., None, :n_podium]).any(axis=-1)
+        points = points + (on_podium & ~exact[..., :n_podium]).sum(axis=-1) * ruleset["podium_partial_points"]
+    return points + exact[..., :n_podium].all(axis=-1) * ruleset["podium_bonus"]
+
+
+# Ramka z kolumną extra_answers (wiersze bez odpowiedzi dodatkowych mogą jej nie mieć)
+def _with_extra_answers(frame):
+    return frame if 'extra_answers' in frame.columns else frame.assign(extra_answers=None)
+
+
+# Odpowiedzi dodatkowe wiersza; brak odpowiedzi w ramce to None albo NaN
+def _answers(answers):
+    return answers if isinstance(answers, dict) else {}
+
+
+# Maksymalna liczba punktów z pytań stałych
+def max_fixed_points(ruleset):
+    return sum(ruleset["field_points"].values()) + ruleset["podium_bonus"]
+
+
+def _points_word(points):
+    if points == 1:
+        return "punkt"
+    if 2 <= points % 10 <= 4 and not 12 <= points % 100 <= 14:
+        return "punkty"
+    return "punktów"
+
+
+def _points(points):
+    return f"{points} {_points_word(points)}"
+
+
+# Treść sekcji "Zasady punktacji" generowana z zasad
+def rules_markdown(ruleset):
+    field_points = ruleset["field_points"]
+    podium_points = field_points['podium_1']
+    podium_max = sum(field_points[pos] for pos in PODIUM_FIELDS) + ruleset["podium_bonus"]
+
+    podium_line = f"1. **Podium** - {_points(podium_points)} za każdego prawidłowo wytypowanego kierowcę"
+    if ruleset["podium_partial_points"]:
+        podium_line += f", {_points(ruleset['podium_partial_points'])} za kierowcę z podium na innej pozycji"
+    if ruleset["podium_bonus"]:
+        podium_line += f" + {_points(ruleset['podium_bonus'])} dodatkowo za idealne podium"
+    podium_line += f" (łącznie max. {_points(podium_max)})"
+
+    extra_points = "1 punkcie" if ruleset["extra_points"] == 1 else _points(ruleset["extra_points"])
+
+    lines = [
+        "### Zasady przyznawania punktów:",
+        podium_line,
+        f"2. **Różnica czasowa** - {_points(field_points['time_diff'])} za prawidłowy przedział",
+        f"3. **Kierowca dnia** - {_points(field_points['driver_of_day'])} za trafienie",
+        f"4. **Safety Car** - {_points(field_points['safety_car'])} za prawidłową odpowiedź",
+        f"5. **Czerwona flaga** - {_points(field_points['red_flag'])} za prawidłową odpowiedź",
+        f"6. **Liczba sklasyfikowanych kierowców** - {_points(field_points['classified_drivers'])} za prawidłowy przedział",
+        f"7. **Liczba zespołów z punktami** - {_points(field_points['teams_with_points'])} za trafienie",
+        f"8. **Pytania dodatkowe** - po {extra_points} za każdą prawidłową odpowiedź",
+        "",
+        f"**Maksymalna liczba punktów z pytań stałych: {max_fixed_points(ruleset)}** (plus pytania dodatkowe)",
+    ]
+    return "\n".join(lines)
@@ -0,0 +1,252 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+# Wspólny cache kilku replik aplikacji (za load balancerem): wyniki zapytań i policzone widoki
+# (klasyfikacja) są liczone raz na zmianę danych dla całej floty, a nie raz na replikę.
+#   F1_SHARED_CACHE=sqlite:///ścieżka/cache.db - plik SQLite (WAL) na wspólnym dysku, np. repliki na jednym hoście
+#   F1_SHARED_CACHE=redis://host:6379/0        - serwer zgodny z Redis (wymaga pakietu redis)
+# Bez F1_SHARED_CACHE każda replika ma tylko własny cache (f1_core.memory).
+#
+# Każdy wpis ma wersję (np. wersję wyników albo generację cache); odczyt z inną wersją to brak wpisu,
+# więc zmiana wersji unieważnia wpis we wszystkich replikach naraz. Generacja cache (bump) to
+# licznik podbijany przy czyszczeniu cache w dowolnej replice. Wyliczenie brakującego wpisu
+# odbywa się pod dzierżawą (lease): liczy jedna replika, pozostałe czekają na jej wynik.
+
+DEFAULT_LEASE_TTL = 60.0
+DEFAULT_WAIT = 30.0
+POLL_INTERVAL = 0.05
+MISSING = object()
+
+
+# Krótki klucz wpisu z nazwy i argumentów (repr argumentów bywa długi)
+def make_key(namespace, *parts):
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+# Zaplecze musi zaimplementować wszystkie metody abstrakcyjne - brakująca metoda kończy się błędem
+# już przy tworzeniu obiektu, a nie przy pierwszym odczycie cache
+class SharedCache(ABC):
+    def __init__(self):
+        # Identyfikator repliki w dzierżawach
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.last_error = None
+        self.stats = {"hits": 0, "misses": 0, "computed": 0, "waited": 0}
+
+    # Operacje zaplecza: wartość to bajty, version - tekst
+    @abstractmethod
+    def _get(self, key):
+        pass
+
+    @abstractmethod
+    def _set(self, key, payload, version, ttl):
+        pass
+
+    @abstractmethod
+    def acquire(self, key, ttl=DEFAULT_LEASE_TTL):
+        pass
+
+    @abstractmethod
+    def release(self, key):
+        pass
+
+    @abstractmethod
+    def generation(self, name):
+        pass
+
+    @abstractmethod
+    def bump(self, name):
+        pass
+
+    # Wartość zapisana dla wersji version albo MISSING
+    def get(self, key, version=None):
+        entry = self._get(key)
+        if entry is None or entry[0] != str(version):
+            self.stats["misses"] += 1
+            return MISSING
+        self.stats["hits"] += 1
+        return pickle.loads(entry[1])
+
+    def set(self, key, value, version=None, ttl=None):
+        self._set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), str(version), ttl)
+
+    # Wartość dla wersji version: ze wspólnego cache albo policzona przez compute() - w całej flocie
+    # liczy ją tylko replika z dzierżawą, pozostałe czekają na wynik najwyżej wait sekund.
+    # force=True pomija odczyt (np. po zapisaniu wyników). Błędy zaplecza cache nie przerywają
+    # działania - wartość jest wtedy liczona lokalnie; błędy compute() są przekazywane dalej.
+    def get_or_compute(self, key, compute, version=None, ttl=None, force=False,
+                       lease_ttl=DEFAULT_LEASE_TTL, wait=DEFAULT_WAIT):
+        lease = f"lease:{key}:{version}"
+        try:
+            value = MISSING if force else self.get(key, version)
+            if value is not MISSING:
+                return value
+            leased = self.acquire(lease, lease_ttl)
+            if not leased:
+                self.stats["waited"] += 1
+                deadline = time.monotonic() + wait
+                while time.monotonic() < deadline:
+                    time.sleep(POLL_INTERVAL)
+                    value = self.get(key, version)
+                    if value is not MISSING:
+                        return value
+                    # Replika z dzierżawą przestała działać - dzierżawa wygasła
+                    leased = self.acquire(lease, lease_ttl)
+                    if leased:
+                        break
+        except Exception as e:
+            self.last_error = e
+            return compute()
+
+        try:
+            value = compute()
+            self.stats["computed"] += 1
+            try:
+                self.set(key, value, version, ttl)
+            except Exception as e:
+                self.last_error = e
+            return value
+        finally:
+            if leased:
+                try:
+                    self.release(lease)
+                except Exception as e:
+                    self.last_error = e
+
+
+class SQLiteSharedCache(SharedCache):
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY, version TEXT, payload BLOB, expires_at REAL);
+                CREATE TABLE IF NOT EXISTS cache_leases (
+                    key TEXT PRIMARY KEY, owner TEXT, expires_at REAL);
+                CREATE TABLE IF NOT EXISTS cache_generations (
+                    name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            """)
+
+    # Połączenie na wątek (sqlite3 nie pozwala współdzielić połączenia między wątkami)
+    def _connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def _get(self, key):
+        row = self._connection().execute(
+            "SELECT version, payload FROM cache_entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time())
+        ).fetchone()
+        return row
+
+    def _set(self, key, payload, version, ttl):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache_entries (key, version, payload, expires_at) VALUES (?, ?, ?, ?)",
+            (key, version, payload, time.time() + ttl if ttl is not None else None)
+        )
+
+    def acquire(self, key, ttl=DEFAULT_LEASE_TTL):
+        now = time.time()
+        cursor = self._connection().execute(
+            "INSERT INTO cache_leases (key, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE cache_leases.expires_at <= ?",
+            (key, self.owner, now + ttl, now)
+        )
+        return cursor.rowcount == 1
+
+    def release(self, key):
+        self._connection().execute("DELETE FROM cache_leases WHERE key = ? AND owner = ?", (key, self.owner))
+
+    def generation(self, name):
+        row = self._connection().execute("SELECT value FROM cache_generations WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, name):
+        self._connection().execute(
+            "INSERT INTO cache_generations (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,)
+        )
+
+    # Usunięcie wygasłych wpisów i dzierżaw
+    def purge(self):
+        now = time.time()
+        connection = self._connection()
+        connection.execute("DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        connection.execute("DELETE FROM cache_leases WHERE expires_at <= ?", (now,))
+
+
+class RedisSharedCache(SharedCache):
+    # Zwolnienie dzierżawy tylko przez jej właściciela
+    RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url, prefix="f1:"):
+        super().__init__()
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("Wspólny cache w Redis wymaga pakietu redis (uv add redis)") from e
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _get(self, key):
+        version, payload = self.client.hmget(self.prefix + key, "version", "payload")
+        return None if payload is None else (version.decode("utf-8"), payload)
+
+    def _set(self, key, payload, version, ttl):
+        pipeline = self.client.pipeline()
+        pipeline.delete(self.prefix + key)
+        pipeline.hset(self.prefix + key, mapping={"version": version, "payload": payload})
+        if ttl is not None:
+            pipeline.pexpire(self.prefix + key, int(ttl * 1000))
+        pipeline.execute()
+
+    def acquire(self, key, ttl=DEFAULT_LEASE_TTL):
+        return bool(self.client.set(self.prefix + key, self.owner, nx=True, px=int(ttl * 1000)))
+
+    def release(self, key):
+        self.client.eval(self.RELEASE_SCRIPT, 1, self.prefix + key, self.owner)
+
+    def generation(self, name):
+        value = self.client.get(f"{self.prefix}generation:{name}")
+        return int(value) if value is not None else 0
+
+    def bump(self, name):
+        self.client.incr(f"{self.prefix}generation:{name}")
+
+
+# Wspólny cache z adresu (sqlite:///ścieżka, redis://...); None dla pustego adresu
+def open_shared_cache(url):
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSharedCache(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteSharedCache(url[len("sqlite:///"):])
+    raise ValueError(f"Nieobsługiwany adres wspólnego cache: {url}")
+
+
+# Wspólny cache procesu (F1_SHARED_CACHE); zmieniany przez configure(), np. w benchmarkach
+tier = open_shared_cache(os.environ.get("F1_SHARED_CACHE"))
+
+
+def configure(url):
+    global tier
+    tier = open_shared_cache(url)
+    return tier
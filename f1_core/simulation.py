@@ -0,0 +1,117 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from f1_core.models import PODIUM_FIELDS
+from f1_core.scoring import ACTIVE_RULESET_VERSION, SCORING_RULESETS, score_choice_arrays
+
+# Symulacja Monte Carlo pozostałej części sezonu.
+# Funkcje działają na tablicach NumPy, dzięki czemu paczki symulacji można uruchamiać w puli procesów.
+# W każdym wyścigu losowane są wynik (podium bez powtórzeń kierowców) i typy wszystkich użytkowników,
+# a punkty liczy score_choice_arrays według zasad punktacji - tak jak dla prawdziwych typów.
+
+# Domyślna wielkość paczki symulacji przetwarzanej przez jeden proces
+DEFAULT_CHUNK_SIZE = 20_000
+
+
+# Normalizacja liczników typowań do rozkładu prawdopodobieństwa (z wygładzaniem Laplace'a)
+def counts_to_probs(counts, alpha=1.0):
+    counts = np.asarray(counts, dtype=np.float64) + alpha
+    return counts / counts.sum(axis=-1, keepdims=True)
+
+
+# Obliczenie miejsc w klasyfikacji (ranking "min", jak w tabeli klasyfikacji) dla każdego wiersza
+def _ranks_min(totals):
+    n_sims, n_users = totals.shape
+    span = float(totals.max() - totals.min()) + 1
+    # Przesunięcie wierszy pozwala posortować wszystkie symulacje jednym wywołaniem
+    keys = (totals - totals.min()) + np.arange(n_sims)[:, None] * span
+    flat = np.sort(keys, axis=None)
+    not_greater = np.searchsorted(flat, keys, side='right') - np.arange(n_sims)[:, None] * n_users
+    return n_users - not_greater + 1
+
+
+# Indeks wariantu wylosowany z każdego rozkładu probs [..., wariant] (rozkłady nie muszą sumować się do 1)
+def _sample(rng, probs, size):
+    cumulative = np.cumsum(probs, axis=-1)
+    draws = rng.random(size) * cumulative[..., -1]
+    return np.minimum((cumulative < draws[..., None]).sum(axis=-1), probs.shape[-1] - 1)
+
+
+# Wynik wyścigu w każdej symulacji: [symulacja, pole]; kierowcy podium losowani bez powtórzeń
+def _sample_outcomes(rng, outcome_probs, n_sims):
+    rows = np.arange(n_sims)
+    outcomes = []
+    for field_idx, field_probs in enumerate(outcome_probs):
+        if field_idx < len(PODIUM_FIELDS):
+            probs = np.repeat(field_probs[None, :], n_sims, axis=0)
+            for taken in outcomes:
+                probs[rows, taken] = 0.0
+            outcomes.append(_sample(rng, probs, n_sims))
+        else:
+            outcomes.append(_sample(rng, field_probs, n_sims))
+    return np.stack(outcomes, axis=-1)
+
+
+# Jedna paczka symulacji; zwraca macierz [użytkownik, miejsce] z liczbą wystąpień
+def _simulate_chunk(args):
+    (seed, n_sims, n_races, base_points, choice_probs, outcome_probs, ruleset,
+     extra_count, extra_hit_rates) = args
+    rng = np.random.default_rng(seed)
+    n_users = base_points.shape[0]
+    totals = np.repeat(base_points[None, :], n_sims, axis=0).astype(np.float64)
+
+    for _ in range(n_races):
+        outcomes = _sample_outcomes(rng, outcome_probs, n_sims)
+        picks = np.stack([_sample(rng, probs, (n_sims, n_users)) for probs in choice_probs], axis=-1)
+        totals += score_choice_arrays(picks, outcomes[:, None, :], ruleset)
+        if extra_count:
+            totals += rng.binomial(extra_count, extra_hit_rates, size=(n_sims, n_users)) * ruleset["extra_points"]
+
+    ranks = _ranks_min(totals)
+    flat_index = np.arange(n_users)[None, :] * n_users + (ranks - 1)
+    return np.bincount(flat_index.ravel(), minlength=n_users * n_users).reshape(n_users, n_users)
+
+
+# Prawdopodobieństwo zajęcia każdego miejsca w klasyfikacji na koniec sezonu.
+# choice_probs to lista macierzy [użytkownik, wariant] z rozkładami typowań użytkowników
+# dla kolejnych pól (PREDICTION_FIELDS; trzy pola podium ze wspólną listą kierowców), outcome_probs
+# to lista wektorów [wariant] z rozkładem możliwych wyników, ruleset - zasady punktacji
+# (domyślnie aktywne). Zwraca macierz [użytkownik, miejsce].
+def simulate_positions(base_points, choice_probs, outcome_probs, n_races, n_sims,
+                       ruleset=None, extra_count=0, extra_hit_rates=None,
+                       workers=None, seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    base_points = np.asarray(base_points, dtype=np.float64)
+    n_users = base_points.shape[0]
+    if n_users == 0 or n_sims <= 0:
+        return np.zeros((n_users, n_users))
+    if extra_hit_rates is None:
+        extra_hit_rates = np.zeros(n_users)
+
+    choice_probs = [np.asarray(p, dtype=np.float64) for p in choice_probs]
+    outcome_probs = [np.asarray(p, dtype=np.float64) for p in outcome_probs]
+    extra_hit_rates = np.clip(np.asarray(extra_hit_rates, dtype=np.float64), 0.0, 1.0)
+    if ruleset is None:
+        ruleset = SCORING_RULESETS[ACTIVE_RULESET_VERSION]
+
+    chunk_sizes = [chunk_size] * (n_sims // chunk_size)
+    if n_sims % chunk_size:
+        chunk_sizes.append(n_sims % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    tasks = [
+        (chunk_seed, size, n_races, base_points, choice_probs, outcome_probs, ruleset,
+         extra_count, extra_hit_rates)
+        for chunk_seed, size in zip(seeds, chunk_sizes)
+    ]
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        counts = sum(_simulate_chunk(task) for task in tasks)
+    else:
+        # "spawn" zamiast "fork" - proces serwera Streamlit jest wielowątkowy
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            counts = sum(pool.map(_simulate_chunk, tasks))
+
+    return counts / n_sims
@@ -0,0 +1,213 @@
+import json
+import os
+import shutil
+import threading
+import time
+
+import pyarrow as pa
+import pyarrow.ipc
+
+# Ostatnia znana wersja danych widoku (np. klasyfikacji) w pamięci procesu i na dysku.
+# Odczyt nie czeka na bazę (stale-while-revalidate): zwracana jest zapisana migawka, a gdy jest
+# starsza niż max_age, w wątku w tle sprawdzana jest wersja danych i - tylko jeśli się zmieniła -
+# liczona nowa migawka. Dane to słownik, którego wartości są DataFrame'ami albo None.
+#
+# Układ katalogu migawki:
+#   manifest.json        - nagłówek: wersja formatu, wersja danych, czas utworzenia, lista ramek
+#   <id>/<ramka>.arrow   - ramki w formacie Arrow IPC, czytane przez mapowanie pamięci (mmap)
+# Manifest jest podmieniany atomowo, więc wiele procesów aplikacji korzysta z migawki zapisanej
+# przez dowolny z nich. Repliki bez wspólnego katalogu dzielą dane przez wspólny cache
+# (f1_core.shared_cache): nową wersję liczy jedna replika, pozostałe biorą jej wynik.
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+
+def _atomic_write_json(path, payload):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(payload, file, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def write_snapshot(directory, snapshot):
+    os.makedirs(directory, exist_ok=True)
+    snapshot_id = f"{time.time_ns()}-{os.getpid()}"
+    frames = {}
+    if snapshot['data'] is not None:
+        os.makedirs(os.path.join(directory, snapshot_id))
+        header = {
+            b"format_version": str(FORMAT_VERSION).encode(),
+            b"version": str(snapshot.get('version')).encode(),
+        }
+        for name, frame in snapshot['data'].items():
+            if frame is None:
+                frames[name] = None
+                continue
+            table = pa.Table.from_pandas(frame, preserve_index=True)
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), **header})
+            frames[name] = f"{snapshot_id}/{name}.arrow"
+            with pa.OSFile(os.path.join(directory, frames[name]), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+    _atomic_write_json(os.path.join(directory, MANIFEST), {
+        "format_version": FORMAT_VERSION,
+        "version": snapshot.get('version'),
+        "created_at": snapshot['created_at'],
+        "empty": snapshot['data'] is None,
+        "frames": frames,
+    })
+    _remove_old_snapshots(directory, keep={snapshot_id} | {path.split("/")[0] for path in frames.values() if path})
+
+
+# Usunięcie ramek starszych migawek (poprzednia zostaje dla czytelników w trakcie odczytu)
+def _remove_old_snapshots(directory, keep, keep_previous=1):
+    old = sorted(
+        (entry for entry in os.listdir(directory)
+         if entry not in keep and os.path.isdir(os.path.join(directory, entry))),
+        reverse=True
+    )
+    for entry in old[keep_previous:]:
+        shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+
+# Zapis samego manifestu z nowym czasem - dane nie zmieniły się od poprzedniej migawki
+def touch_snapshot(directory, snapshot):
+    manifest_path = os.path.join(directory, MANIFEST)
+    with open(manifest_path, encoding="utf-8") as file:
+        manifest = json.load(file)
+    manifest["created_at"] = snapshot['created_at']
+    _atomic_write_json(manifest_path, manifest)
+
+
+def read_frame(path):
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def read_snapshot(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as file:
+            manifest = json.load(file)
+        if manifest.get("format_version") != FORMAT_VERSION:
+            return None
+        data = None if manifest["empty"] else {
+            name: None if path is None else read_frame(os.path.join(directory, path))
+            for name, path in manifest["frames"].items()
+        }
+    except (OSError, ValueError, KeyError, pa.ArrowInvalid):
+        return None
+    return {"data": data, "created_at": manifest["created_at"], "version": manifest.get("version")}
+
+
+def _manifest_mtime(directory):
+    try:
+        return os.stat(os.path.join(directory, MANIFEST)).st_mtime_ns
+    except OSError:
+        return None
+
+
+class SnapshotCache:
+    # loader() - funkcja bez argumentów licząca świeże dane (bez Streamlit, wywoływana w wątku);
+    # version_loader() - tania funkcja zwracająca wersję danych (np. wersję wyników), opcjonalna;
+    # shared - wspólny cache replik (SharedCache), używany tylko razem z version_loader
+    def __init__(self, directory, loader, max_age=30.0, version_loader=None, shared=None):
+        self.directory = directory
+        self.loader = loader
+        self.version_loader = version_loader
+        self.shared = shared
+        self.shared_key = f"snapshot:{os.path.basename(os.path.normpath(directory))}"
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.manifest_mtime = None
+        self.refresh_thread = None
+        self.refreshing = False
+        # force=True zgłoszone w trakcie odświeżania - wątek liczy dane jeszcze raz po jego końcu
+        self.pending_force = False
+        self.last_attempt = 0.0
+        self.last_error = None
+
+    # Migawka {"data": ..., "created_at": ..., "version": ...} albo None, jeśli nigdy jej nie policzono.
+    # Migawka zapisana na dysku przez inny proces jest wczytywana, nieaktualna uruchamia odświeżenie w tle.
+    def get(self):
+        with self.lock:
+            mtime = _manifest_mtime(self.directory)
+            if mtime is not None and mtime != self.manifest_mtime:
+                snapshot = read_snapshot(self.directory)
+                if snapshot is not None:
+                    self.snapshot = snapshot
+                    self.manifest_mtime = mtime
+            snapshot = self.snapshot
+        if snapshot is None or time.time() - max(snapshot['created_at'], self.last_attempt) > self.max_age:
+            self.refresh()
+        return snapshot
+
+    # Odświeżenie w tle; force=True liczy dane od nowa nawet przy niezmienionej wersji
+    # (np. po zapisaniu wyników). Wymuszenie w trakcie trwającego odświeżania nie przepada: ten sam
+    # wątek liczy dane od nowa po jego zakończeniu. Zwraca wątek odświeżania.
+    def refresh(self, force=False):
+        with self.lock:
+            if self.refreshing:
+                self.pending_force = self.pending_force or force
+            else:
+                self.refreshing = True
+                self.last_attempt = time.time()
+                self.refresh_thread = threading.Thread(
+                    target=self._run, args=(force,), name="f1-snapshot-refresh", daemon=True
+                )
+                self.refresh_thread.start()
+            return self.refresh_thread
+
+    def _run(self, force):
+        while True:
+            try:
+                self._refresh(force)
+            except Exception as e:
+                self.last_error = e
+            with self.lock:
+                if not self.pending_force:
+                    self.refreshing = False
+                    return
+                self.pending_force = False
+                self.last_attempt = time.time()
+                force = True
+
+    def _refresh(self, force):
+        current = self.snapshot
+        try:
+            version = self.version_loader() if self.version_loader else None
+            unchanged = not force and current is not None and version is not None and current.get('version') == version
+            data = current['data'] if unchanged else self._compute(version, force)
+        except Exception as e:
+            self.last_error = e
+            return
+
+        snapshot = {"data": data, "created_at": time.time(), "version": version}
+        try:
+            if unchanged:
+                touch_snapshot(self.directory, snapshot)
+            else:
+                write_snapshot(self.directory, snapshot)
+            error = None
+        except OSError as e:
+            error = e
+        with self.lock:
+            self.snapshot = snapshot
+            self.manifest_mtime = _manifest_mtime(self.directory)
+            self.last_error = error
+
+    # Dane nowej wersji: ze wspólnego cache replik (liczone przez jedną z nich) albo z loader()
+    def _compute(self, version, force):
+        if self.shared is None or version is None:
+            return self.loader()
+        return self.shared.get_or_compute(self.shared_key, self.loader, version=version, force=force)
+
+    # Oczekiwanie na trwające odświeżenie (najwyżej timeout sekund); zwraca bieżącą migawkę
+    def wait(self, timeout=None):
+        thread = self.refresh_thread
+        if thread is not None:
+            thread.join(timeout)
+        with self.lock:
+            return self.snapshot
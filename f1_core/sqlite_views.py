@@ -0,0 +1,88 @@
+import json
+import sqlite3
+
+from f1_core.models import PREDICTION_FIELDS
+
+# Widoki agregujące z sql/006_aggregate_views.sql w dialekcie SQLite. Lokalna baza (f1_core.local_db)
+# wylicza je na kopii tabel w SQLite, więc benchmarki i kontrole sprawdzają tę samą logikę SQL
+# niezależnie od obliczeń w pandas.
+
+# Tabele źródłowe i kolumny wymagane przez widoki (pozostałe kolumny są kopiowane bez zmian)
+SOURCE_TABLES = {
+    'races': ['id', 'race_name', 'race_date'],
+    'results': ['race_id', 'extra_answers'] + PREDICTION_FIELDS,
+    'submissions': ['id', 'race_id', 'user_name', 'extra_answers'] + PREDICTION_FIELDS,
+}
+
+_FIELD_HITS = " + ".join(f"(s.{f} IS r.{f})" for f in PREDICTION_FIELDS)
+_FIELD_VALUES = " UNION ALL ".join(
+    f"SELECT id, race_id, '{f}' AS field, "
+    + (f"CASE WHEN {f} THEN 'Tak' ELSE 'Nie' END" if f in ('safety_car', 'red_flag') else f"CAST({f} AS TEXT)")
+    + " AS value FROM submissions"
+    for f in PREDICTION_FIELDS
+)
+
+VIEW_SQL = {
+    'submission_points': f"""
+        CREATE VIEW submission_points AS
+        SELECT s.id AS submission_id, s.race_id, s.user_name,
+               {_FIELD_HITS}
+               + (s.podium_1 IS r.podium_1 AND s.podium_2 IS r.podium_2 AND s.podium_3 IS r.podium_3)
+               + (SELECT COUNT(*) FROM json_each(COALESCE(s.extra_answers, '{{}}')) e
+                  WHERE json_extract(COALESCE(r.extra_answers, '{{}}'), '$."' || e.key || '"') = e.value) AS points
+        FROM submissions s
+        JOIN results r ON r.race_id = s.race_id
+    """,
+    'user_race_points': """
+        CREATE VIEW user_race_points AS
+        SELECT p.user_name, p.race_id, ra.race_name, ra.race_date,
+               SUM(p.points) AS points, COUNT(*) AS submissions
+        FROM submission_points p
+        JOIN races ra ON ra.id = p.race_id
+        GROUP BY p.user_name, p.race_id, ra.race_name, ra.race_date
+    """,
+    'user_points_totals': """
+        CREATE VIEW user_points_totals AS
+        SELECT user_name, SUM(points) AS points, COUNT(DISTINCT race_id) AS races, COUNT(*) AS submissions
+        FROM submission_points
+        GROUP BY user_name
+    """,
+    'race_field_value_counts': f"""
+        CREATE VIEW race_field_value_counts AS
+        SELECT race_id, field, value, COUNT(*) AS submissions
+        FROM ({_FIELD_VALUES})
+        GROUP BY race_id, field, value
+    """,
+}
+
+
+def _sqlite_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+# Baza SQLite w pamięci z tabelami źródłowymi i wszystkimi widokami
+def build_database(tables):
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    for name, required in SOURCE_TABLES.items():
+        rows = tables.get(name, [])
+        columns = sorted({column for row in rows for column in row} | set(required))
+        conn.execute(f"CREATE TABLE {name} ({', '.join(columns)})")
+        conn.executemany(
+            f"INSERT INTO {name} VALUES ({', '.join('?' for _ in columns)})",
+            [[_sqlite_value(row.get(column)) for column in columns] for row in rows]
+        )
+    for sql in VIEW_SQL.values():
+        conn.execute(sql)
+    return conn
+
+
+# Wiersze jednego widoku dla tabel w formacie {"nazwa_tabeli": [wiersze, ...]}
+def view_rows(tables, view_name):
+    conn = build_database(tables)
+    try:
+        return [dict(row) for row in conn.execute(f"SELECT * FROM {view_name}")]
+    finally:
+        conn.close()
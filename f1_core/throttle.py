@@ -0,0 +1,135 @@
+import copy
+import threading
+import time
+
+# Ochrona bazy przed falą identycznych zapytań (np. wszystkie sesje odświeżają się naraz po
+# zapisaniu wyników): identyczne odczyty wykonywane w tym samym czasie dzielą jedno zapytanie
+# (single-flight), a wszystkie zapytania procesu przechodzą przez wspólny limit liczby zapytań
+# na sekundę z kolejką (token bucket z rezerwacją kolejnych terminów).
+
+DEFAULT_RATE = 20.0
+DEFAULT_BURST = 40
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+class RateLimiter:
+    # rate - zapytania na sekundę, burst - ile zapytań może przejść od razu po okresie ciszy,
+    # max_wait - najdłuższe oczekiwanie w kolejce [s] (None = bez limitu)
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_wait=None):
+        self.interval = 1.0 / rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.lock = threading.Lock()
+        # Termin, w którym zapytanie przeszłoby bez zapasu (GCRA); zapas to burst - 1 odstępów
+        self.tat = 0.0
+        self.tolerance = (burst - 1) * self.interval
+        self.waited = 0.0
+        self.rejected = 0
+
+    # Rezerwacja terminu (kolejność zgłoszeń = kolejność terminów) i oczekiwanie na niego
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            tat = max(self.tat, now)
+            wait = max(0.0, tat - self.tolerance - now)
+            if self.max_wait is not None and wait > self.max_wait:
+                self.rejected += 1
+                raise RateLimitExceeded(f"Przekroczono limit zapytań do bazy (kolejka: {wait:.1f} s)")
+            self.tat = tat + self.interval
+            self.waited += wait
+        if wait:
+            time.sleep(wait)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.coalesced = 0
+
+    # Wynik fn() dla klucza; jeśli identyczne wywołanie już trwa, czeka na jego wynik (kopię)
+    def do(self, key, fn):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+
+class _ThrottledQuery:
+    def __init__(self, query, client, key):
+        self._query = query
+        self._client = client
+        self._key = key
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if name == 'execute':
+            return lambda: self._client._execute(self._query, self._key)
+
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if result is self._query or hasattr(result, 'execute'):
+                return _ThrottledQuery(result, self._client, self._key + ((name, repr(args), repr(sorted(kwargs.items()))),))
+            return result
+        return chained
+
+
+# Klient Supabase (lub lokalnej bazy) z limitem zapytań i łączeniem identycznych odczytów.
+# Kluczem odczytu jest tabela i cały łańcuch wywołań (select, filtry, sortowanie, zakres).
+class ThrottledClient:
+    def __init__(self, client, limiter=None, single_flight=None):
+        self.client = client
+        self.limiter = limiter or RateLimiter()
+        self.single_flight = single_flight or SingleFlight()
+
+    def table(self, name):
+        return _ThrottledQuery(self.client.table(name), self, (name,))
+
+    def from_(self, name):
+        return self.table(name)
+
+    def rpc(self, fn, params=None):
+        return _ThrottledQuery(self.client.rpc(fn, params or {}), self, ('rpc', fn, repr(params)))
+
+    def _execute(self, query, key):
+        def run():
+            self.limiter.acquire()
+            return query.execute()
+
+        # Łączone są tylko odczyty tabel - zapisy i funkcje RPC zawsze trafiają do bazy
+        if len(key) > 1 and isinstance(key[1], tuple) and key[1][0] == 'select':
+            return self.single_flight.do(key, run)
+        return run()
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
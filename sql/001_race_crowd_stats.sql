@@ -0,0 +1,9 @@
+-- Statystyki tłumu per wyścig (konsensus, entropia typowań, trafienia wbrew większości).
+-- Wiersz jest przeliczany przez aplikację, gdy zmieni się results.updated_at danego wyścigu.
+create table if not exists race_crowd_stats (
+    race_id bigint primary key references races (id) on delete cascade,
+    results_updated_at timestamptz,
+    consensus jsonb not null default '{}'::jsonb,
+    entropy jsonb not null default '{}'::jsonb,
+    contrarian jsonb not null default '{}'::jsonb
+);
@@ -0,0 +1,2 @@
+-- Indeks dla widoku profilu typującego (historia jednego użytkownika).
+create index if not exists submissions_user_race_idx on submissions (user_name, race_id);
@@ -0,0 +1,10 @@
+-- Sumy punktów użytkowników przeliczone według kolejnych wersji zasad punktacji (scoring_rules.py).
+create table if not exists scoring_totals (
+    ruleset_version integer not null,
+    user_name text not null,
+    points numeric not null,
+    races integer not null,
+    results_version text,
+    computed_at timestamptz not null default now(),
+    primary key (ruleset_version, user_name)
+);
@@ -0,0 +1,29 @@
+-- Klucze extra_answers w results i submissions: "Pytanie dodatkowe N" -> id pytania z custom_questions.
+-- Pytanie N to N-te pytanie wyścigu w kolejności id (tak numerował je formularz).
+-- Klucze bez odpowiadającego pytania zostają bez zmian (raportuje je "f1_cli.py check").
+-- Lokalny zrzut bazy migruje "f1_cli.py migrate-extra-keys --dump plik.json".
+create index if not exists custom_questions_race_idx on custom_questions (race_id, id);
+
+with numbered as (
+    select id, race_id, row_number() over (partition by race_id order by id) as n
+    from custom_questions
+)
+update results r
+set extra_answers = (
+    select coalesce(jsonb_object_agg(coalesce(q.id::text, e.key), e.value), '{}'::jsonb)
+    from jsonb_each(r.extra_answers::jsonb) e
+    left join numbered q on q.race_id = r.race_id and e.key = 'Pytanie dodatkowe ' || q.n
+)
+where exists (select 1 from jsonb_object_keys(r.extra_answers::jsonb) k where k like 'Pytanie dodatkowe %');
+
+with numbered as (
+    select id, race_id, row_number() over (partition by race_id order by id) as n
+    from custom_questions
+)
+update submissions s
+set extra_answers = (
+    select coalesce(jsonb_object_agg(coalesce(q.id::text, e.key), e.value), '{}'::jsonb)
+    from jsonb_each(s.extra_answers::jsonb) e
+    left join numbered q on q.race_id = s.race_id and e.key = 'Pytanie dodatkowe ' || q.n
+)
+where exists (select 1 from jsonb_object_keys(s.extra_answers::jsonb) k where k like 'Pytanie dodatkowe %');
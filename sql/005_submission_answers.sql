@@ -0,0 +1,25 @@
+-- Znormalizowane odpowiedzi na pytania dodatkowe: wiersz na (typ, pytanie).
+-- Aplikacja zapisuje je razem z typem (F1Repository.upsert_submission); extra_answers zostaje
+-- źródłem prawdy dla punktacji. Wymaga kluczy extra_answers w postaci id pytań (sql/004).
+create table if not exists submission_answers (
+    submission_id bigint not null references submissions (id) on delete cascade,
+    question_id bigint not null references custom_questions (id) on delete cascade,
+    answer text not null,
+    primary key (submission_id, question_id)
+);
+
+create index if not exists submission_answers_question_answer_idx on submission_answers (question_id, answer);
+
+-- Rozkład odpowiedzi na pytania (zakładka Statystyki)
+create or replace view submission_answer_counts as
+select question_id, answer, count(*) as submissions
+from submission_answers
+group by question_id, answer;
+
+-- Uzupełnienie dla istniejących typów
+insert into submission_answers (submission_id, question_id, answer)
+select s.id, q.id, e.value
+from submissions s
+cross join lateral jsonb_each_text(s.extra_answers::jsonb) e
+join custom_questions q on q.id::text = e.key and q.race_id = s.race_id
+on conflict (submission_id, question_id) do update set answer = excluded.answer;
@@ -0,0 +1,62 @@
+-- Punktacja i agregacje po stronie bazy - aplikacja pobiera kilkaset wierszy zamiast wszystkich typów.
+-- Widoki odpowiadają zasadom w wersji DB_VIEWS_RULESET_VERSION z f1_core/scoring.py (wersja 1):
+-- 1 pkt za każde trafione pole, +1 za pełne podium, 1 pkt za każdą trafioną odpowiedź dodatkową.
+-- Gdy aktywna jest inna wersja zasad, aplikacja liczy punkty w pandas.
+-- Odpowiednik w SQLite (lokalna baza, benchmarki): f1_core/sqlite_views.py.
+
+-- Punkty każdego typu w rozliczonych wyścigach
+create or replace view submission_points as
+select
+    s.id as submission_id,
+    s.race_id,
+    s.user_name,
+    (s.podium_1 is not distinct from r.podium_1)::int
+    + (s.podium_2 is not distinct from r.podium_2)::int
+    + (s.podium_3 is not distinct from r.podium_3)::int
+    + (s.time_diff is not distinct from r.time_diff)::int
+    + (s.driver_of_day is not distinct from r.driver_of_day)::int
+    + (s.safety_car is not distinct from r.safety_car)::int
+    + (s.red_flag is not distinct from r.red_flag)::int
+    + (s.classified_drivers is not distinct from r.classified_drivers)::int
+    + (s.teams_with_points is not distinct from r.teams_with_points)::int
+    + (s.podium_1 is not distinct from r.podium_1
+       and s.podium_2 is not distinct from r.podium_2
+       and s.podium_3 is not distinct from r.podium_3)::int
+    + (
+        select count(*)::int
+        from jsonb_each(coalesce(s.extra_answers::jsonb, '{}'::jsonb)) e
+        where coalesce(r.extra_answers::jsonb, '{}'::jsonb) -> e.key = e.value
+    ) as points
+from submissions s
+join results r on r.race_id = s.race_id;
+
+-- Punkty użytkownika w każdym wyścigu (tabela klasyfikacji i wykres trendu)
+create or replace view user_race_points as
+select p.user_name, p.race_id, ra.race_name, ra.race_date,
+       sum(p.points)::int as points, count(*)::int as submissions
+from submission_points p
+join races ra on ra.id = p.race_id
+group by p.user_name, p.race_id, ra.race_name, ra.race_date;
+
+-- Sumy punktów użytkowników
+create or replace view user_points_totals as
+select user_name, sum(points)::int as points, count(distinct race_id)::int as races, count(*)::int as submissions
+from submission_points
+group by user_name;
+
+-- Rozkład typowań w każdym polu (zakładka Statystyki)
+create or replace view race_field_value_counts as
+select s.race_id, v.field, v.value, count(*)::int as submissions
+from submissions s
+cross join lateral (values
+    ('podium_1', s.podium_1::text),
+    ('podium_2', s.podium_2::text),
+    ('podium_3', s.podium_3::text),
+    ('time_diff', s.time_diff::text),
+    ('driver_of_day', s.driver_of_day::text),
+    ('safety_car', case when s.safety_car then 'Tak' else 'Nie' end),
+    ('red_flag', case when s.red_flag then 'Tak' else 'Nie' end),
+    ('classified_drivers', s.classified_drivers::text),
+    ('teams_with_points', s.teams_with_points::text)
+) as v (field, value)
+group by s.race_id, v.field, v.value;
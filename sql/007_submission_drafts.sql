@@ -0,0 +1,22 @@
+-- Szkice typów: stan formularza typowania dla pary (wyścig, użytkownik), zapisywany przyciskiem
+-- "Zapisz szkic" (f1_core.drafts.DraftWriter) i przywracany po ponownym wybraniu imienia.
+create table if not exists submission_drafts (
+    race_id bigint not null references races (id) on delete cascade,
+    user_name text not null,
+    predictions jsonb not null,
+    updated_at timestamptz not null default now(),
+    primary key (race_id, user_name)
+);
+
+-- Kopie wierszy usuniętych przez "f1_cli.py check --fix-duplicates" (zdublowane typy i wyniki), żeby
+-- każdą zmianę klasyfikacji po usunięciu dało się sprawdzić i cofnąć.
+create table if not exists duplicate_backups (
+    id bigserial primary key,
+    table_name text not null,
+    row_id bigint not null,
+    row jsonb not null,
+    backed_up_at timestamptz not null default now()
+);
+
+-- Unikalny indeks (race_id, user_name), którego potrzebuje upsert typów, dodaje sql/011_unique_keys.sql -
+-- dopiero po przejrzeniu i usunięciu zdublowanych typów.
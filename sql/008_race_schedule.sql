@@ -0,0 +1,4 @@
+-- Zaplanowane otwarcie typowania. Harmonogram (f1_core/lifecycle.py) ustawia is_active=true
+-- i czyści opens_at, gdy czas otwarcia minął, oraz zamyka aktywne wyścigi po submission_deadline.
+-- Czas lokalny bez strefy, jak submission_deadline zapisywany z panelu administratora.
+alter table races add column if not exists opens_at timestamp;
@@ -0,0 +1,6 @@
+-- Celowo pusta (zachowana, żeby numeracja migracji nie miała luki). Wcześniejsza wersja tej migracji
+-- usuwała zdublowane wyniki i zakładała unikalny indeks results_race_id_key. Oba kroki przeniesiono:
+-- duplikaty usuwa się jawnie ("f1_cli.py check --fix-duplicates", z kopią w duplicate_backups),
+-- a indeks zakłada sql/011_unique_keys.sql. Baza, na której wykonano starą wersję, ma już indeks -
+-- 011 go nie zmienia ("if not exists"). Nowa baza: wykonanie tego pliku niczego nie robi.
+select 1;
@@ -0,0 +1,73 @@
+-- Dziennik zmian typów i wyników (f1_core.events): każda zmiana wiersza w submissions i results
+-- (aplikacja, import, skrypty wsadowe, migracje, ręczny SQL) dopisuje zdarzenie z pełnym wierszem po
+-- zmianie (przy usunięciu - usuniętym wierszem). Zdarzenie zapisuje wyzwalacz w tej samej transakcji co
+-- zmianę, więc nie ma zmiany bez zdarzenia ani zdarzenia bez zmiany. Odtwarzanie idzie po occurred_at.
+create table if not exists change_events (
+    id bigserial primary key,
+    occurred_at timestamptz not null,
+    entity text not null check (entity in ('submission', 'result')),
+    action text not null check (action in ('upsert', 'delete')),
+    race_id bigint,
+    user_name text,
+    payload jsonb not null
+);
+
+create index if not exists change_events_occurred_at_idx on change_events (occurred_at, id);
+
+-- Dziennik jest tylko do dopisywania
+create or replace function change_events_append_only() returns trigger
+language plpgsql as $$
+begin
+    raise exception 'change_events is append-only';
+end;
+$$;
+
+drop trigger if exists change_events_append_only on change_events;
+create trigger change_events_append_only
+    before update or delete on change_events
+    for each row execute function change_events_append_only();
+
+create or replace function record_change_event() returns trigger
+language plpgsql as $$
+declare
+    row_data jsonb;
+begin
+    if tg_op = 'DELETE' then
+        row_data := to_jsonb(old);
+    else
+        row_data := to_jsonb(new);
+    end if;
+    insert into change_events (occurred_at, entity, action, race_id, user_name, payload)
+    values (
+        clock_timestamp(),
+        case tg_table_name when 'submissions' then 'submission' else 'result' end,
+        case tg_op when 'DELETE' then 'delete' else 'upsert' end,
+        (row_data ->> 'race_id')::bigint,
+        row_data ->> 'user_name',
+        row_data
+    );
+    return null;
+end;
+$$;
+
+drop trigger if exists submissions_change_events on submissions;
+create trigger submissions_change_events
+    after insert or update or delete on submissions
+    for each row execute function record_change_event();
+
+drop trigger if exists results_change_events on results;
+create trigger results_change_events
+    after insert or update or delete on results
+    for each row execute function record_change_event();
+
+-- Okresowe migawki stanu (typy, wyniki i punkty każdego typu) obejmujące wszystkie zdarzenia
+-- do occurred_at; stan z dowolnej chwili = najbliższa wcześniejsza migawka + późniejsze zdarzenia
+create table if not exists event_snapshots (
+    id bigserial primary key,
+    occurred_at timestamptz not null,
+    ruleset_version integer not null,
+    state jsonb not null,
+    created_at timestamptz not null default now()
+);
+
+create index if not exists event_snapshots_occurred_at_idx on event_snapshots (occurred_at);
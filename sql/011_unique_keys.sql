@@ -0,0 +1,17 @@
+-- Unikalne klucze potrzebne upsertom: wysłanie typów to upsert po (race_id, user_name) - ponowne
+-- wysłanie zastępuje poprzedni typ; import wyników z pliku (f1_core/ingest.py) to upsert po race_id.
+-- Migracja niczego nie usuwa: przy zdublowanych wierszach kończy się błędem. Duplikaty usuwa się jawnie, po przejrzeniu raportu:
+--   uv run python f1_cli.py check --fix-duplicates --dry-run   # co zostanie usunięte
+--   uv run python f1_cli.py check --fix-duplicates             # kopia w duplicate_backups, potem usunięcie
+do $$
+begin
+    if exists (select 1 from submissions group by race_id, user_name having count(*) > 1) then
+        raise exception 'Zdublowane typy (race_id, user_name) - uruchom "f1_cli.py check --fix-duplicates"';
+    end if;
+    if exists (select 1 from results group by race_id having count(*) > 1) then
+        raise exception 'Zdublowane wyniki (race_id) - uruchom "f1_cli.py check --fix-duplicates"';
+    end if;
+end $$;
+
+create unique index if not exists submissions_race_user_key on submissions (race_id, user_name);
+create unique index if not exists results_race_id_key on results (race_id);
@@ -0,0 +1,52 @@
+from f1_core import F1Repository
+from f1_core.drafts import DraftWriter
+from f1_core.local_db import LocalStore, LocalSupabaseClient
+
+# Szkic porzucony (np. po wysłaniu typów) w trakcie zapisu w tle nie może wrócić do bazy ani do kolejki
+
+
+class DiscardDuringWrite(F1Repository):
+    def __init__(self, client, fail=False):
+        super().__init__(client)
+        self.writer = None
+        self.fail = fail
+
+    def upsert_rows(self, table_name, rows, on_conflict='id', batch_size=500):
+        for row in rows:
+            self.writer.discard(row['race_id'], row['user_name'])
+            self.delete_draft(row['race_id'], row['user_name'])
+        if self.fail:
+            raise RuntimeError("brak połączenia")
+        return super().upsert_rows(table_name, rows, on_conflict, batch_size)
+
+
+def _writer(fail=False):
+    repo = DiscardDuringWrite(LocalSupabaseClient(LocalStore({"submission_drafts": []})), fail)
+    writer = DraftWriter(repo, flush_interval=3600)
+    repo.writer = writer
+    return repo, writer
+
+
+def test_discard_during_flush_removes_written_draft():
+    repo, writer = _writer()
+    writer.save(1, "Iza", {"podium_1": "A"})
+    writer.flush(force=True)
+    assert repo.get_draft(1, "Iza") is None
+    assert writer.pending_draft(1, "Iza") is None
+
+
+def test_discard_during_failed_flush_is_not_requeued():
+    repo, writer = _writer(fail=True)
+    writer.save(1, "Iza", {"podium_1": "A"})
+    assert writer.flush(force=True) == 0
+    assert writer.pending_draft(1, "Iza") is None
+
+
+def test_draft_saved_after_discard_is_written():
+    repo, writer = _writer()
+    writer.discard(1, "Iza")
+    repo.writer = None
+    repo.upsert_rows = lambda *a, **k: F1Repository.upsert_rows(repo, *a, **k)
+    writer.save(1, "Iza", {"podium_1": "B"})
+    writer.flush(force=True)
+    assert repo.get_draft(1, "Iza")["predictions"] == {"podium_1": "B"}
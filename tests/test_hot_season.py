@@ -0,0 +1,22 @@
+from f1_core.models import hot_season
+
+# Bieżący sezon: wyścig następnego sezonu bez wyników nie przełącza klasyfikacji na pusty sezon
+
+RACES = [
+    {"id": 1, "race_date": "2025-03-16"},
+    {"id": 2, "race_date": "2025-12-07"},
+    {"id": 3, "race_date": "2026-03-08"},
+]
+
+
+def test_future_race_without_results_keeps_current_season():
+    assert hot_season(RACES, {1, 2}) == 2025
+
+
+def test_first_results_of_new_season_switch_season():
+    assert hot_season(RACES, {1, 2, 3}) == 2026
+
+
+def test_without_results_latest_season_with_races():
+    assert hot_season(RACES, set()) == 2026
+    assert hot_season([], set()) is None
@@ -0,0 +1,56 @@
+from f1_core import F1Repository
+from f1_core.ingest import import_results
+from f1_core.local_db import LocalStore, LocalSupabaseClient
+
+# Import z overwrite=True nie kasuje pól, których plik nie podaje (odpowiedzi dodatkowe wpisane ręcznie,
+# Safety Car i czerwona flaga bez komunikatów race_control)
+
+DRIVERS = ["Max Verstappen", "Lando Norris", "Charles Leclerc"]
+
+
+def _feed(**extra):
+    return [{
+        "race_name": "GP Testowe", "race_date": "2025-03-16",
+        "classification": [
+            {"position": i + 1, "driver": driver, "team": "Zespół", "time": "1:30:00.000" if i == 0 else f"+{i}.500",
+             "points": 25 - i}
+            for i, driver in enumerate(DRIVERS)
+        ],
+        "driver_of_the_day": DRIVERS[1],
+        **extra,
+    }]
+
+
+def _repo(existing):
+    store = LocalStore({
+        "races": [{"id": 1, "race_name": "GP Testowe", "race_date": "2025-03-16"}],
+        "results": [existing],
+        "custom_questions": [
+            {"id": 10, "race_id": 1, "question": "Pytanie A", "options": ["Tak", "Nie"]},
+            {"id": 11, "race_id": 1, "question": "Pytanie B", "options": ["Tak", "Nie"]},
+        ],
+    })
+    return F1Repository(LocalSupabaseClient(store))
+
+
+EXISTING = {"id": 5, "race_id": 1, "podium_1": "Lando Norris", "safety_car": True, "red_flag": True,
+            "extra_answers": {"10": "Tak", "11": "Nie"}}
+
+
+def test_overwrite_keeps_fields_missing_from_feed():
+    repo = _repo(dict(EXISTING))
+    report = import_results(repo, _feed(), overwrite=True)
+    assert report["written"] and not report["errors"]
+    row = repo.get_race_results(1)[0]
+    assert row["podium_1"] == "Max Verstappen"
+    assert row["safety_car"] is True and row["red_flag"] is True
+    assert row["extra_answers"] == {"10": "Tak", "11": "Nie"}
+
+
+def test_feed_values_win_over_existing():
+    repo = _repo(dict(EXISTING))
+    import_results(repo, _feed(extra_answers={"Pytanie B": "Tak"}, race_control=[{"category": "Flag", "flag": "GREEN"}]),
+                   overwrite=True)
+    row = repo.get_race_results(1)[0]
+    assert row["safety_car"] is False and row["red_flag"] is False
+    assert row["extra_answers"] == {"10": "Tak", "11": "Tak"}
@@ -0,0 +1,37 @@
+import pytest
+
+from f1_core import F1Repository
+from f1_core.local_db import LocalStore, LocalSupabaseClient
+
+# Odczyty widoków przy limicie wierszy odpowiedzi jak w PostgREST: wynik nie może zależeć od limitu
+USERS = [f"Gracz {i}" for i in range(7)]
+RACES = 6
+
+
+def _tables():
+    races, results, submissions = [], [], []
+    for race_id in range(1, RACES + 1):
+        races.append({"id": race_id, "race_name": f"GP {race_id}", "race_date": f"2025-{race_id:02d}-01"})
+        results.append({"id": 1000 + race_id, "race_id": race_id, "podium_1": "A", "podium_2": "B", "podium_3": "C",
+                        "extra_answers": {}})
+        for n, user in enumerate(USERS):
+            submissions.append({"id": 100 * race_id + n, "race_id": race_id, "user_name": user,
+                                "podium_1": "A" if n % 2 else "B", "podium_2": "B", "podium_3": "C",
+                                "extra_answers": {}})
+    return {"races": races, "results": results, "submissions": submissions}
+
+
+@pytest.mark.parametrize("method, args", [
+    ("get_user_race_points", ()),
+    ("get_user_race_points", (2025,)),
+    ("get_user_points_totals", ()),
+    ("get_field_value_counts", (1,)),
+])
+def test_view_reads_are_paged(method, args, monkeypatch):
+    expected = getattr(F1Repository(LocalSupabaseClient(LocalStore(_tables()))), method)(*args)
+    capped = F1Repository(LocalSupabaseClient(LocalStore(_tables(), max_rows=5)))
+    real_fetch_all = capped.fetch_all
+    monkeypatch.setattr(capped, "fetch_all", lambda *a, **k: real_fetch_all(*a, **{**k, "page_size": 5}))
+    rows = getattr(capped, method)(*args)
+    assert len(expected) > 5
+    assert sorted(map(repr, rows)) == sorted(map(repr, expected))
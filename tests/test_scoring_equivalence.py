@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import scoring_fuzz  # noqa: E402
+
+from f1_core.models import PODIUM_FIELDS  # noqa: E402
+from f1_core.scoring import SCORING_RULESETS  # noqa: E402
+from f1_core.simulation import _sample_outcomes  # noqa: E402
+
+# Szybka wersja benchmarks/scoring_fuzz.py z ustalonymi ziarnami: każda ścieżka punktacji
+# na kilku małych partiach. Widoki w Postgres tylko z F1_TEST_DATABASE_URL.
+SEEDS = range(5)
+CASES = 400
+POSTGRES_URL = os.environ.get("F1_TEST_DATABASE_URL")
+
+
+def _report(failure):
+    return None if failure is None else {key: failure[key] for key in failure if key != "points"}
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_scoring_paths_match_reference(seed):
+    _, failure = scoring_fuzz.run_batch(seed, CASES)
+    assert failure is None, _report(failure)
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="brak F1_TEST_DATABASE_URL")
+@pytest.mark.parametrize("seed", SEEDS)
+def test_postgres_views_match_reference(seed):
+    results, submissions = scoring_fuzz.random_batch(seed, CASES)
+    failure = scoring_fuzz.postgres_mismatch(POSTGRES_URL, seed, results, submissions)
+    assert failure is None, _report(failure)
+
+
+# Punktacja wzorcowa czyta wszystkie kategorie z tekstu zasad
+@pytest.mark.parametrize("version", sorted(SCORING_RULESETS))
+def test_rules_text_lists_every_category(version):
+    rules = scoring_fuzz.RULES[version]
+    ruleset = SCORING_RULESETS[version]
+    assert rules["podium"] > 0
+    assert rules["bonus"] == ruleset["podium_bonus"]
+    assert rules["partial"] == ruleset["podium_partial_points"]
+    assert set(rules["fields"]) == set(scoring_fuzz.RULE_LABELS.values())
+
+
+# Symulowane podium nie powtarza kierowców
+def test_simulated_podium_has_no_repeats():
+    rng = np.random.default_rng(0)
+    n_drivers = len(PODIUM_FIELDS) + 1
+    podium_probs = np.full(n_drivers, 1 / n_drivers)
+    outcome_probs = [podium_probs] * len(PODIUM_FIELDS) + [np.array([0.5, 0.5])]
+    outcomes = _sample_outcomes(rng, outcome_probs, 5000)
+    podium = np.sort(outcomes[:, :len(PODIUM_FIELDS)], axis=1)
+    assert (np.diff(podium, axis=1) > 0).all()